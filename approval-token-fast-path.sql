@@ -0,0 +1,33 @@
+-- Approval Token Fast Path
+-- Run this in Supabase SQL Editor on existing databases
+-- (clean-logical-schema.sql already includes these objects)
+
+-- GET /approval/:token filters on approval_token; every notification email carries one
+CREATE UNIQUE INDEX IF NOT EXISTS idx_member_selections_approval_token
+  ON member_selections(approval_token);
+
+-- Compact prejoined row for the approval page (selection + member + plan)
+CREATE OR REPLACE VIEW member_selection_approvals
+WITH (security_invoker = true) AS
+SELECT
+  ms.id,
+  ms.approval_token,
+  ms.status,
+  ms.shipment_id,
+  ms.delivery_date,
+  ms.approved_at,
+  ms.wine_preferences,
+  m.id AS member_id,
+  m.wine_club_id,
+  m.name AS member_name,
+  m.email AS member_email,
+  m.subscription_plan_id,
+  sp.name AS plan_name,
+  sp.bottle_count AS plan_bottle_count
+FROM member_selections ms
+JOIN members m ON m.id = ms.member_id
+LEFT JOIN subscription_plans sp ON sp.id = m.subscription_plan_id;
+
+-- Verify the lookup uses the index
+EXPLAIN SELECT * FROM member_selection_approvals
+WHERE approval_token = '00000000-0000-0000-0000-000000000000';
@@ -0,0 +1,59 @@
+-- Billing Run Tracking
+-- Run this in Supabase SQL Editor on existing databases
+-- (clean-logical-schema.sql already includes these objects)
+
+-- Per-selection checkpoint for the billing run engine.
+-- NULL = not billed, 'order_created' = order exists but unpaid, 'paid', 'failed', 'skipped'
+ALTER TABLE member_selections ADD COLUMN IF NOT EXISTS billing_status VARCHAR(20);
+ALTER TABLE member_selections ADD COLUMN IF NOT EXISTS square_order_id VARCHAR(255);
+ALTER TABLE member_selections ADD COLUMN IF NOT EXISTS square_payment_id VARCHAR(255);
+ALTER TABLE member_selections ADD COLUMN IF NOT EXISTS billing_error TEXT;
+ALTER TABLE member_selections ADD COLUMN IF NOT EXISTS billed_at TIMESTAMP WITH TIME ZONE;
+-- Bumped each time a failed payment is retried; part of the payment idempotency key
+ALTER TABLE member_selections ADD COLUMN IF NOT EXISTS billing_attempt INTEGER NOT NULL DEFAULT 0;
+
+-- The engine pages through one shipment's approved, unbilled selections
+CREATE INDEX IF NOT EXISTS idx_member_selections_billing
+  ON member_selections(shipment_id, status, billing_status);
+
+-- Tracking imports and payment webhooks look selections up by their Square order
+CREATE INDEX IF NOT EXISTS idx_member_selections_square_order
+  ON member_selections(square_order_id) WHERE square_order_id IS NOT NULL;
+
+-- One billing run per shipment at a time. The edge function claims the row before a run,
+-- refreshes heartbeat_at at every checkpoint and deletes it when done; a row whose heartbeat
+-- is older than p_stale_seconds belongs to a crashed run and may be taken over.
+-- No RLS policies: only the edge function (service role) touches it.
+CREATE TABLE IF NOT EXISTS billing_run_locks (
+  shipment_id UUID PRIMARY KEY REFERENCES shipments(id) ON DELETE CASCADE,
+  run_id UUID NOT NULL,
+  heartbeat_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+ALTER TABLE billing_run_locks ENABLE ROW LEVEL SECURITY;
+
+-- TRUE when p_run_id now holds the shipment's lock. A single INSERT ... ON CONFLICT, so two
+-- concurrent callers can never both succeed.
+CREATE OR REPLACE FUNCTION claim_billing_run(
+  p_shipment_id UUID,
+  p_run_id UUID,
+  p_stale_seconds INTEGER DEFAULT 120
+) RETURNS BOOLEAN
+LANGUAGE sql
+AS $$
+  WITH claimed AS (
+    INSERT INTO billing_run_locks (shipment_id, run_id, heartbeat_at)
+    VALUES (p_shipment_id, p_run_id, NOW())
+    ON CONFLICT (shipment_id) DO UPDATE
+      SET run_id = EXCLUDED.run_id, heartbeat_at = EXCLUDED.heartbeat_at
+      WHERE billing_run_locks.heartbeat_at < NOW() - make_interval(secs => p_stale_seconds)
+    RETURNING 1
+  )
+  SELECT EXISTS (SELECT 1 FROM claimed);
+$$;
+
+-- Progress per shipment
+SELECT shipment_id, billing_status, count(*)
+FROM member_selections
+WHERE status = 'approved'
+GROUP BY shipment_id, billing_status
+ORDER BY shipment_id;
@@ -0,0 +1,19 @@
+-- Catalog Images
+-- Run this in Supabase SQL Editor on existing databases
+-- (creates the Storage bucket used by image-proxy.tsx)
+
+-- Public bucket holding one copy of every Square catalog image the image proxy has served.
+-- Objects are keyed by a hash of the Square URL and never change, so renditions can be
+-- cached for a year. Only the edge function (service role) writes to it.
+INSERT INTO storage.buckets (id, name, public, file_size_limit, allowed_mime_types)
+VALUES (
+  'catalog-images',
+  'catalog-images',
+  true,
+  10485760,
+  ARRAY['image/jpeg', 'image/png', 'image/gif', 'image/webp']
+)
+ON CONFLICT (id) DO UPDATE SET
+  public = EXCLUDED.public,
+  file_size_limit = EXCLUDED.file_size_limit,
+  allowed_mime_types = EXCLUDED.allowed_mime_types;
@@ -7,6 +7,11 @@
 -- ========================================
 
 -- Drop in reverse dependency order
+DROP TABLE IF EXISTS square_catalog_versions CASCADE;
+DROP TABLE IF EXISTS billing_run_locks CASCADE;
+DROP TABLE IF EXISTS plan_selection_index CASCADE;
+DROP TABLE IF EXISTS square_webhook_events CASCADE;
+DROP TABLE IF EXISTS fulfillment_orders CASCADE;
 DROP TABLE IF EXISTS plan_preference_matrix CASCADE;
 DROP TABLE IF EXISTS plan_wine_assignments CASCADE;
 DROP TABLE IF EXISTS member_selections CASCADE;
@@ -49,7 +54,8 @@ CREATE TABLE subscription_plans (
   icon_url TEXT,
   square_segment_id VARCHAR(255),
   created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  UNIQUE(wine_club_id, name, bottle_count)
 );
 
 -- 3. MEMBERS (From Wine Clubs + Plans)
@@ -100,6 +106,16 @@ CREATE TABLE member_selections (
   wine_preferences JSONB,
   approval_token UUID DEFAULT uuid_generate_v4(),
   status VARCHAR(50) DEFAULT 'pending',
+  notification_status VARCHAR(20),
+  notification_id VARCHAR(255),
+  notification_error TEXT,
+  notified_at TIMESTAMP WITH TIME ZONE,
+  billing_status VARCHAR(20),
+  billing_attempt INTEGER NOT NULL DEFAULT 0,
+  square_order_id VARCHAR(255),
+  square_payment_id VARCHAR(255),
+  billing_error TEXT,
+  billed_at TIMESTAMP WITH TIME ZONE,
   created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
   updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
   UNIQUE(member_id, shipment_id)
@@ -181,6 +197,71 @@ CREATE TABLE kv_store_9d538b9c (
   updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- 14. FULFILLMENT ORDERS (From Shipments + Square Orders)
+CREATE TABLE fulfillment_orders (
+  id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+  wine_club_id VARCHAR(50) NOT NULL REFERENCES wine_clubs(id) ON DELETE CASCADE,
+  shipment_id UUID REFERENCES shipments(id) ON DELETE CASCADE,
+  square_order_id VARCHAR(255) NOT NULL,
+  order_number VARCHAR(100) NOT NULL,
+  customer_name VARCHAR(255),
+  customer_email VARCHAR(255),
+  stage VARCHAR(20) NOT NULL DEFAULT 'pending' CHECK (stage IN ('pending', 'picked', 'approved', 'shipped')),
+  order_data JSONB NOT NULL DEFAULT '{}',
+  picked_items JSONB NOT NULL DEFAULT '[]',
+  tracking_number VARCHAR(255),
+  picked_at TIMESTAMP WITH TIME ZONE,
+  picked_by VARCHAR(255),
+  approved_at TIMESTAMP WITH TIME ZONE,
+  approved_by VARCHAR(255),
+  shipped_at TIMESTAMP WITH TIME ZONE,
+  shipped_by VARCHAR(255),
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  UNIQUE NULLS NOT DISTINCT (wine_club_id, shipment_id, square_order_id)
+);
+
+-- 15. SQUARE WEBHOOK EVENTS (Deduped by Square event_id, kept for replay)
+CREATE TABLE square_webhook_events (
+  event_id VARCHAR(255) PRIMARY KEY,
+  event_type VARCHAR(100) NOT NULL,
+  merchant_id VARCHAR(255),
+  wine_club_id VARCHAR(50) REFERENCES wine_clubs(id) ON DELETE SET NULL,
+  status VARCHAR(20) NOT NULL DEFAULT 'received' CHECK (status IN ('received', 'processed', 'ignored', 'failed')),
+  result JSONB,
+  error TEXT,
+  payload JSONB NOT NULL,
+  received_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  processed_at TIMESTAMP WITH TIME ZONE
+);
+
+-- 16. PLAN SELECTION INDEX (From Plans + Preferences + Square catalog, built by the edge function)
+CREATE TABLE plan_selection_index (
+  id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+  wine_club_id VARCHAR(50) NOT NULL REFERENCES wine_clubs(id) ON DELETE CASCADE,
+  subscription_plan_id UUID NOT NULL REFERENCES subscription_plans(id) ON DELETE CASCADE,
+  preference_id UUID REFERENCES wine_preferences(id) ON DELETE CASCADE, -- NULL = plan default
+  variation_ids TEXT[] NOT NULL DEFAULT '{}',
+  wines JSONB NOT NULL DEFAULT '[]',
+  stale BOOLEAN NOT NULL DEFAULT FALSE,
+  catalog_fetched_at TIMESTAMP WITH TIME ZONE,
+  refreshed_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  UNIQUE NULLS NOT DISTINCT (subscription_plan_id, preference_id)
+);
+
+-- 17. BILLING RUN LOCKS (One billing run per shipment, claimed by claim_billing_run)
+CREATE TABLE billing_run_locks (
+  shipment_id UUID PRIMARY KEY REFERENCES shipments(id) ON DELETE CASCADE,
+  run_id UUID NOT NULL,
+  heartbeat_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+-- 18. SQUARE CATALOG VERSIONS (Per-club stale stamp written by catalog/inventory webhooks)
+CREATE TABLE square_catalog_versions (
+  wine_club_id VARCHAR(50) PRIMARY KEY REFERENCES wine_clubs(id) ON DELETE CASCADE,
+  stale_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
 -- ========================================
 -- STEP 3: ENABLE RLS ON ALL TABLES
 -- ========================================
@@ -198,24 +279,158 @@ ALTER TABLE wine_preferences ENABLE ROW LEVEL SECURITY;
 ALTER TABLE plan_preference_matrix ENABLE ROW LEVEL SECURITY;
 ALTER TABLE plan_wine_assignments ENABLE ROW LEVEL SECURITY;
 ALTER TABLE kv_store_9d538b9c ENABLE ROW LEVEL SECURITY;
+ALTER TABLE fulfillment_orders ENABLE ROW LEVEL SECURITY;
+ALTER TABLE square_webhook_events ENABLE ROW LEVEL SECURITY;
+ALTER TABLE plan_selection_index ENABLE ROW LEVEL SECURITY;
+-- No policies: only the edge function (service role) uses it
+ALTER TABLE billing_run_locks ENABLE ROW LEVEL SECURITY;
+ALTER TABLE square_catalog_versions ENABLE ROW LEVEL SECURITY;
 
 -- ========================================
--- STEP 4: CREATE SIMPLE RLS POLICIES
+-- STEP 4: CREATE TENANT RLS POLICIES
 -- ========================================
 
-CREATE POLICY "wine_clubs_policy" ON wine_clubs FOR ALL USING (true);
-CREATE POLICY "subscription_plans_policy" ON subscription_plans FOR ALL USING (true);
-CREATE POLICY "members_policy" ON members FOR ALL USING (true);
-CREATE POLICY "shipments_policy" ON shipments FOR ALL USING (true);
-CREATE POLICY "shipment_items_policy" ON shipment_items FOR ALL USING (true);
-CREATE POLICY "member_selections_policy" ON member_selections FOR ALL USING (true);
-CREATE POLICY "global_preferences_policy" ON global_preferences FOR ALL USING (true);
-CREATE POLICY "custom_preferences_policy" ON custom_preferences FOR ALL USING (true);
-CREATE POLICY "admin_users_policy" ON admin_users FOR ALL USING (true);
-CREATE POLICY "wine_preferences_policy" ON wine_preferences FOR ALL USING (true);
-CREATE POLICY "plan_preference_matrix_policy" ON plan_preference_matrix FOR ALL USING (true);
-CREATE POLICY "plan_wine_assignments_policy" ON plan_wine_assignments FOR ALL USING (true);
-CREATE POLICY "kv_store_policy" ON kv_store_9d538b9c FOR ALL USING (true);
+-- The tenant comes from the JWT (app_metadata.wine_club_id, synced from admin_users).
+-- `= ANY ((SELECT current_wine_club_ids()))` is evaluated once per statement and used as an
+-- index condition on idx_*_wine_club_id. See tenant-rls.sql for the full notes.
+CREATE OR REPLACE FUNCTION public.current_wine_club_id() RETURNS VARCHAR
+LANGUAGE sql STABLE
+AS $$
+  SELECT NULLIF(auth.jwt() -> 'app_metadata' ->> 'wine_club_id', '')
+$$;
+
+CREATE OR REPLACE FUNCTION public.is_platform_admin() RETURNS BOOLEAN
+LANGUAGE sql STABLE
+AS $$
+  SELECT COALESCE(auth.jwt() -> 'app_metadata' ->> 'club_role', '') IN ('superadmin', 'saas_admin')
+$$;
+
+-- The clubs the caller may touch: its own, every club for platform admins, none otherwise.
+-- SECURITY DEFINER so listing clubs for a platform admin does not re-enter wine_clubs' policy.
+CREATE OR REPLACE FUNCTION public.current_wine_club_ids() RETURNS VARCHAR[]
+LANGUAGE sql STABLE SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT CASE
+    WHEN is_platform_admin() THEN ARRAY(SELECT id FROM wine_clubs)
+    ELSE ARRAY_REMOVE(ARRAY[current_wine_club_id()], NULL)
+  END
+$$;
+
+-- Claim sync (admin_users -> auth.users.raw_app_meta_data)
+CREATE OR REPLACE FUNCTION public.admin_tenant_claims(p_email TEXT) RETURNS JSONB
+LANGUAGE sql STABLE SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT COALESCE((
+    SELECT jsonb_strip_nulls(jsonb_build_object('wine_club_id', a.wine_club_id, 'club_role', a.role))
+    FROM admin_users a
+    WHERE lower(a.email) = lower(p_email) AND a.is_active
+    LIMIT 1
+  ), '{}'::jsonb)
+$$;
+
+CREATE OR REPLACE FUNCTION public.apply_admin_tenant_claims(p_email TEXT) RETURNS VOID
+LANGUAGE sql SECURITY DEFINER
+SET search_path = public
+AS $$
+  UPDATE auth.users u
+  SET raw_app_meta_data = (COALESCE(u.raw_app_meta_data, '{}'::jsonb) - 'wine_club_id' - 'club_role')
+                          || admin_tenant_claims(p_email)
+  WHERE lower(u.email) = lower(p_email);
+$$;
+
+CREATE OR REPLACE FUNCTION public.sync_admin_tenant_claims() RETURNS TRIGGER
+LANGUAGE plpgsql SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF TG_OP <> 'INSERT' THEN
+    PERFORM apply_admin_tenant_claims(OLD.email);
+  END IF;
+  IF TG_OP <> 'DELETE' AND (TG_OP = 'INSERT' OR NEW.email IS DISTINCT FROM OLD.email) THEN
+    PERFORM apply_admin_tenant_claims(NEW.email);
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS admin_users_tenant_claims ON admin_users;
+CREATE TRIGGER admin_users_tenant_claims
+  AFTER INSERT OR UPDATE OF email, wine_club_id, role, is_active OR DELETE ON admin_users
+  FOR EACH ROW EXECUTE FUNCTION public.sync_admin_tenant_claims();
+
+-- Admins created before their auth user signs up get their claims at signup
+CREATE OR REPLACE FUNCTION public.seed_auth_user_tenant_claims() RETURNS TRIGGER
+LANGUAGE plpgsql SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  NEW.raw_app_meta_data := COALESCE(NEW.raw_app_meta_data, '{}'::jsonb) || admin_tenant_claims(NEW.email);
+  RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS auth_users_tenant_claims ON auth.users;
+CREATE TRIGGER auth_users_tenant_claims
+  BEFORE INSERT ON auth.users
+  FOR EACH ROW EXECUTE FUNCTION public.seed_auth_user_tenant_claims();
+
+-- Policies (authenticated only; the edge function's service role bypasses them)
+CREATE POLICY "wine_clubs_tenant_policy" ON wine_clubs FOR ALL TO authenticated
+  USING (id = ANY ((SELECT current_wine_club_ids())));
+
+CREATE POLICY "subscription_plans_tenant_policy" ON subscription_plans FOR ALL TO authenticated
+  USING (wine_club_id = ANY ((SELECT current_wine_club_ids())));
+
+CREATE POLICY "members_tenant_policy" ON members FOR ALL TO authenticated
+  USING (wine_club_id = ANY ((SELECT current_wine_club_ids())));
+
+CREATE POLICY "shipments_tenant_policy" ON shipments FOR ALL TO authenticated
+  USING (wine_club_id = ANY ((SELECT current_wine_club_ids())));
+
+CREATE POLICY "shipment_items_tenant_policy" ON shipment_items FOR ALL TO authenticated
+  USING (shipment_id IN (SELECT id FROM shipments WHERE wine_club_id = ANY ((SELECT current_wine_club_ids()))));
+
+-- Scoped through shipments (a handful per club) rather than members (up to 100k+ per club)
+CREATE POLICY "member_selections_tenant_policy" ON member_selections FOR ALL TO authenticated
+  USING (shipment_id IN (SELECT id FROM shipments WHERE wine_club_id = ANY ((SELECT current_wine_club_ids()))));
+
+CREATE POLICY "global_preferences_tenant_policy" ON global_preferences FOR ALL TO authenticated
+  USING (wine_club_id = ANY ((SELECT current_wine_club_ids())));
+
+CREATE POLICY "custom_preferences_tenant_policy" ON custom_preferences FOR ALL TO authenticated
+  USING (wine_club_id = ANY ((SELECT current_wine_club_ids())));
+
+-- Platform admins have no wine_club_id, so they are matched by role here (the table is tiny)
+CREATE POLICY "admin_users_tenant_policy" ON admin_users FOR ALL TO authenticated
+  USING (wine_club_id = ANY ((SELECT current_wine_club_ids())) OR (SELECT is_platform_admin()));
+
+-- Shared reference data: everyone signed in reads, platform admins write
+CREATE POLICY "wine_preferences_read_policy" ON wine_preferences FOR SELECT TO authenticated
+  USING (true);
+CREATE POLICY "wine_preferences_admin_policy" ON wine_preferences FOR ALL TO authenticated
+  USING ((SELECT is_platform_admin()));
+
+CREATE POLICY "plan_preference_matrix_tenant_policy" ON plan_preference_matrix FOR ALL TO authenticated
+  USING (subscription_plan_id IN (SELECT id FROM subscription_plans WHERE wine_club_id = ANY ((SELECT current_wine_club_ids()))));
+
+CREATE POLICY "plan_wine_assignments_tenant_policy" ON plan_wine_assignments FOR ALL TO authenticated
+  USING (subscription_plan_id IN (SELECT id FROM subscription_plans WHERE wine_club_id = ANY ((SELECT current_wine_club_ids()))));
+
+CREATE POLICY "kv_store_tenant_policy" ON kv_store_9d538b9c FOR ALL TO authenticated
+  USING (wine_club_id = ANY ((SELECT current_wine_club_ids())));
+
+CREATE POLICY "fulfillment_orders_tenant_policy" ON fulfillment_orders FOR ALL TO authenticated
+  USING (wine_club_id = ANY ((SELECT current_wine_club_ids())));
+
+-- Raw Square payloads are only for the platform (the webhook itself uses the service role)
+CREATE POLICY "square_webhook_events_admin_policy" ON square_webhook_events FOR ALL TO authenticated
+  USING ((SELECT is_platform_admin()));
+
+-- Written only by the edge function (service role)
+CREATE POLICY "plan_selection_index_tenant_policy" ON plan_selection_index FOR SELECT TO authenticated
+  USING (wine_club_id = ANY ((SELECT current_wine_club_ids())));
 
 -- ========================================
 -- STEP 5: CREATE PERFORMANCE INDEXES
@@ -237,6 +452,15 @@ CREATE INDEX idx_shipment_items_shipment_id ON shipment_items(shipment_id);
 CREATE INDEX idx_shipment_items_subscription_plan_id ON shipment_items(subscription_plan_id);
 CREATE INDEX idx_member_selections_member_id ON member_selections(member_id);
 CREATE INDEX idx_member_selections_shipment_id ON member_selections(shipment_id);
+CREATE UNIQUE INDEX idx_member_selections_approval_token ON member_selections(approval_token);
+CREATE INDEX idx_member_selections_notification ON member_selections(shipment_id, notification_status);
+CREATE INDEX idx_member_selections_billing ON member_selections(shipment_id, status, billing_status);
+CREATE INDEX idx_member_selections_square_order ON member_selections(square_order_id) WHERE square_order_id IS NOT NULL;
+CREATE INDEX idx_fulfillment_orders_stage ON fulfillment_orders(wine_club_id, stage, created_at, id);
+CREATE INDEX idx_square_webhook_events_received ON square_webhook_events(status, received_at);
+CREATE INDEX idx_members_square_customer_id ON members(square_customer_id);
+CREATE INDEX idx_member_selections_square_payment_id ON member_selections(square_payment_id);
+CREATE INDEX idx_wine_clubs_square_location_id ON wine_clubs(square_location_id);
 CREATE INDEX idx_custom_preferences_member_id ON custom_preferences(member_id);
 CREATE INDEX idx_admin_users_email ON admin_users(email);
 CREATE INDEX idx_wine_preferences_code ON wine_preferences(code);
@@ -244,6 +468,158 @@ CREATE INDEX idx_plan_preference_matrix_plan_id ON plan_preference_matrix(subscr
 CREATE INDEX idx_plan_preference_matrix_preference_id ON plan_preference_matrix(preference_id);
 CREATE INDEX idx_plan_wine_assignments_plan_id ON plan_wine_assignments(subscription_plan_id);
 CREATE INDEX idx_plan_wine_assignments_preference_id ON plan_wine_assignments(preference_id);
+CREATE INDEX idx_plan_selection_index_club ON plan_selection_index(wine_club_id);
+
+-- Matrix or assignment edits mark the plan's selection index rows stale; the next lookup
+-- rebuilds them from the catalog (selection-index.tsx)
+CREATE OR REPLACE FUNCTION mark_plan_selection_index_stale()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  UPDATE plan_selection_index SET stale = TRUE
+  WHERE subscription_plan_id IN (NEW.subscription_plan_id, OLD.subscription_plan_id)
+    AND NOT stale;
+  RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER plan_preference_matrix_selection_index
+  AFTER INSERT OR UPDATE OR DELETE ON plan_preference_matrix
+  FOR EACH ROW EXECUTE FUNCTION mark_plan_selection_index_stale();
+
+CREATE TRIGGER plan_wine_assignments_selection_index
+  AFTER INSERT OR UPDATE OR DELETE ON plan_wine_assignments
+  FOR EACH ROW EXECUTE FUNCTION mark_plan_selection_index_stale();
+
+-- Approval link lookup: one indexed row with the member and plan prejoined.
+-- Shipment items are shared by every member of a shipment, so they are fetched separately.
+CREATE OR REPLACE VIEW member_selection_approvals
+WITH (security_invoker = true) AS
+SELECT
+  ms.id,
+  ms.approval_token,
+  ms.status,
+  ms.shipment_id,
+  ms.delivery_date,
+  ms.approved_at,
+  ms.wine_preferences,
+  m.id AS member_id,
+  m.wine_club_id,
+  m.name AS member_name,
+  m.email AS member_email,
+  m.subscription_plan_id,
+  sp.name AS plan_name,
+  sp.bottle_count AS plan_bottle_count
+FROM member_selections ms
+JOIN members m ON m.id = ms.member_id
+LEFT JOIN subscription_plans sp ON sp.id = m.subscription_plan_id;
+
+-- Moves a set of fulfillment orders one stage forward in a single statement
+-- (pending -> picked -> approved -> shipped). Orders not in the preceding stage are left
+-- alone; the ids that actually moved are returned.
+CREATE OR REPLACE FUNCTION fulfillment_transition(
+  p_wine_club_id VARCHAR,
+  p_order_ids UUID[],
+  p_to VARCHAR,
+  p_actor VARCHAR DEFAULT NULL,
+  p_tracking JSONB DEFAULT '{}'::jsonb,
+  p_items JSONB DEFAULT '{}'::jsonb
+) RETURNS SETOF UUID
+LANGUAGE sql
+AS $$
+  UPDATE fulfillment_orders f SET
+    stage = p_to,
+    picked_items = CASE WHEN p_to = 'picked' THEN COALESCE(p_items -> f.id::text, f.picked_items) ELSE f.picked_items END,
+    picked_at = CASE WHEN p_to = 'picked' THEN NOW() ELSE f.picked_at END,
+    picked_by = CASE WHEN p_to = 'picked' THEN p_actor ELSE f.picked_by END,
+    approved_at = CASE WHEN p_to = 'approved' THEN NOW() ELSE f.approved_at END,
+    approved_by = CASE WHEN p_to = 'approved' THEN p_actor ELSE f.approved_by END,
+    shipped_at = CASE WHEN p_to = 'shipped' THEN NOW() ELSE f.shipped_at END,
+    shipped_by = CASE WHEN p_to = 'shipped' THEN p_actor ELSE f.shipped_by END,
+    tracking_number = CASE WHEN p_to = 'shipped' THEN COALESCE(NULLIF(p_tracking ->> f.id::text, ''), f.tracking_number) ELSE f.tracking_number END,
+    updated_at = NOW()
+  WHERE f.wine_club_id = p_wine_club_id
+    AND f.id = ANY(p_order_ids)
+    AND f.stage = CASE p_to
+      WHEN 'picked' THEN 'pending'
+      WHEN 'approved' THEN 'picked'
+      WHEN 'shipped' THEN 'approved'
+    END
+  RETURNING f.id;
+$$;
+
+-- Duplicate plan cleanup, all clubs (or one) in one pass.
+-- Plans are duplicates when they share wine_club_id, name and bottle_count. Within each group
+-- the newest plan with a description is kept (newest overall if none has one). Members and
+-- shipment items on a duplicate are moved to the kept plan before the duplicate is deleted.
+-- p_dry_run = TRUE only reports what would be removed.
+CREATE OR REPLACE FUNCTION cleanup_duplicate_plans(
+  p_wine_club_id VARCHAR DEFAULT NULL,
+  p_dry_run BOOLEAN DEFAULT TRUE
+) RETURNS TABLE (
+  plan_id UUID,
+  keep_plan_id UUID,
+  wine_club_id VARCHAR,
+  name VARCHAR,
+  bottle_count INTEGER,
+  created_at TIMESTAMP WITH TIME ZONE
+)
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+BEGIN
+  DROP TABLE IF EXISTS _plan_duplicates;
+  CREATE TEMP TABLE _plan_duplicates ON COMMIT DROP AS
+  SELECT ranked.id AS plan_id, ranked.keep_id AS keep_plan_id, ranked.wine_club_id,
+         ranked.name, ranked.bottle_count, ranked.created_at
+  FROM (
+    SELECT sp.id, sp.wine_club_id, sp.name, sp.bottle_count, sp.created_at,
+           row_number() OVER w AS rn,
+           first_value(sp.id) OVER w AS keep_id
+    FROM subscription_plans sp
+    WHERE p_wine_club_id IS NULL OR sp.wine_club_id = p_wine_club_id
+    WINDOW w AS (
+      PARTITION BY sp.wine_club_id, sp.name, sp.bottle_count
+      ORDER BY (COALESCE(cardinality(sp.description), 0) > 0) DESC, sp.created_at DESC, sp.id
+    )
+  ) ranked
+  WHERE ranked.rn > 1;
+
+  IF NOT p_dry_run THEN
+    UPDATE members m SET subscription_plan_id = d.keep_plan_id, updated_at = NOW()
+    FROM _plan_duplicates d WHERE m.subscription_plan_id = d.plan_id;
+
+    UPDATE shipment_items si SET subscription_plan_id = d.keep_plan_id
+    FROM _plan_duplicates d WHERE si.subscription_plan_id = d.plan_id;
+
+    -- Preference matrix / wine assignments of duplicates cascade with the plan
+    DELETE FROM subscription_plans sp USING _plan_duplicates d WHERE sp.id = d.plan_id;
+  END IF;
+
+  RETURN QUERY SELECT * FROM _plan_duplicates ORDER BY 3, 4, 6;
+END;
+$$;
+
+-- TRUE when p_run_id now holds the shipment's billing lock; a lock whose heartbeat is older
+-- than p_stale_seconds belongs to a crashed run and is taken over
+CREATE OR REPLACE FUNCTION claim_billing_run(
+  p_shipment_id UUID,
+  p_run_id UUID,
+  p_stale_seconds INTEGER DEFAULT 120
+) RETURNS BOOLEAN
+LANGUAGE sql
+AS $$
+  WITH claimed AS (
+    INSERT INTO billing_run_locks (shipment_id, run_id, heartbeat_at)
+    VALUES (p_shipment_id, p_run_id, NOW())
+    ON CONFLICT (shipment_id) DO UPDATE
+      SET run_id = EXCLUDED.run_id, heartbeat_at = EXCLUDED.heartbeat_at
+      WHERE billing_run_locks.heartbeat_at < NOW() - make_interval(secs => p_stale_seconds)
+    RETURNING 1
+  )
+  SELECT EXISTS (SELECT 1 FROM claimed);
+$$;
 
 -- ========================================
 -- STEP 6: INSERT CLEAN SAMPLE DATA
@@ -271,7 +647,8 @@ ON CONFLICT (wine_club_id, email) DO NOTHING;
 -- Insert sample admin users
 INSERT INTO admin_users (wine_club_id, email, name, role, is_active) VALUES
 (NULL, 'jimmy@arccom.io', 'Jimmy Arc', 'saas_admin', true),
-('1', 'klausbellinghausen@gmail.com', 'Klaus Bellinghausen', 'owner', true)
+('1', 'klausbellinghausen@gmail.com', 'Klaus Bellinghausen', 'owner', true),
+('1', 'demo@wineclub.com', 'Demo Admin', 'admin', true)
 ON CONFLICT (email) DO NOTHING;
 
 -- Insert sample global preferences (REAL DATA from wine club setup)
@@ -1,10 +1,76 @@
--- Cleanup Duplicate Plans for King Frosch Wine Club
--- This will remove the older duplicate plans and keep the newer ones with descriptions
+-- Cleanup Duplicate Plans (all wine clubs)
+-- Run this in Supabase SQL Editor. Installs cleanup_duplicate_plans(), removes existing
+-- duplicates in one pass, then adds the unique key that stops new ones being created.
 
--- Delete duplicate plans (older ones without descriptions)
-DELETE FROM subscription_plans WHERE id = 'a9a924e9-d954-4a39-a8e2-f45b8373a3bb';
-DELETE FROM subscription_plans WHERE id = '3caacf9d-a6df-40eb-9cad-658c6b69f2f2';
-DELETE FROM subscription_plans WHERE id = '99adf485-098b-40d3-986f-21df5a7a02ab';
+-- Duplicate plan cleanup, all clubs (or one) in one pass.
+-- Plans are duplicates when they share wine_club_id, name and bottle_count. Within each group
+-- the newest plan with a description is kept (newest overall if none has one). Members and
+-- shipment items on a duplicate are moved to the kept plan before the duplicate is deleted.
+-- p_dry_run = TRUE only reports what would be removed.
+CREATE OR REPLACE FUNCTION cleanup_duplicate_plans(
+  p_wine_club_id VARCHAR DEFAULT NULL,
+  p_dry_run BOOLEAN DEFAULT TRUE
+) RETURNS TABLE (
+  plan_id UUID,
+  keep_plan_id UUID,
+  wine_club_id VARCHAR,
+  name VARCHAR,
+  bottle_count INTEGER,
+  created_at TIMESTAMP WITH TIME ZONE
+)
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+BEGIN
+  DROP TABLE IF EXISTS _plan_duplicates;
+  CREATE TEMP TABLE _plan_duplicates ON COMMIT DROP AS
+  SELECT ranked.id AS plan_id, ranked.keep_id AS keep_plan_id, ranked.wine_club_id,
+         ranked.name, ranked.bottle_count, ranked.created_at
+  FROM (
+    SELECT sp.id, sp.wine_club_id, sp.name, sp.bottle_count, sp.created_at,
+           row_number() OVER w AS rn,
+           first_value(sp.id) OVER w AS keep_id
+    FROM subscription_plans sp
+    WHERE p_wine_club_id IS NULL OR sp.wine_club_id = p_wine_club_id
+    WINDOW w AS (
+      PARTITION BY sp.wine_club_id, sp.name, sp.bottle_count
+      ORDER BY (COALESCE(cardinality(sp.description), 0) > 0) DESC, sp.created_at DESC, sp.id
+    )
+  ) ranked
+  WHERE ranked.rn > 1;
+
+  IF NOT p_dry_run THEN
+    UPDATE members m SET subscription_plan_id = d.keep_plan_id, updated_at = NOW()
+    FROM _plan_duplicates d WHERE m.subscription_plan_id = d.plan_id;
+
+    UPDATE shipment_items si SET subscription_plan_id = d.keep_plan_id
+    FROM _plan_duplicates d WHERE si.subscription_plan_id = d.plan_id;
+
+    -- Preference matrix / wine assignments of duplicates cascade with the plan
+    DELETE FROM subscription_plans sp USING _plan_duplicates d WHERE sp.id = d.plan_id;
+  END IF;
+
+  RETURN QUERY SELECT * FROM _plan_duplicates ORDER BY 3, 4, 6;
+END;
+$$;
+
+-- 1. Preview: every plan that would be removed and the plan it folds into
+SELECT * FROM cleanup_duplicate_plans(NULL, TRUE);
+
+-- 2. Remove duplicates across all clubs (pass a wine_club_id to limit to one club)
+SELECT * FROM cleanup_duplicate_plans(NULL, FALSE);
+
+-- 3. Prevent duplicates from being created again (POST /plans upserts on this key)
+DO $$
+BEGIN
+  IF NOT EXISTS (
+    SELECT 1 FROM pg_constraint WHERE conname = 'subscription_plans_wine_club_id_name_bottle_count_key'
+  ) THEN
+    ALTER TABLE subscription_plans
+      ADD CONSTRAINT subscription_plans_wine_club_id_name_bottle_count_key
+      UNIQUE (wine_club_id, name, bottle_count);
+  END IF;
+END $$;
 
 -- Verify the cleanup
-SELECT COUNT(*) as remaining_plans FROM subscription_plans WHERE wine_club_id = '550e8400-e29b-41d4-a716-446655440000';
+SELECT wine_club_id, count(*) AS remaining_plans FROM subscription_plans GROUP BY wine_club_id;
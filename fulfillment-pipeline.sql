@@ -0,0 +1,75 @@
+-- Fulfillment Pipeline
+-- Run this in Supabase SQL Editor on existing databases
+-- (clean-logical-schema.sql already includes these objects)
+
+-- One row per order per shipment; stage moves pending -> picked -> approved -> shipped
+CREATE TABLE IF NOT EXISTS fulfillment_orders (
+  id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+  wine_club_id VARCHAR(50) NOT NULL REFERENCES wine_clubs(id) ON DELETE CASCADE,
+  shipment_id UUID REFERENCES shipments(id) ON DELETE CASCADE,
+  square_order_id VARCHAR(255) NOT NULL,
+  order_number VARCHAR(100) NOT NULL,
+  customer_name VARCHAR(255),
+  customer_email VARCHAR(255),
+  stage VARCHAR(20) NOT NULL DEFAULT 'pending' CHECK (stage IN ('pending', 'picked', 'approved', 'shipped')),
+  order_data JSONB NOT NULL DEFAULT '{}',
+  picked_items JSONB NOT NULL DEFAULT '[]',
+  tracking_number VARCHAR(255),
+  picked_at TIMESTAMP WITH TIME ZONE,
+  picked_by VARCHAR(255),
+  approved_at TIMESTAMP WITH TIME ZONE,
+  approved_by VARCHAR(255),
+  shipped_at TIMESTAMP WITH TIME ZONE,
+  shipped_by VARCHAR(255),
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  UNIQUE NULLS NOT DISTINCT (wine_club_id, shipment_id, square_order_id)
+);
+
+ALTER TABLE fulfillment_orders ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS "fulfillment_orders_policy" ON fulfillment_orders;
+CREATE POLICY "fulfillment_orders_policy" ON fulfillment_orders FOR ALL USING (true);
+
+-- Stage views page by (created_at, id) within a club
+CREATE INDEX IF NOT EXISTS idx_fulfillment_orders_stage
+  ON fulfillment_orders(wine_club_id, stage, created_at, id);
+
+-- Moves a set of fulfillment orders one stage forward in a single statement
+-- (pending -> picked -> approved -> shipped). Orders not in the preceding stage are left
+-- alone; the ids that actually moved are returned.
+CREATE OR REPLACE FUNCTION fulfillment_transition(
+  p_wine_club_id VARCHAR,
+  p_order_ids UUID[],
+  p_to VARCHAR,
+  p_actor VARCHAR DEFAULT NULL,
+  p_tracking JSONB DEFAULT '{}'::jsonb,
+  p_items JSONB DEFAULT '{}'::jsonb
+) RETURNS SETOF UUID
+LANGUAGE sql
+AS $$
+  UPDATE fulfillment_orders f SET
+    stage = p_to,
+    picked_items = CASE WHEN p_to = 'picked' THEN COALESCE(p_items -> f.id::text, f.picked_items) ELSE f.picked_items END,
+    picked_at = CASE WHEN p_to = 'picked' THEN NOW() ELSE f.picked_at END,
+    picked_by = CASE WHEN p_to = 'picked' THEN p_actor ELSE f.picked_by END,
+    approved_at = CASE WHEN p_to = 'approved' THEN NOW() ELSE f.approved_at END,
+    approved_by = CASE WHEN p_to = 'approved' THEN p_actor ELSE f.approved_by END,
+    shipped_at = CASE WHEN p_to = 'shipped' THEN NOW() ELSE f.shipped_at END,
+    shipped_by = CASE WHEN p_to = 'shipped' THEN p_actor ELSE f.shipped_by END,
+    tracking_number = CASE WHEN p_to = 'shipped' THEN COALESCE(NULLIF(p_tracking ->> f.id::text, ''), f.tracking_number) ELSE f.tracking_number END,
+    updated_at = NOW()
+  WHERE f.wine_club_id = p_wine_club_id
+    AND f.id = ANY(p_order_ids)
+    AND f.stage = CASE p_to
+      WHEN 'picked' THEN 'pending'
+      WHEN 'approved' THEN 'picked'
+      WHEN 'shipped' THEN 'approved'
+    END
+  RETURNING f.id;
+$$;
+
+-- Orders per stage
+SELECT wine_club_id, stage, count(*)
+FROM fulfillment_orders
+GROUP BY wine_club_id, stage
+ORDER BY wine_club_id, stage;
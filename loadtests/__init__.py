@@ -0,0 +1,21 @@
+"""Load generation for the make-server-9d538b9c edge API.
+
+Replays a weighted mix of tenant traffic (member list, plan list, live inventory, approval
+token GET/POST, customer-preferences KV, Square customer sync) at one or more concurrency
+levels and reports p50/p95/p99 latency and throughput per route.
+
+Runs against the local Supabase stack from supabase/config.toml, with Square replaced by
+the stand-in in square_stub.py (requires httpx):
+
+    python -m loadtests.square_stub --port 8787 &
+    SQUARE_API_BASE_URL=http://host.docker.internal:8787 supabase functions serve
+    SUPABASE_ANON_KEY=... python -m loadtests --concurrency 10,50,100 --duration 60
+
+- config.py: local endpoint / key resolution and the tenants file
+- square_stub.py: Square API stand-in with synthetic catalog and customers
+- scenarios.py: the route mix
+- runner.py: asyncio/httpx workers and the latency report
+- datagen.py: seeded synthetic clubs/members/shipments bulk-loaded with COPY (writes tenants files)
+- rls_bench.py: pgbench-style timing of the tenant RLS policies on datagen data
+- webhook_replay.py: signs and replays Square webhook events against /square/webhooks
+"""
@@ -0,0 +1,69 @@
+"""python -m loadtests --concurrency 10,50 --duration 30 [--tenants tenants.json] [--square-stub 8787]"""
+
+import argparse
+import asyncio
+import sys
+
+import httpx
+
+from . import config, runner, scenarios, square_stub
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Load test the make-server-9d538b9c edge API")
+    parser.add_argument("--url", help="Supabase API URL (default: local stack from supabase/config.toml)")
+    parser.add_argument("--anon-key", help="defaults to $SUPABASE_ANON_KEY")
+    parser.add_argument("--tenants", help="tenants JSON file (default: every club from GET /wine-clubs)")
+    parser.add_argument("--concurrency", default="10", help="comma-separated levels, run in order, e.g. 10,50,100")
+    parser.add_argument("--duration", type=float, default=30, help="seconds per concurrency level")
+    parser.add_argument("--requests", type=int, help="stop each level after this many requests instead")
+    parser.add_argument("--mix", help="route weight overrides, e.g. members.list=50,customers.sync=0")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--square-stub", type=int, metavar="PORT", help="also start the Square stand-in on this port")
+    parser.add_argument("--output", help="write the full report as JSON")
+    return parser.parse_args(argv)
+
+
+async def main_async(args):
+    base_url = config.function_url(args.url)
+    headers = config.auth_headers(args.anon_key)
+    mix = scenarios.build_mix(args.mix)
+
+    if args.tenants:
+        tenants = config.load_tenants(args.tenants)
+    else:
+        async with httpx.AsyncClient(base_url=base_url, headers=headers) as client:
+            tenants = await config.discover_tenants(client)
+    if not tenants:
+        print("❌ No tenants to load test")
+        return 1
+
+    print(f"🎯 {base_url} — {len(tenants)} tenants, routes: {', '.join(op.name for op in mix)}")
+
+    report = {"url": base_url, "tenants": len(tenants), "levels": {}}
+    for level in [int(value) for value in args.concurrency.split(",")]:
+        summary = await runner.run_load(
+            base_url, headers, tenants, mix, level,
+            duration_s=None if args.requests else args.duration,
+            max_requests=args.requests,
+            seed=args.seed,
+        )
+        report["levels"][level] = summary
+        print(runner.render_table(level, summary))
+
+    if args.output:
+        runner.write_report(args.output, report)
+        print(f"\n📝 Report written to {args.output}")
+    return 0
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.square_stub:
+        square_stub.start(args.square_stub)
+        print(f"🟢 Square stand-in on port {args.square_stub}")
+    return asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
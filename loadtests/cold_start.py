@@ -0,0 +1,142 @@
+"""Cold-start benchmark for the edge function on the local Supabase runtime.
+
+Serve the function with a fresh worker per request, i.e. in supabase/config.toml
+
+    [edge_runtime]
+    policy = "oneshot"
+
+then time a run of sequential requests; every one of them boots the function from scratch.
+Responses from a build with startup.tsx carry X-Cold-Start and a Server-Timing header with
+the worker boot and module-init split, which is reported too. Compare two builds by serving
+each in turn, e.g. the parent commit from a worktree:
+
+    git worktree add /tmp/before HEAD~1
+    (cd /tmp/before && supabase functions serve --no-verify-jwt)
+    python -m loadtests.cold_start --requests 50 --output before.json
+    supabase functions serve --no-verify-jwt          # this checkout
+    python -m loadtests.cold_start --requests 50 --output after.json
+    python -m loadtests.cold_start --compare before.json after.json
+
+Per-module import costs come from supabase/functions/make-server-9d538b9c/startup-profile.ts.
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+
+import httpx
+
+from . import config
+from .runner import percentile, write_report
+
+SERVER_TIMING = re.compile(r"(\w+);dur=([\d.]+)")
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Measure make-server-9d538b9c cold starts")
+    parser.add_argument("--url", help="Supabase API URL (default: local stack from supabase/config.toml)")
+    parser.add_argument("--anon-key", help="defaults to $SUPABASE_ANON_KEY")
+    parser.add_argument("--path", default="/health", help="route to request (default /health)")
+    parser.add_argument("--requests", type=int, default=30)
+    parser.add_argument("--output", help="write the samples and summary as JSON")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="compare two --output reports")
+    return parser.parse_args(argv)
+
+
+def summarize(values):
+    if not values:
+        return None
+    return {
+        "count": len(values),
+        "mean_ms": round(sum(values) / len(values), 1),
+        "p50_ms": round(percentile(values, 50), 1),
+        "p95_ms": round(percentile(values, 95), 1),
+        "max_ms": round(max(values), 1),
+    }
+
+
+def cold_start(headers):
+    """True/False on builds that mark their first request (X-Request-Id without X-Cold-Start
+    is a reused worker), None on older builds that cannot tell."""
+    if "x-cold-start" in headers:
+        return True
+    return False if "x-request-id" in headers else None
+
+
+def run(base_url, headers, path, requests):
+    samples = []
+    with httpx.Client(base_url=base_url, headers=headers, timeout=60) as client:
+        for _ in range(requests):
+            started = time.perf_counter()
+            response = client.get(path)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            timing = {name: float(value) for name, value in SERVER_TIMING.findall(response.headers.get("server-timing", ""))}
+            samples.append({
+                "status": response.status_code,
+                "ms": elapsed_ms,
+                "cold": cold_start(response.headers),
+                "boot_ms": timing.get("boot"),
+                "init_ms": timing.get("init"),
+            })
+
+    report = {
+        "url": base_url + path,
+        "requests": requests,
+        "errors": sum(1 for sample in samples if sample["status"] >= 500),
+        "latency": summarize([sample["ms"] for sample in samples]),
+        "boot": summarize([sample["boot_ms"] for sample in samples if sample["boot_ms"] is not None]),
+        "init": summarize([sample["init_ms"] for sample in samples if sample["init_ms"] is not None]),
+        "samples": samples,
+    }
+    warm = sum(1 for sample in samples if sample["cold"] is False)
+    if warm:
+        report["warning"] = f"{warm} responses came from a reused worker - is the edge runtime policy oneshot?"
+    return report
+
+
+def render(report):
+    lines = [f"{report['url']} - {report['requests']} requests, {report['errors']} errors"]
+    for key in ("latency", "boot", "init"):
+        stats = report.get(key)
+        if stats:
+            lines.append(f"  {key:<8} mean {stats['mean_ms']:>8.1f}  p50 {stats['p50_ms']:>8.1f}  p95 {stats['p95_ms']:>8.1f}  max {stats['max_ms']:>8.1f} ms")
+    if report.get("warning"):
+        lines.append(f"  ⚠️  {report['warning']}")
+    return "\n".join(lines)
+
+
+def compare(before_path, after_path):
+    with open(before_path, encoding="utf-8") as handle:
+        before = json.load(handle)
+    with open(after_path, encoding="utf-8") as handle:
+        after = json.load(handle)
+
+    print(f"{'':<14}{'before':>12}{'after':>12}{'change':>10}")
+    for key in ("latency", "init"):
+        for stat in ("mean_ms", "p50_ms", "p95_ms"):
+            old = (before.get(key) or {}).get(stat)
+            new = (after.get(key) or {}).get(stat)
+            if old is None or new is None:
+                continue
+            change = f"{(new - old) / old * 100:+.0f}%" if old else "-"
+            print(f"{key + ' ' + stat.replace('_ms', ''):<14}{old:>12.1f}{new:>12.1f}{change:>10}")
+    return 0
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.compare:
+        return compare(*args.compare)
+
+    report = run(config.function_url(args.url), config.auth_headers(args.anon_key), args.path, args.requests)
+    print(render(report))
+    if args.output:
+        write_report(args.output, report)
+        print(f"\n📝 Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""Where the load goes and which tenants it is spread across."""
+
+import json
+import os
+import tomllib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SUPABASE_CONFIG = REPO_ROOT / "supabase" / "config.toml"
+FUNCTION_NAME = "make-server-9d538b9c"
+# Runs without JWT verification: Square webhooks and catalog images
+PUBLIC_FUNCTION_NAME = "make-server-9d538b9c-public"
+
+
+@dataclass
+class Tenant:
+    wine_club_id: str
+    # Relative share of traffic; real clubs are very uneven in size
+    weight: float = 1.0
+    approval_tokens: List[str] = field(default_factory=list)
+    square_customer_ids: List[str] = field(default_factory=list)
+
+
+def local_api_url(config_path=SUPABASE_CONFIG):
+    """API gateway URL of the local stack, e.g. http://127.0.0.1:54321."""
+    port = 54321
+    if Path(config_path).exists():
+        with open(config_path, "rb") as handle:
+            port = tomllib.load(handle).get("api", {}).get("port", port)
+    return f"http://127.0.0.1:{port}"
+
+
+def function_url(api_url=None, name=FUNCTION_NAME):
+    return f"{(api_url or os.environ.get('SUPABASE_URL') or local_api_url()).rstrip('/')}/functions/v1/{name}"
+
+
+def auth_headers(anon_key=None):
+    key = anon_key or os.environ.get("SUPABASE_ANON_KEY")
+    if not key:
+        raise SystemExit("❌ Set SUPABASE_ANON_KEY (printed by `supabase status`) or pass --anon-key")
+    return {"Authorization": f"Bearer {key}", "Content-Type": "application/json"}
+
+
+def load_tenants(path):
+    """Reads a tenants file: [{"wine_club_id": "...", "weight": 3, "approval_tokens": [...], ...}]."""
+    return [Tenant(**entry) for entry in json.loads(Path(path).read_text())]
+
+
+async def discover_tenants(client):
+    """Falls back to every club from GET /wine-clubs, weighted so a few clubs dominate."""
+    response = await client.get("/wine-clubs")
+    response.raise_for_status()
+    clubs = response.json().get("wineClubs") or []
+    return [Tenant(wine_club_id=str(club["id"]), weight=1 / (rank + 1)) for rank, club in enumerate(clubs)]
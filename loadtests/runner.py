@@ -0,0 +1,122 @@
+"""asyncio/httpx load runner and per-route latency report."""
+
+import asyncio
+import json
+import random
+import time
+from collections import defaultdict
+
+import httpx
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = pct / 100 * (len(ordered) - 1)
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+class Results:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def add(self, route, latency_ms, status):
+        self.latencies[route].append(latency_ms)
+        self.statuses[route][status] += 1
+        if status == "error" or (isinstance(status, int) and status >= 500):
+            self.errors[route] += 1
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    def summary(self):
+        routes = {}
+        for route, values in sorted(self.latencies.items()):
+            routes[route] = {
+                "requests": len(values),
+                "errors": self.errors[route],
+                "rps": round(len(values) / self.elapsed, 2),
+                "p50_ms": round(percentile(values, 50), 1),
+                "p95_ms": round(percentile(values, 95), 1),
+                "p99_ms": round(percentile(values, 99), 1),
+                "max_ms": round(max(values), 1),
+                "statuses": {str(k): v for k, v in self.statuses[route].items()},
+            }
+        total = sum(len(values) for values in self.latencies.values())
+        everything = [value for values in self.latencies.values() for value in values]
+        return {
+            "elapsed_s": round(self.elapsed, 2),
+            "requests": total,
+            "errors": sum(self.errors.values()),
+            "rps": round(total / self.elapsed, 2) if self.elapsed else 0,
+            "p50_ms": round(percentile(everything, 50), 1),
+            "p95_ms": round(percentile(everything, 95), 1),
+            "p99_ms": round(percentile(everything, 99), 1),
+            "routes": routes,
+        }
+
+
+async def run_load(base_url, headers, tenants, mix, concurrency, duration_s=None, max_requests=None, seed=1, timeout_s=30):
+    """Runs `concurrency` workers issuing weighted operations until the duration or request cap is hit."""
+    results = Results()
+    deadline = time.perf_counter() + duration_s if duration_s else None
+    issued = 0
+    tenant_weights = [tenant.weight for tenant in tenants]
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, timeout=timeout_s, limits=limits) as client:
+
+        async def worker(worker_id):
+            nonlocal issued
+            rng = random.Random(seed * 1000 + worker_id)
+            while True:
+                if deadline and time.perf_counter() >= deadline:
+                    return
+                if max_requests is not None and issued >= max_requests:
+                    return
+                issued += 1
+
+                tenant = rng.choices(tenants, weights=tenant_weights)[0]
+                candidates = [op for op in mix if op.applies(tenant)]
+                operation = rng.choices(candidates, weights=[op.weight for op in candidates])[0]
+
+                started = time.perf_counter()
+                try:
+                    response = await operation.call(client, tenant, rng)
+                    await response.aread()
+                    status = response.status_code
+                except httpx.HTTPError:
+                    status = "error"
+                results.add(operation.name, (time.perf_counter() - started) * 1000, status)
+
+        await asyncio.gather(*(worker(index) for index in range(concurrency)))
+
+    results.finished = time.perf_counter()
+    return results.summary()
+
+
+def render_table(level, summary):
+    lines = [
+        f"\n📈 Concurrency {level}: {summary['requests']} requests in {summary['elapsed_s']}s "
+        f"({summary['rps']} req/s, {summary['errors']} errors) p50 {summary['p50_ms']}ms p95 {summary['p95_ms']}ms p99 {summary['p99_ms']}ms",
+        f"{'route':<18}{'reqs':>7}{'err':>6}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}",
+    ]
+    for route, row in summary["routes"].items():
+        lines.append(
+            f"{route:<18}{row['requests']:>7}{row['errors']:>6}{row['rps']:>9}"
+            f"{row['p50_ms']:>9}{row['p95_ms']:>9}{row['p99_ms']:>9}{row['max_ms']:>9}"
+        )
+    return "\n".join(lines)
+
+
+def write_report(path, report):
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, indent=2)
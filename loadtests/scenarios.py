@@ -0,0 +1,93 @@
+"""The route mix replayed by the load runner.
+
+Each operation issues one request for a tenant. Weights approximate production traffic:
+admin list views dominate, approval links spike after notification runs, and customer
+sync is rare but heavy. Override with --mix route=weight,...
+"""
+
+import itertools
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Awaitable, Callable, Dict
+
+_sequence = itertools.count()
+
+
+@dataclass
+class Operation:
+    name: str
+    weight: float
+    call: Callable[..., Awaitable]
+    # Returns False when the tenant has nothing this operation can use (e.g. no approval tokens)
+    applies: Callable = lambda tenant: True
+
+
+async def list_members(client, tenant, rng):
+    return await client.get(f"/members/{tenant.wine_club_id}")
+
+
+async def list_plans(client, tenant, rng):
+    return await client.get(f"/plans/{tenant.wine_club_id}")
+
+
+async def live_inventory(client, tenant, rng):
+    return await client.get(f"/square/live-inventory/{tenant.wine_club_id}", params={"category": "all"})
+
+
+async def get_approval(client, tenant, rng):
+    return await client.get(f"/approval/{rng.choice(tenant.approval_tokens)}")
+
+
+async def post_approval(client, tenant, rng):
+    # Each token is approved once; approved tokens stop answering GET, so take it out of the pool
+    token = tenant.approval_tokens.pop(rng.randrange(len(tenant.approval_tokens)))
+    return await client.post(f"/approval/{token}", json={
+        "approved": True,
+        "preferences": {"notes": "load test"},
+        "delivery_date": (date.today() + timedelta(days=14)).isoformat(),
+    })
+
+
+async def get_preferences(client, tenant, rng):
+    return await client.get(f"/customer-preferences/{tenant.wine_club_id}")
+
+
+async def post_preferences(client, tenant, rng):
+    customer_id = rng.choice(tenant.square_customer_ids) if tenant.square_customer_ids else f"load-{next(_sequence) % 500}"
+    return await client.post("/customer-preferences", json={
+        "wine_club_id": tenant.wine_club_id,
+        "customer_id": customer_id,
+        "preference_type": "category",
+        "category_preferences": [{"category": "Red Wine", "quantity": rng.randint(1, 6)}],
+        "custom_wine_assignments": [],
+        "notes": "load test",
+    })
+
+
+async def sync_customers(client, tenant, rng):
+    return await client.post("/square/sync-customers", json={"wine_club_id": tenant.wine_club_id})
+
+
+OPERATIONS: Dict[str, Operation] = {
+    op.name: op for op in [
+        Operation("members.list", 30, list_members),
+        Operation("plans.list", 25, list_plans),
+        Operation("inventory.live", 15, live_inventory),
+        Operation("approval.get", 12, get_approval, lambda tenant: bool(tenant.approval_tokens)),
+        Operation("approval.post", 3, post_approval, lambda tenant: bool(tenant.approval_tokens)),
+        Operation("preferences.get", 8, get_preferences),
+        Operation("preferences.post", 5, post_preferences),
+        Operation("customers.sync", 2, sync_customers),
+    ]
+}
+
+
+def build_mix(spec=None):
+    """'members.list=50,customers.sync=0' -> operations with overridden weights."""
+    weights = {name: op.weight for name, op in OPERATIONS.items()}
+    for part in filter(None, (spec or "").split(",")):
+        name, _, weight = part.partition("=")
+        if name.strip() not in OPERATIONS:
+            raise SystemExit(f"❌ Unknown route '{name}'. Known: {', '.join(OPERATIONS)}")
+        weights[name.strip()] = float(weight)
+    return [Operation(op.name, weights[name], op.call, op.applies) for name, op in OPERATIONS.items() if weights[name] > 0]
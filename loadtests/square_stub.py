@@ -0,0 +1,177 @@
+"""Square API stand-in for load tests.
+
+Serves the Square endpoints the edge function calls during the load mix with synthetic,
+deterministic data and a configurable response delay, so runs measure our code rather than
+Square's rate limits. Point the edge function at it with SQUARE_API_BASE_URL.
+
+    python -m loadtests.square_stub --port 8787 --items 800 --customers 300 --latency-ms 120
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+PAGE_SIZE = 100
+CATEGORIES = ["Red Wine", "White Wine", "Rosé", "Sparkling", "Dessert"]
+VARIETALS = ["Cabernet Sauvignon", "Pinot Noir", "Chardonnay", "Sauvignon Blanc", "Merlot", "Syrah"]
+
+
+def build_catalog(items, seed=7):
+    rng = random.Random(seed)
+    objects = [
+        {"type": "CATEGORY", "id": f"CAT-{index}", "category_data": {"name": name}}
+        for index, name in enumerate(CATEGORIES)
+    ]
+    for index in range(items):
+        item_id = f"ITEM-{index:05d}"
+        varietal = rng.choice(VARIETALS)
+        objects.append({"type": "IMAGE", "id": f"IMG-{index:05d}", "image_data": {"url": f"https://images.example.test/{item_id}.jpg"}})
+        objects.append({
+            "type": "ITEM",
+            "id": item_id,
+            "custom_attribute_values": {"varietal": {"name": "Varietal", "string_value": varietal}},
+            "item_data": {
+                "name": f"{varietal} {2015 + index % 9}",
+                "description_plaintext": f"Synthetic {varietal.lower()} for load testing",
+                "categories": [{"id": f"CAT-{index % len(CATEGORIES)}"}],
+                "image_ids": [f"IMG-{index:05d}"],
+                "variations": [{
+                    "type": "ITEM_VARIATION",
+                    "id": f"VAR-{index:05d}-{size}",
+                    "item_variation_data": {
+                        "item_id": item_id,
+                        "name": size,
+                        "price_money": {"amount": rng.randint(1800, 9500) * (2 if size == "Magnum" else 1), "currency": "USD"},
+                        "inventory_count": rng.randint(0, 240),
+                    },
+                } for size in ("750ml", "Magnum")],
+            },
+        })
+    return objects
+
+
+def build_customers(count, seed=11):
+    rng = random.Random(seed)
+    first = ["Ava", "Noah", "Mia", "Liam", "Zoe", "Ethan", "Ivy", "Owen"]
+    last = ["Garcia", "Smith", "Nguyen", "Patel", "Rossi", "Kim", "Silva", "Berg"]
+    return [{
+        "id": f"CUST-{index:05d}",
+        "given_name": rng.choice(first),
+        "family_name": rng.choice(last),
+        "email_address": {"email_address": f"member{index}@loadtest.example"} if index % 10 else None,
+        "phone_number": {"phone_number": f"+1555{index:07d}"},
+        "cards": [{"id": f"CARD-{index:05d}"}] if index % 3 else [],
+    } for index in range(count)]
+
+
+class SquareStub:
+    def __init__(self, items=500, customers=200, latency_ms=80, jitter_ms=40):
+        self.catalog = build_catalog(items)
+        self.customers = build_customers(customers)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def delay(self):
+        with self._lock:
+            self.requests += 1
+        time.sleep(max(0, self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000)
+
+    @staticmethod
+    def page(objects, cursor):
+        start = int(cursor or 0)
+        end = start + PAGE_SIZE
+        return objects[start:end], (str(end) if end < len(objects) else None)
+
+    def handle(self, method, path, query, body):
+        if method == "GET" and path == "/v2/catalog/list":
+            objects, cursor = self.page(self.catalog, query.get("cursor"))
+            return 200, {"objects": objects, **({"cursor": cursor} if cursor else {})}
+
+        if method == "GET" and path == "/v2/customers":
+            customers, cursor = self.page(self.customers, query.get("cursor"))
+            return 200, {"customers": [{k: v for k, v in c.items() if v is not None} for c in customers], **({"cursor": cursor} if cursor else {})}
+
+        if method == "GET" and path == "/v2/cards":
+            return 200, {"cards": [{"id": f"CARD-{query.get('customer_id', 'x')}", "enabled": True}]}
+
+        if method == "POST" and path == "/v2/orders":
+            order = body.get("order", {})
+            return 200, {"order": {"id": f"ORDER-{body.get('idempotency_key', time.time_ns())}", "version": 1, "location_id": order.get("location_id"),
+                                   "total_money": {"amount": 4500, "currency": "USD"}, "fulfillments": []}}
+
+        if method == "POST" and path == "/v2/orders/batch-retrieve":
+            return 200, {"orders": [{"id": order_id, "version": 1, "fulfillments": [{"uid": "f1", "type": "SHIPMENT"}]} for order_id in body.get("order_ids", [])]}
+
+        if method == "PUT" and path.startswith("/v2/orders/"):
+            return 200, {"order": {"id": path.rsplit("/", 1)[1], "version": 2}}
+
+        if method == "POST" and path == "/v2/payments":
+            return 200, {"payment": {"id": f"PAY-{body.get('idempotency_key', time.time_ns())}", "status": "COMPLETED"}}
+
+        return 404, {"errors": [{"category": "INVALID_REQUEST_ERROR", "code": "NOT_FOUND", "detail": f"{method} {path} is not stubbed"}]}
+
+
+def make_handler(stub):
+    class Handler(BaseHTTPRequestHandler):
+        def _respond(self):
+            parts = urlsplit(self.path)
+            query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+
+            stub.delay()
+            status, payload = stub.handle(self.command, parts.path, query, body)
+            data = json.dumps(payload).encode()
+
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        do_GET = do_POST = do_PUT = _respond
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def start(port=8787, host="0.0.0.0", **options):
+    """Starts the stand-in on a background thread and returns (server, stub)."""
+    stub = SquareStub(**options)
+    server = ThreadingHTTPServer((host, port), make_handler(stub))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, stub
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--items", type=int, default=500, help="catalog items")
+    parser.add_argument("--customers", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=80, help="mean response delay")
+    parser.add_argument("--jitter-ms", type=float, default=40)
+    args = parser.parse_args(argv)
+
+    server, stub = start(args.port, args.host, items=args.items, customers=args.customers,
+                         latency_ms=args.latency_ms, jitter_ms=args.jitter_ms)
+    print(f"🟢 Square stand-in on http://{args.host}:{args.port} ({args.items} items, {args.customers} customers)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print(f"\n🛑 Stopped after {stub.requests} requests")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
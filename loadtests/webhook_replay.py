@@ -0,0 +1,176 @@
+"""Replay Square webhook events against the edge function, signed like Square signs them.
+
+Sends built-in sample events (ids match square_stub.py's synthetic catalog and customers) or
+captured event JSON files to /square/webhooks on the make-server-9d538b9c-public function. It
+must have the same signature key and SQUARE_WEBHOOK_URL set to the URL posted to, since that
+URL is part of the signature:
+
+    export SQUARE_WEBHOOK_SIGNATURE_KEY=local-test-key
+    SQUARE_WEBHOOK_URL=http://127.0.0.1:54321/functions/v1/make-server-9d538b9c-public/square/webhooks \\
+        supabase functions serve
+
+    python -m loadtests.webhook_replay --sample inventory.count.updated --location LOC-1
+    python -m loadtests.webhook_replay --sample all --wine-club-id 100000 --repeat 2   # second send is a duplicate
+    python -m loadtests.webhook_replay captured/*.json --new-ids
+    python -m loadtests.webhook_replay --sample payment.updated --tamper              # expects 401
+"""
+
+import argparse
+import base64
+import hashlib
+import hmac
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+from . import config
+
+WEBHOOK_PATH = "/square/webhooks"
+
+
+def now_iso():
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def sample_event(event_type, merchant_id="MERCHANT-LOCAL", location_id="LOC-1", item=1, quantity=12):
+    """A minimal event of the given type shaped like Square's payloads."""
+    variation_id = f"VAR-{item:05d}-750ml"
+    customer = {
+        "id": f"CUST-{item:05d}",
+        "given_name": "Replay",
+        "family_name": f"Member {item}",
+        "email_address": {"email_address": f"member{item}@loadtest.example"},
+        "phone_number": {"phone_number": f"+1555{item:07d}"},
+        "updated_at": now_iso(),
+    }
+    objects = {
+        "catalog.version.updated": ("catalog_version", {"catalog_version": {"updated_at": now_iso()}}),
+        "inventory.count.updated": ("inventory_counts", {"inventory_counts": [{
+            "catalog_object_id": variation_id,
+            "catalog_object_type": "ITEM_VARIATION",
+            "location_id": location_id,
+            "quantity": str(quantity),
+            "state": "IN_STOCK",
+            "calculated_at": now_iso(),
+        }]}),
+        "customer.created": ("customer", {"customer": customer}),
+        "customer.updated": ("customer", {"customer": customer}),
+        "customer.deleted": ("customer", {"customer": {"id": customer["id"]}}),
+        "payment.created": ("payment", {"payment": {
+            "id": f"PAY-{item:05d}", "order_id": f"ORDER-{item:05d}", "location_id": location_id,
+            "customer_id": customer["id"], "status": "APPROVED", "updated_at": now_iso(),
+        }}),
+        "payment.updated": ("payment", {"payment": {
+            "id": f"PAY-{item:05d}", "order_id": f"ORDER-{item:05d}", "location_id": location_id,
+            "customer_id": customer["id"], "status": "COMPLETED", "updated_at": now_iso(),
+        }}),
+    }
+    if event_type not in objects:
+        raise SystemExit(f"❌ No sample for '{event_type}'. Known: {', '.join(objects)}")
+    data_type, data_object = objects[event_type]
+    return {
+        "merchant_id": merchant_id,
+        "type": event_type,
+        "event_id": str(uuid.uuid4()),
+        "created_at": now_iso(),
+        "data": {"type": data_type, "id": data_object.get("customer", {}).get("id", str(uuid.uuid4())), "object": data_object},
+    }
+
+
+SAMPLE_TYPES = [
+    "catalog.version.updated", "inventory.count.updated", "customer.created",
+    "customer.updated", "customer.deleted", "payment.created", "payment.updated",
+]
+
+
+def sign(signature_key, notification_url, body):
+    digest = hmac.new(signature_key.encode(), (notification_url + body).encode(), hashlib.sha256).digest()
+    return base64.b64encode(digest).decode()
+
+
+def send(client, url, signature_key, event, notification_url=None, tamper=False):
+    body = json.dumps(event, separators=(",", ":"))
+    signature = sign(signature_key, notification_url or url, body)
+    if tamper:
+        signature = sign(signature_key + "-wrong", notification_url or url, body)
+    started = time.perf_counter()
+    response = client.post(url, content=body, headers={
+        "Content-Type": "application/json",
+        "x-square-hmacsha256-signature": signature,
+    })
+    return response, (time.perf_counter() - started) * 1000
+
+
+def load_events(paths):
+    events = []
+    for path in paths:
+        payload = json.loads(Path(path).read_text(encoding="utf-8"))
+        # Accept a single event, a list, or rows exported from square_webhook_events
+        for entry in payload if isinstance(payload, list) else [payload]:
+            events.append(entry.get("payload", entry))
+    return events
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Replay signed Square webhook events")
+    parser.add_argument("files", nargs="*", help="event JSON files (single event, list, or square_webhook_events rows)")
+    parser.add_argument("--sample", action="append", default=[], help=f"built-in event type, or 'all' ({', '.join(SAMPLE_TYPES)})")
+    parser.add_argument("--url", help="Supabase API URL (default: local stack from supabase/config.toml)")
+    parser.add_argument("--notification-url", help="URL to sign (default: the URL posted to)")
+    parser.add_argument("--signature-key", default=os.environ.get("SQUARE_WEBHOOK_SIGNATURE_KEY"), help="defaults to $SQUARE_WEBHOOK_SIGNATURE_KEY")
+    parser.add_argument("--wine-club-id", help="append ?wine_club_id= for events without a location")
+    parser.add_argument("--location", default="LOC-1", help="location id for inventory/payment samples")
+    parser.add_argument("--item", type=int, default=1, help="stub item/customer number for samples")
+    parser.add_argument("--quantity", type=int, default=12, help="in-stock quantity for inventory samples")
+    parser.add_argument("--repeat", type=int, default=1, help="send each event this many times (dedupe check)")
+    parser.add_argument("--new-ids", action="store_true", help="give file events fresh event_ids so they are not deduped")
+    parser.add_argument("--tamper", action="store_true", help="sign with the wrong key; the function should answer 401")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not args.signature_key:
+        raise SystemExit("❌ Set SQUARE_WEBHOOK_SIGNATURE_KEY or pass --signature-key")
+
+    events = load_events(args.files)
+    samples = SAMPLE_TYPES if "all" in args.sample else args.sample
+    events += [sample_event(event_type, location_id=args.location, item=args.item, quantity=args.quantity) for event_type in samples]
+    if not events:
+        raise SystemExit("❌ Nothing to send: pass event files or --sample")
+    if args.new_ids:
+        for event in events:
+            event["event_id"] = str(uuid.uuid4())
+
+    url = config.function_url(args.url, config.PUBLIC_FUNCTION_NAME) + WEBHOOK_PATH
+    if args.wine_club_id:
+        url += f"?wine_club_id={args.wine_club_id}"
+
+    failures = 0
+    with httpx.Client(timeout=30) as client:
+        for event in events:
+            for attempt in range(args.repeat):
+                response, elapsed_ms = send(client, url, args.signature_key, event, args.notification_url, args.tamper)
+                expected = 401 if args.tamper else 200
+                ok = response.status_code == expected
+                failures += not ok
+                try:
+                    detail = response.json()
+                except ValueError:
+                    detail = response.text[:200]
+                marker = "✅" if ok else "❌"
+                label = " (repeat)" if attempt else ""
+                print(f"{marker} {event['type']:<26} {event['event_id'][:8]}{label} -> {response.status_code} in {elapsed_ms:.0f}ms {json.dumps(detail)}")
+
+    print(f"\n📊 {len(events) * args.repeat} deliveries, {failures} unexpected responses")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+-- Plan Selection Index
+-- Run this in Supabase SQL Editor on existing databases
+-- (clean-logical-schema.sql already includes these objects)
+
+-- Materialized wine choices per (subscription plan, wine preference), built by the edge
+-- function (selection-index.tsx) from plan_preference_matrix, plan_wine_assignments and the
+-- club's Square catalog. preference_id NULL is the plan's default selection. variation_ids
+-- are the in-stock Square variations a member of the plan may pick; wines holds the card
+-- data the selection screens render, so a member's options are one indexed read.
+CREATE TABLE IF NOT EXISTS plan_selection_index (
+  id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+  wine_club_id VARCHAR(50) NOT NULL REFERENCES wine_clubs(id) ON DELETE CASCADE,
+  subscription_plan_id UUID NOT NULL REFERENCES subscription_plans(id) ON DELETE CASCADE,
+  preference_id UUID REFERENCES wine_preferences(id) ON DELETE CASCADE,
+  variation_ids TEXT[] NOT NULL DEFAULT '{}',
+  wines JSONB NOT NULL DEFAULT '[]',
+  -- Set by the triggers below when the plan's matrix or assignments change; the next
+  -- lookup rebuilds the club's rows
+  stale BOOLEAN NOT NULL DEFAULT FALSE,
+  catalog_fetched_at TIMESTAMP WITH TIME ZONE,
+  refreshed_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  UNIQUE NULLS NOT DISTINCT (subscription_plan_id, preference_id)
+);
+
+ALTER TABLE plan_selection_index ENABLE ROW LEVEL SECURITY;
+-- Only the edge function (service role) writes; club staff may read their own rows
+DROP POLICY IF EXISTS "plan_selection_index_tenant_policy" ON plan_selection_index;
+CREATE POLICY "plan_selection_index_tenant_policy" ON plan_selection_index FOR SELECT TO authenticated
+  USING (wine_club_id = ANY ((SELECT current_wine_club_ids())));
+
+-- Lookups go through the (subscription_plan_id, preference_id) unique index;
+-- rebuilds replace a whole club's rows
+CREATE INDEX IF NOT EXISTS idx_plan_selection_index_club ON plan_selection_index(wine_club_id);
+
+CREATE OR REPLACE FUNCTION mark_plan_selection_index_stale()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  UPDATE plan_selection_index SET stale = TRUE
+  WHERE subscription_plan_id IN (NEW.subscription_plan_id, OLD.subscription_plan_id)
+    AND NOT stale;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS plan_preference_matrix_selection_index ON plan_preference_matrix;
+CREATE TRIGGER plan_preference_matrix_selection_index
+  AFTER INSERT OR UPDATE OR DELETE ON plan_preference_matrix
+  FOR EACH ROW EXECUTE FUNCTION mark_plan_selection_index_stale();
+
+DROP TRIGGER IF EXISTS plan_wine_assignments_selection_index ON plan_wine_assignments;
+CREATE TRIGGER plan_wine_assignments_selection_index
+  AFTER INSERT OR UPDATE OR DELETE ON plan_wine_assignments
+  FOR EACH ROW EXECUTE FUNCTION mark_plan_selection_index_stale();
+
+-- Index size per club
+SELECT wine_club_id, count(*) AS rows, sum(cardinality(variation_ids)) AS variations,
+       count(*) FILTER (WHERE stale) AS stale, max(refreshed_at) AS refreshed_at
+FROM plan_selection_index
+GROUP BY wine_club_id
+ORDER BY wine_club_id;
@@ -0,0 +1,20 @@
+-- Shipment Notification Tracking
+-- Run this in Supabase SQL Editor on existing databases
+-- (clean-logical-schema.sql already includes these columns)
+
+-- Per-recipient outcome of the bulk notification dispatcher.
+-- NULL = not notified yet, 'sent' = accepted by the provider, 'failed' = retried on the next run
+ALTER TABLE member_selections ADD COLUMN IF NOT EXISTS notification_status VARCHAR(20);
+ALTER TABLE member_selections ADD COLUMN IF NOT EXISTS notification_id VARCHAR(255);
+ALTER TABLE member_selections ADD COLUMN IF NOT EXISTS notification_error TEXT;
+ALTER TABLE member_selections ADD COLUMN IF NOT EXISTS notified_at TIMESTAMP WITH TIME ZONE;
+
+-- The dispatcher pages through one shipment's pending recipients
+CREATE INDEX IF NOT EXISTS idx_member_selections_notification
+  ON member_selections(shipment_id, notification_status);
+
+-- Progress per shipment
+SELECT shipment_id, notification_status, count(*)
+FROM member_selections
+GROUP BY shipment_id, notification_status
+ORDER BY shipment_id;
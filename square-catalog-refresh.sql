@@ -0,0 +1,48 @@
+-- Scheduled Square Catalog Refresh
+-- Run this in Supabase SQL Editor (requires the pg_cron and pg_net extensions)
+-- Replace <project-ref> and <service-role-key> before running.
+
+-- Every 5 minutes, re-fetch the live-inventory catalogs that are cached in the edge function.
+-- The function shares 4 concurrent Square requests round-robin across clubs, page by page,
+-- so one very large catalog cannot hold up the rest.
+CREATE EXTENSION IF NOT EXISTS pg_cron;
+CREATE EXTENSION IF NOT EXISTS pg_net;
+
+SELECT cron.schedule(
+  'square-catalog-refresh',
+  '*/5 * * * *',
+  $$
+  SELECT net.http_post(
+    url := 'https://<project-ref>.supabase.co/functions/v1/make-server-9d538b9c/square/live-inventory/refresh',
+    headers := jsonb_build_object(
+      'Content-Type', 'application/json',
+      'Authorization', 'Bearer <service-role-key>'
+    ),
+    body := jsonb_build_object('concurrency', 4)
+  );
+  $$
+);
+
+-- Warm every configured club once a night, not only the ones already cached
+SELECT cron.schedule(
+  'square-catalog-refresh-all',
+  '15 3 * * *',
+  $$
+  SELECT net.http_post(
+    url := 'https://<project-ref>.supabase.co/functions/v1/make-server-9d538b9c/square/live-inventory/refresh',
+    headers := jsonb_build_object(
+      'Content-Type', 'application/json',
+      'Authorization', 'Bearer <service-role-key>'
+    ),
+    body := jsonb_build_object('all', true, 'concurrency', 4)
+  );
+  $$
+);
+
+-- Check the schedule / recent runs
+SELECT jobname, schedule, active FROM cron.job WHERE jobname LIKE 'square-catalog-refresh%';
+SELECT * FROM net._http_response ORDER BY created DESC LIMIT 10;
+
+-- To remove:
+-- SELECT cron.unschedule('square-catalog-refresh');
+-- SELECT cron.unschedule('square-catalog-refresh-all');
@@ -0,0 +1,48 @@
+-- Square Webhook Events
+-- Run this in Supabase SQL Editor on existing databases
+-- (clean-logical-schema.sql already includes these objects)
+
+-- One row per Square event_id. The primary key is the dedupe: Square retries deliveries,
+-- and a second insert of the same event_id is a no-op. The payload is kept for replay.
+CREATE TABLE IF NOT EXISTS square_webhook_events (
+  event_id VARCHAR(255) PRIMARY KEY,
+  event_type VARCHAR(100) NOT NULL,
+  merchant_id VARCHAR(255),
+  wine_club_id VARCHAR(50) REFERENCES wine_clubs(id) ON DELETE SET NULL,
+  status VARCHAR(20) NOT NULL DEFAULT 'received' CHECK (status IN ('received', 'processed', 'ignored', 'failed')),
+  result JSONB,
+  error TEXT,
+  payload JSONB NOT NULL,
+  received_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  processed_at TIMESTAMP WITH TIME ZONE
+);
+
+ALTER TABLE square_webhook_events ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS "square_webhook_events_policy" ON square_webhook_events;
+CREATE POLICY "square_webhook_events_policy" ON square_webhook_events FOR ALL USING (true);
+
+CREATE INDEX IF NOT EXISTS idx_square_webhook_events_received
+  ON square_webhook_events(status, received_at);
+
+-- Last time a webhook reported a catalog or stock change per club. The webhook runs in the
+-- public function and cannot reach the main function's in-memory catalog snapshots; the
+-- catalog service re-reads this and refreshes any snapshot fetched before stale_at.
+-- No RLS policies: only the edge functions (service role) touch it.
+CREATE TABLE IF NOT EXISTS square_catalog_versions (
+  wine_club_id VARCHAR(50) PRIMARY KEY REFERENCES wine_clubs(id) ON DELETE CASCADE,
+  stale_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+ALTER TABLE square_catalog_versions ENABLE ROW LEVEL SECURITY;
+
+-- Webhook handlers look members up by Square customer, selections by Square payment,
+-- and clubs by Square location
+CREATE INDEX IF NOT EXISTS idx_members_square_customer_id ON members(square_customer_id);
+CREATE INDEX IF NOT EXISTS idx_member_selections_square_payment_id ON member_selections(square_payment_id);
+CREATE INDEX IF NOT EXISTS idx_wine_clubs_square_location_id ON wine_clubs(square_location_id);
+
+-- Recent deliveries
+SELECT event_type, status, count(*), max(received_at)
+FROM square_webhook_events
+WHERE received_at > NOW() - INTERVAL '1 day'
+GROUP BY event_type, status
+ORDER BY event_type, status;
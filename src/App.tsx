@@ -1,29 +1,34 @@
-import { useState, useEffect } from "react";
-import { ClientProvider } from "./contexts/ClientContext";
-import { AdminLayout } from "./components/AdminLayout";
-import { Dashboard } from "./components/Dashboard";
-import { MembersPage } from "./components/MembersPage";
-import { PlansPage } from "./components/PlansPage";
-import { CustomerPreferencesPage } from "./components/CustomerPreferencesPage";
-import { ShipmentBuilderPage } from "./components/ShipmentBuilderPage";
-import { SquareConfigPage } from "./components/SquareConfigPage";
-import { FulfillmentPage } from "./components/FulfillmentPage";
-import { SuperadminDashboard } from "./components/SuperadminDashboard";
-import { SuperadminLayout } from "./components/SuperadminLayout";
-import { OrganizationsPage } from "./components/ClubsOrganizationsPage";
-import { UsersPage } from "./components/ClubsUsersPage";
-import { BillingPage } from "./components/BillingPage";
-import { MarketingIntegration } from "./components/MarketingIntegration";
-import { ShippingSchedulePage } from "./components/ShippingSchedulePage";
-import { EmbeddableSignupPage } from "./components/EmbeddableSignupPage";
+import { useState, useEffect, Suspense } from "react";
+import { ClientProvider, useClient } from "./contexts/ClientContext";
+import {
+  AdminLayout,
+  Dashboard,
+  MembersPage,
+  ShipmentBuilderPage,
+  SquareConfigPage,
+  FulfillmentPage,
+  SuperadminDashboard,
+  SuperadminLayout,
+  OrganizationsPage,
+  UsersPage,
+  BillingPage,
+  MarketingIntegration,
+  ShippingSchedulePage,
+  EmbeddableSignupPage,
+  EmbeddedSignup,
+  WineSelectionReview,
+  BonusUpsell,
+  DeliveryDateConfirmation,
+  PaymentCollection,
+  adminRoutes,
+  superadminRoutes,
+  customerRoutes,
+  prefetchRoute,
+  prefetchOnIdle,
+} from "./routes";
 import { AuthPage } from "./components/AuthPage";
 import { AuthCallback } from "./components/AuthCallback";
 import { ResetPassword } from "./components/ResetPassword";
-import { EmbeddedSignup } from "./components/EmbeddedSignup";
-import { WineSelectionReview } from "./components/customer/WineSelectionReview";
-import { BonusUpsell } from "./components/customer/BonusUpsell";
-import { DeliveryDateConfirmation } from "./components/customer/DeliveryDateConfirmation";
-import { PaymentCollection } from "./components/customer/PaymentCollection";
 import { WelcomeToast } from "./components/WelcomeToast";
 import { Toaster } from "./components/ui/sonner";
 import { api } from "./utils/api";
@@ -41,7 +46,25 @@ export default function App() {
   );
 }
 
+// Portal for a /bootstrap user role (club-profile.tsx); null when the account has no club
+function portalForRole(role: string | null | undefined): "superadmin" | "admin" | "customer" | null {
+  if (role === "superadmin" || role === "saas_admin") return "superadmin";
+  if (role === "member") return "customer";
+  if (role && role !== "none") return "admin";
+  return null;
+}
+
+// Shown while a route chunk is downloading
+function PageLoader() {
+  return (
+    <div className="min-h-[50vh] flex items-center justify-center">
+      <div className="h-8 w-8 rounded-full border-2 border-amber-900 border-t-transparent animate-spin" />
+    </div>
+  );
+}
+
 function AppContent() {
+  const { currentWineClub, user, profileError } = useClient();
   const [appMode, setAppMode] = useState<AppMode>("auth");
   const [currentPage, setCurrentPage] = useState<AdminPage>("dashboard");
   const [currentSuperadminPage, setCurrentSuperadminPage] = useState<SuperadminPage>("saas-dashboard");
@@ -50,6 +73,9 @@ function AppContent() {
   const [isCheckingDemoMode, setIsCheckingDemoMode] = useState(false);
   const [authError, setAuthError] = useState<string>("");
   const [authSuccess, setAuthSuccess] = useState<string>("");
+  // Email that just signed in (form, restored session or magic link), routed once the
+  // club profile for that account has loaded
+  const [signedInEmail, setSignedInEmail] = useState<string | null>(null);
 
   const handlePageChange = (page: string) => {
     if (page === "customer-portal") {
@@ -71,32 +97,52 @@ function AppContent() {
       return;
     }
     
-    // Route different user types to appropriate dashboards
+    // The portal follows the account's role, once the club profile has loaded
     if (email && password) {
-      if (email === 'jimmy@arccom.io') {
-        // SaaS Admin - Jimmy ArcCom
+      setSignedInEmail(email);
+    } else {
+      setAuthError("Please check your credentials and try again.");
+    }
+  };
+
+  // Back to the sign-in form with a reason; signing out lets the next attempt start clean
+  const rejectSignIn = (message: string) => {
+    api.signOut().catch((error) => console.error('Sign out error:', error));
+    setAppMode("auth");
+    setAuthError(message);
+  };
+
+  // Routes a signed-in account by its /bootstrap role - the same for every way in
+  useEffect(() => {
+    if (!signedInEmail) return;
+    if (profileError) {
+      setSignedInEmail(null);
+      rejectSignIn(profileError);
+      return;
+    }
+    if (user?.email?.toLowerCase() !== signedInEmail.toLowerCase()) return;
+    setSignedInEmail(null);
+
+    switch (portalForRole(user.role)) {
+      case "superadmin":
         setAppMode("superadmin");
         setCurrentSuperadminPage("saas-dashboard");
-      } else if (email === 'klausbellinghausen@gmail.com') {
-        // Wine Club Owner - Klaus Bellinghausen
-        setAppMode("admin");
-        setCurrentPage("dashboard");
-      } else if (email === 'demo@wineclub.com') {
-        // Demo account
+        break;
+      case "admin":
         setAppMode("admin");
         setCurrentPage("dashboard");
-      } else {
-        // Check if this is a wine club member trying to login
-        // For now, show error message directing them to wine club domain
-        setAuthError("Members should login at their wine club's website. Please contact your wine club administrator for the correct login URL.");
-        return;
-      }
-    } else {
-      setAuthError("Please check your credentials and try again.");
+        break;
+      case "customer":
+        setAppMode("customer");
+        setCustomerStep("wine-selection");
+        break;
+      default:
+        rejectSignIn("This account isn't linked to a wine club. Please contact your wine club administrator.");
     }
-  };
+  }, [signedInEmail, user, profileError]);
 
   const handleLogout = () => {
+    api.signOut().catch((error) => console.error('Sign out error:', error));
     setAppMode("auth");
     setAuthError("");
     setAuthSuccess("");
@@ -150,14 +196,14 @@ function AppContent() {
   };
 
   const refreshDemoMode = async () => {
-    if (isCheckingDemoMode) return;
+    if (isCheckingDemoMode || !currentWineClub) return;
     
     setIsCheckingDemoMode(true);
     try {
       const controller = new AbortController();
       const timeoutId = setTimeout(() => controller.abort(), 8000); // 8 second timeout
       
-      const response = await api.getLiveInventory("1", 'all', 1);
+      const response = await api.getLiveInventory(currentWineClub.id, 'all', 1);
       clearTimeout(timeoutId);
       setIsDemoMode(!!response.isDemoMode);
     } catch (error: any) {
@@ -168,15 +214,17 @@ function AppContent() {
     }
   };
 
-  // Check demo mode status on app load only
+  // Check demo mode once the signed-in user's club is known
   useEffect(() => {
+    if (!currentWineClub) return;
+
     const checkDemoMode = async () => {
       try {
         // Use a very lightweight API call with short timeout
         const controller = new AbortController();
         const timeoutId = setTimeout(() => controller.abort(), 5000); // 5 second timeout
         
-        const response = await api.getLiveInventory("1", 'all', 1);
+        const response = await api.getLiveInventory(currentWineClub.id, 'all', 1);
         clearTimeout(timeoutId);
         setIsDemoMode(!!response.isDemoMode);
       } catch (error: any) {
@@ -188,7 +236,23 @@ function AppContent() {
     // Small delay to let the app render first
     const timer = setTimeout(checkDemoMode, 1000);
     return () => clearTimeout(timer);
-  }, []);
+  }, [currentWineClub?.id]);
+
+  // Warm up the chunks the user is most likely to need next
+  useEffect(() => {
+    if (appMode === "auth") {
+      return prefetchOnIdle([AdminLayout, Dashboard]);
+    }
+    if (appMode === "admin") {
+      return prefetchOnIdle([MembersPage, ShipmentBuilderPage, FulfillmentPage, SquareConfigPage, EmbeddableSignupPage]);
+    }
+    if (appMode === "superadmin") {
+      return prefetchOnIdle([OrganizationsPage, UsersPage, BillingPage]);
+    }
+    if (appMode === "customer") {
+      return prefetchOnIdle(customerRoutes);
+    }
+  }, [appMode]);
 
   const renderSuperadminPage = () => {
     switch (currentSuperadminPage) {
@@ -313,6 +377,13 @@ function AppContent() {
       setAppMode('auth-callback');
     } else if (path === '/auth/reset-password') {
       setAppMode('reset-password');
+    } else {
+      // Skip the login screen on reload when a Supabase session is still stored
+      api.getSession()
+        .then((session) => {
+          if (session?.user?.email) setSignedInEmail(session.user.email);
+        })
+        .catch((error) => console.error('Session restore error:', error));
     }
   }, []);
 
@@ -320,14 +391,7 @@ function AppContent() {
   if (appMode === "auth-callback") {
     return (
       <AuthCallback 
-        onAuthSuccess={(email) => {
-          // Determine which portal to redirect to based on user email
-          if (email === 'jimmy@arccom.io') {
-            setAppMode('superadmin');
-          } else {
-            setAppMode('admin');
-          }
-        }}
+        onAuthSuccess={setSignedInEmail}
         onAuthError={() => setAppMode('auth')}
       />
     );
@@ -372,7 +436,15 @@ function AppContent() {
               ← Back to Login
             </button>
           </div>
-          <EmbeddedSignup onSignup={handleSignup} wineClubId="1" />
+          {currentWineClub ? (
+            <Suspense fallback={<PageLoader />}>
+              <EmbeddedSignup onSignup={handleSignup} wineClubId={currentWineClub.id} />
+            </Suspense>
+          ) : (
+            <p className="max-w-2xl mx-auto text-center text-gray-600">
+              Sign-up is offered through your wine club's own signup page.
+            </p>
+          )}
         </div>
       </>
     );
@@ -383,7 +455,9 @@ function AppContent() {
     return (
       <>
         <Toaster position="top-right" />
-        {renderCustomerStep()}
+        <Suspense fallback={<PageLoader />}>
+          {renderCustomerStep()}
+        </Suspense>
       </>
     );
   }
@@ -412,6 +486,7 @@ function AppContent() {
               <div className="flex items-center gap-2">
                 <button 
                   onClick={() => handlePageChange('square-diagnostic')}
+                  data-testid="square-auth-fix"
                   className="bg-red-600 hover:bg-red-700 text-white px-4 py-2 rounded-lg text-sm font-medium transition-colors"
                 >
                   Fix Authentication →
@@ -427,9 +502,18 @@ function AppContent() {
             </div>
           </div>
         )}
-        <AdminLayout currentPage={currentPage} onPageChange={handlePageChange} onLogout={handleLogout}>
-          {renderAdminPage()}
-        </AdminLayout>
+        <Suspense fallback={<PageLoader />}>
+          <AdminLayout
+            currentPage={currentPage}
+            onPageChange={handlePageChange}
+            onPagePrefetch={(page: string) => prefetchRoute(adminRoutes, page)}
+            onLogout={handleLogout}
+          >
+            <Suspense fallback={<PageLoader />}>
+              {renderAdminPage()}
+            </Suspense>
+          </AdminLayout>
+        </Suspense>
       </>
     );
   }
@@ -439,19 +523,24 @@ function AppContent() {
     return (
       <>
         <Toaster position="top-right" />
-        <SuperadminLayout 
-          currentPage={currentSuperadminPage} 
-          onPageChange={(page) => {
-            if (page === "dashboard") {
-              setAppMode("admin");
-            } else {
-              setCurrentSuperadminPage(page as SuperadminPage);
-            }
-          }} 
-          onLogout={handleLogout}
-        >
-          {renderSuperadminPage()}
-        </SuperadminLayout>
+        <Suspense fallback={<PageLoader />}>
+          <SuperadminLayout 
+            currentPage={currentSuperadminPage} 
+            onPageChange={(page: string) => {
+              if (page === "dashboard") {
+                setAppMode("admin");
+              } else {
+                setCurrentSuperadminPage(page as SuperadminPage);
+              }
+            }} 
+            onPagePrefetch={(page: string) => prefetchRoute(superadminRoutes, page)}
+            onLogout={handleLogout}
+          >
+            <Suspense fallback={<PageLoader />}>
+              {renderSuperadminPage()}
+            </Suspense>
+          </SuperadminLayout>
+        </Suspense>
       </>
     );
   }
@@ -460,9 +549,13 @@ function AppContent() {
   return (
     <>
       <Toaster position="top-right" />
-      <AdminLayout currentPage={currentPage} onPageChange={handlePageChange} onLogout={handleLogout}>
-        {renderAdminPage()}
-      </AdminLayout>
+      <Suspense fallback={<PageLoader />}>
+        <AdminLayout currentPage={currentPage} onPageChange={handlePageChange} onLogout={handleLogout}>
+          <Suspense fallback={<PageLoader />}>
+            {renderAdminPage()}
+          </Suspense>
+        </AdminLayout>
+      </Suspense>
     </>
   );
 }
\ No newline at end of file
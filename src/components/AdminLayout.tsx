@@ -28,6 +28,7 @@ interface AdminLayoutProps {
   children: React.ReactNode;
   currentPage: string;
   onPageChange: (page: string) => void;
+  onPagePrefetch?: (page: string) => void;
   onLogout: () => void;
 }
 
@@ -42,7 +43,7 @@ const navigation = [
   { name: "Embeddable Signup", icon: Code, id: "embeddable-signup" },
 ];
 
-export function AdminLayout({ children, currentPage, onPageChange, onLogout }: AdminLayoutProps) {
+export function AdminLayout({ children, currentPage, onPageChange, onPagePrefetch, onLogout }: AdminLayoutProps) {
   const { currentWineClub } = useClient();
   const [isDemoMode, setIsDemoMode] = React.useState(
     localStorage.getItem('demo_mode') === 'true' || 
@@ -78,6 +79,9 @@ export function AdminLayout({ children, currentPage, onPageChange, onLogout }: A
                 <SidebarMenuItem key={item.id}>
                   <SidebarMenuButton
                     onClick={() => onPageChange(item.id)}
+                    data-testid={`nav-${item.id}`}
+                    onMouseEnter={() => onPagePrefetch?.(item.id)}
+                    onFocus={() => onPagePrefetch?.(item.id)}
                     isActive={currentPage === item.id}
                   >
                     <item.icon className="h-4 w-4" />
@@ -100,6 +104,7 @@ export function AdminLayout({ children, currentPage, onPageChange, onLogout }: A
                   variant="ghost"
                   size="sm"
                   onClick={toggleDemoMode}
+                  data-testid="demo-mode-toggle"
                   className="flex items-center space-x-1 h-6 px-2"
                 >
                   {isDemoMode ? (
@@ -135,11 +140,11 @@ export function AdminLayout({ children, currentPage, onPageChange, onLogout }: A
                       <Building className="h-4 w-4 mr-2" />
                       Configure {currentWineClub?.name}
                     </DropdownMenuItem>
-                    <DropdownMenuItem onClick={() => onPageChange("superadmin")}>
+                    <DropdownMenuItem onClick={() => onPageChange("superadmin")} onMouseEnter={() => onPagePrefetch?.("superadmin")}>
                       <Shield className="h-4 w-4 mr-2" />
                       SaaS Admin
                     </DropdownMenuItem>
-                    <DropdownMenuItem onClick={() => onPageChange("embedded-signup")}>
+                    <DropdownMenuItem onClick={() => onPageChange("embedded-signup")} onMouseEnter={() => onPagePrefetch?.("embedded-signup")}>
                       <Users className="h-4 w-4 mr-2" />
                       Embedded Signup
                     </DropdownMenuItem>
@@ -150,12 +155,12 @@ export function AdminLayout({ children, currentPage, onPageChange, onLogout }: A
           </SidebarFooter>
         </Sidebar>
 
-        <main className="flex-1 flex flex-col">
+        <main className="flex-1 flex flex-col" data-testid="admin-main">
           <header className="border-b bg-background/95 backdrop-blur supports-[backdrop-filter]:bg-background/60 sticky top-0 z-40">
             <div className="flex h-14 items-center gap-4 px-4">
               <SidebarTrigger />
               <div className="ml-auto flex items-center gap-2">
-                <Button variant="outline" size="sm" onClick={onLogout}>
+                <Button variant="outline" size="sm" onClick={onLogout} data-testid="logout">
                   Logout
                 </Button>
               </div>
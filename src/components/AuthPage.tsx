@@ -27,18 +27,21 @@ export function AuthPage({ onAuth, onSignupClick, error, successMessage }: AuthP
   const [email, setEmail] = useState("");
   const [password, setPassword] = useState("");
   const [isLoading, setIsLoading] = useState(false);
+  // Supabase rejections are shown here; the parent's error covers routing after sign-in
+  const [signInError, setSignInError] = useState("");
+  const shownError = signInError || error;
 
   const handlePasswordLogin = async (e: React.FormEvent) => {
     e.preventDefault();
     setIsLoading(true);
+    setSignInError("");
     
     try {
       await api.signInWithPassword(email, password);
       onAuth('password', email, password);
     } catch (error: any) {
       console.error('Login error:', error);
-      // Still call onAuth to show error message
-      onAuth('password', email, password);
+      setSignInError(error?.message || "Sign in failed. Please check your credentials and try again.");
     } finally {
       setIsLoading(false);
     }
@@ -92,7 +95,7 @@ export function AuthPage({ onAuth, onSignupClick, error, successMessage }: AuthP
           </p>
         </div>
 
-        <Card className="shadow-xl">
+        <Card className="shadow-xl" data-testid="auth-page">
           <CardHeader>
             <CardTitle>Wine Club Admin Portal</CardTitle>
             <CardDescription>
@@ -102,8 +105,8 @@ export function AuthPage({ onAuth, onSignupClick, error, successMessage }: AuthP
           <CardContent>
             <Tabs defaultValue="password" className="space-y-6">
               <TabsList className="grid w-full grid-cols-2">
-                <TabsTrigger value="password">Password</TabsTrigger>
-                <TabsTrigger value="magic-link">Magic Link</TabsTrigger>
+                <TabsTrigger value="password" data-testid="auth-tab-password">Password</TabsTrigger>
+                <TabsTrigger value="magic-link" data-testid="auth-tab-magic-link">Magic Link</TabsTrigger>
               </TabsList>
 
               {/* Password Login */}
@@ -113,6 +116,7 @@ export function AuthPage({ onAuth, onSignupClick, error, successMessage }: AuthP
                     <Label htmlFor="email">Email</Label>
                     <Input
                       id="email"
+                      data-testid="auth-email"
                       type="email"
                       placeholder="admin@yourwineclub.com"
                       value={email}
@@ -125,6 +129,7 @@ export function AuthPage({ onAuth, onSignupClick, error, successMessage }: AuthP
                     <Label htmlFor="password">Password</Label>
                     <Input
                       id="password"
+                      data-testid="auth-password"
                       type="password"
                       placeholder="••••••••"
                       value={password}
@@ -133,13 +138,13 @@ export function AuthPage({ onAuth, onSignupClick, error, successMessage }: AuthP
                     />
                   </div>
 
-                  {error && (
-                    <Alert variant="destructive">
-                      <AlertDescription>{error}</AlertDescription>
+                  {shownError && (
+                    <Alert variant="destructive" data-testid="auth-error">
+                      <AlertDescription>{shownError}</AlertDescription>
                     </Alert>
                   )}
 
-                  <Button type="submit" className="w-full" disabled={isLoading}>
+                  <Button type="submit" className="w-full" disabled={isLoading} data-testid="auth-submit">
                     {isLoading ? "Signing in..." : "Sign In"}
                     <Lock className="w-4 h-4 ml-2" />
                   </Button>
@@ -149,6 +154,7 @@ export function AuthPage({ onAuth, onSignupClick, error, successMessage }: AuthP
                       variant="link"
                       size="sm"
                       onClick={handleForgotPassword}
+                      data-testid="auth-forgot-password"
                       disabled={isLoading}
                       className="text-sm text-muted-foreground hover:text-primary"
                     >
@@ -165,6 +171,7 @@ export function AuthPage({ onAuth, onSignupClick, error, successMessage }: AuthP
                     <Label htmlFor="magic-email">Email</Label>
                     <Input
                       id="magic-email"
+                      data-testid="auth-magic-email"
                       type="email"
                       placeholder="admin@yourwineclub.com"
                       value={email}
@@ -183,7 +190,7 @@ export function AuthPage({ onAuth, onSignupClick, error, successMessage }: AuthP
                     </Alert>
                   )}
 
-                  <Button type="submit" className="w-full" disabled={isLoading}>
+                  <Button type="submit" className="w-full" disabled={isLoading} data-testid="auth-magic-submit">
                     {isLoading ? "Sending..." : "Send Magic Link"}
                     <Mail className="w-4 h-4 ml-2" />
                   </Button>
@@ -1,4 +1,4 @@
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef } from "react";
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "./ui/card";
 import { Button } from "./ui/button";
 import { Input } from "./ui/input";
@@ -58,7 +58,7 @@ interface CustomPreference {
 }
 
 export function CustomerPreferencesPage() {
-  const { currentWineClub } = useClient();
+  const { currentWineClub, plans } = useClient();
   const [activeTab, setActiveTab] = useState("global-preferences");
   
   // Global Preferences
@@ -82,6 +82,26 @@ export function CustomerPreferencesPage() {
   const [loading, setLoading] = useState(false);
   const [saving, setSaving] = useState(false);
 
+  // Members are searched server-side; only the matches are loaded
+  const searchedQuery = useRef<string | null>(null);
+  const searchMembers = async (query: string) => {
+    if (!currentWineClub) return;
+
+    searchedQuery.current = query;
+    const membersData = await api.searchMembers(currentWineClub.id, query);
+    setMembers((membersData || []).map(member => {
+      const plan = plans.find(p => p.id === member.subscription_plan_id);
+      return {
+        id: member.id,
+        name: member.name,
+        email: member.email,
+        subscription_plan_id: member.subscription_plan_id || '',
+        plan_name: plan?.name || 'No Plan',
+        bottle_count: plan?.bottle_count || 0
+      };
+    }));
+  };
+
   const fetchData = async () => {
     if (!currentWineClub) return;
     
@@ -92,36 +112,7 @@ export function CustomerPreferencesPage() {
       const globalPrefs = await api.getGlobalPreferences(currentWineClub.id);
       setGlobalPreferences(globalPrefs || []);
       
-      // Fetch members with their plans
-      const membersData = await api.getMembers(currentWineClub.id);
-      const plansData = await api.getPlans(currentWineClub.id);
-      
-      const membersWithPlans = membersData.map(member => {
-        const plan = plansData.find(p => p.id === member.subscription_plan_id);
-        return {
-          id: member.id,
-          name: member.name,
-          email: member.email,
-          subscription_plan_id: member.subscription_plan_id || '',
-          plan_name: plan?.name || 'No Plan',
-          bottle_count: plan?.bottle_count || 0
-        };
-      });
-      setMembers(membersWithPlans);
-      
-      // Fetch wines from Square inventory
-      const inventoryRes = await api.getLiveInventory(currentWineClub.id, 'all', 0);
-      const winesWithInventory = inventoryRes.wines?.filter(wine => {
-        const hasInventory = wine.total_inventory && wine.total_inventory > 0;
-        const isNotUncategorized = wine.category_name && 
-          wine.category_name.toLowerCase() !== 'uncategorized' &&
-          wine.category_name.toLowerCase() !== 'uncat' &&
-          wine.category_name.toLowerCase() !== 'misc' &&
-          wine.category_name.toLowerCase() !== 'other';
-        return hasInventory && isNotUncategorized;
-      }) || [];
-      
-      setWines(winesWithInventory);
+      await searchMembers(memberSearch);
       
     } catch (error) {
       console.error('Error fetching data:', error);
@@ -132,13 +123,38 @@ export function CustomerPreferencesPage() {
 
   useEffect(() => {
     fetchData();
-  }, [currentWineClub]);
+  }, [currentWineClub, plans]);
 
-  // Filter members based on search
-  const filteredMembers = members.filter(member =>
-    member.name.toLowerCase().includes(memberSearch.toLowerCase()) ||
-    member.email.toLowerCase().includes(memberSearch.toLowerCase())
-  );
+  useEffect(() => {
+    const timer = setTimeout(() => {
+      // Already loaded by fetchData (mount / Refresh)
+      if (searchedQuery.current === memberSearch) return;
+      searchMembers(memberSearch).catch(error => console.error('Error searching members:', error));
+    }, 250);
+    return () => clearTimeout(timer);
+  }, [memberSearch]);
+
+  // Wines come from the selected member's plan selection index, not the whole catalog
+  useEffect(() => {
+    setWines([]);
+    setWineSearch("");
+    if (!selectedMember) return;
+
+    let cancelled = false;
+    api.getSelectionOptions(selectedMember.id)
+      .then(selection => {
+        if (cancelled) return;
+        const eligible = new Map<string, Wine>();
+        for (const option of selection.options || []) {
+          for (const wine of option.wines) {
+            if (!eligible.has(wine.id)) eligible.set(wine.id, wine);
+          }
+        }
+        setWines(Array.from(eligible.values()));
+      })
+      .catch(error => console.error('Error loading eligible wines:', error));
+    return () => { cancelled = true; };
+  }, [selectedMember?.id]);
 
   // Filter wines based on search
   const filteredWines = wines.filter(wine =>
@@ -425,7 +441,7 @@ export function CustomerPreferencesPage() {
                 )}
 
                 <div className="max-h-60 overflow-y-auto">
-                  {filteredMembers.map((member) => (
+                  {members.map((member) => (
                     <div
                       key={member.id}
                       className={`p-3 border rounded-lg cursor-pointer hover:bg-gray-50 ${
@@ -1,6 +1,5 @@
 import { useState, useEffect } from "react";
 import { Button } from "./ui/button";
-import { Input } from "./ui/input";
 import { Label } from "./ui/label";
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "./ui/card";
 import { 
@@ -18,7 +17,7 @@ import {
 } from "lucide-react";
 import { format, addDays, addWeeks, isAfter, startOfWeek, addDays as addDaysToDate } from "date-fns";
 import { api } from "../utils/api";
-import { useClient } from "../contexts/ClientContext";
+import { ImageWithFallback } from "./figma/ImageWithFallback";
 
 interface Wine {
   id: string;
@@ -30,6 +29,8 @@ interface Wine {
   color: string;
   sweetness: string;
   image_url?: string;
+  thumbnail_url?: string | null;
+  image_srcset?: string | null;
   square_item_id: string;
 }
 
@@ -37,20 +38,26 @@ interface Member {
   id: string;
   name: string;
   email: string;
+  has_payment_method: boolean;
   subscription_plan: {
     name: string;
     bottle_count: number;
     discount_percentage: number;
-  };
+  } | null;
+}
+
+interface Selection {
+  id: string;
+  editable: boolean;
+  variation_ids: string[];
 }
 
 interface CustomerWineSelectionProps {
-  memberId: string;
   onComplete?: () => void;
 }
 
-export function CustomerWineSelection({ memberId, onComplete }: CustomerWineSelectionProps) {
-  const { currentWineClub } = useClient();
+// The signed-in member's portal: everything comes from the session-scoped /portal routes
+export function CustomerWineSelection({ onComplete }: CustomerWineSelectionProps) {
   const [currentStep, setCurrentStep] = useState(1);
   const [member, setMember] = useState<Member | null>(null);
   const [wines, setWines] = useState<Wine[]>([]);
@@ -59,37 +66,50 @@ export function CustomerWineSelection({ memberId, onComplete }: CustomerWineSele
   const [selectedColor, setSelectedColor] = useState<string>('');
   const [selectedSweetness, setSelectedSweetness] = useState<string>('');
   const [deliveryDate, setDeliveryDate] = useState<Date | null>(null);
-  const [paymentInfo, setPaymentInfo] = useState({
-    cardNumber: '',
-    expiryDate: '',
-    cvv: '',
-    name: ''
-  });
+  const [selection, setSelection] = useState<Selection | null>(null);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState('');
 
   // Step 1: Load member and initial wines
   useEffect(() => {
     const loadData = async () => {
-      if (!currentWineClub) return;
-      
       try {
         setLoading(true);
         
-        // Load member data
-        const memberRes = await api.getMembers(currentWineClub.id);
-        const memberData = memberRes.members.find((m: any) => m.id === memberId);
-        if (!memberData) throw new Error('Member not found');
-        
+        // Small, indexed reads scoped to the signed-in member
+        const [me, planData, shipmentData, wineData] = await Promise.all([
+          api.getPortalMe(),
+          api.getPortalPlan(),
+          api.getPortalShipment(),
+          api.getPortalWines(),
+        ]);
+        const memberData: Member = { ...me.member, subscription_plan: planData.plan };
         setMember(memberData);
+        setSelection(shipmentData.selection);
+        if (shipmentData.selection?.delivery_date) {
+          setDeliveryDate(new Date(`${shipmentData.selection.delivery_date}T00:00:00`));
+        }
         
-        // Load wines based on member preferences
-        const inventoryRes = await api.getLiveInventory(currentWineClub.id, 'all', 0);
-        const availableWines = inventoryRes.wines || [];
+        // The plan default comes first; swaps may pick from any of the plan's preferences
+        const options = wineData.options || [];
+        const availableWines: Wine[] = [];
+        const seen = new Set<string>();
+        for (const option of options) {
+          for (const wine of option.wines) {
+            if (seen.has(wine.id)) continue;
+            seen.add(wine.id);
+            availableWines.push(wine);
+          }
+        }
         
-        // Filter wines based on member's subscription plan bottle count
+        // Start with the plan's bottle count from the default selection
+        // unless the member already picked wines for this shipment
         const bottleCount = memberData.subscription_plan?.bottle_count || 3;
-        const initialWines = availableWines.slice(0, bottleCount);
+        const byId = new Map(availableWines.map((wine) => [wine.id, wine]));
+        const saved = (shipmentData.selection?.variation_ids || [])
+          .map((id: string) => byId.get(id))
+          .filter(Boolean) as Wine[];
+        const initialWines = saved.length === bottleCount ? saved : (options[0]?.wines || []).slice(0, bottleCount);
         
         setWines(availableWines);
         setSelectedWines(initialWines);
@@ -102,7 +122,7 @@ export function CustomerWineSelection({ memberId, onComplete }: CustomerWineSele
     };
 
     loadData();
-  }, [memberId, currentWineClub]);
+  }, []);
 
   // Get available delivery dates (next Wednesday + 7 days, then 1-2 Wednesdays after)
   const getAvailableDeliveryDates = () => {
@@ -139,8 +159,12 @@ export function CustomerWineSelection({ memberId, onComplete }: CustomerWineSele
     try {
       setLoading(true);
       
-      // Process payment (placeholder - would integrate with Square)
-      await new Promise(resolve => setTimeout(resolve, 2000));
+      // Saves the picks; the billing run charges the card on file when the shipment is billed
+      await api.submitPortalSelection({
+        selection_id: selection!.id,
+        variation_ids: selectedWines.map((wine) => wine.id),
+        delivery_date: deliveryDate ? format(deliveryDate, 'yyyy-MM-dd') : undefined,
+      });
       
       // Move to receipt step
       setCurrentStep(6);
@@ -176,6 +200,26 @@ export function CustomerWineSelection({ memberId, onComplete }: CustomerWineSele
 
   if (!member) return null;
 
+  if (!selection) {
+    return (
+      <Card>
+        <CardContent className="p-6 text-center">
+          <p className="text-gray-600">There is no upcoming shipment to choose wines for yet.</p>
+        </CardContent>
+      </Card>
+    );
+  }
+
+  if (!selection.editable && currentStep !== 6) {
+    return (
+      <Card>
+        <CardContent className="p-6 text-center">
+          <p className="text-gray-600">Your wines for this shipment are locked in and being processed.</p>
+        </CardContent>
+      </Card>
+    );
+  }
+
   return (
     <div className="max-w-2xl mx-auto space-y-6">
       {/* Step 1: Welcome & Initial Selection */}
@@ -205,8 +249,17 @@ export function CustomerWineSelection({ memberId, onComplete }: CustomerWineSele
               {selectedWines.map((wine, index) => (
                 <div key={wine.id} className="flex items-center justify-between p-3 border rounded-lg">
                   <div className="flex items-center gap-3">
-                    <div className="w-12 h-12 bg-gray-100 rounded-lg flex items-center justify-center">
-                      <WineIcon className="w-6 h-6 text-gray-400" />
+                    <div className="w-12 h-12 bg-gray-100 rounded-lg flex items-center justify-center overflow-hidden">
+                      {wine.image_url ? (
+                        <ImageWithFallback
+                          src={wine.thumbnail_url || wine.image_url}
+                          originalSrc={wine.image_url}
+                          alt={wine.name}
+                          className="w-full h-full object-cover"
+                        />
+                      ) : (
+                        <WineIcon className="w-6 h-6 text-gray-400" />
+                      )}
                     </div>
                     <div>
                       <p className="font-medium">{wine.name}</p>
@@ -394,64 +447,32 @@ export function CustomerWineSelection({ memberId, onComplete }: CustomerWineSele
         </Card>
       )}
 
-      {/* Step 4: Payment Information */}
+      {/* Step 4: Payment Method */}
       {currentStep === 4 && (
         <Card>
           <CardHeader>
-            <CardTitle>Payment Information</CardTitle>
-            <CardDescription>Update your payment method for this order</CardDescription>
+            <CardTitle>Payment Method</CardTitle>
+            <CardDescription>Club shipments are charged to the card on file when they are billed</CardDescription>
           </CardHeader>
           <CardContent className="space-y-4">
-            <div className="space-y-2">
-              <Label htmlFor="cardNumber">Card Number</Label>
-              <Input
-                id="cardNumber"
-                placeholder="1234 5678 9012 3456"
-                value={paymentInfo.cardNumber}
-                onChange={(e) => setPaymentInfo(prev => ({ ...prev, cardNumber: e.target.value }))}
-              />
-            </div>
-
-            <div className="grid grid-cols-2 gap-4">
-              <div className="space-y-2">
-                <Label htmlFor="expiryDate">Expiry Date</Label>
-                <Input
-                  id="expiryDate"
-                  placeholder="MM/YY"
-                  value={paymentInfo.expiryDate}
-                  onChange={(e) => setPaymentInfo(prev => ({ ...prev, expiryDate: e.target.value }))}
-                />
+            {member.has_payment_method ? (
+              <div className="flex items-center gap-2 p-3 border rounded-lg">
+                <CreditCard className="w-5 h-5 text-green-600" />
+                <span>Your saved card will be charged for this shipment.</span>
               </div>
-              <div className="space-y-2">
-                <Label htmlFor="cvv">CVV</Label>
-                <Input
-                  id="cvv"
-                  placeholder="123"
-                  value={paymentInfo.cvv}
-                  onChange={(e) => setPaymentInfo(prev => ({ ...prev, cvv: e.target.value }))}
-                />
+            ) : (
+              <div className="flex items-center gap-2 p-3 border rounded-lg bg-yellow-50">
+                <CreditCard className="w-5 h-5 text-yellow-600" />
+                <span>No card is on file yet. Your club will contact you to add one before billing.</span>
               </div>
-            </div>
-
-            <div className="space-y-2">
-              <Label htmlFor="cardName">Cardholder Name</Label>
-              <Input
-                id="cardName"
-                placeholder="John Doe"
-                value={paymentInfo.name}
-                onChange={(e) => setPaymentInfo(prev => ({ ...prev, name: e.target.value }))}
-              />
-            </div>
+            )}
 
             <div className="flex gap-2">
               <Button variant="outline" onClick={() => setCurrentStep(3)}>
                 <ArrowLeft className="w-4 h-4 mr-2" />
                 Back
               </Button>
-              <Button 
-                onClick={() => setCurrentStep(5)}
-                disabled={!paymentInfo.cardNumber || !paymentInfo.expiryDate || !paymentInfo.cvv || !paymentInfo.name}
-              >
+              <Button onClick={() => setCurrentStep(5)}>
                 Continue
                 <ArrowRight className="w-4 h-4 ml-2" />
               </Button>
@@ -472,8 +493,17 @@ export function CustomerWineSelection({ memberId, onComplete }: CustomerWineSele
               {selectedWines.map((wine, index) => (
                 <div key={wine.id} className="flex items-center justify-between p-3 border rounded-lg">
                   <div className="flex items-center gap-3">
-                    <div className="w-12 h-12 bg-gray-100 rounded-lg flex items-center justify-center">
-                      <WineIcon className="w-6 h-6 text-gray-400" />
+                    <div className="w-12 h-12 bg-gray-100 rounded-lg flex items-center justify-center overflow-hidden">
+                      {wine.image_url ? (
+                        <ImageWithFallback
+                          src={wine.thumbnail_url || wine.image_url}
+                          originalSrc={wine.image_url}
+                          alt={wine.name}
+                          className="w-full h-full object-cover"
+                        />
+                      ) : (
+                        <WineIcon className="w-6 h-6 text-gray-400" />
+                      )}
                     </div>
                     <div>
                       <p className="font-medium">{wine.name}</p>
@@ -525,12 +555,12 @@ export function CustomerWineSelection({ memberId, onComplete }: CustomerWineSele
                 {loading ? (
                   <>
                     <Clock className="w-4 h-4 mr-2 animate-spin" />
-                    Processing...
+                    Saving...
                   </>
                 ) : (
                   <>
                     <CreditCard className="w-4 h-4 mr-2" />
-                    Confirm & Pay ${calculateTotal().toFixed(2)}
+                    Confirm Selection ${calculateTotal().toFixed(2)}
                   </>
                 )}
               </Button>
@@ -553,10 +583,10 @@ export function CustomerWineSelection({ memberId, onComplete }: CustomerWineSele
             <div className="bg-green-50 p-4 rounded-lg">
               <div className="flex items-center gap-2 mb-2">
                 <CheckCircle className="w-5 h-5 text-green-600" />
-                <span className="font-medium text-green-800">Payment Successful</span>
+                <span className="font-medium text-green-800">Selection Saved</span>
               </div>
               <p className="text-sm text-green-700">
-                You have been charged ${calculateTotal().toFixed(2)} for your wine selection.
+                Your card on file will be charged ${calculateTotal().toFixed(2)} when this shipment is billed.
               </p>
             </div>
 
@@ -572,7 +602,7 @@ export function CustomerWineSelection({ memberId, onComplete }: CustomerWineSele
 
             <div className="border-t pt-4">
               <div className="flex justify-between font-bold">
-                <span>Total Paid:</span>
+                <span>Total:</span>
                 <span>${calculateTotal().toFixed(2)}</span>
               </div>
             </div>
@@ -588,9 +618,6 @@ export function CustomerWineSelection({ memberId, onComplete }: CustomerWineSele
             </div>
 
             <div className="text-center">
-              <p className="text-sm text-gray-600 mb-4">
-                This demo is complete. In the live version, your order would be processed.
-              </p>
               <Button onClick={onComplete} className="w-full">
                 Complete
               </Button>
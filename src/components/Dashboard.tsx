@@ -8,11 +8,11 @@ import { api } from "../utils/api";
 import { useClient } from "../contexts/ClientContext";
 
 export function Dashboard() {
-  const { currentWineClub, isLoading: clientLoading } = useClient();
+  // Plans come with the club profile loaded once by ClientProvider
+  const { currentWineClub, plans, isLoading: clientLoading } = useClient();
   const [loading, setLoading] = useState(true);
   const [members, setMembers] = useState([]);
   const [shipments, setShipments] = useState([]);
-  const [plans, setPlans] = useState([]);
   const [inventory, setInventory] = useState([]);
   const [globalPreferences, setGlobalPreferences] = useState([]);
   
@@ -30,23 +30,21 @@ export function Dashboard() {
     const fetchDashboardData = async () => {
       try {
         setLoading(true);
-        const [membersRes, shipmentsRes, plansRes, inventoryRes, preferencesRes] = await Promise.all([
+        const [membersRes, shipmentsRes, inventoryRes, preferencesRes] = await Promise.all([
           api.getMembers(currentWineClub.id).catch(() => ({ members: [] })),
           api.getShipments(currentWineClub.id).catch(() => ({ shipments: [] })),
-          api.getPlans(currentWineClub.id).catch(() => ({ plans: [] })),
           api.getLiveInventory(currentWineClub.id, 'all', 0).catch(() => ({ wines: [] })),
           api.getGlobalPreferences(currentWineClub.id).catch(() => ({ preferences: [] }))
         ]);
 
         const membersData = membersRes.members || [];
         const shipmentsData = shipmentsRes.shipments || [];
-        const plansData = plansRes.plans || [];
+        const plansData = plans;
         const inventoryData = inventoryRes.wines || [];
         const preferencesData = preferencesRes.preferences || [];
 
         setMembers(membersData);
         setShipments(shipmentsData);
-        setPlans(plansData);
         setInventory(inventoryData);
         setGlobalPreferences(preferencesData);
 
@@ -84,7 +82,6 @@ export function Dashboard() {
         // Graceful fallback
         setMembers([]);
         setShipments([]);
-        setPlans([]);
         setInventory([]);
         setGlobalPreferences([]);
       } finally {
@@ -198,7 +195,7 @@ export function Dashboard() {
 
   if (clientLoading || loading) {
     return (
-      <div className="space-y-6">
+      <div className="space-y-6" data-testid="dashboard-loading">
         <div className="grid gap-4 md:grid-cols-2 lg:grid-cols-4">
           {[...Array(4)].map((_, i) => (
             <Card key={i}>
@@ -226,7 +223,7 @@ export function Dashboard() {
   }
 
   return (
-    <div className="space-y-6">
+    <div className="space-y-6" data-testid="dashboard">
       <div>
         <h1>Dashboard</h1>
         <p className="text-muted-foreground">
@@ -251,13 +248,13 @@ export function Dashboard() {
           ))
         ) : (
           stats.map((stat) => (
-            <Card key={stat.title}>
+            <Card key={stat.title} data-testid={`dashboard-stat-${stat.title.toLowerCase().replace(/[^a-z0-9]+/g, '-').replace(/-$/, '')}`}>
               <CardHeader className="flex flex-row items-center justify-between space-y-0 pb-2">
                 <CardTitle className="text-sm">{stat.title}</CardTitle>
                 <stat.icon className="h-4 w-4 text-muted-foreground" />
               </CardHeader>
               <CardContent>
-                <div className="text-2xl">{stat.value}</div>
+                <div className="text-2xl" data-testid="dashboard-stat-value">{stat.value}</div>
                 {stat.subtitle && (
                   <p className="text-xs text-muted-foreground mb-1">
                     {stat.subtitle}
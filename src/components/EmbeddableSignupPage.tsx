@@ -70,6 +70,7 @@ export function EmbeddableSignupPage() {
     
     // Load the signup form
     const script = document.createElement('script');
+    script.type = 'module';
     script.src = '${embedConfig.apiBaseUrl}/embeddable-signup.js';
     script.onload = function() {
       window.initWineClubSignup('${embedConfig.wineClubId}', config);
@@ -474,7 +474,6 @@ export function EmbeddedSignup({
                         </DialogDescription>
                       </DialogHeader>
                       <CustomerWineSelection 
-                        memberId="demo-member-id" 
                         onComplete={() => {
                           // Close dialog
                           const closeButton = document.querySelector('[data-state="open"] button[aria-label="Close"]') as HTMLButtonElement;
@@ -105,6 +105,44 @@ interface ShippedOrder {
   shipped_by: string;
 }
 
+type FulfillmentStage = 'pending' | 'picked' | 'approved' | 'shipped';
+
+const FULFILLMENT_STAGES: FulfillmentStage[] = ['pending', 'picked', 'approved', 'shipped'];
+
+// fulfillment_orders rows -> the shapes each tab renders
+const toSquareOrder = (row: any): SquareOrder => ({ ...row.order_data, id: row.id, order_number: row.order_number });
+
+const toPickedOrder = (row: any): PickedOrder => ({
+  id: row.id,
+  order_number: row.order_number,
+  customer_name: row.customer_name,
+  customer_email: row.customer_email,
+  picked_items: row.picked_items || [],
+  picked_at: row.picked_at,
+  picked_by: row.picked_by,
+});
+
+const toApprovedOrder = (row: any): ApprovedOrder => ({
+  id: row.id,
+  order_number: row.order_number,
+  customer_name: row.customer_name,
+  customer_email: row.customer_email,
+  approved_items: row.picked_items || [],
+  approved_at: row.approved_at,
+  approved_by: row.approved_by,
+});
+
+const toShippedOrder = (row: any): ShippedOrder => ({
+  id: row.id,
+  order_number: row.order_number,
+  customer_name: row.customer_name,
+  customer_email: row.customer_email,
+  shipped_items: row.picked_items || [],
+  tracking_number: row.tracking_number || "",
+  shipped_at: row.shipped_at,
+  shipped_by: row.shipped_by,
+});
+
 export function FulfillmentPage() {
   const { currentWineClub } = useClient();
   const [activeTab, setActiveTab] = useState("orders");
@@ -128,6 +166,14 @@ export function FulfillmentPage() {
   // Shipped Tab
   const [shippedOrders, setShippedOrders] = useState<ShippedOrder[]>([]);
 
+  // Server-side pagination per stage (null = no more pages)
+  const [stageCursors, setStageCursors] = useState<Record<FulfillmentStage, string | null>>({
+    pending: null,
+    picked: null,
+    approved: null,
+    shipped: null,
+  });
+
   // CSV Export functionality
   const [csvEmail, setCsvEmail] = useState("");
   const [saveEmail, setSaveEmail] = useState(false);
@@ -137,83 +183,50 @@ export function FulfillmentPage() {
   const [csvExportLoading, setCsvExportLoading] = useState(false);
   const [trackingUploadLoading, setTrackingUploadLoading] = useState(false);
 
+  const loadStage = async (stage: FulfillmentStage, append = false) => {
+    if (!currentWineClub) return;
+
+    const { orders: rows, next_cursor } = await api.getFulfillmentOrders(
+      currentWineClub.id,
+      stage,
+      append ? stageCursors[stage] : null
+    );
+    setStageCursors(prev => ({ ...prev, [stage]: next_cursor }));
+
+    const merge = <T,>(prev: T[], next: T[]) => (append ? [...prev, ...next] : next);
+    switch (stage) {
+      case 'pending':
+        setOrders(prev => merge(prev, rows.map(toSquareOrder)));
+        break;
+      case 'picked':
+        setPickedOrders(prev => merge(prev, rows.map(toPickedOrder)));
+        break;
+      case 'approved':
+        setApprovedOrders(prev => merge(prev, rows.map(toApprovedOrder)));
+        break;
+      case 'shipped':
+        setShippedOrders(prev => merge(prev, rows.map(toShippedOrder)));
+        break;
+    }
+  };
+
+  const renderLoadMore = (stage: FulfillmentStage) =>
+    stageCursors[stage] ? (
+      <div className="text-center">
+        <Button variant="outline" onClick={() => loadStage(stage, true)}>
+          Load more
+        </Button>
+      </div>
+    ) : null;
+
+  // Orders enter the pipeline server-side when the billing run charges them (billing-run.tsx);
+  // the page only reads the stages
   const fetchOrders = async () => {
     if (!currentWineClub) return;
     
     try {
       setLoading(true);
-      // This would call Square API to get orders since last shipment
-      // For now, using mock data
-      const mockOrders: SquareOrder[] = [
-        {
-          id: "order_1",
-          order_number: "ORD-001",
-          customer_name: "John Smith",
-          customer_email: "john@example.com",
-          customer_phone: "+1-555-0123",
-          address_line_1: "123 Main Street",
-          address_line_2: "Apt 4B",
-          city: "San Francisco",
-          state: "CA",
-          zip: "94102",
-          order_date: "2025-01-15",
-          total_amount: 89.00,
-          amount_paid: 89.00,
-          date_paid: "2025-01-15",
-          wine_club_plan: "Gold",
-          status: "pending",
-          line_items: [
-            {
-              id: "item_1",
-              name: "Cabernet Sauvignon 2020",
-              quantity: 3,
-              unit_price: 29.67,
-              total_price: 89.00,
-              item_id: "wine_1",
-              variation_id: "var_1",
-              category: "Red Wine",
-              in_stock: true,
-              status: 'pending'
-            }
-          ],
-          created_at: "2025-01-15T10:00:00Z"
-        },
-        {
-          id: "order_2",
-          order_number: "ORD-002",
-          customer_name: "Sarah Johnson",
-          customer_email: "sarah@example.com",
-          customer_phone: "+1-555-0124",
-          address_line_1: "456 Oak Avenue",
-          address_line_2: "",
-          city: "Los Angeles",
-          state: "CA",
-          zip: "90210",
-          order_date: "2025-01-16",
-          total_amount: 178.00,
-          amount_paid: 178.00,
-          date_paid: "2025-01-16",
-          wine_club_plan: "Silver",
-          status: "pending",
-          line_items: [
-            {
-              id: "item_2",
-              name: "Chardonnay 2021",
-              quantity: 6,
-              unit_price: 29.67,
-              total_price: 178.00,
-              item_id: "wine_2",
-              variation_id: "var_2",
-              category: "White Wine",
-              in_stock: true,
-              status: 'pending'
-            }
-          ],
-          created_at: "2025-01-16T14:30:00Z"
-        }
-      ];
-      
-      setOrders(mockOrders);
+      await Promise.all(FULFILLMENT_STAGES.map(stage => loadStage(stage)));
     } catch (error) {
       console.error('Error fetching orders:', error);
     } finally {
@@ -222,56 +235,45 @@ export function FulfillmentPage() {
   };
 
   // Action functions for order management
-  const markItemAsPicked = (orderId: string, itemId: string) => {
-    setOrders(orders.map(order => {
-      if (order.id === orderId) {
-        return {
-          ...order,
-          line_items: order.line_items.map(item => 
-            item.id === itemId ? { ...item, status: 'picked' as const } : item
-          )
-        };
-      }
-      return order;
-    }));
+  // Picking progress is saved on the pending order so it survives a reload
+  const persistPendingOrder = (order: SquareOrder) => {
+    if (!currentWineClub) return;
+    const { id, ...orderData } = order;
+    api.updateFulfillmentOrder(currentWineClub.id, id, orderData).catch(error => {
+      console.error('Error saving order progress:', error);
+    });
   };
 
-  const markItemAsOutOfStock = (orderId: string, itemId: string) => {
+  const setItemStatus = (orderId: string, itemId: string, status: SquareLineItem['status']) => {
     setOrders(orders.map(order => {
       if (order.id === orderId) {
-        return {
+        const updated = {
           ...order,
           line_items: order.line_items.map(item => 
-            item.id === itemId ? { ...item, status: 'out_of_stock' as const } : item
+            item.id === itemId ? { ...item, status } : item
           )
         };
+        persistPendingOrder(updated);
+        return updated;
       }
       return order;
     }));
   };
 
-  const removeItem = (orderId: string, itemId: string) => {
-    setOrders(orders.map(order => {
-      if (order.id === orderId) {
-        return {
-          ...order,
-          line_items: order.line_items.map(item => 
-            item.id === itemId ? { ...item, status: 'removed' as const } : item
-          )
-        };
-      }
-      return order;
-    }));
-  };
+  const markItemAsPicked = (orderId: string, itemId: string) => setItemStatus(orderId, itemId, 'picked');
+
+  const markItemAsOutOfStock = (orderId: string, itemId: string) => setItemStatus(orderId, itemId, 'out_of_stock');
+
+  const removeItem = (orderId: string, itemId: string) => setItemStatus(orderId, itemId, 'removed');
 
   const isOrderReadyToShip = (order: SquareOrder) => {
     const activeItems = order.line_items.filter(item => item.status !== 'removed');
     return activeItems.length > 0 && activeItems.every(item => item.status === 'picked');
   };
 
-  const markOrderAsReadyToShip = (orderId: string) => {
+  const markOrderAsReadyToShip = async (orderId: string) => {
     const order = orders.find(o => o.id === orderId);
-    if (!order || !isOrderReadyToShip(order)) return;
+    if (!order || !isOrderReadyToShip(order) || !currentWineClub) return;
 
     // Group items by wine and create box numbers
     const pickedItems: PickedItem[] = [];
@@ -297,18 +299,16 @@ export function FulfillmentPage() {
         }
       });
 
-    const pickedOrder: PickedOrder = {
-      id: orderId,
-      order_number: order.order_number,
-      customer_name: order.customer_name,
-      customer_email: order.customer_email,
-      picked_items: pickedItems,
-      picked_at: new Date().toISOString(),
-      picked_by: "Current User" // Would be actual user
-    };
-
-    setPickedOrders([...pickedOrders, pickedOrder]);
-    setOrders(orders.filter(o => o.id !== orderId));
+    try {
+      await api.transitionFulfillmentOrders(currentWineClub.id, [orderId], 'picked', {
+        pickedItems: { [orderId]: pickedItems },
+      });
+      setOrders(orders.filter(o => o.id !== orderId));
+      await loadStage('picked');
+    } catch (error) {
+      console.error('Error marking order as picked:', error);
+      alert('Error updating order. Please try again.');
+    }
   };
 
   const openModifyOrderDialog = (order: SquareOrder) => {
@@ -338,6 +338,7 @@ export function FulfillmentPage() {
     };
 
     setOrders(orders.map(order => order.id === editingOrder.id ? updatedOrder : order));
+    persistPendingOrder(updatedOrder);
     setIsModifyDialogOpen(false);
     setEditingOrder(null);
   };
@@ -348,41 +349,37 @@ export function FulfillmentPage() {
     // This would update the order to flag the item
   };
 
-  const approveOrders = (orderIds: string[]) => {
-    const ordersToApprove = pickedOrders.filter(o => orderIds.includes(o.id));
-    
-    const approvedOrdersList: ApprovedOrder[] = ordersToApprove.map(order => ({
-      id: order.id,
-      order_number: order.order_number,
-      customer_name: order.customer_name,
-      customer_email: order.customer_email,
-      approved_items: order.picked_items,
-      approved_at: new Date().toISOString(),
-      approved_by: "Current User"
-    }));
+  // Bulk transitions run as one statement server-side; only the affected stages are reloaded
+  const approveOrders = async (orderIds: string[]) => {
+    if (!currentWineClub || orderIds.length === 0) return;
 
-    setApprovedOrders([...approvedOrders, ...approvedOrdersList]);
-    setPickedOrders(pickedOrders.filter(o => !orderIds.includes(o.id)));
-    setSelectedOrders([]);
+    try {
+      const { moved } = await api.transitionFulfillmentOrders(currentWineClub.id, orderIds, 'approved');
+      const movedIds = new Set<string>(moved);
+      setPickedOrders(pickedOrders.filter(o => !movedIds.has(o.id)));
+      setSelectedOrders([]);
+      await loadStage('approved');
+    } catch (error) {
+      console.error('Error approving orders:', error);
+      alert('Error approving orders. Please try again.');
+    }
   };
 
-  const shipOrders = (orderIds: string[], trackingNumbers: { [key: string]: string }) => {
-    const ordersToShip = approvedOrders.filter(o => orderIds.includes(o.id));
-    
-    const shippedOrdersList: ShippedOrder[] = ordersToShip.map(order => ({
-      id: order.id,
-      order_number: order.order_number,
-      customer_name: order.customer_name,
-      customer_email: order.customer_email,
-      shipped_items: order.approved_items,
-      tracking_number: trackingNumbers[order.id] || "",
-      shipped_at: new Date().toISOString(),
-      shipped_by: "Current User"
-    }));
+  const shipOrders = async (orderIds: string[], trackingNumbers: { [key: string]: string }) => {
+    if (!currentWineClub || orderIds.length === 0) return;
 
-    setShippedOrders([...shippedOrders, ...shippedOrdersList]);
-    setApprovedOrders(approvedOrders.filter(o => !orderIds.includes(o.id)));
-    setSelectedApprovedOrders([]);
+    try {
+      const { moved } = await api.transitionFulfillmentOrders(currentWineClub.id, orderIds, 'shipped', {
+        trackingNumbers,
+      });
+      const movedIds = new Set<string>(moved);
+      setApprovedOrders(approvedOrders.filter(o => !movedIds.has(o.id)));
+      setSelectedApprovedOrders([]);
+      await loadStage('shipped');
+    } catch (error) {
+      console.error('Error shipping orders:', error);
+      alert('Error shipping orders. Please try again.');
+    }
   };
 
   const generateCsvData = () => {
@@ -459,25 +456,14 @@ export function FulfillmentPage() {
     try {
       setTrackingUploadLoading(true);
       
-      const text = await trackingFile.text();
-      const lines = text.split('\n');
-      const headers = lines[0].split(',').map(h => h.trim().replace(/"/g, ''));
-      
-      // Expected headers: Order Number, Tracking Number
-      const orderNumberIndex = headers.findIndex(h => h.toLowerCase().includes('order'));
-      const trackingNumberIndex = headers.findIndex(h => h.toLowerCase().includes('tracking'));
-      
-      if (orderNumberIndex === -1 || trackingNumberIndex === -1) {
-        alert('CSV must contain "Order Number" and "Tracking Number" columns');
-        return;
-      }
+      // Parsed and applied server-side; the report has one entry per CSV row
+      const report = await api.uploadTrackingCsv(trackingFile, currentWineClub?.id || '1');
 
+      // Only rows Square accepted change the table; unmatched and failed rows are reported below
       const trackingUpdates: { [orderNumber: string]: string } = {};
-      
-      for (let i = 1; i < lines.length; i++) {
-        const values = lines[i].split(',').map(v => v.trim().replace(/"/g, ''));
-        if (values[orderNumberIndex] && values[trackingNumberIndex]) {
-          trackingUpdates[values[orderNumberIndex]] = values[trackingNumberIndex];
+      for (const result of report.results) {
+        if (result.status === 'updated') {
+          trackingUpdates[result.order_number] = result.tracking_number;
         }
       }
 
@@ -496,12 +482,14 @@ export function FulfillmentPage() {
 
       setShippedOrders(updatedShippedOrders);
       
-      // Update Square orders with tracking numbers
-      await api.updateSquareOrderTracking(trackingUpdates);
-      
       setIsUploadDialogOpen(false);
       setTrackingFile(null);
-      alert('Tracking numbers updated successfully!');
+      const { summary } = report;
+      if (summary.failed || summary.unmatched || summary.invalid) {
+        alert(`Tracking upload finished: ${summary.updated} updated in Square, ${summary.unmatched} unmatched, ${summary.invalid} invalid, ${summary.failed} failed.`);
+      } else {
+        alert('Tracking numbers updated successfully!');
+      }
       
     } catch (error) {
       console.error('Error uploading tracking CSV:', error);
@@ -516,7 +504,7 @@ export function FulfillmentPage() {
   }, [currentWineClub, onlineOnly]);
 
   return (
-    <div className="space-y-6">
+    <div className="space-y-6" data-testid="fulfillment-page">
       <div className="flex items-center justify-between">
         <div>
           <h2 className="text-2xl font-bold">Fulfillment</h2>
@@ -601,7 +589,7 @@ export function FulfillmentPage() {
           {/* Upload Tracking Dialog */}
           <Dialog open={isUploadDialogOpen} onOpenChange={setIsUploadDialogOpen}>
             <DialogTrigger asChild>
-              <Button variant="outline">
+              <Button variant="outline" data-testid="fulfillment-upload-tracking">
                 <Upload className="h-4 w-4 mr-2" />
                 Upload Tracking
               </Button>
@@ -618,6 +606,7 @@ export function FulfillmentPage() {
                   <Label htmlFor="tracking-file">CSV File</Label>
                   <Input
                     id="tracking-file"
+                    data-testid="fulfillment-tracking-file"
                     type="file"
                     accept=".csv"
                     onChange={handleTrackingFileUpload}
@@ -641,6 +630,7 @@ export function FulfillmentPage() {
                 </Button>
                 <Button 
                   onClick={uploadTrackingCsv} 
+                  data-testid="fulfillment-tracking-submit"
                   disabled={trackingUploadLoading || !trackingFile}
                 >
                   {trackingUploadLoading ? (
@@ -659,7 +649,7 @@ export function FulfillmentPage() {
             </DialogContent>
           </Dialog>
 
-          <Button onClick={fetchOrders} disabled={loading}>
+          <Button onClick={fetchOrders} disabled={loading} data-testid="fulfillment-refresh">
             <RefreshCw className={`h-4 w-4 mr-2 ${loading ? 'animate-spin' : ''}`} />
             Refresh Orders
           </Button>
@@ -668,19 +658,19 @@ export function FulfillmentPage() {
 
       <Tabs value={activeTab} onValueChange={setActiveTab}>
         <TabsList className="grid w-full grid-cols-4">
-          <TabsTrigger value="orders" className="flex items-center space-x-2">
+          <TabsTrigger value="orders" className="flex items-center space-x-2" data-testid="fulfillment-tab-orders">
             <Package className="w-4 h-4" />
             <span>Orders</span>
           </TabsTrigger>
-          <TabsTrigger value="picked" className="flex items-center space-x-2">
+          <TabsTrigger value="picked" className="flex items-center space-x-2" data-testid="fulfillment-tab-picked">
             <CheckCircle className="w-4 h-4" />
             <span>Picked</span>
           </TabsTrigger>
-          <TabsTrigger value="approved" className="flex items-center space-x-2">
+          <TabsTrigger value="approved" className="flex items-center space-x-2" data-testid="fulfillment-tab-approved">
             <Clock className="w-4 h-4" />
             <span>Approved</span>
           </TabsTrigger>
-          <TabsTrigger value="shipped" className="flex items-center space-x-2">
+          <TabsTrigger value="shipped" className="flex items-center space-x-2" data-testid="fulfillment-tab-shipped">
             <Truck className="w-4 h-4" />
             <span>Shipped</span>
           </TabsTrigger>
@@ -707,7 +697,7 @@ export function FulfillmentPage() {
               ) : (
                 <div className="space-y-6">
                   {orders.map((order) => (
-                    <Card key={order.id} className="p-6">
+                    <Card key={order.id} className="p-6" data-testid="fulfillment-order" data-order-id={order.id}>
                       {/* Order Header */}
                       <div className="flex items-start justify-between mb-6">
                         <div className="space-y-2">
@@ -752,6 +742,7 @@ export function FulfillmentPage() {
                             variant={isOrderReadyToShip(order) ? "default" : "outline"}
                             size="sm"
                             onClick={() => markOrderAsReadyToShip(order.id)}
+                            data-testid="fulfillment-ready-to-ship"
                             disabled={!isOrderReadyToShip(order)}
                             className={isOrderReadyToShip(order) ? "bg-green-600 hover:bg-green-700" : ""}
                           >
@@ -870,6 +861,7 @@ export function FulfillmentPage() {
                       </Table>
                     </Card>
                   ))}
+                  {renderLoadMore('pending')}
                 </div>
               )}
             </CardContent>
@@ -912,6 +904,7 @@ export function FulfillmentPage() {
                     </div>
                     <Button
                       onClick={() => approveOrders(selectedOrders)}
+                      data-testid="fulfillment-approve-selected"
                       disabled={selectedOrders.length === 0}
                     >
                       <CheckCircle className="h-4 w-4 mr-2" />
@@ -971,6 +964,7 @@ export function FulfillmentPage() {
                       </Table>
                     </Card>
                   ))}
+                  {renderLoadMore('picked')}
                 </div>
               )}
             </CardContent>
@@ -1020,6 +1014,7 @@ export function FulfillmentPage() {
                         shipOrders(selectedApprovedOrders, trackingNumbers);
                       }}
                       disabled={selectedApprovedOrders.length === 0}
+                      data-testid="fulfillment-ship-selected"
                     >
                       <Truck className="h-4 w-4 mr-2" />
                       Ship Selected ({selectedApprovedOrders.length})
@@ -1078,6 +1073,7 @@ export function FulfillmentPage() {
                       </Table>
                     </Card>
                   ))}
+                  {renderLoadMore('approved')}
                 </div>
               )}
             </CardContent>
@@ -1153,6 +1149,7 @@ export function FulfillmentPage() {
                       </Table>
                     </Card>
                   ))}
+                  {renderLoadMore('shipped')}
                 </div>
               )}
             </CardContent>
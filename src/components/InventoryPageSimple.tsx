@@ -8,6 +8,7 @@ import { Input } from "./ui/input";
 import { Badge } from "./ui/badge";
 import { Button } from "./ui/button";
 import { Search, RefreshCw, Wine, Package, ChevronLeft, ChevronRight } from "lucide-react";
+import { ImageWithFallback } from "./figma/ImageWithFallback";
 import { api } from "../utils/api";
 import { useClient } from "../contexts/ClientContext";
 const ITEMS_PER_PAGE = 24; // 8 rows × 3 columns
@@ -17,6 +18,8 @@ type WineItem = {
   name: string;
   category_name: string;
   image_url: string | null;
+  thumbnail_url?: string | null;
+  image_srcset?: string | null;
   description: string;
   varietal: string;
   sweetness: string;
@@ -196,8 +199,11 @@ export function InventoryPageSimple() {
                   <CardContent className="p-4">
                     <div className="aspect-[3/4] bg-muted rounded-lg mb-3 flex items-center justify-center overflow-hidden">
                       {wine.image_url ? (
-                        <img
+                        <ImageWithFallback
                           src={wine.image_url}
+                          srcSet={wine.image_srcset || undefined}
+                          sizes="(min-width: 1280px) 25vw, (min-width: 768px) 40vw, 100vw"
+                          originalSrc={wine.image_url}
                           alt={wine.name}
                           className="w-full h-full object-cover"
                         />
@@ -14,7 +14,7 @@ import { api } from "../utils/api";
 import { useClient } from "../contexts/ClientContext";
 
 export function MembersPage() {
-  const { currentWineClub } = useClient();
+  const { currentWineClub, plans } = useClient();
   const [searchTerm, setSearchTerm] = useState("");
   const [selectedPlan, setSelectedPlan] = useState("all");
   const [isImportModalOpen, setIsImportModalOpen] = useState(false);
@@ -30,7 +30,6 @@ export function MembersPage() {
   });
   const [loading, setLoading] = useState(true);
   const [members, setMembers] = useState([]);
-  const [plans, setPlans] = useState([]);
   const [refreshing, setRefreshing] = useState(false);
 
   const fetchData = async () => {
@@ -38,22 +37,14 @@ export function MembersPage() {
     
     try {
       setLoading(true);
-      const [membersRes, plansRes] = await Promise.all([
-        api.getMembers(currentWineClub.id),
-        api.getPlans(currentWineClub.id)
-      ]);
+      // Plans are part of the shared club profile; only members are page-specific
+      const membersRes = await api.getMembers(currentWineClub.id);
       
       setMembers(membersRes.members || []);
-      setPlans(plansRes.plans || []);
-      
-      // Debug: Log the actual member data
-      console.log('Members data:', membersRes.members);
-      console.log('Plans data:', plansRes.plans);
     } catch (error) {
       console.error('Failed to fetch members data:', error);
       // Graceful fallback - continue with empty arrays
       setMembers([]);
-      setPlans([]);
     } finally {
       setLoading(false);
     }
@@ -169,7 +160,7 @@ export function MembersPage() {
   });
 
   return (
-    <div className="space-y-6">
+    <div className="space-y-6" data-testid="members-page">
       <div className="flex items-center justify-between">
         <div>
           <h1>Wine Club Members</h1>
@@ -181,6 +172,7 @@ export function MembersPage() {
           <Button 
             variant="outline" 
             onClick={handleSyncFromSquare}
+            data-testid="members-sync-square"
             disabled={refreshing}
           >
             <RefreshCw className={`h-4 w-4 mr-2 ${refreshing ? 'animate-spin' : ''}`} />
@@ -189,6 +181,7 @@ export function MembersPage() {
           <Button 
             variant="outline" 
             onClick={handleRefresh}
+            data-testid="members-refresh"
             disabled={refreshing}
           >
             <RefreshCw className={`h-4 w-4 mr-2 ${refreshing ? 'animate-spin' : ''}`} />
@@ -196,7 +189,7 @@ export function MembersPage() {
           </Button>
           <Dialog open={isImportModalOpen} onOpenChange={setIsImportModalOpen}>
             <DialogTrigger asChild>
-              <Button variant="outline">
+              <Button variant="outline" data-testid="members-import">
                 <Upload className="h-4 w-4 mr-2" />
                 Import Members
               </Button>
@@ -234,7 +227,7 @@ export function MembersPage() {
               </div>
             </DialogContent>
           </Dialog>
-          <Button onClick={() => setIsAddModalOpen(true)}>
+          <Button onClick={() => setIsAddModalOpen(true)} data-testid="members-add">
             <UserPlus className="h-4 w-4 mr-2" />
             Add Member
           </Button>
@@ -255,13 +248,14 @@ export function MembersPage() {
               <Search className="absolute left-3 top-1/2 transform -translate-y-1/2 h-4 w-4 text-muted-foreground" />
               <Input
                 placeholder="Search members..."
+                data-testid="members-search"
                 value={searchTerm}
                 onChange={(e) => setSearchTerm(e.target.value)}
                 className="pl-9"
               />
             </div>
             <Select value={selectedPlan} onValueChange={setSelectedPlan}>
-              <SelectTrigger className="w-40">
+              <SelectTrigger className="w-40" data-testid="members-plan-filter">
                 <Filter className="h-4 w-4 mr-2" />
                 <SelectValue />
               </SelectTrigger>
@@ -315,7 +309,7 @@ export function MembersPage() {
                 ))
               ) : (
                 filteredMembers.map((member) => (
-                  <TableRow key={member.id}>
+                  <TableRow key={member.id} data-testid="member-row" data-member-id={member.id}>
                     <TableCell>
                       <div>
                         <p className="font-medium">{member.name}</p>
@@ -363,6 +357,7 @@ export function MembersPage() {
                         variant="ghost" 
                         size="sm"
                         onClick={() => handleEditMember(member)}
+                        data-testid="member-edit"
                       >
                         Edit
                       </Button>
@@ -464,7 +459,7 @@ export function MembersPage() {
             <Button variant="outline" onClick={() => setIsEditModalOpen(false)}>
               Cancel
             </Button>
-            <Button onClick={handleUpdateMember}>
+            <Button onClick={handleUpdateMember} data-testid="member-edit-save">
               Save Changes
             </Button>
           </div>
@@ -487,6 +482,7 @@ export function MembersPage() {
               </Label>
               <Input
                 id="new-name"
+                data-testid="member-new-name"
                 value={newMember.name}
                 onChange={(e) => setNewMember({...newMember, name: e.target.value})}
                 className="col-span-3"
@@ -499,6 +495,7 @@ export function MembersPage() {
               </Label>
               <Input
                 id="new-email"
+                data-testid="member-new-email"
                 type="email"
                 value={newMember.email}
                 onChange={(e) => setNewMember({...newMember, email: e.target.value})}
@@ -512,6 +509,7 @@ export function MembersPage() {
               </Label>
               <Input
                 id="new-phone"
+                data-testid="member-new-phone"
                 value={newMember.phone}
                 onChange={(e) => setNewMember({...newMember, phone: e.target.value})}
                 className="col-span-3"
@@ -526,7 +524,7 @@ export function MembersPage() {
                 value={newMember.subscription_plan_id} 
                 onValueChange={(value) => setNewMember({...newMember, subscription_plan_id: value})}
               >
-                <SelectTrigger className="col-span-3">
+                <SelectTrigger className="col-span-3" data-testid="member-new-plan">
                   <SelectValue placeholder="Select a plan" />
                 </SelectTrigger>
                 <SelectContent>
@@ -567,7 +565,7 @@ export function MembersPage() {
             <Button variant="outline" onClick={() => setIsAddModalOpen(false)}>
               Cancel
             </Button>
-            <Button onClick={handleAddMember}>
+            <Button onClick={handleAddMember} data-testid="member-new-submit">
               Add Member
             </Button>
           </div>
@@ -107,7 +107,7 @@ const defaultShippingZones: ShippingZone[] = [
 ];
 
 export function PlansPage() {
-  const { currentWineClub } = useClient();
+  const { currentWineClub, plans: clubPlans, refreshProfile } = useClient();
   const [activeTab, setActiveTab] = useState("plans");
   const [plans, setPlans] = useState<Plan[]>([]);
   const [shippingZones, setShippingZones] = useState<ShippingZone[]>(defaultShippingZones);
@@ -148,17 +148,13 @@ export function PlansPage() {
     try {
       setLoading(true);
       
-      // Fetch plans from database
-      const plansRes = await api.getPlans(currentWineClub.id).catch(() => ({ plans: [] }));
-      setPlans(plansRes.plans || []);
-      
       // Fetch members
       const membersRes = await api.getMembers(currentWineClub.id).catch(() => ({ members: [] }));
       setMembers(membersRes.members || []);
       
       // Fetch Square group member counts for each plan
       const groupCounts: {[key: string]: number} = {};
-      for (const plan of plansRes.plans || []) {
+      for (const plan of clubPlans) {
         if (plan.square_segment_id) {
           try {
                  const segmentRes = await api.getCustomersInSquareSegment(plan.square_segment_id, currentWineClub.id);
@@ -181,9 +177,10 @@ export function PlansPage() {
     }
   };
 
+  // Reloads the shared club profile; the new plans then re-run fetchData below
   const handleRefresh = async () => {
     setRefreshing(true);
-    await fetchData();
+    await refreshProfile();
     setRefreshing(false);
   };
 
@@ -249,16 +246,22 @@ export function PlansPage() {
         square_segment_id: plan.square_segment_id
       };
       
-      const response = await api.createPlan(planData, currentWineClub.id);
-      if (response.plan) {
-        plan.id = response.plan.id; // Use database ID
+      // createPlan returns the inserted row
+      const response = await api.createPlan(planData);
+      if (response?.id) {
+        plan.id = response.id; // Use database ID
         setPlans([...plans, plan]);
+        refreshProfile(); // Other pages share the club's plan list
       } else {
         // Fallback to local state if API fails
         setPlans([...plans, plan]);
       }
-    } catch (error) {
+    } catch (error: any) {
       console.error('Failed to save plan to database:', error);
+      if (error?.message?.includes('already exists')) {
+        alert(error.message);
+        return;
+      }
       // Fallback to local state
       setPlans([...plans, plan]);
     }
@@ -301,8 +304,27 @@ export function PlansPage() {
     setIsEditPlanOpen(true);
   };
 
-  const handleUpdatePlan = () => {
+  const handleUpdatePlan = async () => {
     setPlans(plans.map(p => p.id === editingPlanId ? { ...newPlan as Plan, id: editingPlanId } : p));
+
+    try {
+      if (editingPlanId) {
+        await api.updatePlan(editingPlanId, {
+          name: newPlan.name,
+          bottle_count: newPlan.bottle_count,
+          discount_percentage: newPlan.discount_percentage,
+          frequency_options: newPlan.frequency_options,
+          pricing_type: newPlan.pricing_type,
+          fixed_price: newPlan.fixed_price,
+          description: newPlan.description,
+          is_active: newPlan.is_active
+        });
+        refreshProfile(); // Other pages share the club's plan list
+      }
+    } catch (error) {
+      console.error('Failed to save plan changes:', error);
+    }
+
     setIsEditPlanOpen(false);
     setEditingPlanId(null);
     setNewPlan({
@@ -317,9 +339,15 @@ export function PlansPage() {
     });
   };
 
-  const handleDeletePlan = (planId: string) => {
+  const handleDeletePlan = async (planId: string) => {
     if (confirm('Are you sure you want to delete this plan? Members using this plan will need to be reassigned.')) {
       setPlans(plans.filter(p => p.id !== planId));
+      try {
+        await api.deletePlan(planId);
+        refreshProfile(); // Other pages share the club's plan list
+      } catch (error) {
+        console.error('Failed to delete plan:', error);
+      }
     }
   };
 
@@ -347,11 +375,16 @@ export function PlansPage() {
     }
   };
 
+  // Plans come from the club profile ClientProvider loads once per session
+  useEffect(() => {
+    setPlans(clubPlans as Plan[]);
+  }, [clubPlans]);
+
   useEffect(() => {
     if (currentWineClub) {
       fetchData();
     }
-  }, [currentWineClub]);
+  }, [currentWineClub, clubPlans]);
 
   // Calculate stats
   const planStats = plans.map(plan => ({
@@ -362,7 +395,7 @@ export function PlansPage() {
   const totalMembers = members.length;
 
   return (
-    <div className="space-y-6">
+    <div className="space-y-6" data-testid="plans-page">
       <div className="flex items-center justify-between">
         <div>
           <h1>Subscription Plans & Shipping</h1>
@@ -384,8 +417,8 @@ export function PlansPage() {
 
       <Tabs value={activeTab} onValueChange={setActiveTab} className="space-y-6">
         <TabsList className="grid w-full grid-cols-2">
-          <TabsTrigger value="plans">Subscription Plans</TabsTrigger>
-          <TabsTrigger value="shipping">Shipping Zones</TabsTrigger>
+          <TabsTrigger value="plans" data-testid="plans-tab-plans">Subscription Plans</TabsTrigger>
+          <TabsTrigger value="shipping" data-testid="plans-tab-shipping">Shipping Zones</TabsTrigger>
         </TabsList>
 
         <TabsContent value="plans" className="space-y-6">
@@ -464,7 +497,7 @@ export function PlansPage() {
               </div>
               <Dialog open={isCreatePlanOpen} onOpenChange={setIsCreatePlanOpen}>
                 <DialogTrigger asChild>
-                  <Button>
+                  <Button data-testid="plans-create">
                     <Plus className="h-4 w-4 mr-2" />
                     Create Plan
                   </Button>
@@ -481,6 +514,7 @@ export function PlansPage() {
                       <Label htmlFor="plan-name">Plan Name</Label>
                       <Input
                         id="plan-name"
+                        data-testid="plan-form-name"
                         value={newPlan.name || ""}
                         onChange={(e) => setNewPlan({...newPlan, name: e.target.value})}
                         placeholder="e.g. Gold, Silver, Platinum"
@@ -602,7 +636,7 @@ export function PlansPage() {
                           value={newPlan.bottle_count?.toString() || "3"} 
                           onValueChange={(value) => setNewPlan({...newPlan, bottle_count: parseInt(value)})}
                         >
-                          <SelectTrigger>
+                          <SelectTrigger data-testid="plan-form-bottles">
                             <SelectValue />
                           </SelectTrigger>
                           <SelectContent>
@@ -688,7 +722,7 @@ export function PlansPage() {
                       <Button variant="outline" onClick={() => setIsCreatePlanOpen(false)}>
                         Cancel
                       </Button>
-                      <Button onClick={handleCreatePlan} disabled={!newPlan.name}>
+                      <Button onClick={handleCreatePlan} disabled={!newPlan.name} data-testid="plan-form-submit">
                         Create Plan
                       </Button>
                     </div>
@@ -710,6 +744,7 @@ export function PlansPage() {
                       <Label htmlFor="edit-plan-name">Plan Name</Label>
                       <Input
                         id="edit-plan-name"
+                        data-testid="plan-form-name"
                         value={newPlan.name || ""}
                         onChange={(e) => setNewPlan({...newPlan, name: e.target.value})}
                         placeholder="e.g. Gold, Silver, Platinum"
@@ -831,7 +866,7 @@ export function PlansPage() {
                           value={newPlan.bottle_count?.toString() || "3"} 
                           onValueChange={(value) => setNewPlan({...newPlan, bottle_count: parseInt(value)})}
                         >
-                          <SelectTrigger>
+                          <SelectTrigger data-testid="plan-form-bottles">
                             <SelectValue />
                           </SelectTrigger>
                           <SelectContent>
@@ -917,7 +952,7 @@ export function PlansPage() {
                       <Button variant="outline" onClick={() => setIsEditPlanOpen(false)}>
                         Cancel
                       </Button>
-                      <Button onClick={handleUpdatePlan} disabled={!newPlan.name}>
+                      <Button onClick={handleUpdatePlan} disabled={!newPlan.name} data-testid="plan-form-submit">
                         Update Plan
                       </Button>
                     </div>
@@ -940,7 +975,7 @@ export function PlansPage() {
                 </TableHeader>
                 <TableBody>
                   {planStats.map((plan) => (
-                    <TableRow key={plan.id}>
+                    <TableRow key={plan.id} data-testid="plan-row" data-plan-id={plan.id}>
                       <TableCell>
                         <div className="flex items-center gap-3">
                           {plan.icon_url ? (
@@ -1001,10 +1036,10 @@ export function PlansPage() {
                       </TableCell>
                       <TableCell>
                         <div className="flex items-center gap-2">
-                          <Button variant="ghost" size="sm" onClick={() => handleEditPlan(plan)}>
+                          <Button variant="ghost" size="sm" onClick={() => handleEditPlan(plan)} data-testid="plan-edit">
                             <Edit className="h-4 w-4" />
                           </Button>
-                          <Button variant="ghost" size="sm" onClick={() => handleDeletePlan(plan.id)}>
+                          <Button variant="ghost" size="sm" onClick={() => handleDeletePlan(plan.id)} data-testid="plan-delete">
                             <Trash2 className="h-4 w-4" />
                           </Button>
                         </div>
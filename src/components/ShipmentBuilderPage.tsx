@@ -595,7 +595,7 @@ export function ShipmentBuilderPage() {
                                             >
                                               <div className="flex items-center gap-2 flex-1">
                                                 {wine.image_url ? (
-                                                  <img src={wine.image_url} alt={wine.name} className="h-8 w-8 rounded object-cover" />
+                                                  <ImageWithFallback src={wine.thumbnail_url || wine.image_url} originalSrc={wine.image_url} alt={wine.name} className="h-8 w-8 rounded object-cover" />
                                                 ) : (
                                                   <Wine className="h-4 w-4" />
                                                 )}
@@ -444,27 +444,27 @@ export function SquareConfigPage() {
             </CardHeader>
             <CardContent>
               <TabsList className="grid w-full grid-cols-7">
-                <TabsTrigger value="credentials" className="flex items-center space-x-2">
+                <TabsTrigger value="credentials" className="flex items-center space-x-2" data-testid="square-config-tab-credentials">
                   <Settings className="w-4 h-4" />
                   <span>Credentials</span>
                 </TabsTrigger>
-                <TabsTrigger value="categories" className="flex items-center space-x-2">
+                <TabsTrigger value="categories" className="flex items-center space-x-2" data-testid="square-config-tab-categories">
                   <Package className="w-4 h-4" />
                   <span>Categories</span>
                 </TabsTrigger>
-                <TabsTrigger value="preferences" className="flex items-center space-x-2">
+                <TabsTrigger value="preferences" className="flex items-center space-x-2" data-testid="square-config-tab-preferences">
                   <Heart className="w-4 h-4" />
                   <span>Preferences</span>
                 </TabsTrigger>
-                <TabsTrigger value="plans" className="flex items-center space-x-2">
+                <TabsTrigger value="plans" className="flex items-center space-x-2" data-testid="square-config-tab-plans">
                   <CreditCard className="w-4 h-4" />
                   <span>Plans</span>
                 </TabsTrigger>
-                <TabsTrigger value="inventory" className="flex items-center space-x-2">
+                <TabsTrigger value="inventory" className="flex items-center space-x-2" data-testid="square-config-tab-inventory">
                   <Wine className="w-4 h-4" />
                   <span>Inventory</span>
                 </TabsTrigger>
-                <TabsTrigger value="shipping" className="flex items-center space-x-2">
+                <TabsTrigger value="shipping" className="flex items-center space-x-2" data-testid="square-config-tab-shipping">
                   <Truck className="w-4 h-4" />
                   <span>Shipping</span>
                 </TabsTrigger>
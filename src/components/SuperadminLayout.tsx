@@ -17,6 +17,7 @@ interface SuperadminLayoutProps {
   children: React.ReactNode;
   currentPage: string;
   onPageChange: (page: string) => void;
+  onPagePrefetch?: (page: string) => void;
   onLogout: () => void;
 }
 
@@ -32,7 +33,7 @@ const superadminNavigation = [
   { name: "Settings", icon: Settings, id: "settings" },
 ];
 
-export function SuperadminLayout({ children, currentPage, onPageChange, onLogout }: SuperadminLayoutProps) {
+export function SuperadminLayout({ children, currentPage, onPageChange, onPagePrefetch, onLogout }: SuperadminLayoutProps) {
   return (
     <SidebarProvider>
       <div className="min-h-screen flex w-full">
@@ -53,6 +54,8 @@ export function SuperadminLayout({ children, currentPage, onPageChange, onLogout
                 <SidebarMenuItem key={item.id}>
                   <SidebarMenuButton
                     onClick={() => onPageChange(item.id)}
+                    onMouseEnter={() => onPagePrefetch?.(item.id)}
+                    onFocus={() => onPagePrefetch?.(item.id)}
                     isActive={currentPage === item.id}
                   >
                     <item.icon className="h-4 w-4" />
@@ -92,7 +95,7 @@ export function SuperadminLayout({ children, currentPage, onPageChange, onLogout
           </SidebarFooter>
         </Sidebar>
 
-        <main className="flex-1 flex flex-col">
+        <main className="flex-1 flex flex-col" data-testid="superadmin-main">
           <header className="border-b bg-background/95 backdrop-blur supports-[backdrop-filter]:bg-background/60 sticky top-0 z-40">
             <div className="flex h-14 items-center gap-4 px-4">
               <SidebarTrigger />
@@ -106,7 +109,7 @@ export function SuperadminLayout({ children, currentPage, onPageChange, onLogout
                 </div>
               </div>
               <div className="ml-auto flex items-center gap-2">
-                <Button variant="outline" size="sm" onClick={onLogout}>
+                <Button variant="outline" size="sm" onClick={onLogout} data-testid="logout">
                   Logout
                 </Button>
               </div>
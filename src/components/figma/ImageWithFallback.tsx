@@ -3,15 +3,27 @@ import React, { useState } from 'react'
 const ERROR_IMG_SRC =
   'data:image/svg+xml;base64,PHN2ZyB3aWR0aD0iODgiIGhlaWdodD0iODgiIHhtbG5zPSJodHRwOi8vd3d3LnczLm9yZy8yMDAwL3N2ZyIgc3Ryb2tlPSIjMDAwIiBzdHJva2UtbGluZWpvaW49InJvdW5kIiBvcGFjaXR5PSIuMyIgZmlsbD0ibm9uZSIgc3Ryb2tlLXdpZHRoPSIzLjciPjxyZWN0IHg9IjE2IiB5PSIxNiIgd2lkdGg9IjU2IiBoZWlnaHQ9IjU2IiByeD0iNiIvPjxwYXRoIGQ9Im0xNiA1OCAxNi0xOCAzMiAzMiIvPjxjaXJjbGUgY3g9IjUzIiBjeT0iMzUiIHI9IjciLz48L3N2Zz4KCg=='
 
-export function ImageWithFallback(props: React.ImgHTMLAttributes<HTMLImageElement>) {
+// Catalog wines carry resized copies (thumbnail_url, image_srcset) next to the original
+// image_url. Pass them as src/srcSet with a sizes hint and the browser picks the smallest
+// rendition that fits; if the resized copies fail, the original is tried before the placeholder.
+interface ImageWithFallbackProps extends React.ImgHTMLAttributes<HTMLImageElement> {
+  originalSrc?: string | null
+}
+
+export function ImageWithFallback(props: ImageWithFallbackProps) {
   const [didError, setDidError] = useState(false)
+  const [useOriginal, setUseOriginal] = useState(false)
+
+  const { src, srcSet, sizes, alt, style, className, originalSrc, loading = 'lazy', decoding = 'async', ...rest } = props
 
   const handleError = () => {
-    setDidError(true)
+    if (!useOriginal && originalSrc && (originalSrc !== src || srcSet)) {
+      setUseOriginal(true)
+    } else {
+      setDidError(true)
+    }
   }
 
-  const { src, alt, style, className, ...rest } = props
-
   return didError ? (
     <div
       className={`inline-block bg-gray-100 text-center align-middle ${className ?? ''}`}
@@ -21,7 +33,20 @@ export function ImageWithFallback(props: React.ImgHTMLAttributes<HTMLImageElemen
         <img src={ERROR_IMG_SRC} alt="Error loading image" {...rest} data-original-url={src} />
       </div>
     </div>
+  ) : useOriginal ? (
+    <img src={originalSrc ?? undefined} alt={alt} className={className} style={style} loading={loading} decoding={decoding} {...rest} onError={handleError} />
   ) : (
-    <img src={src} alt={alt} className={className} style={style} {...rest} onError={handleError} />
+    <img
+      src={src}
+      srcSet={srcSet}
+      sizes={srcSet ? sizes : undefined}
+      alt={alt}
+      className={className}
+      style={style}
+      loading={loading}
+      decoding={decoding}
+      {...rest}
+      onError={handleError}
+    />
   )
 }
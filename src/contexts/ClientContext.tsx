@@ -1,61 +1,144 @@
-import { createContext, useContext, useState, useEffect, ReactNode } from 'react';
+import { createContext, useContext, useState, useEffect, useCallback, useRef, ReactNode } from 'react';
+import { api } from '../utils/api';
 
 interface WineClub {
   id: string;
   name: string;
   email: string;
-  square_location_id?: string;
+  branding_logo_url?: string | null;
+  square_location_id?: string | null;
   square_access_token?: string;
 }
 
+interface SessionUser {
+  email: string;
+  name: string | null;
+  role: string;
+}
+
+interface SquareStatus {
+  configured: boolean;
+  location_id: string | null;
+  environment: string | null;
+}
+
+// Response of GET /bootstrap: who is signed in and the profile of their club
+interface ClubProfile {
+  user: SessionUser;
+  club: WineClub | null;
+  plans: any[];
+  square: SquareStatus;
+}
+
 interface ClientContextType {
   currentWineClub: WineClub | null;
   setCurrentWineClub: (club: WineClub | null) => void;
   isLoading: boolean;
+  user: SessionUser | null;
+  // Why the signed-in account's profile could not be loaded (bootstrap failed or rejected the session)
+  profileError: string | null;
+  // Shared by every page; call refreshProfile() after changing plans or Square settings
+  plans: any[];
+  squareStatus: SquareStatus | null;
+  refreshProfile: (options?: { wineClubId?: string }) => Promise<void>;
 }
 
 const ClientContext = createContext<ClientContextType | undefined>(undefined);
 
+const NO_PLANS: any[] = [];
+
+// Last profile for this tab, so a reload renders at once while the bootstrap revalidates
+const PROFILE_CACHE_KEY = 'club_profile';
+
+function readCachedProfile(): ClubProfile | null {
+  try {
+    const cached = sessionStorage.getItem(PROFILE_CACHE_KEY);
+    return cached ? JSON.parse(cached) : null;
+  } catch {
+    return null;
+  }
+}
+
+function writeCachedProfile(profile: ClubProfile | null) {
+  try {
+    if (profile) sessionStorage.setItem(PROFILE_CACHE_KEY, JSON.stringify(profile));
+    else sessionStorage.removeItem(PROFILE_CACHE_KEY);
+  } catch {
+    // Storage full or disabled - the profile still lives in state
+  }
+}
+
 export function ClientProvider({ children }: { children: ReactNode }) {
+  const [profile, setProfile] = useState<ClubProfile | null>(null);
   const [currentWineClub, setCurrentWineClub] = useState<WineClub | null>(null);
   const [isLoading, setIsLoading] = useState(true);
+  const [profileError, setProfileError] = useState<string | null>(null);
+  // Club a platform admin switched to; everyone else always gets their own
+  const selectedClubId = useRef<string | undefined>(undefined);
 
-  useEffect(() => {
-    // Check if this is a demo account or real wine club
-    // In production, this would come from authentication/user session
-    const isDemoAccount = window.location.hostname === 'localhost' || 
-                         window.location.hostname.includes('demo') ||
-                         localStorage.getItem('demo_mode') === 'true';
-    
-    if (isDemoAccount) {
-      // Demo account for testing - Wine Club ID = 1
-      const demoClub: WineClub = {
-        id: "1", // Demo Wine Club ID = 1
-        name: "Demo Wine Club",
-        email: "demo@wineclub.com"
-      };
-      
-      setTimeout(() => {
-        setCurrentWineClub(demoClub);
-        setIsLoading(false);
-      }, 0);
-    } else {
-      // Real wine club account - King Frosch Wine Club ID = 2
-      const kingFroschClub: WineClub = {
-        id: "2", // King Frosch Wine Club ID = 2
-        name: "King Frosch Wine Club",
-        email: "klausbellinghausen@gmail.com" // Klaus is the wine club owner
-      };
-      
-      setTimeout(() => {
-        setCurrentWineClub(kingFroschClub);
-        setIsLoading(false);
-      }, 0);
+  const applyProfile = (next: ClubProfile | null) => {
+    setProfile(next);
+    setCurrentWineClub(next?.club || null);
+  };
+
+  const loadProfile = useCallback(async (fresh = false) => {
+    setProfileError(null);
+    try {
+      const next = await api.getBootstrap({ wineClubId: selectedClubId.current, fresh });
+      applyProfile(next);
+      writeCachedProfile(next);
+      // Only called with a session, so no profile means the edge function rejected it
+      if (!next) setProfileError("Your session could not be verified. Please sign in again.");
+    } catch (error) {
+      console.error('Failed to load club profile:', error);
+      setProfileError("We couldn't load your account. Please try again in a moment.");
+    } finally {
+      setIsLoading(false);
     }
   }, []);
 
+  // The tenant follows the Supabase session instead of the hostname or localStorage
+  useEffect(() => {
+    return api.onAuthStateChange((event, session) => {
+      if (!session) {
+        selectedClubId.current = undefined;
+        applyProfile(null);
+        setProfileError(null);
+        writeCachedProfile(null);
+        setIsLoading(false);
+        return;
+      }
+
+      if (event === 'INITIAL_SESSION' || event === 'SIGNED_IN' || event === 'USER_UPDATED') {
+        const cached = readCachedProfile();
+        if (cached?.user?.email === session.user?.email) {
+          applyProfile(cached);
+          setIsLoading(false);
+        }
+        // Supabase calls this listener while holding its auth lock; fetch once it is released
+        setTimeout(() => loadProfile(), 0);
+      }
+    });
+  }, [loadProfile]);
+
+  const refreshProfile = useCallback(async (options: { wineClubId?: string } = {}) => {
+    if (options.wineClubId) selectedClubId.current = options.wineClubId;
+    await loadProfile(true);
+  }, [loadProfile]);
+
   return (
-    <ClientContext.Provider value={{ currentWineClub, setCurrentWineClub, isLoading }}>
+    <ClientContext.Provider
+      value={{
+        currentWineClub,
+        setCurrentWineClub,
+        isLoading,
+        user: profile?.user || null,
+        profileError,
+        plans: profile?.plans || NO_PLANS,
+        squareStatus: profile?.square || null,
+        refreshProfile,
+      }}
+    >
       {children}
     </ClientContext.Provider>
   );
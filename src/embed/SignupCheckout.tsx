@@ -0,0 +1,193 @@
+import * as React from "react";
+import { useState, useEffect, useRef } from "react";
+import { submitPublicSignup, type PublicClubProfile, type PublicPlan } from "./public-api";
+
+// Checkout step of the embed widget. Loaded lazily so the plan list renders without
+// the form code or the Square Web Payments SDK.
+
+const SQUARE_SDK_URL = {
+  production: "https://web.squarecdn.com/v1/square.js",
+  sandbox: "https://sandbox.web.squarecdn.com/v1/square.js",
+};
+
+const PREFERENCES = ["Red Wine", "White Wine", "Rosé", "Sparkling", "Dessert Wine"];
+
+declare global {
+  interface Window {
+    Square?: any;
+  }
+}
+
+let squareSdkPromise: Promise<any> | null = null;
+
+function loadSquareSdk(environment: string) {
+  if (window.Square) return Promise.resolve(window.Square);
+  if (!squareSdkPromise) {
+    squareSdkPromise = new Promise((resolve, reject) => {
+      const script = document.createElement("script");
+      script.src = environment === "sandbox" ? SQUARE_SDK_URL.sandbox : SQUARE_SDK_URL.production;
+      script.async = true;
+      script.onload = () => resolve(window.Square);
+      script.onerror = () => {
+        squareSdkPromise = null;
+        reject(new Error("Failed to load Square payments"));
+      };
+      document.head.appendChild(script);
+    });
+  }
+  return squareSdkPromise;
+}
+
+interface SignupCheckoutProps {
+  wineClubId: string;
+  plan: PublicPlan;
+  payments: PublicClubProfile["payments"];
+  functionsUrl: string;
+  primaryColor: string;
+  onBack: () => void;
+}
+
+const fieldStyle: React.CSSProperties = {
+  width: "100%",
+  padding: "10px 12px",
+  borderRadius: 8,
+  border: "1px solid #d1d5db",
+  fontSize: 15,
+  boxSizing: "border-box",
+  marginTop: 4,
+};
+
+export function SignupCheckout({ wineClubId, plan, payments, functionsUrl, primaryColor, onBack }: SignupCheckoutProps) {
+  const [formData, setFormData] = useState({ name: "", email: "", phone: "" });
+  const [preferences, setPreferences] = useState<string[]>([]);
+  const [status, setStatus] = useState<"idle" | "submitting" | "done">("idle");
+  const [error, setError] = useState("");
+  const [cardReady, setCardReady] = useState(false);
+  const cardRef = useRef<any>(null);
+  const cardContainerId = `wine-club-card-${wineClubId}`;
+  const canCollectCard = !!(payments.application_id && payments.location_id);
+
+  useEffect(() => {
+    if (!canCollectCard) return;
+    let cancelled = false;
+
+    loadSquareSdk(payments.environment)
+      .then(async (Square) => {
+        const card = await Square.payments(payments.application_id, payments.location_id).card();
+        if (cancelled) {
+          card.destroy();
+          return;
+        }
+        await card.attach(`#${cardContainerId}`);
+        cardRef.current = card;
+        setCardReady(true);
+      })
+      .catch((err) => {
+        console.error('Square payments unavailable:', err);
+      });
+
+    return () => {
+      cancelled = true;
+      cardRef.current?.destroy();
+      cardRef.current = null;
+    };
+  }, [canCollectCard, payments.application_id, payments.location_id, payments.environment, cardContainerId]);
+
+  const togglePreference = (preference: string) => {
+    setPreferences((prev) => (prev.includes(preference) ? prev.filter((p) => p !== preference) : [...prev, preference]));
+  };
+
+  const handleSubmit = async (e: React.FormEvent) => {
+    e.preventDefault();
+    setError("");
+    setStatus("submitting");
+
+    try {
+      let sourceId: string | undefined;
+      if (cardRef.current) {
+        const result = await cardRef.current.tokenize();
+        if (result.status !== "OK") {
+          throw new Error("Please check your card details");
+        }
+        sourceId = result.token;
+      }
+
+      await submitPublicSignup(functionsUrl, {
+        wine_club_id: wineClubId,
+        plan_id: plan.id,
+        name: formData.name,
+        email: formData.email,
+        phone: formData.phone || undefined,
+        preferences,
+        source_id: sourceId,
+      });
+      setStatus("done");
+    } catch (err: any) {
+      setError(err.message || "There was an error submitting your form. Please try again.");
+      setStatus("idle");
+    }
+  };
+
+  if (status === "done") {
+    return (
+      <div style={{ textAlign: "center", padding: 24 }}>
+        <h3 style={{ fontFamily: "Georgia, serif" }}>Thank you for joining!</h3>
+        <p>We'll be in touch soon about your first {plan.name} shipment.</p>
+      </div>
+    );
+  }
+
+  return (
+    <form onSubmit={handleSubmit} style={{ maxWidth: 520, margin: "0 auto", background: "#fff", borderRadius: 12, padding: 24 }}>
+      <h3 style={{ marginTop: 0, fontFamily: "Georgia, serif" }}>
+        {plan.name} - {plan.bottle_count} bottles, {plan.frequency.toLowerCase()}
+      </h3>
+
+      <label style={{ display: "block", marginBottom: 12 }}>
+        Full name *
+        <input required style={fieldStyle} value={formData.name} onChange={(e) => setFormData({ ...formData, name: e.target.value })} />
+      </label>
+      <label style={{ display: "block", marginBottom: 12 }}>
+        Email address *
+        <input required type="email" style={fieldStyle} value={formData.email} onChange={(e) => setFormData({ ...formData, email: e.target.value })} />
+      </label>
+      <label style={{ display: "block", marginBottom: 12 }}>
+        Phone number
+        <input type="tel" style={fieldStyle} value={formData.phone} onChange={(e) => setFormData({ ...formData, phone: e.target.value })} />
+      </label>
+
+      <fieldset style={{ border: "none", padding: 0, margin: "0 0 12px" }}>
+        <legend style={{ marginBottom: 6 }}>What types of wine do you enjoy?</legend>
+        {PREFERENCES.map((preference) => (
+          <label key={preference} style={{ display: "inline-flex", alignItems: "center", gap: 6, marginRight: 12 }}>
+            <input type="checkbox" checked={preferences.includes(preference)} onChange={() => togglePreference(preference)} />
+            {preference}
+          </label>
+        ))}
+      </fieldset>
+
+      {canCollectCard && (
+        <div style={{ marginBottom: 12 }}>
+          <p style={{ margin: "0 0 6px" }}>Payment method</p>
+          <div id={cardContainerId} />
+          {!cardReady && <p style={{ color: "#6b7280", fontSize: 13 }}>Loading secure payment form...</p>}
+        </div>
+      )}
+
+      {error && <p style={{ color: "#b91c1c" }}>{error}</p>}
+
+      <div style={{ display: "flex", justifyContent: "space-between", marginTop: 16 }}>
+        <button type="button" onClick={onBack} style={{ background: "none", border: "1px solid #d1d5db", borderRadius: 8, padding: "10px 20px", cursor: "pointer" }}>
+          Back
+        </button>
+        <button
+          type="submit"
+          disabled={status === "submitting"}
+          style={{ border: "none", borderRadius: 8, padding: "10px 24px", color: "#fff", backgroundColor: primaryColor, cursor: "pointer" }}
+        >
+          {status === "submitting" ? "Submitting..." : "Complete Signup"}
+        </button>
+      </div>
+    </form>
+  );
+}
@@ -0,0 +1,155 @@
+import * as React from "react";
+import { useState, useEffect, lazy, Suspense } from "react";
+import { getPublicPlans, DEFAULT_FUNCTIONS_URL, type PublicClubProfile, type PublicPlan } from "./public-api";
+
+// Standalone signup widget for third-party winery sites.
+// Only React is bundled here - the checkout step (form + Square card) is a separate
+// chunk that is fetched when the visitor picks a plan.
+
+const SignupCheckout = lazy(() => import("./SignupCheckout").then((m) => ({ default: m.SignupCheckout })));
+
+const preloadCheckout = () => {
+  import("./SignupCheckout").catch(() => undefined);
+};
+
+export interface EmbedConfig {
+  wineClubId: string;
+  clubName?: string;
+  clubLogo?: string;
+  primaryColor?: string;
+  backgroundColor?: string;
+  textColor?: string;
+  functionsUrl?: string;
+}
+
+const styles = {
+  root: {
+    fontFamily: "-apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif",
+    padding: "24px 16px",
+    boxSizing: "border-box" as const,
+  },
+  container: { maxWidth: 960, margin: "0 auto" },
+  header: { textAlign: "center" as const, marginBottom: 24 },
+  logo: { maxHeight: 120, maxWidth: "100%", objectFit: "contain" as const, marginBottom: 12 },
+  grid: { display: "grid", gap: 16, gridTemplateColumns: "repeat(auto-fit, minmax(220px, 1fr))" },
+  card: {
+    background: "#fff",
+    borderRadius: 12,
+    border: "1px solid #e5e7eb",
+    padding: 20,
+    textAlign: "center" as const,
+    cursor: "pointer",
+  },
+  muted: { color: "#6b7280", fontSize: 14, margin: "4px 0" },
+  button: { border: "none", borderRadius: 8, padding: "12px 24px", color: "#fff", fontSize: 16, cursor: "pointer" },
+};
+
+function formatPrice(plan: PublicPlan) {
+  return plan.price != null ? `$${plan.price.toFixed(2)} per shipment` : `${plan.discount_percentage}% off retail`;
+}
+
+export function SignupWidget({
+  wineClubId,
+  clubName,
+  clubLogo,
+  primaryColor = "#d97706",
+  backgroundColor = "#fef3c7",
+  textColor = "#1f2937",
+  functionsUrl = DEFAULT_FUNCTIONS_URL,
+}: EmbedConfig) {
+  const [profile, setProfile] = useState<PublicClubProfile | null>(null);
+  const [error, setError] = useState("");
+  const [selectedPlan, setSelectedPlan] = useState<PublicPlan | null>(null);
+  const [checkout, setCheckout] = useState(false);
+
+  useEffect(() => {
+    let cancelled = false;
+    getPublicPlans(functionsUrl, wineClubId)
+      .then((data) => {
+        if (!cancelled) setProfile(data);
+      })
+      .catch((err) => {
+        console.error('Error fetching plans:', err);
+        if (!cancelled) setError("Membership plans are unavailable right now. Please try again later.");
+      });
+    return () => {
+      cancelled = true;
+    };
+  }, [functionsUrl, wineClubId]);
+
+  const name = clubName || profile?.club.name || "Wine Club";
+  const logo = clubLogo || profile?.club.logo_url;
+
+  const renderPlans = () => {
+    if (error) return <p style={styles.muted}>{error}</p>;
+    if (!profile) return <p style={styles.muted}>Loading plans...</p>;
+    if (profile.plans.length === 0) {
+      return <p style={styles.muted}>Please contact the wine club administrator to set up membership plans.</p>;
+    }
+
+    return (
+      <div style={styles.grid}>
+        {profile.plans.map((plan) => {
+          const selected = selectedPlan?.id === plan.id;
+          return (
+            <div
+              key={plan.id}
+              role="button"
+              tabIndex={0}
+              onClick={() => setSelectedPlan(plan)}
+              onKeyDown={(e) => e.key === "Enter" && setSelectedPlan(plan)}
+              onMouseEnter={preloadCheckout}
+              style={{ ...styles.card, boxShadow: selected ? `0 0 0 2px ${primaryColor}` : "none" }}
+            >
+              {plan.icon_url && <img src={plan.icon_url} alt="" width={48} height={48} loading="lazy" />}
+              <h3 style={{ margin: "8px 0", color: textColor }}>{plan.name}</h3>
+              <p style={styles.muted}>{plan.bottle_count} bottles, {plan.frequency.toLowerCase()}</p>
+              <p style={{ color: primaryColor, fontWeight: 700, fontSize: 18, margin: "8px 0" }}>{formatPrice(plan)}</p>
+              {plan.description.map((line, index) => (
+                <p key={index} style={styles.muted}>{line}</p>
+              ))}
+            </div>
+          );
+        })}
+      </div>
+    );
+  };
+
+  return (
+    <div style={{ ...styles.root, backgroundColor, color: textColor }}>
+      <div style={styles.container}>
+        <div style={styles.header}>
+          {logo && <img src={logo} alt={`${name} Logo`} style={styles.logo} />}
+          <h2 style={{ margin: 0, fontFamily: "Georgia, serif" }}>Join {name}</h2>
+        </div>
+
+        {checkout && selectedPlan && profile ? (
+          <Suspense fallback={<p style={styles.muted}>Loading checkout...</p>}>
+            <SignupCheckout
+              wineClubId={wineClubId}
+              plan={selectedPlan}
+              payments={profile.payments}
+              functionsUrl={functionsUrl}
+              primaryColor={primaryColor}
+              onBack={() => setCheckout(false)}
+            />
+          </Suspense>
+        ) : (
+          <>
+            {renderPlans()}
+            <div style={{ textAlign: "center", marginTop: 24 }}>
+              <button
+                type="button"
+                disabled={!selectedPlan}
+                onClick={() => setCheckout(true)}
+                style={{ ...styles.button, backgroundColor: primaryColor, opacity: selectedPlan ? 1 : 0.5 } as React.CSSProperties}
+              >
+                Continue
+              </button>
+            </div>
+          </>
+        )}
+      </div>
+    </div>
+  );
+}
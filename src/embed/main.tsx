@@ -0,0 +1,30 @@
+import { createRoot, type Root } from "react-dom/client";
+import { SignupWidget, type EmbedConfig } from "./SignupWidget";
+
+// Entry point for build/embeddable-signup.js (vite.embed.config.ts).
+// The snippet generated by EmbeddableSignupPage loads this file and calls
+// window.initWineClubSignup(wineClubId, config).
+
+const roots = new Map<string, Root>();
+
+function initWineClubSignup(wineClubId: string, config: Partial<EmbedConfig> = {}) {
+  const container = document.getElementById(`wine-club-signup-${wineClubId}`);
+  if (!container) {
+    console.error(`Wine club signup container #wine-club-signup-${wineClubId} not found`);
+    return;
+  }
+
+  roots.get(wineClubId)?.unmount();
+
+  const root = createRoot(container);
+  root.render(<SignupWidget {...config} wineClubId={wineClubId} />);
+  roots.set(wineClubId, root);
+}
+
+declare global {
+  interface Window {
+    initWineClubSignup: typeof initWineClubSignup;
+  }
+}
+
+window.initWineClubSignup = initWineClubSignup;
@@ -0,0 +1,57 @@
+import { projectId, publicAnonKey } from "../utils/supabase/info";
+
+// Minimal client for the public widget endpoints. Uses plain fetch so the embed
+// bundle doesn't pull in supabase-js; the browser HTTP cache revalidates with ETags.
+
+export const DEFAULT_FUNCTIONS_URL = `https://${projectId}.supabase.co/functions/v1/make-server-9d538b9c`;
+
+export interface PublicPlan {
+  id: string;
+  name: string;
+  bottle_count: number;
+  frequency: string;
+  discount_percentage: number;
+  price: number | null;
+  description: string[];
+  icon_url: string | null;
+}
+
+export interface PublicClubProfile {
+  club: { id: string; name: string; logo_url: string | null };
+  plans: PublicPlan[];
+  payments: { application_id: string | null; location_id: string | null; environment: string };
+}
+
+export interface PublicSignupRequest {
+  wine_club_id: string;
+  plan_id: string;
+  name: string;
+  email: string;
+  phone?: string;
+  preferences?: string[];
+  source_id?: string;
+}
+
+export async function getPublicPlans(functionsUrl: string, wineClubId: string): Promise<PublicClubProfile> {
+  const res = await fetch(`${functionsUrl}/public/plans/${encodeURIComponent(wineClubId)}`, {
+    headers: { Authorization: `Bearer ${publicAnonKey}` },
+  });
+  if (!res.ok) throw new Error(`Plans fetch failed: ${res.status}`);
+  return res.json();
+}
+
+export async function submitPublicSignup(functionsUrl: string, signup: PublicSignupRequest) {
+  const res = await fetch(`${functionsUrl}/public/signup`, {
+    method: 'POST',
+    headers: {
+      Authorization: `Bearer ${publicAnonKey}`,
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify(signup),
+  });
+  if (!res.ok) {
+    const body = await res.json().catch(() => ({}));
+    throw new Error(body.error || `Signup failed: ${res.status}`);
+  }
+  return res.json();
+}
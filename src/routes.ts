@@ -0,0 +1,110 @@
+import { lazy, type ComponentType, type LazyExoticComponent } from "react";
+
+// Route-level code splitting.
+// Every page is loaded on demand so the auth screen, the embedded signup widget and the
+// member approval flow don't download the whole admin app. The chunk each page lands in
+// (one per admin/superadmin page, plus customer / embed) is decided by manualChunks in
+// vite.config.ts.
+
+export type PreloadablePage = LazyExoticComponent<ComponentType<any>> & {
+  preload: () => Promise<unknown>;
+};
+
+// Wraps a named export in React.lazy and exposes preload() so the chunk can be fetched
+// on hover/idle before the page is actually rendered
+function lazyPage<M extends Record<string, any>>(loader: () => Promise<M>, exportName: keyof M): PreloadablePage {
+  let pending: Promise<M> | null = null;
+
+  const load = () => {
+    if (!pending) {
+      pending = loader().catch((error) => {
+        // Allow a retry on the next navigation if the chunk failed to download
+        pending = null;
+        throw error;
+      });
+    }
+    return pending;
+  };
+
+  const Page = lazy(() => load().then((module) => ({ default: module[exportName] as ComponentType<any> })));
+  return Object.assign(Page, { preload: load });
+}
+
+// Admin portal
+export const AdminLayout = lazyPage(() => import("./components/AdminLayout"), "AdminLayout");
+export const Dashboard = lazyPage(() => import("./components/Dashboard"), "Dashboard");
+export const MembersPage = lazyPage(() => import("./components/MembersPage"), "MembersPage");
+export const ShipmentBuilderPage = lazyPage(() => import("./components/ShipmentBuilderPage"), "ShipmentBuilderPage");
+export const FulfillmentPage = lazyPage(() => import("./components/FulfillmentPage"), "FulfillmentPage");
+export const SquareConfigPage = lazyPage(() => import("./components/SquareConfigPage"), "SquareConfigPage");
+export const MarketingIntegration = lazyPage(() => import("./components/MarketingIntegration"), "MarketingIntegration");
+export const ShippingSchedulePage = lazyPage(() => import("./components/ShippingSchedulePage"), "ShippingSchedulePage");
+export const EmbeddableSignupPage = lazyPage(() => import("./components/EmbeddableSignupPage"), "EmbeddableSignupPage");
+
+// Superadmin portal
+export const SuperadminLayout = lazyPage(() => import("./components/SuperadminLayout"), "SuperadminLayout");
+export const SuperadminDashboard = lazyPage(() => import("./components/SuperadminDashboard"), "SuperadminDashboard");
+export const OrganizationsPage = lazyPage(() => import("./components/ClubsOrganizationsPage"), "OrganizationsPage");
+export const UsersPage = lazyPage(() => import("./components/ClubsUsersPage"), "UsersPage");
+export const BillingPage = lazyPage(() => import("./components/BillingPage"), "BillingPage");
+
+// Customer portal
+export const WineSelectionReview = lazyPage(() => import("./components/customer/WineSelectionReview"), "WineSelectionReview");
+export const BonusUpsell = lazyPage(() => import("./components/customer/BonusUpsell"), "BonusUpsell");
+export const DeliveryDateConfirmation = lazyPage(() => import("./components/customer/DeliveryDateConfirmation"), "DeliveryDateConfirmation");
+export const PaymentCollection = lazyPage(() => import("./components/customer/PaymentCollection"), "PaymentCollection");
+
+// Embedded signup
+export const EmbeddedSignup = lazyPage(() => import("./components/EmbeddedSignup"), "EmbeddedSignup");
+
+// Page ids used by AdminLayout / SuperadminLayout navigation
+export const adminRoutes: Record<string, PreloadablePage> = {
+  "dashboard": Dashboard,
+  "members": MembersPage,
+  "shipments": ShipmentBuilderPage,
+  "fulfillment": FulfillmentPage,
+  "square-config": SquareConfigPage,
+  "superadmin": SuperadminDashboard,
+  "marketing": MarketingIntegration,
+  "shipping-schedule": ShippingSchedulePage,
+  "embeddable-signup": EmbeddableSignupPage,
+  "customer-portal": WineSelectionReview,
+  "embedded-signup": EmbeddedSignup,
+};
+
+export const superadminRoutes: Record<string, PreloadablePage> = {
+  "saas-dashboard": SuperadminDashboard,
+  "organizations": OrganizationsPage,
+  "users": UsersPage,
+  "billing": BillingPage,
+  "dashboard": Dashboard,
+};
+
+export const customerRoutes: PreloadablePage[] = [
+  WineSelectionReview,
+  BonusUpsell,
+  DeliveryDateConfirmation,
+  PaymentCollection,
+];
+
+// Hover/focus prefetch for a navigation target
+export function prefetchRoute(routes: Record<string, PreloadablePage>, id: string) {
+  routes[id]?.preload().catch(() => {
+    // Ignore - the page will retry when it is actually rendered
+  });
+}
+
+// Fetches the given chunks once the browser is idle. Returns a cleanup for useEffect.
+export function prefetchOnIdle(pages: PreloadablePage[]) {
+  const run = () => {
+    pages.forEach((page) => page.preload().catch(() => undefined));
+  };
+
+  if (typeof window.requestIdleCallback === "function") {
+    const handle = window.requestIdleCallback(run, { timeout: 3000 });
+    return () => window.cancelIdleCallback(handle);
+  }
+
+  const timer = setTimeout(run, 1500);
+  return () => clearTimeout(timer);
+}
@@ -5,6 +5,32 @@ const supabaseAnonKey = 'eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.eyJpc3MiOiJzdXBhYm
 
 const supabase = createClient(supabaseUrl, supabaseAnonKey);
 
+// Authorization header for edge routes that act as the signed-in user (staff-only routes
+// check the session's club on the server)
+async function sessionAuthHeader(action: string) {
+  const { data: { session } } = await supabase.auth.getSession();
+  if (!session) throw new Error(`Please sign in to ${action}`);
+  return { Authorization: `Bearer ${session.access_token}` };
+}
+
+// Member portal calls are scoped by the signed-in member's session, never by a member id
+async function portalFetch(path: string, init: RequestInit = {}) {
+  const { data: { session } } = await supabase.auth.getSession();
+  if (!session) throw new Error('Please sign in to view your membership');
+
+  const BASE_URL = `https://aammkgdhfmkukpqkdduj.supabase.co/functions/v1/make-server-9d538b9c`;
+  const res = await fetch(`${BASE_URL}/portal/${path}`, {
+    ...init,
+    headers: {
+      Authorization: `Bearer ${session.access_token}`,
+      ...(init.body ? { 'Content-Type': 'application/json' } : {}),
+    },
+  });
+  const body = await res.json().catch(() => ({}));
+  if (!res.ok) throw new Error(body.error || `Member portal request failed: ${res.status}`);
+  return body;
+}
+
 export const api = {
   // Wine Clubs
   async getWineClubs() {
@@ -59,6 +85,10 @@ export const api = {
       .select()
       .single();
     
+    // UNIQUE(wine_club_id, name, bottle_count)
+    if (error?.code === '23505') {
+      throw new Error(`A plan named "${planData.name}" with ${planData.bottle_count} bottles already exists`);
+    }
     if (error) throw error;
     return data;
   },
@@ -97,6 +127,24 @@ export const api = {
     return data;
   },
 
+  // Name/email search for pickers, so pages need not download the whole member list
+  async searchMembers(wineClubId: string, query: string = '', limit: number = 25) {
+    let request = supabase
+      .from('members')
+      .select('id, name, email, subscription_plan_id')
+      .eq('wine_club_id', wineClubId)
+      .order('name', { ascending: true })
+      .limit(limit);
+
+    // Commas and parentheses would break the or() filter syntax
+    const term = query.trim().replace(/[,()%]/g, ' ');
+    if (term) request = request.or(`name.ilike.%${term}%,email.ilike.%${term}%`);
+
+    const { data, error } = await request;
+    if (error) throw error;
+    return data;
+  },
+
   async createMember(memberData: any) {
     const { data, error } = await supabase
       .from('members')
@@ -384,6 +432,74 @@ export const api = {
     if (error) throw error;
   },
 
+  // Reads the session persisted in localStorage by signInWithPassword / the magic link
+  // callback (refreshing it if the access token has expired); null when signed out
+  async getSession() {
+    const { data: { session }, error } = await supabase.auth.getSession();
+    if (error) throw error;
+    return session;
+  },
+
+  // Fires with INITIAL_SESSION on subscribe, then on sign-in / sign-out / token refresh
+  onAuthStateChange(callback: (event: string, session: any) => void) {
+    const { data: { subscription } } = supabase.auth.onAuthStateChange(callback);
+    return () => subscription.unsubscribe();
+  },
+
+  // Tenant, club profile, plans and Square status for the signed-in user in one request.
+  // Null when there is no session (or the edge function no longer accepts it).
+  async getBootstrap(options: { wineClubId?: string; fresh?: boolean } = {}) {
+    const { data: { session } } = await supabase.auth.getSession();
+    if (!session) return null;
+
+    const BASE_URL = `https://aammkgdhfmkukpqkdduj.supabase.co/functions/v1/make-server-9d538b9c`;
+    const params = new URLSearchParams();
+    if (options.wineClubId) params.set('wine_club_id', options.wineClubId);
+    if (options.fresh) params.set('fresh', '1');
+
+    const res = await fetch(`${BASE_URL}/bootstrap?${params}`, {
+      headers: { Authorization: `Bearer ${session.access_token}` },
+    });
+    if (res.status === 401) return null;
+    if (!res.ok) throw new Error(`Bootstrap failed: ${res.status}`);
+    return res.json();
+  },
+
+  // A member's plan and the wines they may choose from (plan_selection_index), in one request
+  async getSelectionOptions(memberId: string) {
+    const { data: { session } } = await supabase.auth.getSession();
+    if (!session) throw new Error('Please sign in to choose your wines');
+
+    const BASE_URL = `https://aammkgdhfmkukpqkdduj.supabase.co/functions/v1/make-server-9d538b9c`;
+    const res = await fetch(`${BASE_URL}/members/${memberId}/selection-options`, {
+      headers: { Authorization: `Bearer ${session.access_token}` },
+    });
+    if (res.status === 404) throw new Error('Member not found');
+    if (!res.ok) throw new Error(`Selection options fetch failed: ${res.status}`);
+    return res.json();
+  },
+
+  // Member portal
+  async getPortalMe() {
+    return portalFetch('me');
+  },
+
+  async getPortalPlan() {
+    return portalFetch('plan');
+  },
+
+  async getPortalShipment() {
+    return portalFetch('shipment');
+  },
+
+  async getPortalWines() {
+    return portalFetch('wines');
+  },
+
+  async submitPortalSelection(selection: { selection_id: string; variation_ids: string[]; delivery_date?: string }) {
+    return portalFetch('selection', { method: 'POST', body: JSON.stringify(selection) });
+  },
+
   async getCurrentUser() {
     const { data: { user }, error } = await supabase.auth.getUser();
     if (error) throw error;
@@ -404,16 +520,72 @@ export const api = {
     return res.json();
   },
 
+  // Bulk shipment notifications (server-side batch; re-run to resume)
+  async sendShipmentNotifications(shipmentId: string, options: { approvalBaseUrl: string; deadline: string; maxRecipients?: number; dryRun?: boolean }) {
+    const BASE_URL = `https://aammkgdhfmkukpqkdduj.supabase.co/functions/v1/make-server-9d538b9c`;
+    const res = await fetch(`${BASE_URL}/shipments/${shipmentId}/notify`, {
+      method: 'POST',
+      headers: {
+        ...(await sessionAuthHeader('send notifications')),
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({
+        approval_base_url: options.approvalBaseUrl,
+        deadline: options.deadline,
+        max_recipients: options.maxRecipients,
+        dry_run: options.dryRun,
+      }),
+    });
+    if (!res.ok) throw new Error(`Shipment notifications failed: ${res.status}`);
+    return res.json();
+  },
+
+  async getShipmentNotificationRun(shipmentId: string) {
+    const BASE_URL = `https://aammkgdhfmkukpqkdduj.supabase.co/functions/v1/make-server-9d538b9c`;
+    const res = await fetch(`${BASE_URL}/shipments/${shipmentId}/notify`, {
+      headers: { Authorization: `Bearer ${supabaseAnonKey}` },
+    });
+    if (!res.ok) throw new Error(`Notification run fetch failed: ${res.status}`);
+    return res.json();
+  },
+
+  // Billing run (orders + payments for a whole shipment; re-run to resume).
+  // Runs as the signed-in club admin; the edge function checks they manage the shipment's club.
+  async runShipmentBilling(shipmentId: string, options: { concurrency?: number; maxSelections?: number } = {}) {
+    const BASE_URL = `https://aammkgdhfmkukpqkdduj.supabase.co/functions/v1/make-server-9d538b9c`;
+    const res = await fetch(`${BASE_URL}/shipments/${shipmentId}/billing-run`, {
+      method: 'POST',
+      headers: {
+        ...(await sessionAuthHeader('run billing')),
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({ concurrency: options.concurrency, max_selections: options.maxSelections }),
+    });
+    if (!res.ok) throw new Error(`Billing run failed: ${res.status}`);
+    return res.json();
+  },
+
+  async getShipmentBillingRun(shipmentId: string) {
+    const BASE_URL = `https://aammkgdhfmkukpqkdduj.supabase.co/functions/v1/make-server-9d538b9c`;
+    const res = await fetch(`${BASE_URL}/shipments/${shipmentId}/billing-run`, {
+      headers: { Authorization: `Bearer ${supabaseAnonKey}` },
+    });
+    if (!res.ok) throw new Error(`Billing run fetch failed: ${res.status}`);
+    return res.json();
+  },
+
   // Cleanup functions
-  async cleanupDuplicatePlans(wineClubId: string) {
+  async cleanupDuplicatePlans(wineClubId: string, options: { dryRun?: boolean; allClubs?: boolean } = {}) {
     const BASE_URL = `https://aammkgdhfmkukpqkdduj.supabase.co/functions/v1/make-server-9d538b9c`;
-    const res = await fetch(`${BASE_URL}/plans/cleanup-duplicates`, {
+    const params = new URLSearchParams({ wine_club_id: wineClubId });
+    if (options.dryRun) params.set('dry_run', '1');
+    if (options.allClubs) params.set('scope', 'all');
+    const res = await fetch(`${BASE_URL}/plans/cleanup-duplicates?${params}`, {
       method: 'POST',
       headers: {
-        Authorization: `Bearer ${supabaseAnonKey}`,
+        ...(await sessionAuthHeader('clean up plans')),
         'Content-Type': 'application/json',
       },
-      body: JSON.stringify({ wine_club_id: wineClubId }),
     });
     if (!res.ok) throw new Error(`Cleanup duplicates failed: ${res.status}`);
     return res.json();
@@ -435,7 +607,7 @@ export const api = {
   },
 
   // Square Order Tracking Updates
-  async updateSquareOrderTracking(trackingUpdates: { [orderNumber: string]: string }) {
+  async updateSquareOrderTracking(trackingUpdates: { [orderNumber: string]: string }, wineClubId?: string) {
     const BASE_URL = `https://aammkgdhfmkukpqkdduj.supabase.co/functions/v1/make-server-9d538b9c`;
     const res = await fetch(`${BASE_URL}/square/update-tracking`, {
       method: 'POST',
@@ -443,12 +615,106 @@ export const api = {
         Authorization: `Bearer ${supabaseAnonKey}`,
         'Content-Type': 'application/json',
       },
-      body: JSON.stringify({ trackingUpdates }),
+      body: JSON.stringify({ trackingUpdates, wine_club_id: wineClubId }),
     });
     if (!res.ok) throw new Error(`Square tracking update failed: ${res.status}`);
     return res.json();
   },
 
+  // Uploads a carrier tracking CSV as-is; the server parses it and reports per row
+  async uploadTrackingCsv(file: File, wineClubId: string, shipmentId?: string) {
+    const BASE_URL = `https://aammkgdhfmkukpqkdduj.supabase.co/functions/v1/make-server-9d538b9c`;
+    const params = new URLSearchParams({ wine_club_id: wineClubId });
+    if (shipmentId) params.set('shipment_id', shipmentId);
+    const res = await fetch(`${BASE_URL}/fulfillment/tracking-upload?${params}`, {
+      method: 'POST',
+      headers: {
+        Authorization: `Bearer ${supabaseAnonKey}`,
+        'Content-Type': 'text/csv',
+      },
+      body: file,
+    });
+    if (!res.ok) throw new Error(`Tracking upload failed: ${res.status}`);
+    return res.json();
+  },
+
+  // Fulfillment pipeline (server-side stages: pending -> picked -> approved -> shipped).
+  // Runs as the signed-in club admin; the edge function checks they manage the club.
+  async getFulfillmentOrders(wineClubId: string, stage: string, cursor?: string | null, limit: number = 50) {
+    const BASE_URL = `https://aammkgdhfmkukpqkdduj.supabase.co/functions/v1/make-server-9d538b9c`;
+    const params = new URLSearchParams({ stage, limit: String(limit) });
+    if (cursor) params.set('cursor', cursor);
+    const res = await fetch(`${BASE_URL}/fulfillment/${wineClubId}/orders?${params}`, {
+      headers: await sessionAuthHeader('view fulfillment'),
+    });
+    if (!res.ok) throw new Error(`Fulfillment orders fetch failed: ${res.status}`);
+    return res.json();
+  },
+
+  async getFulfillmentSummary(wineClubId: string) {
+    const BASE_URL = `https://aammkgdhfmkukpqkdduj.supabase.co/functions/v1/make-server-9d538b9c`;
+    const res = await fetch(`${BASE_URL}/fulfillment/${wineClubId}/summary`, {
+      headers: await sessionAuthHeader('view fulfillment'),
+    });
+    if (!res.ok) throw new Error(`Fulfillment summary fetch failed: ${res.status}`);
+    return res.json();
+  },
+
+  async registerFulfillmentOrders(wineClubId: string, orders: any[], shipmentId?: string) {
+    const BASE_URL = `https://aammkgdhfmkukpqkdduj.supabase.co/functions/v1/make-server-9d538b9c`;
+    const res = await fetch(`${BASE_URL}/fulfillment/orders`, {
+      method: 'POST',
+      headers: {
+        ...(await sessionAuthHeader('update fulfillment')),
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({ wine_club_id: wineClubId, shipment_id: shipmentId, orders }),
+    });
+    if (!res.ok) throw new Error(`Fulfillment order registration failed: ${res.status}`);
+    return res.json();
+  },
+
+  async updateFulfillmentOrder(wineClubId: string, id: string, orderData: any) {
+    const BASE_URL = `https://aammkgdhfmkukpqkdduj.supabase.co/functions/v1/make-server-9d538b9c`;
+    const res = await fetch(`${BASE_URL}/fulfillment/orders/${id}`, {
+      method: 'PUT',
+      headers: {
+        ...(await sessionAuthHeader('update fulfillment')),
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({ wine_club_id: wineClubId, order_data: orderData }),
+    });
+    if (!res.ok) throw new Error(`Fulfillment order update failed: ${res.status}`);
+    return res.json();
+  },
+
+  async transitionFulfillmentOrders(
+    wineClubId: string,
+    orderIds: string[],
+    to: 'picked' | 'approved' | 'shipped',
+    // actor defaults to the signed-in admin's email
+    options: { actor?: string; trackingNumbers?: { [id: string]: string }; pickedItems?: { [id: string]: any[] } } = {}
+  ) {
+    const BASE_URL = `https://aammkgdhfmkukpqkdduj.supabase.co/functions/v1/make-server-9d538b9c`;
+    const res = await fetch(`${BASE_URL}/fulfillment/transition`, {
+      method: 'POST',
+      headers: {
+        ...(await sessionAuthHeader('update fulfillment')),
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({
+        wine_club_id: wineClubId,
+        order_ids: orderIds,
+        to,
+        actor: options.actor,
+        tracking_numbers: options.trackingNumbers,
+        picked_items: options.pickedItems,
+      }),
+    });
+    if (!res.ok) throw new Error(`Fulfillment transition failed: ${res.status}`);
+    return res.json();
+  },
+
   // Shipments
   async getShipments(wineClubId: string) {
     const { data, error } = await supabase
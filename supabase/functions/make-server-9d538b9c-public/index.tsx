@@ -0,0 +1,22 @@
+// Imported first so it can time the cold start (startup.tsx)
+import { markReady } from "../make-server-9d538b9c/startup.tsx";
+import { Hono } from "npm:hono";
+import squareWebhookRoutes from "../make-server-9d538b9c/square-webhooks.tsx";
+import imageProxyRoutes from "../make-server-9d538b9c/image-proxy.tsx";
+import { requestObserver } from "../make-server-9d538b9c/observability.tsx";
+
+// Routes that cannot carry a Supabase JWT, deployed with verify_jwt = false (supabase/config.toml)
+// so make-server-9d538b9c itself keeps JWT verification:
+//   POST /square/webhooks        Square deliveries, authenticated by their HMAC signature
+//   GET  /images/catalog/:width  catalog thumbnails requested by <img> tags
+// Nothing else may be mounted here.
+
+const app = new Hono().basePath("/make-server-9d538b9c-public");
+
+app.use('*', requestObserver());
+
+app.route("/", squareWebhookRoutes);
+app.route("/", imageProxyRoutes);
+
+markReady();
+Deno.serve(app.fetch);
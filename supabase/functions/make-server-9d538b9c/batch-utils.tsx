@@ -0,0 +1,46 @@
+// Shared helpers for the bulk jobs (notifications, billing runs, tracking imports):
+// pacing, bounded concurrency and simple latency stats.
+
+export function sleep(ms: number) {
+  return new Promise((resolve) => setTimeout(resolve, ms));
+}
+
+// Spaces out calls so that at most `requestsPerSecond` start in any second
+export function createRateLimiter(requestsPerSecond: number) {
+  const interval = 1000 / requestsPerSecond;
+  let nextSlot = 0;
+  return async () => {
+    const now = Date.now();
+    const wait = Math.max(0, nextSlot - now);
+    nextSlot = Math.max(now, nextSlot) + interval;
+    if (wait > 0) await sleep(wait);
+  };
+}
+
+// Runs `worker` over a (possibly async) stream of items with at most `concurrency` in flight.
+// Items are pulled lazily, so a paged database cursor is never read far ahead of the workers.
+export async function runWithConcurrency<T>(
+  items: Iterable<T> | AsyncIterable<T>,
+  concurrency: number,
+  worker: (item: T) => Promise<void>,
+) {
+  const inflight = new Set<Promise<void>>();
+
+  for await (const item of items as AsyncIterable<T>) {
+    const task: Promise<void> = worker(item).finally(() => inflight.delete(task));
+    inflight.add(task);
+    if (inflight.size >= concurrency) {
+      await Promise.race(inflight);
+    }
+  }
+
+  await Promise.all(inflight);
+}
+
+// Percentiles over a sample of durations in milliseconds
+export function summarizeLatencies(samples: number[]) {
+  if (samples.length === 0) return { p50: 0, p95: 0, max: 0 };
+  const sorted = [...samples].sort((a, b) => a - b);
+  const at = (q: number) => sorted[Math.min(sorted.length - 1, Math.floor(q * sorted.length))];
+  return { p50: at(0.5), p95: at(0.95), max: sorted[sorted.length - 1] };
+}
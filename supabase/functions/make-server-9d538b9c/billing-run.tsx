@@ -0,0 +1,420 @@
+// Billing run engine
+// Creates a Square order and charges the card on file for every approved member_selection
+// of a shipment. Idempotency keys are derived from the selection id, so re-running a
+// shipment never double-charges, and each selection's progress is written back to
+// member_selections.billing_status - a crashed or timed-out run resumes from there.
+// Retrying a failed payment bumps member_selections.billing_attempt: the retry may use a
+// different card, and Square rejects a reused key whose request body changed.
+// Every paid order is registered as a pending fulfillment order (fulfillment.tsx).
+
+import type { SupabaseClient } from "jsr:@supabase/supabase-js@2.49.8";
+import * as kv from "./kv_store.tsx";
+import { getSquareConfig } from "./square-helpers.tsx";
+import { createRateLimiter, runWithConcurrency, summarizeLatencies } from "./batch-utils.tsx";
+import { log, timedFetch } from "./observability.tsx";
+
+const PAGE_SIZE = 200;
+const CHECKPOINT_EVERY = 25;
+// A run that hasn't checkpointed for this long is treated as crashed and its lock taken over
+const STALE_RUN_MS = 2 * 60 * 1000;
+
+export interface BillingRunOptions {
+  concurrency?: number;
+  requestsPerSecond?: number;
+  // Stop after this many selections; the next run continues with the rest
+  maxSelections?: number;
+}
+
+export interface BillingRunSummary {
+  shipment_id: string;
+  status: "running" | "completed" | "partial" | "failed";
+  runs: number;
+  processed: number;
+  paid: number;
+  failed: number;
+  skipped: number;
+  started_at: string;
+  updated_at: string;
+  finished_at?: string;
+  elapsed_ms?: number;
+  selections_per_second?: number;
+  latency_ms?: { p50: number; p95: number; max: number };
+  error?: string;
+}
+
+const runKey = (shipmentId: string) => `billing_run_${shipmentId}`;
+
+// Deterministic per selection, step and attempt: Square returns the original result for a
+// repeated key
+export const billingIdempotencyKey = (selectionId: string, step: "order" | "payment", attempt = 0) =>
+  attempt > 0 ? `billing-${selectionId}-${step}-${attempt}` : `billing-${selectionId}-${step}`;
+
+export async function getBillingRun(shipmentId: string): Promise<BillingRunSummary | null> {
+  return await kv.get(runKey(shipmentId));
+}
+
+// Approved selections still needing work (never billed, failed, or order created but unpaid)
+async function* billableSelections(supabase: SupabaseClient, shipmentId: string) {
+  let lastId: string | null = null;
+
+  while (true) {
+    let query = supabase
+      .from("member_selections")
+      .select(`
+        id, member_id, shipment_id, billing_status, billing_attempt, square_order_id, wine_preferences,
+        member:members!inner(id, name, email, phone, square_customer_id, subscription_plan_id)
+      `)
+      .eq("shipment_id", shipmentId)
+      .eq("status", "approved")
+      .or("billing_status.is.null,billing_status.in.(order_created,failed)")
+      .order("id", { ascending: true })
+      .limit(PAGE_SIZE);
+
+    if (lastId) query = query.gt("id", lastId);
+
+    const { data, error } = await query;
+    if (error) throw error;
+    if (!data || data.length === 0) return;
+
+    yield* data as any[];
+
+    if (data.length < PAGE_SIZE) return;
+    lastId = data[data.length - 1].id;
+  }
+}
+
+// One run per shipment: the billing_run_locks row is claimed atomically (claim_billing_run,
+// see billing-runs.sql), kept alive by every checkpoint and released when the run ends
+export async function runBilling(
+  supabase: SupabaseClient,
+  shipmentId: string,
+  options: BillingRunOptions = {},
+): Promise<BillingRunSummary> {
+  const runId = crypto.randomUUID();
+  const { data: claimed, error } = await supabase.rpc("claim_billing_run", {
+    p_shipment_id: shipmentId,
+    p_run_id: runId,
+    p_stale_seconds: STALE_RUN_MS / 1000,
+  });
+  if (error) throw error;
+  if (!claimed) {
+    throw new Error("A billing run for this shipment is already in progress");
+  }
+
+  const heartbeat = () =>
+    supabase
+      .from("billing_run_locks")
+      .update({ heartbeat_at: new Date().toISOString() })
+      .eq("shipment_id", shipmentId)
+      .eq("run_id", runId);
+
+  try {
+    return await billShipment(supabase, shipmentId, options, heartbeat);
+  } finally {
+    await supabase.from("billing_run_locks").delete().eq("shipment_id", shipmentId).eq("run_id", runId);
+  }
+}
+
+async function billShipment(
+  supabase: SupabaseClient,
+  shipmentId: string,
+  options: BillingRunOptions,
+  heartbeat: () => PromiseLike<unknown>,
+): Promise<BillingRunSummary> {
+  const concurrency = Math.max(1, options.concurrency || 4);
+  const throttle = createRateLimiter(options.requestsPerSecond || 10);
+
+  const previous = await getBillingRun(shipmentId);
+
+  const { data: shipment, error: shipmentError } = await supabase
+    .from("shipments")
+    .select("id, wine_club_id, name, shipment_items(subscription_plan_id, square_variation_id, square_item_id, quantity)")
+    .eq("id", shipmentId)
+    .single();
+
+  if (shipmentError || !shipment) {
+    throw new Error("Shipment not found");
+  }
+
+  const square = await getSquareConfig(shipment.wine_club_id);
+  if (!square.success) {
+    throw new Error(square.error);
+  }
+
+  const { data: plans, error: plansError } = await supabase
+    .from("subscription_plans")
+    .select("*")
+    .eq("wine_club_id", shipment.wine_club_id);
+
+  if (plansError) throw plansError;
+
+  // Order template per plan, built once for the whole run; used for members who made no picks
+  const plansById = new Map<string, any>();
+  const orderTemplates = new Map<string, any>();
+  for (const plan of plans || []) {
+    plansById.set(plan.id, plan);
+    const items = (shipment.shipment_items || []).filter((item: any) => item.subscription_plan_id === plan.id);
+    orderTemplates.set(plan.id, buildOrderTemplate(plan, items, shipment.name));
+  }
+
+  const headers = {
+    "Authorization": `Bearer ${square.token}`,
+    "Square-Version": "2024-01-18",
+    "Content-Type": "application/json",
+  };
+
+  const squarePost = async (path: string, body: unknown) => {
+    await throttle();
+    const response = await timedFetch(`${square.baseUrl}${path}`, { method: "POST", headers, body: JSON.stringify(body) });
+    if (!response.ok) throw new Error(await response.text());
+    return response.json();
+  };
+
+  const findCardOnFile = async (customerId: string) => {
+    await throttle();
+    const response = await timedFetch(`${square.baseUrl}/v2/cards?customer_id=${encodeURIComponent(customerId)}`, { headers });
+    if (!response.ok) throw new Error(await response.text());
+    const { cards } = await response.json();
+    return (cards || []).find((card: any) => card.enabled !== false)?.id || null;
+  };
+
+  const now = new Date().toISOString();
+  const summary: BillingRunSummary = {
+    shipment_id: shipmentId,
+    status: "running",
+    runs: (previous?.runs || 0) + 1,
+    processed: 0,
+    paid: 0,
+    failed: 0,
+    skipped: 0,
+    started_at: now,
+    updated_at: now,
+  };
+  await kv.set(runKey(shipmentId), summary);
+
+  const latencies: number[] = [];
+  const startedAt = Date.now();
+  let sinceCheckpoint = 0;
+
+  const checkpoint = async () => {
+    const elapsed = Date.now() - startedAt;
+    summary.updated_at = new Date().toISOString();
+    summary.elapsed_ms = elapsed;
+    summary.selections_per_second = elapsed > 0 ? Math.round((summary.processed / elapsed) * 1000 * 100) / 100 : 0;
+    summary.latency_ms = summarizeLatencies(latencies);
+    await Promise.all([kv.set(runKey(shipmentId), summary), heartbeat()]);
+  };
+
+  const record = (selectionId: string, update: Record<string, unknown>) =>
+    supabase.from("member_selections").update({ ...update, updated_at: new Date().toISOString() }).eq("id", selectionId);
+
+  // The member is charged either way, so a failed registration is logged rather than failing the selection
+  const registerFulfillment = async (member: any, order: any) => {
+    const { error } = await supabase
+      .from("fulfillment_orders")
+      .upsert(fulfillmentOrderRow(shipment, member, plansById.get(member.subscription_plan_id), order), {
+        onConflict: "wine_club_id,shipment_id,square_order_id",
+        ignoreDuplicates: true,
+      });
+    if (error) log.error(`Failed to register fulfillment order ${order.id}`, error);
+  };
+
+  const billSelection = async (selection: any) => {
+    const began = Date.now();
+    const member = selection.member;
+    // Wines the member chose in the portal (member-portal.tsx), one variation id per bottle
+    const picks = selection.wine_preferences?.variation_ids;
+    const plan = plansById.get(member.subscription_plan_id);
+    const template = Array.isArray(picks) && picks.length > 0 && plan
+      ? buildOrderTemplate(plan, pickedItems(picks), shipment.name)
+      : orderTemplates.get(member.subscription_plan_id);
+
+    try {
+      if (!member.square_customer_id || !template) {
+        summary.skipped++;
+        await record(selection.id, {
+          billing_status: "skipped",
+          billing_error: !template ? "No plan or shipment items for member" : "Member has no Square customer",
+        });
+        return;
+      }
+
+      // A failed selection is a new payment attempt; an interrupted one (order_created) is not
+      let attempt = selection.billing_attempt || 0;
+      if (selection.billing_status === "failed") {
+        attempt++;
+        await record(selection.id, { billing_attempt: attempt });
+      }
+
+      let orderId = selection.square_order_id;
+      let squareOrder: any = null;
+
+      if (!orderId) {
+        const { order } = await squarePost("/v2/orders", {
+          idempotency_key: billingIdempotencyKey(selection.id, "order"),
+          order: {
+            ...template,
+            location_id: square.locationId,
+            customer_id: member.square_customer_id,
+            reference_id: selection.id,
+          },
+        });
+        orderId = order.id;
+        squareOrder = order;
+        await record(selection.id, { billing_status: "order_created", square_order_id: orderId, billing_error: null });
+      }
+
+      if (!squareOrder) {
+        await throttle();
+        const response = await timedFetch(`${square.baseUrl}/v2/orders/${orderId}`, { headers });
+        if (!response.ok) throw new Error(await response.text());
+        squareOrder = (await response.json()).order;
+
+        // A previous attempt may have been charged before its result was recorded
+        const tender = squareOrder.state === "COMPLETED" && (squareOrder.tenders || []).find((t: any) => t.payment_id);
+        if (tender) {
+          await record(selection.id, {
+            billing_status: "paid",
+            square_payment_id: tender.payment_id,
+            billing_error: null,
+            billed_at: new Date().toISOString(),
+          });
+          await registerFulfillment(member, squareOrder);
+          summary.paid++;
+          return;
+        }
+      }
+
+      const cardId = await findCardOnFile(member.square_customer_id);
+      if (!cardId) {
+        throw new Error("No card on file");
+      }
+
+      const { payment } = await squarePost("/v2/payments", {
+        idempotency_key: billingIdempotencyKey(selection.id, "payment", attempt),
+        source_id: cardId,
+        customer_id: member.square_customer_id,
+        location_id: square.locationId,
+        amount_money: squareOrder.total_money,
+        order_id: orderId,
+        reference_id: selection.id,
+        autocomplete: true,
+      });
+
+      await record(selection.id, {
+        billing_status: "paid",
+        square_payment_id: payment.id,
+        billing_error: null,
+        billed_at: new Date().toISOString(),
+      });
+      await registerFulfillment(member, squareOrder);
+      summary.paid++;
+    } catch (error) {
+      log.error(`Billing failed for selection ${selection.id}`, error);
+      summary.failed++;
+      await record(selection.id, { billing_status: "failed", billing_error: String(error.message).slice(0, 1000) });
+    } finally {
+      summary.processed++;
+      latencies.push(Date.now() - began);
+      if (++sinceCheckpoint >= CHECKPOINT_EVERY) {
+        sinceCheckpoint = 0;
+        await checkpoint();
+      }
+    }
+  };
+
+  async function* limited() {
+    let budget = options.maxSelections ?? Infinity;
+    for await (const selection of billableSelections(supabase, shipmentId)) {
+      if (budget-- <= 0) {
+        summary.status = "partial";
+        return;
+      }
+      yield selection;
+    }
+  }
+
+  try {
+    await runWithConcurrency(limited(), concurrency, billSelection);
+    if (summary.status === "running") {
+      summary.status = summary.failed > 0 ? "partial" : "completed";
+    }
+  } catch (error) {
+    summary.status = "failed";
+    summary.error = error.message;
+  }
+
+  summary.finished_at = new Date().toISOString();
+  await checkpoint();
+  return summary;
+}
+
+// fulfillment_orders row for a paid Square order, in the shape FulfillmentPage renders
+function fulfillmentOrderRow(shipment: any, member: any, plan: any, order: any) {
+  const money = (m: any) => (Number(m?.amount) || 0) / 100;
+  return {
+    wine_club_id: shipment.wine_club_id,
+    shipment_id: shipment.id,
+    square_order_id: order.id,
+    order_number: order.id,
+    customer_name: member.name,
+    customer_email: member.email,
+    order_data: {
+      customer_name: member.name,
+      customer_email: member.email,
+      customer_phone: member.phone || "",
+      order_date: order.created_at,
+      total_amount: money(order.total_money),
+      amount_paid: money(order.total_money),
+      date_paid: new Date().toISOString(),
+      wine_club_plan: plan?.name || "",
+      status: "pending",
+      line_items: (order.line_items || []).map((item: any) => ({
+        id: item.uid,
+        name: item.variation_name && item.variation_name !== "Regular" ? `${item.name} ${item.variation_name}` : item.name,
+        quantity: Number(item.quantity) || 1,
+        unit_price: money(item.base_price_money),
+        total_price: money(item.total_money),
+        item_id: item.catalog_object_id || "",
+        variation_id: item.catalog_object_id || "",
+        category: "",
+        in_stock: true,
+        status: "pending",
+      })),
+      created_at: order.created_at,
+    },
+  };
+}
+
+// Shipment-item shaped rows for a member's picks, repeated variations folded into a quantity
+function pickedItems(variationIds: string[]) {
+  const counts = new Map<string, number>();
+  for (const id of variationIds) counts.set(String(id), (counts.get(String(id)) || 0) + 1);
+  return [...counts].map(([variationId, quantity]) => ({ square_variation_id: variationId, quantity }));
+}
+
+// Square order body for a plan: its shipment items, or a member's own picks
+function buildOrderTemplate(plan: any, items: any[], shipmentName: string) {
+  if (plan.pricing_type === "fixed_price" && plan.fixed_price != null) {
+    return {
+      line_items: [{
+        name: `${plan.name} - ${shipmentName}`,
+        quantity: "1",
+        base_price_money: { amount: Math.round(Number(plan.fixed_price) * 100), currency: "USD" },
+      }],
+    };
+  }
+
+  if (items.length === 0) return null;
+
+  const discount = Number(plan.discount_percentage) || 0;
+  return {
+    line_items: items.map((item) => ({
+      catalog_object_id: item.square_variation_id || item.square_item_id,
+      quantity: String(item.quantity || 1),
+    })),
+    discounts: discount > 0
+      ? [{ uid: "plan-discount", name: `${plan.name} member discount`, percentage: String(discount), scope: "ORDER" }]
+      : undefined,
+  };
+}
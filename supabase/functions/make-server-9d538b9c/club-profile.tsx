@@ -0,0 +1,145 @@
+import { Hono } from "npm:hono";
+import { cachedJson, CACHE_CONTROL } from "./http-cache.tsx";
+import { TtlCache } from "./ttl-cache.tsx";
+import { log, setRequestTenant } from "./observability.tsx";
+import { serviceClient } from "./service-client.tsx";
+
+// Session bootstrap for the admin app (ClientContext).
+// GET /bootstrap resolves the caller's tenant from their Supabase access token (admin_users,
+// then members) and returns it together with the club profile every page needs - club and
+// branding, subscription plans and whether Square is configured - in one response.
+// Profiles are cached per club; the Square token itself never leaves the server.
+
+const clubProfile = new Hono();
+
+const supabase = serviceClient();
+
+const PROFILE_TTL_MS = 60 * 1000;
+// Access tokens live for an hour; re-checking them every minute keeps sign-outs prompt enough
+const SESSION_TTL_MS = 60 * 1000;
+
+export const PLATFORM_ROLES = new Set(["superadmin", "saas_admin"]);
+
+export interface SessionTenant {
+  email: string;
+  name: string | null;
+  role: string;
+  wine_club_id: string | null;
+}
+
+const profiles = new TtlCache<any | null>(PROFILE_TTL_MS);
+const sessions = new TtlCache<SessionTenant | null>(SESSION_TTL_MS);
+
+function bearerToken(header: string | undefined) {
+  const match = header?.match(/^Bearer\s+(.+)$/i);
+  return match ? match[1] : null;
+}
+
+async function lookupTenant(email: string): Promise<SessionTenant> {
+  const { data: admin } = await supabase
+    .from('admin_users')
+    .select('wine_club_id, name, role')
+    .eq('email', email)
+    .eq('is_active', true)
+    .maybeSingle();
+  if (admin) {
+    return { email, name: admin.name, role: admin.role, wine_club_id: admin.wine_club_id };
+  }
+
+  // Not staff: a member signing in to their own club
+  const { data: member } = await supabase
+    .from('members')
+    .select('wine_club_id, name')
+    .eq('email', email)
+    .order('updated_at', { ascending: false })
+    .limit(1)
+    .maybeSingle();
+  return { email, name: member?.name || null, role: member ? "member" : "none", wine_club_id: member?.wine_club_id || null };
+}
+
+// The tenant behind an access token, or null when the token is invalid or expired
+export function resolveSessionTenant(authorization: string | undefined) {
+  const token = bearerToken(authorization);
+  if (!token) return Promise.resolve(null);
+
+  return sessions.getOrLoad(token, async () => {
+    const { data, error } = await supabase.auth.getUser(token);
+    if (error || !data.user?.email) return null;
+    return lookupTenant(data.user.email.toLowerCase());
+  }).then((tenant) => {
+    setRequestTenant(tenant?.wine_club_id);
+    return tenant;
+  });
+}
+
+// Platform admins reach every club, club staff their own; members are checked per record
+export function canManageClub(tenant: SessionTenant, wineClubId: string) {
+  if (PLATFORM_ROLES.has(tenant.role)) return true;
+  return tenant.role !== "member" && tenant.role !== "none" && tenant.wine_club_id === wineClubId;
+}
+
+async function loadProfile(wineClubId: string) {
+  const [clubResult, plansResult] = await Promise.all([
+    supabase
+      .from('wine_clubs')
+      .select('id, name, email, branding_logo_url, square_location_id, square_access_token, updated_at')
+      .eq('id', wineClubId)
+      .maybeSingle(),
+    supabase
+      .from('subscription_plans')
+      .select('*')
+      .eq('wine_club_id', wineClubId)
+      .order('created_at', { ascending: false }),
+  ]);
+  if (clubResult.error) throw clubResult.error;
+  if (plansResult.error) throw plansResult.error;
+  if (!clubResult.data) return null;
+
+  const { square_access_token, ...club } = clubResult.data;
+  return {
+    club,
+    plans: plansResult.data || [],
+    square: {
+      configured: !!(square_access_token && club.square_location_id),
+      location_id: club.square_location_id || null,
+      environment: square_access_token ? (square_access_token.includes('sandbox') ? 'sandbox' : 'production') : null,
+    },
+  };
+}
+
+export function getClubProfile(wineClubId: string, options: { fresh?: boolean } = {}) {
+  if (options.fresh) profiles.delete(wineClubId);
+  return profiles.getOrLoad(wineClubId, () => loadProfile(wineClubId));
+}
+
+// Call after anything in the profile changes server-side (plans, Square credentials, branding)
+export function invalidateClubProfile(wineClubId: string) {
+  profiles.delete(wineClubId);
+}
+
+// ?wine_club_id= lets platform admins open a specific club; ?fresh=1 skips the profile cache
+clubProfile.get("/make-server-9d538b9c/bootstrap", async (c) => {
+  try {
+    const tenant = await resolveSessionTenant(c.req.header('Authorization'));
+    if (!tenant) {
+      return c.json({ success: false, error: 'Not signed in' }, 401);
+    }
+
+    const requested = c.req.query('wine_club_id');
+    const wineClubId = requested && PLATFORM_ROLES.has(tenant.role) ? requested : tenant.wine_club_id;
+    const profile = wineClubId ? await getClubProfile(wineClubId, { fresh: c.req.query('fresh') === '1' }) : null;
+
+    return cachedJson(c, {
+      success: true,
+      user: { email: tenant.email, name: tenant.name, role: tenant.role },
+      club: profile?.club || null,
+      plans: profile?.plans || [],
+      square: profile?.square || { configured: false, location_id: null, environment: null },
+    }, CACHE_CONTROL.privateRevalidate);
+  } catch (error) {
+    log.error('Bootstrap error', error);
+    return c.json({ success: false, error: error.message }, 500);
+  }
+});
+
+export default clubProfile;
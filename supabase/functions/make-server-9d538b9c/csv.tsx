@@ -0,0 +1,78 @@
+// Streaming RFC 4180 CSV parser.
+// Handles quoted fields with embedded commas, newlines and doubled quotes, CRLF or LF line
+// endings and a leading BOM. Rows are yielded as they complete, so large uploads are never
+// buffered whole.
+
+export async function* parseCsvStream(stream: ReadableStream<Uint8Array>): AsyncGenerator<string[]> {
+  const reader = stream.pipeThrough(new TextDecoderStream()).getReader();
+
+  let row: string[] = [];
+  let field = "";
+  let inQuotes = false;
+  let quotePending = false;
+  let atStart = true;
+
+  const endRow = () => {
+    row.push(field);
+    field = "";
+    const complete = row;
+    row = [];
+    // Blank lines produce a single empty field - skip them
+    return complete.length === 1 && complete[0] === "" ? null : complete;
+  };
+
+  while (true) {
+    const { value: chunk, done } = await reader.read();
+    if (done) break;
+
+    let i = 0;
+    if (atStart) {
+      atStart = false;
+      if (chunk.charCodeAt(0) === 0xfeff) i = 1;
+    }
+
+    for (; i < chunk.length; i++) {
+      const ch = chunk[i];
+
+      if (inQuotes) {
+        if (quotePending) {
+          quotePending = false;
+          if (ch === '"') {
+            field += '"';
+            continue;
+          }
+          inQuotes = false;
+          // fall through: the character after a closing quote is handled as unquoted
+        } else if (ch === '"') {
+          quotePending = true;
+          continue;
+        } else {
+          field += ch;
+          continue;
+        }
+      }
+
+      if (ch === '"' && field === "") {
+        inQuotes = true;
+      } else if (ch === ",") {
+        row.push(field);
+        field = "";
+      } else if (ch === "\n") {
+        const complete = endRow();
+        if (complete) yield complete;
+      } else if (ch !== "\r") {
+        field += ch;
+      }
+    }
+  }
+
+  if (field !== "" || row.length > 0) {
+    const complete = endRow();
+    if (complete) yield complete;
+  }
+}
+
+// Convenience wrapper for text that is already in memory
+export function parseCsvText(text: string) {
+  return parseCsvStream(new Blob([text]).stream());
+}
@@ -1,9 +1,6 @@
-import { createClient } from "jsr:@supabase/supabase-js@2.49.8";
+import { serviceClient } from "./service-client.tsx";
 
-const supabase = createClient(
-  Deno.env.get("SUPABASE_URL")!,
-  Deno.env.get("SUPABASE_SERVICE_ROLE_KEY")!,
-);
+const supabase = serviceClient();
 
 // Wine Club SaaS Database Schema
 // This would be run via Supabase SQL Editor or migrations
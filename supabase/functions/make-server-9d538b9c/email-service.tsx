@@ -2,6 +2,9 @@
 // Handles all wine club email communications
 
 import { serverEnv } from "./env.tsx";
+import { timedFetch } from "./observability.tsx";
+
+export const DEFAULT_FROM_EMAIL = "noreply@wineclubsaas.com";
 
 interface EmailOptions {
   to: string;
@@ -32,13 +35,96 @@ interface ShipmentNotificationOptions {
   deadline: string;
 }
 
+// Shipment notification template, rendered once per club. Per-member values are left as
+// {{name}}, {{approval_url}} and {{deadline}} placeholders for fillTemplate, so bulk sends
+// don't rebuild the whole document for every recipient.
+export function renderShipmentNotificationTemplate(wineClubName: string) {
+  const html = `
+    <!DOCTYPE html>
+    <html>
+      <head>
+        <meta charset="utf-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <title>Your Wine Selection is Ready</title>
+      </head>
+      <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333; max-width: 600px; margin: 0 auto; padding: 20px;">
+        <div style="background: linear-gradient(135deg, #d97706, #f59e0b); padding: 30px; border-radius: 10px; text-align: center; margin-bottom: 30px;">
+          <h1 style="color: white; margin: 0; font-size: 28px;">🍷 Your Wine Selection is Ready!</h1>
+        </div>
+        
+        <div style="background: #f9fafb; padding: 30px; border-radius: 10px;">
+          <h2 style="color: #1f2937; margin-top: 0;">Hello {{name}}! 🎉</h2>
+          <p style="font-size: 16px; margin-bottom: 20px;">
+            Great news! We've curated your next wine selection from ${wineClubName}. 
+            Your wines are ready for review and approval.
+          </p>
+          
+          <div style="background: #fef3c7; padding: 20px; border-radius: 8px; border-left: 4px solid #f59e0b; margin: 20px 0;">
+            <p style="margin: 0; color: #92400e;">
+              <strong>⏰ Important:</strong> Please review and approve your selection by {{deadline}} to ensure timely delivery.
+            </p>
+          </div>
+          
+          <div style="text-align: center; margin: 30px 0;">
+            <a href="{{approval_url}}" 
+               style="background: #d97706; color: white; padding: 15px 30px; text-decoration: none; border-radius: 8px; font-weight: bold; font-size: 16px; display: inline-block;">
+              Review Your Wine Selection
+            </a>
+          </div>
+          
+          <h3 style="color: #1f2937;">What You Can Do:</h3>
+          <ul style="padding-left: 20px;">
+            <li>Review your curated wine selection</li>
+            <li>Swap wines if you prefer different options</li>
+            <li>Adjust quantities within your plan</li>
+            <li>Choose your preferred delivery date</li>
+            <li>Confirm your order and payment</li>
+          </ul>
+          
+          <div style="background: #ecfdf5; padding: 20px; border-radius: 8px; border-left: 4px solid #10b981; margin: 20px 0;">
+            <p style="margin: 0; color: #065f46;">
+              <strong>💡 Remember:</strong> You can always customize your selection to match your taste preferences!
+            </p>
+          </div>
+        </div>
+        
+        <div style="text-align: center; margin-top: 30px; padding-top: 20px; border-top: 1px solid #e5e7eb;">
+          <p style="font-size: 12px; color: #9ca3af;">
+            Questions about your selection? Reply to this email or contact our support team.
+          </p>
+        </div>
+      </body>
+    </html>
+  `;
+
+  return {
+    subject: `Your ${wineClubName} wine selection is ready for review`,
+    html,
+  };
+}
+
+const HTML_ESCAPES: Record<string, string> = {
+  "&": "&amp;",
+  "<": "&lt;",
+  ">": "&gt;",
+  '"': "&quot;",
+  "'": "&#39;",
+};
+
+// Substitutes {{placeholder}} values (HTML-escaped) into a rendered template
+export function fillTemplate(template: string, values: Record<string, string>) {
+  return template.replace(/\{\{(\w+)\}\}/g, (match, key) =>
+    key in values ? String(values[key]).replace(/[&<>"']/g, (ch) => HTML_ESCAPES[ch]) : match
+  );
+}
+
 class EmailService {
   private apiKey: string;
   private fromEmail: string;
 
   constructor() {
     this.apiKey = serverEnv.RESEND_API_KEY;
-    this.fromEmail = "noreply@wineclubsaas.com"; // Default from email
+    this.fromEmail = DEFAULT_FROM_EMAIL;
   }
 
   private async sendEmail(options: EmailOptions) {
@@ -46,7 +132,7 @@ class EmailService {
       throw new Error("Resend API key not configured");
     }
 
-    const response = await fetch("https://api.resend.com/emails", {
+    const response = await timedFetch("https://api.resend.com/emails", {
       method: "POST",
       headers: {
         "Authorization": `Bearer ${this.apiKey}`,
@@ -182,68 +268,16 @@ class EmailService {
 
   // Shipment Ready Notification
   async sendShipmentNotification(options: ShipmentNotificationOptions) {
-    const html = `
-      <!DOCTYPE html>
-      <html>
-        <head>
-          <meta charset="utf-8">
-          <meta name="viewport" content="width=device-width, initial-scale=1.0">
-          <title>Your Wine Selection is Ready</title>
-        </head>
-        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333; max-width: 600px; margin: 0 auto; padding: 20px;">
-          <div style="background: linear-gradient(135deg, #d97706, #f59e0b); padding: 30px; border-radius: 10px; text-align: center; margin-bottom: 30px;">
-            <h1 style="color: white; margin: 0; font-size: 28px;">🍷 Your Wine Selection is Ready!</h1>
-          </div>
-          
-          <div style="background: #f9fafb; padding: 30px; border-radius: 10px;">
-            <h2 style="color: #1f2937; margin-top: 0;">Hello ${options.name}! 🎉</h2>
-            <p style="font-size: 16px; margin-bottom: 20px;">
-              Great news! We've curated your next wine selection from ${options.wineClubName}. 
-              Your wines are ready for review and approval.
-            </p>
-            
-            <div style="background: #fef3c7; padding: 20px; border-radius: 8px; border-left: 4px solid #f59e0b; margin: 20px 0;">
-              <p style="margin: 0; color: #92400e;">
-                <strong>⏰ Important:</strong> Please review and approve your selection by ${options.deadline} to ensure timely delivery.
-              </p>
-            </div>
-            
-            <div style="text-align: center; margin: 30px 0;">
-              <a href="${options.approvalUrl}" 
-                 style="background: #d97706; color: white; padding: 15px 30px; text-decoration: none; border-radius: 8px; font-weight: bold; font-size: 16px; display: inline-block;">
-                Review Your Wine Selection
-              </a>
-            </div>
-            
-            <h3 style="color: #1f2937;">What You Can Do:</h3>
-            <ul style="padding-left: 20px;">
-              <li>Review your curated wine selection</li>
-              <li>Swap wines if you prefer different options</li>
-              <li>Adjust quantities within your plan</li>
-              <li>Choose your preferred delivery date</li>
-              <li>Confirm your order and payment</li>
-            </ul>
-            
-            <div style="background: #ecfdf5; padding: 20px; border-radius: 8px; border-left: 4px solid #10b981; margin: 20px 0;">
-              <p style="margin: 0; color: #065f46;">
-                <strong>💡 Remember:</strong> You can always customize your selection to match your taste preferences!
-              </p>
-            </div>
-          </div>
-          
-          <div style="text-align: center; margin-top: 30px; padding-top: 20px; border-top: 1px solid #e5e7eb;">
-            <p style="font-size: 12px; color: #9ca3af;">
-              Questions about your selection? Reply to this email or contact our support team.
-            </p>
-          </div>
-        </body>
-      </html>
-    `;
+    const template = renderShipmentNotificationTemplate(options.wineClubName);
 
     return this.sendEmail({
       to: options.email,
-      subject: `Your ${options.wineClubName} wine selection is ready for review`,
-      html,
+      subject: template.subject,
+      html: fillTemplate(template.html, {
+        name: options.name,
+        approval_url: options.approvalUrl,
+        deadline: options.deadline,
+      }),
     });
   }
 
@@ -1,5 +1,6 @@
-import { Hono } from "npm:hono@4.6.11";
+import { Hono } from "npm:hono";
 import { serverEnv, isServerEnvConfigured, getSquareEnvironment } from "./env.tsx";
+import { log } from "./observability.tsx";
 
 const envStatus = new Hono();
 
@@ -41,7 +42,7 @@ envStatus.get("/make-server-9d538b9c/env-status", async (c) => {
       timestamp: new Date().toISOString()
     });
   } catch (error) {
-    console.error('Environment status error:', error);
+    log.error('Environment status error', error);
     return c.json({ error: error.message }, 500);
   }
 });
@@ -13,6 +13,20 @@ export const serverEnv = {
   SQUARE_ACCESS_TOKEN: Deno.env.get("SQUARE_ACCESS_TOKEN") || Deno.env.get("SQUARE_SANDBOX_ACCESS_TOKEN") || '',
   SQUARE_LOCATION_ID: Deno.env.get("SQUARE_LOCATION_ID") || Deno.env.get("SQUARE_SANDBOX_LOCATION_ID") || '',
   SQUARE_WEBHOOK_SIGNATURE_KEY: Deno.env.get("SQUARE_WEBHOOK_SIGNATURE_KEY") || '',
+  // The notification URL exactly as registered with Square (it is part of the signed payload)
+  SQUARE_WEBHOOK_URL: Deno.env.get("SQUARE_WEBHOOK_URL") || '',
+  // Overrides the Square API host, e.g. a local stand-in for load tests (loadtests/square_stub.py)
+  SQUARE_API_BASE_URL: Deno.env.get("SQUARE_API_BASE_URL") || '',
+  // Memory budget for the per-club live-inventory snapshots (square-catalog-service.tsx)
+  SQUARE_CATALOG_CACHE_MB: Deno.env.get("SQUARE_CATALOG_CACHE_MB") || '',
+  // "off" serves catalog image originals from Storage without image transformations (image-proxy.tsx)
+  CATALOG_IMAGE_TRANSFORMS: Deno.env.get("CATALOG_IMAGE_TRANSFORMS") || 'on',
+
+  // Logging (observability.tsx): debug | info | warn | error, the share of ordinary requests
+  // that get a log line (5xx and slow requests always do) and the "slow" threshold in ms
+  LOG_LEVEL: Deno.env.get("LOG_LEVEL") || 'info',
+  LOG_SAMPLE_RATE: Deno.env.get("LOG_SAMPLE_RATE") || '0.1',
+  SLOW_REQUEST_MS: Deno.env.get("SLOW_REQUEST_MS") || '1000',
 
   // Wine Club
   DEFAULT_WINE_CLUB_ID: Deno.env.get("DEFAULT_WINE_CLUB_ID") || '1',
@@ -20,6 +34,8 @@ export const serverEnv = {
   // Optional: Email/SMS
   SENDGRID_API_KEY: Deno.env.get("SENDGRID_API_KEY") || '',
   RESEND_API_KEY: Deno.env.get("RESEND_API_KEY") || '',
+  // "resend" (default) or "mock" to record bulk sends in memory instead of emailing
+  EMAIL_PROVIDER: Deno.env.get("EMAIL_PROVIDER") || 'resend',
   TWILIO_ACCOUNT_SID: Deno.env.get("TWILIO_ACCOUNT_SID") || '',
   TWILIO_AUTH_TOKEN: Deno.env.get("TWILIO_AUTH_TOKEN") || '',
   TWILIO_PHONE_NUMBER: Deno.env.get("TWILIO_PHONE_NUMBER") || '',
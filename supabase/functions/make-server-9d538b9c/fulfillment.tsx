@@ -0,0 +1,227 @@
+import { Hono, type Context } from "npm:hono";
+import { canManageClub, resolveSessionTenant, type SessionTenant } from "./club-profile.tsx";
+import { log } from "./observability.tsx";
+import { serviceClient } from "./service-client.tsx";
+
+// Fulfillment pipeline backed by the fulfillment_orders table (see fulfillment-pipeline.sql).
+// Orders move pending -> picked -> approved -> shipped; each bulk transition is one
+// fulfillment_transition() call no matter how many orders are selected.
+// Paid billing-run selections are registered here as pending orders (billing-run.tsx).
+// Every route is for the signed-in admins of the club the orders belong to.
+
+const fulfillment = new Hono();
+
+const supabase = serviceClient();
+
+const STAGES = ["pending", "picked", "approved", "shipped"];
+const TRANSITION_TARGETS = ["picked", "approved", "shipped"];
+const DEFAULT_PAGE_SIZE = 50;
+const MAX_PAGE_SIZE = 500;
+
+// Opaque keyset cursor over (created_at, id); null when the cursor was not one of ours
+const encodeCursor = (row: { created_at: string; id: string }) => btoa(`${row.created_at}|${row.id}`);
+const decodeCursor = (cursor: string) => {
+  try {
+    const [createdAt, id] = atob(cursor).split("|");
+    if (!createdAt || !id || Number.isNaN(Date.parse(createdAt)) || !/^[0-9a-f-]{36}$/i.test(id)) return null;
+    return { createdAt, id };
+  } catch {
+    return null;
+  }
+};
+
+// The signed-in admin of the club, or the 401/403 response to return instead
+async function requireClubAdmin(c: Context, wineClubId: string): Promise<SessionTenant | Response> {
+  const tenant = await resolveSessionTenant(c.req.header('Authorization'));
+  if (!tenant) return c.json({ success: false, error: 'Not signed in' }, 401);
+  if (!canManageClub(tenant, wineClubId)) return c.json({ success: false, error: 'Not allowed' }, 403);
+  return tenant;
+}
+
+// Paginated stage view
+fulfillment.get("/make-server-9d538b9c/fulfillment/:wineClubId/orders", async (c) => {
+  try {
+    const wineClubId = c.req.param('wineClubId');
+    const stage = c.req.query('stage') || 'pending';
+    const shipmentId = c.req.query('shipment_id');
+    const cursor = c.req.query('cursor');
+    const limit = Math.min(Number(c.req.query('limit')) || DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE);
+
+    const auth = await requireClubAdmin(c, wineClubId);
+    if (auth instanceof Response) return auth;
+
+    const position = cursor ? decodeCursor(cursor) : null;
+    if (cursor && !position) {
+      return c.json({ error: "Invalid cursor" }, 400);
+    }
+    if (!STAGES.includes(stage)) {
+      return c.json({ error: `Unknown stage: ${stage}` }, 400);
+    }
+
+    let query = supabase
+      .from('fulfillment_orders')
+      .select('*')
+      .eq('wine_club_id', wineClubId)
+      .eq('stage', stage)
+      .order('created_at', { ascending: true })
+      .order('id', { ascending: true })
+      .limit(limit + 1);
+
+    if (shipmentId) query = query.eq('shipment_id', shipmentId);
+    if (position) {
+      const { createdAt, id } = position;
+      query = query.or(`created_at.gt."${createdAt}",and(created_at.eq."${createdAt}",id.gt.${id})`);
+    }
+
+    const { data, error } = await query;
+    if (error) {
+      return c.json({ error: error.message }, 500);
+    }
+
+    const orders = (data || []).slice(0, limit);
+    const nextCursor = data && data.length > limit ? encodeCursor(orders[orders.length - 1]) : null;
+
+    return c.json({ orders, next_cursor: nextCursor });
+  } catch (error) {
+    log.error('Get fulfillment orders error', error);
+    return c.json({ error: error.message }, 500);
+  }
+});
+
+// Order count per stage, for the tab badges
+fulfillment.get("/make-server-9d538b9c/fulfillment/:wineClubId/summary", async (c) => {
+  try {
+    const wineClubId = c.req.param('wineClubId');
+    const shipmentId = c.req.query('shipment_id');
+
+    const auth = await requireClubAdmin(c, wineClubId);
+    if (auth instanceof Response) return auth;
+
+    const counts = await Promise.all(STAGES.map(async (stage) => {
+      let query = supabase
+        .from('fulfillment_orders')
+        .select('id', { count: 'exact', head: true })
+        .eq('wine_club_id', wineClubId)
+        .eq('stage', stage);
+      if (shipmentId) query = query.eq('shipment_id', shipmentId);
+
+      const { count, error } = await query;
+      if (error) throw error;
+      return [stage, count || 0];
+    }));
+
+    return c.json({ counts: Object.fromEntries(counts) });
+  } catch (error) {
+    log.error('Get fulfillment summary error', error);
+    return c.json({ error: error.message }, 500);
+  }
+});
+
+// Registers orders in the pending stage. Orders already in the pipeline keep their stage.
+fulfillment.post("/make-server-9d538b9c/fulfillment/orders", async (c) => {
+  try {
+    const { wine_club_id, shipment_id, orders } = await c.req.json();
+
+    if (!wine_club_id || !Array.isArray(orders)) {
+      return c.json({ error: "wine_club_id and orders are required" }, 400);
+    }
+    const auth = await requireClubAdmin(c, String(wine_club_id));
+    if (auth instanceof Response) return auth;
+
+    const rows = orders.map((order: any) => ({
+      wine_club_id,
+      shipment_id: shipment_id || null,
+      square_order_id: order.square_order_id || order.id,
+      order_number: order.order_number,
+      customer_name: order.customer_name,
+      customer_email: order.customer_email,
+      order_data: order,
+    }));
+
+    const { data, error } = await supabase
+      .from('fulfillment_orders')
+      .upsert(rows, { onConflict: 'wine_club_id,shipment_id,square_order_id', ignoreDuplicates: true })
+      .select('id');
+
+    if (error) {
+      return c.json({ error: error.message }, 500);
+    }
+
+    return c.json({ inserted: data?.length || 0 });
+  } catch (error) {
+    log.error('Register fulfillment orders error', error);
+    return c.json({ error: error.message }, 500);
+  }
+});
+
+// Saves picking progress (line item statuses) on a pending order
+fulfillment.put("/make-server-9d538b9c/fulfillment/orders/:id", async (c) => {
+  try {
+    const id = c.req.param('id');
+    const { wine_club_id, order_data } = await c.req.json();
+
+    if (!wine_club_id) {
+      return c.json({ error: "wine_club_id is required" }, 400);
+    }
+    const auth = await requireClubAdmin(c, String(wine_club_id));
+    if (auth instanceof Response) return auth;
+
+    const { data, error } = await supabase
+      .from('fulfillment_orders')
+      .update({ order_data, updated_at: new Date().toISOString() })
+      .eq('id', id)
+      .eq('wine_club_id', wine_club_id)
+      .eq('stage', 'pending')
+      .select()
+      .maybeSingle();
+
+    if (error) {
+      return c.json({ error: error.message }, 500);
+    }
+    if (!data) {
+      return c.json({ error: "Pending order not found" }, 404);
+    }
+
+    return c.json({ order: data });
+  } catch (error) {
+    log.error('Update fulfillment order error', error);
+    return c.json({ error: error.message }, 500);
+  }
+});
+
+// Bulk stage transition - one SQL statement for the whole selection
+fulfillment.post("/make-server-9d538b9c/fulfillment/transition", async (c) => {
+  try {
+    const { wine_club_id, order_ids, to, actor, tracking_numbers, picked_items } = await c.req.json();
+
+    if (!wine_club_id || !Array.isArray(order_ids) || !TRANSITION_TARGETS.includes(to)) {
+      return c.json({ error: "wine_club_id, order_ids and a valid target stage are required" }, 400);
+    }
+    const auth = await requireClubAdmin(c, String(wine_club_id));
+    if (auth instanceof Response) return auth;
+
+    const { data, error } = await supabase.rpc('fulfillment_transition', {
+      p_wine_club_id: wine_club_id,
+      p_order_ids: order_ids,
+      p_to: to,
+      p_actor: actor || auth.email,
+      p_tracking: tracking_numbers || {},
+      p_items: picked_items || {},
+    });
+
+    if (error) {
+      return c.json({ error: error.message }, 500);
+    }
+
+    const moved: string[] = (data || []).map((row: any) => (typeof row === 'string' ? row : row.fulfillment_transition));
+    const movedSet = new Set(moved);
+    const skipped = order_ids.filter((id: string) => !movedSet.has(id));
+
+    return c.json({ moved, skipped });
+  } catch (error) {
+    log.error('Fulfillment transition error', error);
+    return c.json({ error: error.message }, 500);
+  }
+});
+
+export default fulfillment;
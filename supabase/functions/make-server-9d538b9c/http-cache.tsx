@@ -0,0 +1,142 @@
+import type { Context, MiddlewareHandler } from "npm:hono";
+
+// HTTP caching helpers: weak ETags, If-None-Match handling, Cache-Control presets
+// and response compression for the make-server-9d538b9c GET routes
+
+export const CACHE_CONTROL = {
+  // Anonymous, CDN-cacheable data such as the embed widget's plan list
+  publicShort: "public, max-age=60, s-maxage=300, stale-while-revalidate=600",
+  // Tenant data that changes rarely (plans, schedules, preferences)
+  privateShort: "private, max-age=30, stale-while-revalidate=120",
+  // Tenant data that must always be revalidated (members, shipments) - 304s keep it cheap
+  privateRevalidate: "private, no-cache",
+  // Content-addressed responses such as catalog image renditions
+  immutable: "public, max-age=31536000, immutable",
+};
+
+// Bodies smaller than this are not worth compressing
+const COMPRESSION_THRESHOLD_BYTES = 1024;
+
+async function sha1Hex(payload: string): Promise<string> {
+  const digest = await crypto.subtle.digest("SHA-1", new TextEncoder().encode(payload));
+  return Array.from(new Uint8Array(digest).slice(0, 12), (byte) => byte.toString(16).padStart(2, "0")).join("");
+}
+
+// Weak ETag derived from the serialized response body
+export async function weakETag(payload: string): Promise<string> {
+  return `W/"${await sha1Hex(payload)}"`;
+}
+
+// Weak ETag derived from row versions (id + updated_at) instead of the full body.
+// Only use it when the rows fully determine the response, i.e. no joined columns.
+export async function rowVersionETag(rows: Array<{ id?: string; key?: string; updated_at?: string; created_at?: string }>): Promise<string> {
+  const versions = rows.map((row) => `${row.id ?? row.key}:${row.updated_at ?? row.created_at ?? ""}`);
+  return `W/"v${rows.length}-${await sha1Hex(versions.join("|"))}"`;
+}
+
+// If-None-Match uses weak comparison, so W/"x" and "x" are the same validator
+export function matchesETag(ifNoneMatch: string | undefined, etag: string): boolean {
+  if (!ifNoneMatch) return false;
+  if (ifNoneMatch.trim() === "*") return true;
+
+  const opaque = (tag: string) => tag.trim().replace(/^W\//, "");
+  const target = opaque(etag);
+  return ifNoneMatch.split(",").some((candidate) => opaque(candidate) === target);
+}
+
+// JSON response with an ETag validator. Answers 304 with no body when the client copy is current.
+export async function cachedJson(c: Context, body: unknown, cacheControl: string) {
+  const payload = JSON.stringify(body);
+  const etag = await weakETag(payload);
+
+  c.header("ETag", etag);
+  c.header("Cache-Control", cacheControl);
+  c.header("Vary", "Accept-Encoding");
+
+  if (matchesETag(c.req.header("If-None-Match"), etag)) {
+    return c.body(null, 304);
+  }
+
+  return c.body(payload, 200, { "Content-Type": "application/json; charset=UTF-8" });
+}
+
+// Picks the best encoding the client accepts and the runtime can produce.
+// Brotli is used where CompressionStream supports it; Deno currently offers gzip/deflate.
+function negotiateEncoding(acceptEncoding: string | undefined): string | null {
+  if (!acceptEncoding) return null;
+
+  const accepted = acceptEncoding
+    .split(",")
+    .map((part) => {
+      const [name, ...params] = part.trim().split(";");
+      const q = params.find((param) => param.trim().startsWith("q="));
+      return { name: name.toLowerCase(), q: q ? parseFloat(q.trim().slice(2)) : 1 };
+    })
+    .filter((entry) => entry.q > 0)
+    .map((entry) => entry.name);
+
+  for (const encoding of ["br", "gzip", "deflate"]) {
+    if (accepted.includes(encoding) && supportsCompression(encoding)) {
+      return encoding;
+    }
+  }
+  return null;
+}
+
+const compressionSupport = new Map<string, boolean>();
+
+function supportsCompression(encoding: string): boolean {
+  if (!compressionSupport.has(encoding)) {
+    try {
+      new CompressionStream(encoding as CompressionFormat);
+      compressionSupport.set(encoding, true);
+    } catch {
+      compressionSupport.set(encoding, false);
+    }
+  }
+  return compressionSupport.get(encoding)!;
+}
+
+// Conditional GET middleware.
+// On successful GET responses it sets Cache-Control, adds a weak ETag (unless the handler
+// already set one from row versions), answers If-None-Match with 304, and compresses
+// JSON bodies with br/gzip when the client accepts it.
+export function httpCache(options: { cacheControl: string }): MiddlewareHandler {
+  return async (c, next) => {
+    await next();
+
+    if (c.req.method !== "GET" || c.res.status !== 200) return;
+
+    const contentType = c.res.headers.get("Content-Type") || "";
+    if (!contentType.includes("application/json")) return;
+
+    const payload = await c.res.clone().text();
+    const etag = c.res.headers.get("ETag") || await weakETag(payload);
+    const headers = new Headers(c.res.headers);
+
+    headers.set("ETag", etag);
+    headers.set("Cache-Control", options.cacheControl);
+    headers.set("Vary", "Accept-Encoding");
+
+    if (matchesETag(c.req.header("If-None-Match"), etag)) {
+      headers.delete("Content-Length");
+      headers.delete("Content-Type");
+      c.res = new Response(null, { status: 304, headers });
+      return;
+    }
+
+    const encoding = payload.length >= COMPRESSION_THRESHOLD_BYTES && !headers.has("Content-Encoding")
+      ? negotiateEncoding(c.req.header("Accept-Encoding"))
+      : null;
+
+    if (encoding) {
+      const stream = new Blob([payload]).stream().pipeThrough(new CompressionStream(encoding as CompressionFormat));
+      headers.set("Content-Encoding", encoding);
+      headers.delete("Content-Length");
+      c.res = new Response(stream, { status: 200, headers });
+      return;
+    }
+
+    c.res = new Response(payload, { status: 200, headers });
+  };
+}
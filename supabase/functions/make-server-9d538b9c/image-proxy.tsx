@@ -0,0 +1,137 @@
+import { Hono } from "npm:hono";
+import { serverEnv } from "./env.tsx";
+import { CACHE_CONTROL } from "./http-cache.tsx";
+import { TtlCache } from "./ttl-cache.tsx";
+import { log, timedFetch } from "./observability.tsx";
+import { serviceClient } from "./service-client.tsx";
+
+// Thumbnails for Square catalog images.
+// GET /images/catalog/:width?src=<Square image URL> copies the original into the public
+// catalog-images bucket once (catalog-images.sql) and redirects to a Storage image
+// transformation at one of IMAGE_WIDTHS. Storage resizes, serves WebP to browsers that accept
+// it and keeps the rendition on its CDN. The redirect for a (src, width) pair never changes,
+// so browsers cache it for a year. Only Square's image hosts are proxied. <img> requests carry
+// no JWT, so the route is served by the make-server-9d538b9c-public function.
+
+const imageProxy = new Hono();
+
+const supabase = serviceClient();
+
+export const IMAGE_BUCKET = "catalog-images";
+// thumbnail (8x8 table cells at 3x), then card sizes for the srcset
+export const IMAGE_WIDTHS = [96, 240, 480, 960];
+export const THUMBNAIL_WIDTH = 96;
+const SRCSET_WIDTHS = [240, 480, 960];
+
+const IMAGE_QUALITY = 75;
+const MAX_ORIGINAL_BYTES = 10 * 1024 * 1024;
+// Originals are keyed by a hash of their URL, so a stored copy never goes stale
+const STORED_TTL_MS = 24 * 60 * 60 * 1000;
+
+const stored = new TtlCache<string>(STORED_TTL_MS, 5000);
+
+const FUNCTION_BASE_URL = `${serverEnv.SUPABASE_URL}/functions/v1/make-server-9d538b9c-public`;
+
+// The S3 buckets Square serves catalog images from; any other bucket could be anyone's
+const SQUARE_IMAGE_BUCKETS = new Set([
+  "items-images-production",
+  "items-images-sandbox",
+  "square-catalog-production",
+  "square-catalog-sandbox",
+]);
+// <bucket>.s3.amazonaws.com, <bucket>.s3.<region>.amazonaws.com or <bucket>.s3-<region>.amazonaws.com
+const S3_HOST = /^([a-z0-9-]+)\.s3([.-][a-z0-9-]+)?\.amazonaws\.com$/;
+
+export function isCatalogImageUrl(src: string) {
+  try {
+    const url = new URL(src);
+    if (url.protocol !== "https:") return false;
+    const bucket = url.hostname.match(S3_HOST)?.[1];
+    return (!!bucket && SQUARE_IMAGE_BUCKETS.has(bucket)) || url.hostname.endsWith(".squarecdn.com");
+  } catch {
+    return false;
+  }
+}
+
+export function catalogImageUrl(src: string, width: number) {
+  return `${FUNCTION_BASE_URL}/images/catalog/${width}?src=${encodeURIComponent(src)}`;
+}
+
+// Fields added to every wine in the catalog responses; image_url stays the original
+export function catalogImageFields(src: string | null) {
+  if (!src || !isCatalogImageUrl(src)) {
+    return { thumbnail_url: src, image_srcset: null };
+  }
+  return {
+    thumbnail_url: catalogImageUrl(src, THUMBNAIL_WIDTH),
+    image_srcset: SRCSET_WIDTHS.map((width) => `${catalogImageUrl(src, width)} ${width}w`).join(", "),
+  };
+}
+
+async function objectPath(src: string) {
+  const digest = await crypto.subtle.digest("SHA-256", new TextEncoder().encode(src));
+  const hash = Array.from(new Uint8Array(digest).slice(0, 16), (byte) => byte.toString(16).padStart(2, "0")).join("");
+  const extension = new URL(src).pathname.match(/\.(jpe?g|png|gif|webp)$/i)?.[1].toLowerCase() || "jpg";
+  return `square/${hash}.${extension}`;
+}
+
+function publicObjectUrl(path: string) {
+  return `${serverEnv.SUPABASE_URL}/storage/v1/object/public/${IMAGE_BUCKET}/${path}`;
+}
+
+// Copies the original into Storage unless an earlier request (in any isolate) already did
+async function storeOriginal(src: string, path: string) {
+  const existing = await timedFetch(publicObjectUrl(path), { method: "HEAD" });
+  if (existing.ok) return path;
+
+  const response = await timedFetch(src);
+  if (!response.ok) {
+    throw new Error(`Square image returned ${response.status}`);
+  }
+  const contentType = response.headers.get("content-type") || "";
+  if (!contentType.startsWith("image/")) {
+    throw new Error(`Not an image: ${contentType || "unknown content type"}`);
+  }
+  const body = await response.arrayBuffer();
+  if (body.byteLength > MAX_ORIGINAL_BYTES) {
+    throw new Error(`Image is ${body.byteLength} bytes (limit ${MAX_ORIGINAL_BYTES})`);
+  }
+
+  const { error } = await supabase.storage
+    .from(IMAGE_BUCKET)
+    .upload(path, body, { contentType, cacheControl: "31536000", upsert: true });
+  if (error) throw error;
+  return path;
+}
+
+imageProxy.get("/images/catalog/:width", async (c) => {
+  const width = parseInt(c.req.param("width"), 10);
+  const src = c.req.query("src") || "";
+
+  if (!IMAGE_WIDTHS.includes(width)) {
+    return c.json({ error: `Width must be one of ${IMAGE_WIDTHS.join(", ")}` }, 400);
+  }
+  if (!isCatalogImageUrl(src)) {
+    return c.json({ error: "src must be a Square catalog image URL" }, 400);
+  }
+
+  try {
+    const path = await objectPath(src);
+    await stored.getOrLoad(path, () => storeOriginal(src, path));
+
+    // CATALOG_IMAGE_TRANSFORMS=off on plans without Storage image transformations
+    const target = serverEnv.CATALOG_IMAGE_TRANSFORMS === "off"
+      ? publicObjectUrl(path)
+      : `${serverEnv.SUPABASE_URL}/storage/v1/render/image/public/${IMAGE_BUCKET}/${path}?width=${width}&quality=${IMAGE_QUALITY}&resize=contain`;
+
+    c.header("Cache-Control", CACHE_CONTROL.immutable);
+    return c.redirect(target, 301);
+  } catch (error) {
+    log.error(`Image proxy error for ${src}`, error);
+    // Let the browser fall back to the original rather than show a broken image
+    c.header("Cache-Control", "public, max-age=300");
+    return c.redirect(src, 302);
+  }
+});
+
+export default imageProxy;
@@ -1,38 +1,58 @@
+// Imported first so it can time the cold start (startup.tsx)
+import { lazyModule, lazyRoutes, markReady } from "./startup.tsx";
 import { Hono } from "npm:hono";
 import { cors } from "npm:hono/cors";
-import { logger } from "npm:hono/logger";
-import { createClient } from "jsr:@supabase/supabase-js@2.49.8";
 import * as kv from "./kv_store.tsx";
 import squareLiveInventory from "./square-live-inventory.tsx";
-import envStatusRoutes from "./env-status.tsx";
-import { serverEnv } from "./env.tsx";
+import { invalidateClubCatalog } from "./square-catalog-service.tsx";
+import clubProfileRoutes, { canManageClub, invalidateClubProfile, PLATFORM_ROLES, resolveSessionTenant } from "./club-profile.tsx";
+import selectionIndexRoutes from "./selection-index.tsx";
+import memberPortalRoutes from "./member-portal.tsx";
+import publicSignupRoutes from "./public-signup.tsx";
+import fulfillmentRoutes from "./fulfillment.tsx";
+import { httpCache, rowVersionETag, CACHE_CONTROL } from "./http-cache.tsx";
+import { TtlCache } from "./ttl-cache.tsx";
+import observabilityRoutes, { log, requestObserver } from "./observability.tsx";
+import { serviceClient } from "./service-client.tsx";
 
 const app = new Hono();
 
 // Default wine club ID for development (wine club client #1)
 const DEFAULT_WINE_CLUB_ID = '1';
 
-// Initialize Supabase client
-const supabase = createClient(
-  serverEnv.SUPABASE_URL,
-  serverEnv.SUPABASE_SERVICE_ROLE_KEY,
-);
+// Shared service-role client (service-client.tsx)
+const supabase = serviceClient();
 
-// Enable logger
-app.use('*', logger(console.log));
+// Request ids, sampled structured request logs and latency histograms (observability.tsx)
+app.use('*', requestObserver());
 
 // Enable CORS for all routes and methods
 app.use(
   "/*",
   cors({
     origin: "*",
-    allowHeaders: ["Content-Type", "Authorization"],
+    allowHeaders: ["Content-Type", "Authorization", "If-None-Match"],
     allowMethods: ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-    exposeHeaders: ["Content-Length"],
+    exposeHeaders: ["Content-Length", "ETag", "X-Request-Id"],
     maxAge: 600,
   }),
 );
 
+// Conditional GET (ETag / 304), Cache-Control and compression for read-heavy routes.
+// Registered before the routes so it wraps them; non-GET methods pass straight through.
+const cachedRoutes: Array<[string, string]> = [
+  ["/make-server-9d538b9c/wine-clubs", CACHE_CONTROL.privateRevalidate],
+  ["/make-server-9d538b9c/members/:wineClubId", CACHE_CONTROL.privateRevalidate],
+  ["/make-server-9d538b9c/plans/:wineClubId", CACHE_CONTROL.privateShort],
+  ["/make-server-9d538b9c/shipments/:wineClubId", CACHE_CONTROL.privateRevalidate],
+  ["/make-server-9d538b9c/shipping-schedule/:wineClubId", CACHE_CONTROL.privateShort],
+  ["/make-server-9d538b9c/global-preferences/:wineClubId", CACHE_CONTROL.privateShort],
+  ["/make-server-9d538b9c/square/live-inventory/:wineClubId", CACHE_CONTROL.privateShort],
+];
+for (const [path, cacheControl] of cachedRoutes) {
+  app.use(path, httpCache({ cacheControl }));
+}
+
 // Health check endpoint
 app.get("/make-server-9d538b9c/health", (c) => {
   return c.json({ status: "ok" });
@@ -50,9 +70,10 @@ app.get("/make-server-9d538b9c/wine-clubs", async (c) => {
       return c.json({ error: error.message }, 500);
     }
 
+    c.header('ETag', await rowVersionETag(wineClubs || []));
     return c.json({ wineClubs });
   } catch (error) {
-    console.error('Get wine clubs error:', error);
+    log.error('Get wine clubs error', error);
     return c.json({ error: error.message }, 500);
   }
 });
@@ -77,7 +98,7 @@ app.get("/make-server-9d538b9c/members/:wineClubId", async (c) => {
 
     return c.json({ members });
   } catch (error) {
-    console.error('Get members error:', error);
+    log.error('Get members error', error);
     return c.json({ error: error.message }, 500);
   }
 });
@@ -113,14 +134,14 @@ app.post("/make-server-9d538b9c/members", async (c) => {
           );
         }
       } catch (squareError) {
-        console.error('Failed to add member to Square group:', squareError);
+        log.error('Failed to add member to Square group', squareError);
         // Don't fail member creation if Square group assignment fails
       }
     }
 
     return c.json({ member });
   } catch (error) {
-    console.error('Create member error:', error);
+    log.error('Create member error', error);
     return c.json({ error: error.message }, 500);
   }
 });
@@ -188,14 +209,14 @@ app.put("/make-server-9d538b9c/members/:memberId", async (c) => {
           );
         }
       } catch (squareError) {
-        console.error('Failed to update Square groups for member:', squareError);
+        log.error('Failed to update Square groups for member', squareError);
         // Don't fail the member update if Square group update fails
       }
     }
 
     return c.json({ member });
   } catch (error) {
-    console.error('Update member error:', error);
+    log.error('Update member error', error);
     return c.json({ error: error.message }, 500);
   }
 });
@@ -215,9 +236,10 @@ app.get("/make-server-9d538b9c/plans/:wineClubId", async (c) => {
       return c.json({ error: error.message }, 500);
     }
 
+    c.header('ETag', await rowVersionETag(plans || []));
     return c.json({ plans });
   } catch (error) {
-    console.error('Get plans error:', error);
+    log.error('Get plans error', error);
     return c.json({ error: error.message }, 500);
   }
 });
@@ -226,9 +248,12 @@ app.post("/make-server-9d538b9c/plans", async (c) => {
   try {
     const planData = await c.req.json();
     
+    // Upsert on the (wine_club_id, name, bottle_count) key so retried or repeated
+    // creates update the existing plan instead of adding a duplicate. updated_at moves the
+    // GET /plans ETag (rowVersionETag) when an existing plan is overwritten.
     const { data: plan, error } = await supabase
       .from('subscription_plans')
-      .insert(planData)
+      .upsert({ ...planData, updated_at: new Date().toISOString() }, { onConflict: 'wine_club_id,name,bottle_count' })
       .select()
       .single();
 
@@ -236,9 +261,10 @@ app.post("/make-server-9d538b9c/plans", async (c) => {
       return c.json({ error: error.message }, 500);
     }
 
+    invalidateClubProfile(String(plan.wine_club_id));
     return c.json({ plan });
   } catch (error) {
-    console.error('Create plan error:', error);
+    log.error('Create plan error', error);
     return c.json({ error: error.message }, 500);
   }
 });
@@ -247,90 +273,64 @@ app.delete("/make-server-9d538b9c/plans/:planId", async (c) => {
   try {
     const planId = c.req.param('planId');
     
-    const { error } = await supabase
+    const { data: deleted, error } = await supabase
       .from('subscription_plans')
       .delete()
-      .eq('id', planId);
+      .eq('id', planId)
+      .select('wine_club_id');
 
     if (error) {
       return c.json({ error: error.message }, 500);
     }
 
+    for (const plan of deleted || []) invalidateClubProfile(String(plan.wine_club_id));
     return c.json({ success: true });
   } catch (error) {
-    console.error('Delete plan error:', error);
+    log.error('Delete plan error', error);
     return c.json({ error: error.message }, 500);
   }
 });
 
-// Cleanup duplicate plans for King Frosch
+// Removes duplicate plans (same club, name and bottle count) in a single set-based pass.
+// ?wine_club_id= is required and must be a club the caller manages; ?scope=all covers every
+// club and is for platform admins only. ?dry_run=1 only reports what would be removed.
 app.post("/make-server-9d538b9c/plans/cleanup-duplicates", async (c) => {
   try {
-    const wineClubId = c.req.query('wine_club_id') || DEFAULT_WINE_CLUB_ID;
-    
-    // Get all plans for this wine club
-    const { data: plans, error: fetchError } = await supabase
-      .from('subscription_plans')
-      .select('*')
-      .eq('wine_club_id', wineClubId)
-      .order('created_at', { ascending: true });
+    const tenant = await resolveSessionTenant(c.req.header('Authorization'));
+    if (!tenant) {
+      return c.json({ success: false, error: 'Not signed in' }, 401);
+    }
 
-    if (fetchError) {
-      return c.json({ error: fetchError.message }, 500);
+    const allClubs = c.req.query('scope') === 'all';
+    const wineClubId = allClubs ? null : c.req.query('wine_club_id');
+    if (allClubs ? !PLATFORM_ROLES.has(tenant.role) : !wineClubId || !canManageClub(tenant, wineClubId)) {
+      return c.json({ success: false, error: 'Not allowed' }, 403);
     }
 
-    // Group plans by name and bottle_count
-    const planGroups = {};
-    plans.forEach(plan => {
-      const key = `${plan.name}-${plan.bottle_count}`;
-      if (!planGroups[key]) {
-        planGroups[key] = [];
-      }
-      planGroups[key].push(plan);
-    });
+    const dryRun = c.req.query('dry_run') === '1' || c.req.query('dry_run') === 'true';
 
-    // Delete older duplicates, keep the newest one with description
-    const plansToDelete = [];
-    Object.values(planGroups).forEach((group: any[]) => {
-      if (group.length > 1) {
-        // Sort by created_at desc, keep the first (newest)
-        group.sort((a, b) => new Date(b.created_at).getTime() - new Date(a.created_at).getTime());
-        const keepPlan = group[0];
-        const deletePlans = group.slice(1);
-        
-        // If the newest plan has no description, try to find one with description
-        if (!keepPlan.description) {
-          const planWithDescription = group.find(p => p.description);
-          if (planWithDescription) {
-            plansToDelete.push(keepPlan.id);
-            // Keep the one with description
-            deletePlans.splice(deletePlans.indexOf(planWithDescription), 1);
-          }
-        }
-        
-        plansToDelete.push(...deletePlans.map(p => p.id));
-      }
+    const { data: duplicates, error } = await supabase.rpc('cleanup_duplicate_plans', {
+      p_wine_club_id: wineClubId,
+      p_dry_run: dryRun,
     });
 
-    // Delete the duplicate plans
-    if (plansToDelete.length > 0) {
-      const { error: deleteError } = await supabase
-        .from('subscription_plans')
-        .delete()
-        .in('id', plansToDelete);
+    if (error) {
+      return c.json({ error: error.message }, 500);
+    }
 
-      if (deleteError) {
-        return c.json({ error: deleteError.message }, 500);
-      }
+    if (!dryRun) {
+      for (const clubId of new Set(duplicates.map((row: any) => String(row.wine_club_id)))) invalidateClubProfile(clubId);
     }
 
     return c.json({ 
       success: true, 
-      deletedCount: plansToDelete.length,
-      deletedPlanIds: plansToDelete
+      dryRun,
+      deletedCount: dryRun ? 0 : duplicates.length,
+      deletedPlanIds: dryRun ? [] : duplicates.map((row: any) => row.plan_id),
+      duplicates
     });
   } catch (error) {
-    console.error('Cleanup duplicates error:', error);
+    log.error('Cleanup duplicates error', error);
     return c.json({ error: error.message }, 500);
   }
 });
@@ -358,7 +358,7 @@ app.get("/make-server-9d538b9c/shipments/:wineClubId", async (c) => {
 
     return c.json({ shipments });
   } catch (error) {
-    console.error('Get shipments error:', error);
+    log.error('Get shipments error', error);
     return c.json({ error: error.message }, 500);
   }
 });
@@ -395,44 +395,78 @@ app.post("/make-server-9d538b9c/shipments", async (c) => {
 
     return c.json({ shipment: newShipment, items: newItems });
   } catch (error) {
-    console.error('Create shipment error:', error);
+    log.error('Create shipment error', error);
     return c.json({ error: error.message }, 500);
   }
 });
 
 // Customer approval workflow
+// Shipment payloads are identical for every member of a shipment; cache them briefly so a
+// notification blast turns into one shipment query per isolate instead of one per click.
+const APPROVAL_SHIPMENT_TTL_MS = 60 * 1000;
+const approvalShipmentCache = new TtlCache<any>(APPROVAL_SHIPMENT_TTL_MS);
+
+async function loadApprovalShipment(shipmentId: string) {
+  const { data: shipment, error } = await supabase
+    .from('shipments')
+    .select(`
+      id, wine_club_id, name, ship_date, status,
+      shipment_items(id, subscription_plan_id, square_item_id, square_variation_id, quantity)
+    `)
+    .eq('id', shipmentId)
+    .single();
+
+  if (error) throw error;
+  return shipment;
+}
+
 app.get("/make-server-9d538b9c/approval/:token", async (c) => {
   try {
     const token = c.req.param('token');
     
-    const { data: selection, error } = await supabase
-      .from('member_selections')
-      .select(`
-        *,
-        member:members(*),
-        shipment:shipments(
-          *,
-          shipment_items(
-            *,
-            product:products(*),
-            subscription_plan:subscription_plans(*)
-          )
-        )
-      `)
+    // Indexed lookup on member_selection_approvals (see approval-token-fast-path.sql)
+    const { data: approval, error } = await supabase
+      .from('member_selection_approvals')
+      .select('*')
       .eq('approval_token', token)
-      .single();
+      .maybeSingle();
 
-    if (error) {
+    if (error || !approval) {
       return c.json({ error: "Invalid approval token" }, 404);
     }
 
-    if (selection.status === 'approved') {
+    if (approval.status === 'approved') {
       return c.json({ error: "Selection already approved" }, 400);
     }
 
+    const shipment = await approvalShipmentCache.getOrLoad(approval.shipment_id, () =>
+      loadApprovalShipment(approval.shipment_id)
+    );
+
+    const selection = {
+      id: approval.id,
+      approval_token: approval.approval_token,
+      status: approval.status,
+      shipment_id: approval.shipment_id,
+      member_id: approval.member_id,
+      delivery_date: approval.delivery_date,
+      approved_at: approval.approved_at,
+      wine_preferences: approval.wine_preferences,
+      member: {
+        id: approval.member_id,
+        wine_club_id: approval.wine_club_id,
+        name: approval.member_name,
+        email: approval.member_email,
+        subscription_plan_id: approval.subscription_plan_id,
+        plan_name: approval.plan_name,
+        plan_bottle_count: approval.plan_bottle_count,
+      },
+      shipment,
+    };
+
     return c.json({ selection });
   } catch (error) {
-    console.error('Get approval error:', error);
+    log.error('Get approval error', error);
     return c.json({ error: error.message }, 500);
   }
 });
@@ -466,7 +500,7 @@ app.post("/make-server-9d538b9c/approval/:token", async (c) => {
 
     return c.json({ selection });
   } catch (error) {
-    console.error('Update approval error:', error);
+    log.error('Update approval error', error);
     return c.json({ error: error.message }, 500);
   }
 });
@@ -478,7 +512,7 @@ app.get("/make-server-9d538b9c/customer-preferences/:wine_club_id", async (c) =>
     const preferences = await kv.getByPrefix(`preferences_${wineClubId}_`);
     return c.json({ preferences: preferences || [] });
   } catch (error) {
-    console.error('Error fetching customer preferences:', error);
+    log.error('Error fetching customer preferences', error);
     return c.json({ error: error.message }, 500);
   }
 });
@@ -504,7 +538,7 @@ app.post("/make-server-9d538b9c/customer-preferences", async (c) => {
     await kv.set(preferenceId, preference);
     return c.json({ preference });
   } catch (error) {
-    console.error('Error creating customer preference:', error);
+    log.error('Error creating customer preference', error);
     return c.json({ error: error.message }, 500);
   }
 });
@@ -514,9 +548,12 @@ app.get("/make-server-9d538b9c/shipping-schedule/:wineClubId", async (c) => {
   try {
     const wineClubId = c.req.param('wineClubId');
     const schedule = await kv.get(`shipping_schedule_${wineClubId}`);
+    if (schedule) {
+      c.header('ETag', await rowVersionETag([schedule]));
+    }
     return c.json({ schedule: schedule || null });
   } catch (error) {
-    console.error('Error fetching shipping schedule:', error);
+    log.error('Error fetching shipping schedule', error);
     return c.json({ error: error.message }, 500);
   }
 });
@@ -542,7 +579,7 @@ app.post("/make-server-9d538b9c/shipping-schedule", async (c) => {
     await kv.set(scheduleId, schedule);
     return c.json({ schedule });
   } catch (error) {
-    console.error('Error saving shipping schedule:', error);
+    log.error('Error saving shipping schedule', error);
     return c.json({ error: error.message }, 500);
   }
 });
@@ -554,7 +591,7 @@ app.get("/make-server-9d538b9c/club-shipments/:wine_club_id", async (c) => {
     const shipments = await kv.getByPrefix(`shipments_${wineClubId}_`);
     return c.json({ shipments: shipments || [] });
   } catch (error) {
-    console.error('Error fetching club shipments:', error);
+    log.error('Error fetching club shipments', error);
     return c.json({ error: error.message }, 500);
   }
 });
@@ -581,7 +618,7 @@ app.post("/make-server-9d538b9c/club-shipments", async (c) => {
     await kv.set(shipmentId, shipment);
     return c.json({ shipment });
   } catch (error) {
-    console.error('Error creating club shipment:', error);
+    log.error('Error creating club shipment', error);
     return c.json({ error: error.message }, 500);
   }
 });
@@ -589,13 +626,13 @@ app.post("/make-server-9d538b9c/club-shipments", async (c) => {
 // Advanced Square API Routes (for future payment integration)
 import * as squareHelpers from "./square-helpers.tsx";
 
-// Email Service Integration
-import { 
-  sendMagicLink, 
-  sendWelcomeEmail, 
-  sendShipmentNotification, 
-  sendVerificationEmail 
-} from "./email-service.tsx";
+// Email and the batch jobs (notifications, billing, tracking import) only load on first use,
+// so the rest of the API does not pay for them at cold start
+const emailService = lazyModule("email-service", () => import("./email-service.tsx"));
+const shipmentNotifications = lazyModule("shipment-notifications", () => import("./shipment-notifications.tsx"));
+const billingRun = lazyModule("billing-run", () => import("./billing-run.tsx"));
+const trackingImport = lazyModule("tracking-import", () => import("./tracking-import.tsx"));
+const csv = lazyModule("csv", () => import("./csv.tsx"));
 
 // List all customers (for importing to wine club)
 app.get("/make-server-9d538b9c/square/customers", async (c) => {
@@ -604,7 +641,7 @@ app.get("/make-server-9d538b9c/square/customers", async (c) => {
     const result = await squareHelpers.listCustomers(wineClubId);
     return c.json(result);
   } catch (error) {
-    console.error('Error listing customers:', error);
+    log.error('Error listing customers', error);
     return c.json({ error: error.message }, 500);
   }
 });
@@ -626,27 +663,9 @@ app.post("/make-server-9d538b9c/square/sync-customers", async (c) => {
     // For each Square customer, create or update member
     for (const customer of squareCustomers) {
       if (customer.email_address?.email_address) {
-        // Better name parsing from Square customer data
-        let fullName = 'Unknown';
-        if (customer.given_name && customer.family_name) {
-          fullName = `${customer.given_name} ${customer.family_name}`;
-        } else if (customer.given_name) {
-          fullName = customer.given_name;
-        } else if (customer.family_name) {
-          fullName = customer.family_name;
-        } else if (customer.nickname) {
-          fullName = customer.nickname;
-        } else if (customer.company_name) {
-          fullName = customer.company_name;
-        }
-
         const memberData = {
           wine_club_id,
-          email: customer.email_address.email_address,
-          name: fullName,
-          phone: customer.phone_number?.phone_number || null,
-          square_customer_id: customer.id,
-          has_payment_method: customer.cards && customer.cards.length > 0,
+          ...squareHelpers.squareCustomerToMember(customer),
           status: 'active'
         };
         
@@ -691,7 +710,7 @@ app.post("/make-server-9d538b9c/square/sync-customers", async (c) => {
       members: syncedMembers 
     });
   } catch (error) {
-    console.error('Error syncing customers:', error);
+    log.error('Error syncing customers', error);
     return c.json({ error: error.message }, 500);
   }
 });
@@ -702,7 +721,7 @@ app.get("/make-server-9d538b9c/square/segments", async (c) => {
     const result = await squareHelpers.listCustomerSegments();
     return c.json(result);
   } catch (error) {
-    console.error('Error listing segments:', error);
+    log.error('Error listing segments', error);
     return c.json({ error: error.message }, 500);
   }
 });
@@ -724,7 +743,7 @@ app.post("/make-server-9d538b9c/square/segments", async (c) => {
       message: `Customer group "${segmentName}" created successfully`
     });
   } catch (error) {
-    console.error('Error creating segment:', error);
+    log.error('Error creating segment', error);
     return c.json({ error: error.message }, 500);
   }
 });
@@ -747,7 +766,7 @@ app.post("/make-server-9d538b9c/square/segments/:segmentId/customers", async (c)
       message: "Customer added to group successfully"
     });
   } catch (error) {
-    console.error('Error adding customer to segment:', error);
+    log.error('Error adding customer to segment', error);
     return c.json({ error: error.message }, 500);
   }
 });
@@ -770,7 +789,7 @@ app.delete("/make-server-9d538b9c/square/segments/:segmentId/customers/:customer
       message: "Customer removed from group successfully"
     });
   } catch (error) {
-    console.error('Error removing customer from segment:', error);
+    log.error('Error removing customer from segment', error);
     return c.json({ error: error.message }, 500);
   }
 });
@@ -792,7 +811,7 @@ app.get("/make-server-9d538b9c/square/segments/:segmentId/customers", async (c)
       count: result.customers.length
     });
   } catch (error) {
-    console.error('Error getting customers in segment:', error);
+    log.error('Error getting customers in segment', error);
     return c.json({ error: error.message }, 500);
   }
 });
@@ -804,7 +823,7 @@ app.get("/make-server-9d538b9c/square/segments/:segmentId", async (c) => {
     const result = await squareHelpers.getCustomerSegment(segmentId);
     return c.json(result);
   } catch (error) {
-    console.error('Error getting segment:', error);
+    log.error('Error getting segment', error);
     return c.json({ error: error.message }, 500);
   }
 });
@@ -816,7 +835,7 @@ app.post("/make-server-9d538b9c/square/create-shipment", async (c) => {
     const result = await squareHelpers.createWineClubShipment(shipmentData);
     return c.json(result);
   } catch (error) {
-    console.error('Error creating shipment:', error);
+    log.error('Error creating shipment', error);
     return c.json({ error: error.message }, 500);
   }
 });
@@ -829,7 +848,7 @@ app.post("/make-server-9d538b9c/square/save-card", async (c) => {
     const result = await squareHelpers.createCard(customerId, sourceId, idempotencyKey);
     return c.json(result);
   } catch (error) {
-    console.error('Error saving card:', error);
+    log.error('Error saving card', error);
     return c.json({ error: error.message }, 500);
   }
 });
@@ -844,7 +863,7 @@ app.post("/make-server-9d538b9c/square/create-order", async (c) => {
     });
     return c.json(result);
   } catch (error) {
-    console.error('Error creating order:', error);
+    log.error('Error creating order', error);
     return c.json({ error: error.message }, 500);
   }
 });
@@ -859,7 +878,97 @@ app.post("/make-server-9d538b9c/square/create-payment", async (c) => {
     });
     return c.json(result);
   } catch (error) {
-    console.error('Error creating payment:', error);
+    log.error('Error creating payment', error);
+    return c.json({ error: error.message }, 500);
+  }
+});
+
+// Billing run - orders and payments for every approved selection of a shipment.
+// Re-running resumes: paid selections are skipped and idempotency keys prevent double charges.
+// Charges cards, so only staff of the shipment's club (or platform admins) may start it.
+app.post("/make-server-9d538b9c/shipments/:shipmentId/billing-run", async (c) => {
+  try {
+    const shipmentId = c.req.param('shipmentId');
+    const tenant = await resolveSessionTenant(c.req.header('Authorization'));
+    if (!tenant) {
+      return c.json({ success: false, error: 'Not signed in' }, 401);
+    }
+
+    const { data: shipment, error: shipmentError } = await supabase
+      .from('shipments')
+      .select('wine_club_id')
+      .eq('id', shipmentId)
+      .maybeSingle();
+    if (shipmentError) throw shipmentError;
+    if (!shipment) {
+      return c.json({ success: false, error: 'Shipment not found' }, 404);
+    }
+    if (!canManageClub(tenant, shipment.wine_club_id)) {
+      return c.json({ success: false, error: 'Not allowed' }, 403);
+    }
+
+    const { concurrency, max_selections } = await c.req.json().catch(() => ({}));
+
+    const { runBilling } = await billingRun();
+    const summary = await runBilling(supabase, shipmentId, {
+      concurrency,
+      maxSelections: max_selections,
+    });
+
+    return c.json({ success: summary.status !== 'failed', summary });
+  } catch (error) {
+    log.error('Error running billing', error);
+    const status = error.message?.includes('already in progress') ? 409 : 500;
+    return c.json({ error: error.message }, status);
+  }
+});
+
+app.get("/make-server-9d538b9c/shipments/:shipmentId/billing-run", async (c) => {
+  try {
+    const shipmentId = c.req.param('shipmentId');
+    const { getBillingRun } = await billingRun();
+    const run = await getBillingRun(shipmentId);
+    return c.json({ run });
+  } catch (error) {
+    log.error('Error fetching billing run', error);
+    return c.json({ error: error.message }, 500);
+  }
+});
+
+// Tracking number import - raw CSV body, parsed as it streams in.
+// Returns a per-row report; rows that fail don't stop the rest of the file.
+app.post("/make-server-9d538b9c/fulfillment/tracking-upload", async (c) => {
+  try {
+    const wineClubId = c.req.query('wine_club_id') || DEFAULT_WINE_CLUB_ID;
+    const shipmentId = c.req.query('shipment_id') || undefined;
+
+    if (!c.req.raw.body) {
+      return c.json({ error: "CSV body is required" }, 400);
+    }
+
+    const [{ importTrackingRows }, { parseCsvStream }] = await Promise.all([trackingImport(), csv()]);
+    const report = await importTrackingRows(supabase, wineClubId, parseCsvStream(c.req.raw.body), { shipmentId });
+    return c.json({ success: report.summary.failed === 0, ...report });
+  } catch (error) {
+    log.error('Error importing tracking numbers', error);
+    return c.json({ error: error.message }, 500);
+  }
+});
+
+// Order number -> tracking number map, for callers that already parsed their data
+app.post("/make-server-9d538b9c/square/update-tracking", async (c) => {
+  try {
+    const { trackingUpdates, wine_club_id } = await c.req.json();
+    const rows = [
+      ["Order Number", "Tracking Number"],
+      ...Object.entries(trackingUpdates || {}).map(([orderNumber, trackingNumber]) => [orderNumber, String(trackingNumber)]),
+    ];
+
+    const { importTrackingRows } = await trackingImport();
+    const report = await importTrackingRows(supabase, wine_club_id || DEFAULT_WINE_CLUB_ID, rows);
+    return c.json({ success: report.summary.failed === 0, ...report });
+  } catch (error) {
+    log.error('Error updating Square tracking', error);
     return c.json({ error: error.message }, 500);
   }
 });
@@ -874,7 +983,7 @@ app.get("/make-server-9d538b9c/square-config/:wineClubId", async (c) => {
     
     return c.json({ config });
   } catch (error) {
-    console.error('Error fetching Square config:', error);
+    log.error('Error fetching Square config', error);
     return c.json({ error: error.message }, 500);
   }
 });
@@ -906,10 +1015,14 @@ app.post("/make-server-9d538b9c/square-config", async (c) => {
       .eq('id', wine_club_id);
     
     if (updateError) {
-      console.error('Error updating wine_clubs table:', updateError);
+      log.error('Error updating wine_clubs table', updateError);
       // Don't fail the request, just log the error
     }
     
+    // New credentials may point at a different Square account
+    invalidateClubCatalog(String(wine_club_id));
+    invalidateClubProfile(String(wine_club_id));
+    
     return c.json({ 
       success: true, 
       message: "Square configuration saved successfully",
@@ -922,7 +1035,7 @@ app.post("/make-server-9d538b9c/square-config", async (c) => {
       }
     });
   } catch (error) {
-    console.error('Error saving Square config:', error);
+    log.error('Error saving Square config', error);
     return c.json({ error: error.message }, 500);
   }
 });
@@ -957,7 +1070,7 @@ app.post("/make-server-9d538b9c/global-preferences", async (c) => {
       message: "Global preference created successfully" 
     });
   } catch (error) {
-    console.error('Error creating global preference:', error);
+    log.error('Error creating global preference', error);
     return c.json({ error: error.message }, 500);
   }
 });
@@ -982,7 +1095,7 @@ app.get("/make-server-9d538b9c/global-preferences/:wineClubId", async (c) => {
       preferences: formattedPreferences 
     });
   } catch (error) {
-    console.error('Error fetching global preferences:', error);
+    log.error('Error fetching global preferences', error);
     return c.json({ error: error.message }, 500);
   }
 });
@@ -1015,7 +1128,7 @@ app.put("/make-server-9d538b9c/global-preferences/:preferenceId", async (c) => {
       message: "Global preference updated successfully" 
     });
   } catch (error) {
-    console.error('Error updating global preference:', error);
+    log.error('Error updating global preference', error);
     return c.json({ error: error.message }, 500);
   }
 });
@@ -1032,7 +1145,7 @@ app.delete("/make-server-9d538b9c/global-preferences/:preferenceId", async (c) =
       message: "Global preference deleted successfully" 
     });
   } catch (error) {
-    console.error('Error deleting global preference:', error);
+    log.error('Error deleting global preference', error);
     return c.json({ error: error.message }, 500);
   }
 });
@@ -1054,6 +1167,7 @@ app.post("/make-server-9d538b9c/email/magic-link", async (c) => {
     const wineClubName = config.wine_club_name || "Wine Club";
     const redirectUrl = `${c.req.url.split('/api')[0]}/auth/callback`;
     
+    const { sendMagicLink } = await emailService();
     await sendMagicLink(email, redirectUrl, wineClubName);
     
     return c.json({ 
@@ -1061,7 +1175,7 @@ app.post("/make-server-9d538b9c/email/magic-link", async (c) => {
       message: "Magic link sent successfully" 
     });
   } catch (error) {
-    console.error('Error sending magic link:', error);
+    log.error('Error sending magic link', error);
     return c.json({ error: error.message }, 500);
   }
 });
@@ -1081,6 +1195,7 @@ app.post("/make-server-9d538b9c/email/welcome", async (c) => {
     
     const wineClubName = config.wine_club_name || "Wine Club";
     
+    const { sendWelcomeEmail } = await emailService();
     await sendWelcomeEmail(email, name, wineClubName, plan_name);
     
     return c.json({ 
@@ -1088,7 +1203,7 @@ app.post("/make-server-9d538b9c/email/welcome", async (c) => {
       message: "Welcome email sent successfully" 
     });
   } catch (error) {
-    console.error('Error sending welcome email:', error);
+    log.error('Error sending welcome email', error);
     return c.json({ error: error.message }, 500);
   }
 });
@@ -1108,6 +1223,7 @@ app.post("/make-server-9d538b9c/email/shipment-notification", async (c) => {
     
     const wineClubName = config.wine_club_name || "Wine Club";
     
+    const { sendShipmentNotification } = await emailService();
     await sendShipmentNotification(email, name, wineClubName, approval_url, deadline);
     
     return c.json({ 
@@ -1115,7 +1231,53 @@ app.post("/make-server-9d538b9c/email/shipment-notification", async (c) => {
       message: "Shipment notification sent successfully" 
     });
   } catch (error) {
-    console.error('Error sending shipment notification:', error);
+    log.error('Error sending shipment notification', error);
+    return c.json({ error: error.message }, 500);
+  }
+});
+
+// Bulk shipment notifications - notifies every pending member of a shipment server-side.
+// Safe to call again: recipients already marked 'sent' are skipped, 'failed' ones are retried.
+// Emails every pending member of the shipment; only admins of the shipment's club may trigger it.
+app.post("/make-server-9d538b9c/shipments/:shipmentId/notify", async (c) => {
+  try {
+    const shipmentId = c.req.param('shipmentId');
+    const tenant = await resolveSessionTenant(c.req.header('Authorization'));
+    if (!tenant) return c.json({ success: false, error: 'Not signed in' }, 401);
+    const { data: shipment, error: shipmentError } = await supabase.from('shipments').select('wine_club_id').eq('id', shipmentId).maybeSingle();
+    if (shipmentError) throw shipmentError;
+    if (!shipment) return c.json({ success: false, error: 'Shipment not found' }, 404);
+    if (!canManageClub(tenant, shipment.wine_club_id)) return c.json({ success: false, error: 'Not allowed' }, 403);
+    const { approval_base_url, deadline, max_recipients, concurrency, dry_run } = await c.req.json();
+
+    if (!approval_base_url || !deadline) {
+      return c.json({ error: "approval_base_url and deadline are required" }, 400);
+    }
+
+    const { dispatchShipmentNotifications } = await shipmentNotifications();
+    const summary = await dispatchShipmentNotifications(supabase, shipmentId, {
+      approvalBaseUrl: approval_base_url,
+      deadline,
+      maxRecipients: max_recipients,
+      concurrency,
+      dryRun: !!dry_run,
+    });
+
+    return c.json({ success: summary.status !== 'failed', summary });
+  } catch (error) {
+    log.error('Error dispatching shipment notifications', error);
+    return c.json({ error: error.message }, 500);
+  }
+});
+
+app.get("/make-server-9d538b9c/shipments/:shipmentId/notify", async (c) => {
+  try {
+    const shipmentId = c.req.param('shipmentId');
+    const { getNotificationRun } = await shipmentNotifications();
+    const run = await getNotificationRun(shipmentId);
+    return c.json({ run });
+  } catch (error) {
+    log.error('Error fetching notification run', error);
     return c.json({ error: error.message }, 500);
   }
 });
@@ -1135,6 +1297,7 @@ app.post("/make-server-9d538b9c/email/verify", async (c) => {
     
     const wineClubName = config.wine_club_name || "Wine Club";
     
+    const { sendVerificationEmail } = await emailService();
     await sendVerificationEmail(email, verification_url, wineClubName);
     
     return c.json({ 
@@ -1142,13 +1305,20 @@ app.post("/make-server-9d538b9c/email/verify", async (c) => {
       message: "Verification email sent successfully" 
     });
   } catch (error) {
-    console.error('Error sending verification email:', error);
+    log.error('Error sending verification email', error);
     return c.json({ error: error.message }, 500);
   }
 });
 
 // Mount Square routes
 app.route("/", squareLiveInventory);
-app.route("/", envStatusRoutes);
-
+app.get("/make-server-9d538b9c/env-status", lazyRoutes("env-status", () => import("./env-status.tsx")));
+app.route("/", publicSignupRoutes);
+app.route("/", fulfillmentRoutes);
+app.route("/", clubProfileRoutes);
+app.route("/", selectionIndexRoutes);
+app.route("/", memberPortalRoutes);
+app.route("/", observabilityRoutes);
+
+markReady();
 Deno.serve(app.fetch);
\ No newline at end of file
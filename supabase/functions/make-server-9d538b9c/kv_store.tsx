@@ -10,12 +10,10 @@ CREATE TABLE kv_store_9d538b9c (
 // View at https://supabase.com/dashboard/project/aammkgdhfmkukpqkdduj/database/tables
 
 // This file provides a simple key-value interface for storing Figma Make data. It should be adequate for most small-scale use cases.
-import { createClient } from "jsr:@supabase/supabase-js@2.49.8";
+import { serviceClient } from "./service-client.tsx";
 
-const client = () => createClient(
-  Deno.env.get("SUPABASE_URL"),
-  Deno.env.get("SUPABASE_SERVICE_ROLE_KEY"),
-);
+// Every call shares the isolate's client rather than building a new one
+const client = serviceClient;
 
 // Set stores a key-value pair in the database.
 export const set = async (key: string, value: any): Promise<void> => {
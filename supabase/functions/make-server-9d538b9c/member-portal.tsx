@@ -0,0 +1,239 @@
+import { Hono, type Context } from "npm:hono";
+import { cachedJson, CACHE_CONTROL } from "./http-cache.tsx";
+import { TtlCache } from "./ttl-cache.tsx";
+import { getClubProfile, resolveSessionTenant } from "./club-profile.tsx";
+import { getPlanSelectionOptions } from "./selection-index.tsx";
+import { log } from "./observability.tsx";
+import { serviceClient } from "./service-client.tsx";
+
+// Member portal API (CustomerWineSelection).
+// Every route is scoped by the caller's Supabase access token: the member is the members row
+// with the session's email (idx on wine_club_id + email), never an id from the request, so a
+// page load reads that member's rows only - a few kilobytes however large the club is.
+//   GET  /portal/me         member and club branding
+//   GET  /portal/plan       the member's subscription plan
+//   GET  /portal/shipment   latest member_selection with its shipment and the plan's items
+//   GET  /portal/wines      eligible wines from plan_selection_index (selection-index.tsx)
+//   POST /portal/selection  save the member's picks; the billing run charges the card on file
+// Members of several clubs pass ?wine_club_id= to pick one.
+
+const memberPortal = new Hono();
+
+const supabase = serviceClient();
+
+const MEMBER_TTL_MS = 30 * 1000;
+const DATE_PATTERN = /^\d{4}-\d{2}-\d{2}$/;
+
+interface PortalMember {
+  id: string;
+  wine_club_id: string;
+  subscription_plan_id: string | null;
+  name: string;
+  email: string;
+  phone: string | null;
+  status: string;
+  has_payment_method: boolean;
+}
+
+const members = new TtlCache<PortalMember | null>(MEMBER_TTL_MS);
+
+async function loadMember(email: string, wineClubId?: string) {
+  let query = supabase
+    .from('members')
+    .select('id, wine_club_id, subscription_plan_id, name, email, phone, status, has_payment_method')
+    .eq('email', email);
+  if (wineClubId) query = query.eq('wine_club_id', wineClubId);
+
+  const { data, error } = await query.order('updated_at', { ascending: false }).limit(1).maybeSingle();
+  if (error) throw error;
+  return data as PortalMember | null;
+}
+
+// The signed-in member, or the 401/404 response to return instead
+async function requireMember(c: Context): Promise<PortalMember | Response> {
+  const tenant = await resolveSessionTenant(c.req.header('Authorization'));
+  if (!tenant) {
+    return c.json({ success: false, error: 'Not signed in' }, 401);
+  }
+
+  const wineClubId = c.req.query('wine_club_id') || undefined;
+  const member = await members.getOrLoad(`${tenant.email}|${wineClubId || ''}`, () => loadMember(tenant.email, wineClubId));
+  if (!member) {
+    return c.json({ success: false, error: 'No membership found for this account' }, 404);
+  }
+  return member;
+}
+
+// Plans come from the cached club profile rather than another query
+async function loadPlan(member: PortalMember) {
+  if (!member.subscription_plan_id) return null;
+  const profile = await getClubProfile(member.wine_club_id);
+  const plan = profile?.plans.find((p: any) => p.id === member.subscription_plan_id);
+  if (!plan) return null;
+  const { id, name, bottle_count, frequency, discount_percentage, description, icon_url } = plan;
+  return { id, name, bottle_count, frequency, discount_percentage, description, icon_url };
+}
+
+memberPortal.get("/make-server-9d538b9c/portal/me", async (c) => {
+  try {
+    const member = await requireMember(c);
+    if (member instanceof Response) return member;
+
+    const profile = await getClubProfile(member.wine_club_id);
+    const club = profile?.club;
+    return cachedJson(c, {
+      success: true,
+      member,
+      club: club ? { id: club.id, name: club.name, branding_logo_url: club.branding_logo_url || null } : null,
+    }, CACHE_CONTROL.privateRevalidate);
+  } catch (error) {
+    log.error('Portal me error', error);
+    return c.json({ success: false, error: error.message }, 500);
+  }
+});
+
+memberPortal.get("/make-server-9d538b9c/portal/plan", async (c) => {
+  try {
+    const member = await requireMember(c);
+    if (member instanceof Response) return member;
+
+    return cachedJson(c, { success: true, plan: await loadPlan(member) }, CACHE_CONTROL.privateShort);
+  } catch (error) {
+    log.error('Portal plan error', error);
+    return c.json({ success: false, error: error.message }, 500);
+  }
+});
+
+memberPortal.get("/make-server-9d538b9c/portal/shipment", async (c) => {
+  try {
+    const member = await requireMember(c);
+    if (member instanceof Response) return member;
+
+    const { data: selection, error } = await supabase
+      .from('member_selections')
+      .select('id, status, delivery_date, approved_at, billing_status, wine_preferences, shipment:shipments(id, name, ship_date, status)')
+      .eq('member_id', member.id)
+      .order('created_at', { ascending: false })
+      .limit(1)
+      .maybeSingle();
+    if (error) throw error;
+
+    let items: any[] = [];
+    if (selection && member.subscription_plan_id) {
+      const { data, error: itemsError } = await supabase
+        .from('shipment_items')
+        .select('square_item_id, square_variation_id, quantity')
+        .eq('shipment_id', (selection.shipment as any).id)
+        .eq('subscription_plan_id', member.subscription_plan_id);
+      if (itemsError) throw itemsError;
+      items = data || [];
+    }
+
+    return cachedJson(c, {
+      success: true,
+      shipment: selection?.shipment || null,
+      selection: selection ? {
+        id: selection.id,
+        status: selection.status,
+        delivery_date: selection.delivery_date,
+        approved_at: selection.approved_at,
+        // Picks can change until the billing run has started on this selection
+        editable: !selection.billing_status,
+        variation_ids: selection.wine_preferences?.variation_ids || [],
+      } : null,
+      items,
+    }, CACHE_CONTROL.privateRevalidate);
+  } catch (error) {
+    log.error('Portal shipment error', error);
+    return c.json({ success: false, error: error.message }, 500);
+  }
+});
+
+memberPortal.get("/make-server-9d538b9c/portal/wines", async (c) => {
+  try {
+    const member = await requireMember(c);
+    if (member instanceof Response) return member;
+    if (!member.subscription_plan_id) {
+      return cachedJson(c, { success: true, options: [] }, CACHE_CONTROL.privateRevalidate);
+    }
+
+    const { options, catalogError } = await getPlanSelectionOptions(member.wine_club_id, member.subscription_plan_id);
+    return cachedJson(c, {
+      success: true,
+      options,
+      ...(catalogError ? { catalog_error: catalogError } : {}),
+    }, CACHE_CONTROL.privateRevalidate);
+  } catch (error) {
+    log.error('Portal wines error', error);
+    return c.json({ success: false, error: error.message }, 500);
+  }
+});
+
+// Body: { selection_id, variation_ids (one entry per bottle), delivery_date? (YYYY-MM-DD) }
+memberPortal.post("/make-server-9d538b9c/portal/selection", async (c) => {
+  try {
+    const member = await requireMember(c);
+    if (member instanceof Response) return member;
+
+    const body = await c.req.json().catch(() => ({}));
+    const variationIds: string[] = Array.isArray(body.variation_ids) ? body.variation_ids.map(String) : [];
+    if (!body.selection_id || variationIds.length === 0) {
+      return c.json({ success: false, error: 'selection_id and variation_ids are required' }, 400);
+    }
+    if (body.delivery_date && !DATE_PATTERN.test(body.delivery_date)) {
+      return c.json({ success: false, error: 'delivery_date must be YYYY-MM-DD' }, 400);
+    }
+
+    const plan = await loadPlan(member);
+    if (!plan) {
+      return c.json({ success: false, error: 'No subscription plan on this membership' }, 400);
+    }
+    if (variationIds.length !== plan.bottle_count) {
+      return c.json({ success: false, error: `Choose exactly ${plan.bottle_count} bottles` }, 400);
+    }
+
+    const { variationIds: eligible } = await getPlanSelectionOptions(member.wine_club_id, plan.id);
+    const notAllowed = variationIds.filter((id) => !eligible.has(id));
+    if (notAllowed.length > 0) {
+      return c.json({ success: false, error: 'Some wines are no longer available for your plan', variation_ids: notAllowed }, 409);
+    }
+
+    const { data: current, error: currentError } = await supabase
+      .from('member_selections')
+      .select('id, wine_preferences')
+      .eq('id', body.selection_id)
+      .eq('member_id', member.id)
+      .maybeSingle();
+    if (currentError) throw currentError;
+    if (!current) {
+      return c.json({ success: false, error: 'Selection not found' }, 404);
+    }
+
+    const now = new Date().toISOString();
+    const { data: selection, error } = await supabase
+      .from('member_selections')
+      .update({
+        status: 'approved',
+        approved_at: now,
+        ...(body.delivery_date ? { delivery_date: body.delivery_date } : {}),
+        wine_preferences: { ...(current.wine_preferences || {}), variation_ids: variationIds, submitted_at: now },
+        updated_at: now,
+      })
+      .eq('id', current.id)
+      .eq('member_id', member.id)
+      .is('billing_status', null)
+      .select('id, status, delivery_date, approved_at')
+      .maybeSingle();
+    if (error) throw error;
+    if (!selection) {
+      return c.json({ success: false, error: 'This shipment is already being billed' }, 409);
+    }
+
+    return c.json({ success: true, selection: { ...selection, variation_ids: variationIds } });
+  } catch (error) {
+    log.error('Portal selection error', error);
+    return c.json({ success: false, error: error.message }, 500);
+  }
+});
+
+export default memberPortal;
@@ -0,0 +1,282 @@
+import { Hono, type MiddlewareHandler } from "npm:hono";
+import { AsyncLocalStorage } from "node:async_hooks";
+import { serverEnv } from "./env.tsx";
+import { noteRequest, startupReport } from "./startup.tsx";
+
+// Structured logging and latency metrics for the make-server-9d538b9c function.
+// requestObserver() gives every request an id (X-Request-Id), times it into per-route and
+// per-tenant histograms and writes one JSON line per request: always for 5xx and slow
+// requests, otherwise for a LOG_SAMPLE_RATE sample. Outbound calls made through timedFetch
+// (the Supabase clients, Square, Resend) are timed per upstream and attributed to the request
+// that made them. An isolate's first request is marked X-Cold-Start and always logged.
+// GET /internal/metrics returns this isolate's histograms and startup timings; it takes the
+// service role key, like the pg_cron callers.
+
+const LEVELS = { debug: 10, info: 20, warn: 30, error: 40 } as const;
+type Level = keyof typeof LEVELS;
+
+const MIN_LEVEL = LEVELS[serverEnv.LOG_LEVEL as Level] ?? LEVELS.info;
+const SAMPLE_RATE = Math.min(1, Math.max(0, Number(serverEnv.LOG_SAMPLE_RATE)));
+const SLOW_REQUEST_MS = Number(serverEnv.SLOW_REQUEST_MS) || 1000;
+
+// Upper bounds in ms; the last bucket counts everything slower
+const BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000];
+// Tenants beyond this share one "(other)" series so a scan of ids cannot grow memory
+const MAX_TENANT_SERIES = 500;
+
+interface RequestContext {
+  id: string;
+  tenant: string | null;
+  upstream: Record<string, { calls: number; ms: number }>;
+}
+
+const requestContext = new AsyncLocalStorage<RequestContext>();
+
+// ---------- Logging ----------
+
+type Fields = Record<string, unknown>;
+
+function write(level: Level, message: string, fields?: Fields) {
+  if (LEVELS[level] < MIN_LEVEL) return;
+  const request = requestContext.getStore();
+  const line = JSON.stringify({
+    level,
+    msg: message,
+    ...(request ? { request_id: request.id } : {}),
+    ...fields,
+  });
+  if (level === "error") console.error(line);
+  else if (level === "warn") console.warn(line);
+  else console.log(line);
+}
+
+// The parts of an error worth keeping - never the whole object (PostgREST errors, Responses, ...)
+export function errorFields(error: unknown): Fields {
+  if (error instanceof Error || (error && typeof error === "object" && "message" in error)) {
+    const { message, code, status, details } = error as any;
+    return {
+      error: String(message),
+      ...(code ? { code } : {}),
+      ...(status ? { status } : {}),
+      ...(details ? { details: String(details).slice(0, 500) } : {}),
+      ...(MIN_LEVEL <= LEVELS.debug && error instanceof Error ? { stack: error.stack } : {}),
+    };
+  }
+  return { error: String(error) };
+}
+
+export const log = {
+  debug: (message: string, fields?: Fields) => write("debug", message, fields),
+  info: (message: string, fields?: Fields) => write("info", message, fields),
+  warn: (message: string, fields?: Fields) => write("warn", message, fields),
+  error: (message: string, error?: unknown, fields?: Fields) =>
+    write("error", message, error === undefined ? fields : { ...errorFields(error), ...fields }),
+};
+
+// ---------- Histograms ----------
+
+class Histogram {
+  private buckets = new Array<number>(BUCKETS_MS.length + 1).fill(0);
+  count = 0;
+  errors = 0;
+  private sumMs = 0;
+  private maxMs = 0;
+
+  observe(ms: number, failed = false) {
+    let index = BUCKETS_MS.findIndex((bound) => ms <= bound);
+    if (index === -1) index = BUCKETS_MS.length;
+    this.buckets[index]++;
+    this.count++;
+    if (failed) this.errors++;
+    this.sumMs += ms;
+    if (ms > this.maxMs) this.maxMs = ms;
+  }
+
+  // Upper bound of the bucket holding the q-th observation
+  private quantile(q: number) {
+    const rank = Math.ceil(q * this.count);
+    let seen = 0;
+    for (let i = 0; i < this.buckets.length; i++) {
+      seen += this.buckets[i];
+      if (seen >= rank) return i < BUCKETS_MS.length ? Math.min(BUCKETS_MS[i], this.maxMs) : this.maxMs;
+    }
+    return this.maxMs;
+  }
+
+  toJSON() {
+    return {
+      count: this.count,
+      errors: this.errors,
+      mean_ms: this.count ? Math.round(this.sumMs / this.count) : 0,
+      p50_ms: this.quantile(0.5),
+      p95_ms: this.quantile(0.95),
+      p99_ms: this.quantile(0.99),
+      max_ms: Math.round(this.maxMs),
+      buckets: Object.fromEntries([
+        ...BUCKETS_MS.map((bound, i) => [`le_${bound}`, this.buckets[i]]),
+        ["inf", this.buckets[BUCKETS_MS.length]],
+      ]),
+    };
+  }
+}
+
+let since = new Date().toISOString();
+const routes = new Map<string, Histogram>();
+const tenants = new Map<string, Histogram>();
+const upstreams = new Map<string, Histogram>();
+
+function series(map: Map<string, Histogram>, key: string) {
+  let histogram = map.get(key);
+  if (!histogram) {
+    histogram = new Histogram();
+    map.set(key, histogram);
+  }
+  return histogram;
+}
+
+function sorted(map: Map<string, Histogram>) {
+  return Object.fromEntries(
+    [...map.entries()]
+      .sort(([, a], [, b]) => b.count - a.count)
+      .map(([key, histogram]) => [key, histogram.toJSON()]),
+  );
+}
+
+export function metricsSnapshot() {
+  return {
+    since,
+    startup: startupReport(),
+    slow_request_ms: SLOW_REQUEST_MS,
+    routes: sorted(routes),
+    tenants: sorted(tenants),
+    upstreams: sorted(upstreams),
+  };
+}
+
+export function resetMetrics() {
+  routes.clear();
+  tenants.clear();
+  upstreams.clear();
+  since = new Date().toISOString();
+}
+
+// ---------- Upstream timing ----------
+
+const SUPABASE_HOST = serverEnv.SUPABASE_URL ? new URL(serverEnv.SUPABASE_URL).host : "";
+const SQUARE_STUB_HOST = serverEnv.SQUARE_API_BASE_URL ? new URL(serverEnv.SQUARE_API_BASE_URL).host : "";
+
+function upstreamOf(url: URL) {
+  if (url.host === SUPABASE_HOST) {
+    if (url.pathname.startsWith("/rest/")) return "postgres";
+    if (url.pathname.startsWith("/storage/")) return "storage";
+    if (url.pathname.startsWith("/auth/")) return "auth";
+    return "supabase";
+  }
+  if (url.host === SQUARE_STUB_HOST || /(^|\.)squareup(sandbox)?\.com$/.test(url.hostname)) return "square";
+  if (/(^|\.)resend\.com$/.test(url.hostname)) return "resend";
+  if (url.hostname.endsWith(".amazonaws.com") || url.hostname.endsWith(".squarecdn.com")) return "square_images";
+  return "other";
+}
+
+// Drop-in fetch that records time-to-response per upstream. The shared Supabase client
+// (service-client.tsx) uses it; call it directly for Square and Resend.
+export async function timedFetch(input: RequestInfo | URL, init?: RequestInit): Promise<Response> {
+  const url = new URL(input instanceof Request ? input.url : String(input));
+  const upstream = upstreamOf(url);
+  const started = performance.now();
+  let failed = true;
+  try {
+    const response = await fetch(input, init);
+    failed = response.status >= 500;
+    return response;
+  } finally {
+    const ms = performance.now() - started;
+    series(upstreams, upstream).observe(ms, failed);
+
+    const request = requestContext.getStore();
+    if (request) {
+      const totals = request.upstream[upstream] ??= { calls: 0, ms: 0 };
+      totals.calls++;
+      totals.ms += ms;
+    }
+    log.debug("upstream", { upstream, method: init?.method || "GET", path: url.pathname, ms: Math.round(ms), failed });
+  }
+}
+
+// ---------- Request middleware ----------
+
+// Routes without a :wineClubId param (session-scoped ones) attribute the request here
+export function setRequestTenant(wineClubId: string | null | undefined) {
+  const request = requestContext.getStore();
+  if (request && wineClubId && !request.tenant) request.tenant = wineClubId;
+}
+
+export function requestObserver(): MiddlewareHandler {
+  return async (c, next) => {
+    const request: RequestContext = {
+      id: c.req.header("X-Request-Id") || crypto.randomUUID(),
+      tenant: null,
+      upstream: {},
+    };
+    c.header("X-Request-Id", request.id);
+    const cold = noteRequest();
+    if (cold) {
+      const { boot_ms, module_init_ms } = startupReport();
+      c.header("X-Cold-Start", "1");
+      c.header("Server-Timing", `boot;dur=${boot_ms}, init;dur=${module_init_ms ?? 0}`);
+    }
+
+    const started = performance.now();
+    await requestContext.run(request, next);
+    const ms = performance.now() - started;
+
+    // After next() the request points at the matched handler, so these are its pattern and params
+    const pattern = c.req.routePath === "*" || c.req.routePath === "/*" ? "(unmatched)" : c.req.routePath;
+    const route = `${c.req.method} ${pattern}`;
+    const tenant = c.req.param("wineClubId") || c.req.query("wine_club_id") || request.tenant;
+    const status = c.res.status;
+    const failed = status >= 500;
+
+    series(routes, route).observe(ms, failed);
+    if (tenant) {
+      series(tenants, tenants.has(tenant) || tenants.size < MAX_TENANT_SERIES ? tenant : "(other)").observe(ms, failed);
+    }
+
+    const slow = ms >= SLOW_REQUEST_MS;
+    if (failed || slow || cold || Math.random() < SAMPLE_RATE) {
+      const fields = {
+        route,
+        ...(cold ? { cold_start: startupReport() } : {}),
+        status,
+        ms: Math.round(ms),
+        ...(tenant ? { tenant } : {}),
+        upstream: Object.fromEntries(
+          Object.entries(request.upstream).map(([name, totals]) => [name, { calls: totals.calls, ms: Math.round(totals.ms) }]),
+        ),
+      };
+      requestContext.run(request, () => {
+        if (failed) log.error("request", undefined, fields);
+        else if (slow) log.warn("request", fields);
+        else log.info("request", fields);
+      });
+    }
+  };
+}
+
+// ---------- Metrics endpoint ----------
+
+const observability = new Hono();
+
+// ?reset=1 starts a new measurement window after reading this one
+observability.get("/make-server-9d538b9c/internal/metrics", (c) => {
+  if (!serverEnv.SUPABASE_SERVICE_ROLE_KEY || c.req.header("Authorization") !== `Bearer ${serverEnv.SUPABASE_SERVICE_ROLE_KEY}`) {
+    return c.json({ success: false, error: "Unauthorized" }, 401);
+  }
+
+  const snapshot = metricsSnapshot();
+  if (c.req.query("reset") === "1") resetMetrics();
+  c.header("Cache-Control", "no-store");
+  return c.json({ success: true, ...snapshot });
+});
+
+export default observability;
@@ -0,0 +1,181 @@
+import { Hono } from "npm:hono";
+import { serverEnv, getSquareEnvironment } from "./env.tsx";
+import { cachedJson, CACHE_CONTROL } from "./http-cache.tsx";
+import * as kv from "./kv_store.tsx";
+import * as squareHelpers from "./square-helpers.tsx";
+import { log } from "./observability.tsx";
+import { serviceClient } from "./service-client.tsx";
+
+// Public endpoints for the standalone embed widget (build/embeddable-signup.js).
+// Responses only contain data that is safe to show on a third-party winery site.
+
+const publicSignup = new Hono();
+
+const supabase = serviceClient();
+
+const UNIQUE_VIOLATION = '23505';
+const ALREADY_MEMBER = "This email is already signed up with this wine club";
+
+// Slim plan projection - no Square segment ids or internal fields
+function toPublicPlan(plan: any) {
+  return {
+    id: plan.id,
+    name: plan.name,
+    bottle_count: plan.bottle_count,
+    frequency: plan.frequency,
+    discount_percentage: Number(plan.discount_percentage) || 0,
+    price: plan.pricing_type === 'fixed_price' && plan.fixed_price != null ? Number(plan.fixed_price) : null,
+    description: Array.isArray(plan.description) ? plan.description : [],
+    icon_url: plan.icon_url || null,
+  };
+}
+
+// Club profile and plans for the widget. CDN-cacheable and revalidated with ETags.
+publicSignup.get("/make-server-9d538b9c/public/plans/:wineClubId", async (c) => {
+  try {
+    const wineClubId = c.req.param('wineClubId');
+
+    const [clubResult, plansResult] = await Promise.all([
+      supabase
+        .from('wine_clubs')
+        .select('id, name, branding_logo_url, square_location_id')
+        .eq('id', wineClubId)
+        .maybeSingle(),
+      supabase
+        .from('subscription_plans')
+        .select('*')
+        .eq('wine_club_id', wineClubId)
+        .order('bottle_count', { ascending: true }),
+    ]);
+
+    if (clubResult.error || plansResult.error) {
+      return c.json({ error: (clubResult.error || plansResult.error).message }, 500);
+    }
+
+    if (!clubResult.data) {
+      return c.json({ error: "Wine club not found" }, 404);
+    }
+
+    const club = clubResult.data;
+
+    return cachedJson(c, {
+      club: {
+        id: club.id,
+        name: club.name,
+        logo_url: club.branding_logo_url || null,
+      },
+      plans: (plansResult.data || []).map(toPublicPlan),
+      payments: {
+        application_id: serverEnv.SQUARE_APPLICATION_ID || null,
+        location_id: club.square_location_id || null,
+        environment: getSquareEnvironment(),
+      },
+    }, CACHE_CONTROL.publicShort);
+  } catch (error) {
+    log.error('Get public plans error', error);
+    return c.json({ error: error.message }, 500);
+  }
+});
+
+// Signup submitted by the widget. Creates a pending member and, when the visitor
+// entered a card, the Square customer with the card on file. An email already signed up
+// with the club gets a 409 before anything is created in Square.
+publicSignup.post("/make-server-9d538b9c/public/signup", async (c) => {
+  try {
+    const { wine_club_id, plan_id, name, email, phone, preferences, source_id } = await c.req.json();
+
+    if (!wine_club_id || !plan_id || !name || !email) {
+      return c.json({ error: "wine_club_id, plan_id, name and email are required" }, 400);
+    }
+
+    const { data: plan, error: planError } = await supabase
+      .from('subscription_plans')
+      .select('id')
+      .eq('id', plan_id)
+      .eq('wine_club_id', wine_club_id)
+      .maybeSingle();
+
+    if (planError || !plan) {
+      return c.json({ error: "Plan not found for this wine club" }, 404);
+    }
+
+    const { data: existing, error: existingError } = await supabase
+      .from('members')
+      .select('id')
+      .eq('wine_club_id', wine_club_id)
+      .eq('email', email)
+      .maybeSingle();
+    if (existingError) throw existingError;
+    if (existing) {
+      return c.json({ error: ALREADY_MEMBER }, 409);
+    }
+
+    let squareCustomerId: string | null = null;
+    let hasPaymentMethod = false;
+
+    if (source_id) {
+      const [givenName, ...rest] = String(name).trim().split(/\s+/);
+      const result = await squareHelpers.createCustomerWithCard(
+        wine_club_id,
+        { givenName, familyName: rest.join(' '), email, phone },
+        source_id
+      );
+
+      if (result.customer) {
+        squareCustomerId = result.customer.id;
+      }
+      hasPaymentMethod = !!result.success;
+
+      if (!result.success) {
+        // Still create the member - the club can collect payment details later
+        log.error('Signup card on file failed', result.error);
+      }
+    }
+
+    const { data: member, error } = await supabase
+      .from('members')
+      .insert({
+        wine_club_id,
+        subscription_plan_id: plan_id,
+        name,
+        email,
+        phone: phone || null,
+        square_customer_id: squareCustomerId,
+        has_payment_method: hasPaymentMethod,
+        status: 'pending',
+      })
+      .select('id, status, has_payment_method')
+      .single();
+
+    if (error) {
+      // A concurrent signup with the same email won the insert
+      if (error.code === UNIQUE_VIOLATION) {
+        return c.json({ error: ALREADY_MEMBER }, 409);
+      }
+      log.error('Public signup member insert failed', error);
+      return c.json({ error: "Signup failed, please try again" }, 500);
+    }
+
+    if (Array.isArray(preferences) && preferences.length > 0) {
+      const preferenceId = `preferences_${wine_club_id}_${member.id}`;
+      await kv.set(preferenceId, {
+        id: preferenceId,
+        wine_club_id,
+        customer_id: member.id,
+        preference_type: 'signup',
+        category_preferences: preferences.map((category: string) => ({ category })),
+        custom_wine_assignments: [],
+        notes: 'Collected by the embedded signup widget',
+        created_at: new Date().toISOString(),
+        updated_at: new Date().toISOString()
+      });
+    }
+
+    return c.json({ success: true, member });
+  } catch (error) {
+    log.error('Public signup error', error);
+    return c.json({ error: error.message }, 500);
+  }
+});
+
+export default publicSignup;
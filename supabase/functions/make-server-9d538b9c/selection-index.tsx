@@ -0,0 +1,340 @@
+import { Hono } from "npm:hono";
+import { cachedJson, CACHE_CONTROL } from "./http-cache.tsx";
+import { canManageClub, resolveSessionTenant } from "./club-profile.tsx";
+import { getClubCatalog, onCatalogSnapshot, type CatalogSnapshot } from "./square-catalog-service.tsx";
+import type { Wine } from "./square-catalog.tsx";
+import { log } from "./observability.tsx";
+import { serviceClient } from "./service-client.tsx";
+
+// Materialized member wine choices (plan_selection_index, see plan-selection-index.sql).
+// One row per (subscription plan, wine preference) lists the in-stock variations a member of
+// that plan may pick: the plan's plan_wine_assignments first, then catalog wines in the
+// categories plan_preference_matrix allows. preference_id NULL is the plan default.
+// Rows are rebuilt from the club's catalog snapshot whenever a new snapshot is built (for
+// clubs that have an index), when an inventory webhook lands, and on lookup after the
+// matrix/assignment triggers marked them stale. GET /members/:memberId/selection-options
+// then answers the selection screens with one read of the member's plan rows.
+
+const selectionIndex = new Hono();
+
+const supabase = serviceClient();
+
+// Enough to swap every bottle of the largest plan a few times over
+const MAX_WINES_PER_OPTION = 48;
+const UUID_PATTERN = /^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$/i;
+
+export interface SelectionWine {
+  id: string;
+  square_item_id: string;
+  name: string;
+  description: string;
+  price: number;
+  category_name: string;
+  varietal: string;
+  color: string;
+  sweetness: string;
+  image_url: string | null;
+  thumbnail_url: string | null;
+  image_srcset: string | null;
+  total_inventory: number;
+  variation_ids: string[];
+}
+
+interface IndexRow {
+  wine_club_id: string;
+  subscription_plan_id: string;
+  preference_id: string | null;
+  variation_ids: string[];
+  wines: SelectionWine[];
+  stale: boolean;
+  catalog_fetched_at: string;
+  refreshed_at: string;
+}
+
+// Card data for one wine; the first in-stock variation is the one a member gets by default
+function toSelectionWine(wine: Wine): SelectionWine | null {
+  const inStock = wine.variations.filter((variation) => variation.inventory_count > 0);
+  if (inStock.length === 0) return null;
+
+  return {
+    id: inStock[0].id,
+    square_item_id: wine.square_item_id,
+    name: wine.name,
+    description: wine.description.slice(0, 280),
+    price: inStock[0].price / 100,
+    category_name: wine.category_name,
+    varietal: wine.varietal,
+    color: wine.color,
+    sweetness: wine.sweetness,
+    image_url: wine.image_url,
+    thumbnail_url: wine.thumbnail_url ?? null,
+    image_srcset: wine.image_srcset ?? null,
+    total_inventory: wine.total_inventory,
+    variation_ids: inStock.map((variation) => variation.id),
+  };
+}
+
+// matrix.category_ids may hold Square category ids or category names
+function inCategories(wine: Wine, categories: Set<string>) {
+  return (!!wine.category_id && categories.has(wine.category_id.toLowerCase()))
+    || categories.has(wine.category_name.toLowerCase());
+}
+
+function buildOption(
+  snapshot: CatalogSnapshot,
+  winesByItem: Map<string, Wine>,
+  pinnedItemIds: string[],
+  // "all" when the plan has no matrix yet; null for a preference with assignments only
+  categories: Set<string> | "all" | null,
+) {
+  const chosen = new Map<string, SelectionWine>();
+  const add = (wine: Wine | undefined) => {
+    if (!wine || chosen.has(wine.square_item_id) || chosen.size >= MAX_WINES_PER_OPTION) return;
+    const card = toSelectionWine(wine);
+    if (card) chosen.set(wine.square_item_id, card);
+  };
+
+  for (const itemId of pinnedItemIds) add(winesByItem.get(itemId));
+  if (categories) {
+    for (const wine of snapshot.wines) {
+      if (chosen.size >= MAX_WINES_PER_OPTION) break;
+      if (categories === "all" || inCategories(wine, categories)) add(wine);
+    }
+  }
+
+  const wines = Array.from(chosen.values());
+  return { wines, variation_ids: wines.flatMap((wine) => wine.variation_ids) };
+}
+
+async function buildClubIndex(wineClubId: string, snapshot: CatalogSnapshot) {
+  const { data: plans, error: plansError } = await supabase
+    .from('subscription_plans')
+    .select('id')
+    .eq('wine_club_id', wineClubId);
+  if (plansError) throw plansError;
+
+  const planIds = (plans || []).map((plan: any) => plan.id);
+  const rows: IndexRow[] = [];
+
+  if (planIds.length > 0) {
+    const [matrixResult, assignmentsResult] = await Promise.all([
+      supabase
+        .from('plan_preference_matrix')
+        .select('subscription_plan_id, preference_id, category_ids')
+        .in('subscription_plan_id', planIds),
+      supabase
+        .from('plan_wine_assignments')
+        .select('subscription_plan_id, preference_id, square_item_id')
+        .in('subscription_plan_id', planIds)
+        .order('created_at', { ascending: true }),
+    ]);
+    if (matrixResult.error) throw matrixResult.error;
+    if (assignmentsResult.error) throw assignmentsResult.error;
+
+    const winesByItem = new Map(snapshot.wines.map((wine) => [wine.square_item_id, wine]));
+    const lower = (values: string[] | null) => (values || []).map((value) => value.toLowerCase());
+    const now = new Date().toISOString();
+    const fetchedAt = new Date(snapshot.fetchedAt).toISOString();
+
+    for (const planId of planIds) {
+      const matrix = (matrixResult.data || []).filter((row: any) => row.subscription_plan_id === planId);
+      const assignments = (assignmentsResult.data || []).filter((row: any) => row.subscription_plan_id === planId);
+
+      const preferenceIds = new Set<string | null>([null]);
+      for (const row of [...matrix, ...assignments]) {
+        if (row.preference_id) preferenceIds.add(row.preference_id);
+      }
+
+      // The default row takes every category the plan allows (the whole catalog when it has no matrix)
+      const planCategories = new Set(matrix.flatMap((row: any) => lower(row.category_ids)));
+
+      for (const preferenceId of preferenceIds) {
+        const pinned = assignments
+          .filter((row: any) => row.preference_id === null || row.preference_id === preferenceId)
+          .map((row: any) => row.square_item_id);
+
+        let categories: Set<string> | "all" | null;
+        if (preferenceId === null) {
+          categories = matrix.length > 0 ? planCategories : "all";
+        } else {
+          const entry = matrix.find((row: any) => row.preference_id === preferenceId);
+          categories = entry?.category_ids?.length ? new Set(lower(entry.category_ids)) : null;
+        }
+
+        const option = buildOption(snapshot, winesByItem, pinned, categories);
+
+        rows.push({
+          wine_club_id: wineClubId,
+          subscription_plan_id: planId,
+          preference_id: preferenceId,
+          variation_ids: option.variation_ids,
+          wines: option.wines,
+          stale: false,
+          catalog_fetched_at: fetchedAt,
+          refreshed_at: now,
+        });
+      }
+    }
+  }
+
+  let keepIds: string[] = [];
+  if (rows.length > 0) {
+    const { data, error } = await supabase
+      .from('plan_selection_index')
+      .upsert(rows, { onConflict: 'subscription_plan_id,preference_id' })
+      .select('id');
+    if (error) throw error;
+    keepIds = (data || []).map((row: any) => row.id);
+  }
+
+  // Rows for plans or preferences that no longer exist
+  let cleanup = supabase.from('plan_selection_index').delete().eq('wine_club_id', wineClubId);
+  if (keepIds.length > 0) cleanup = cleanup.not('id', 'in', `(${keepIds.join(',')})`);
+  const { error: cleanupError } = await cleanup;
+  if (cleanupError) throw cleanupError;
+
+  return rows.length;
+}
+
+const rebuilding = new Map<string, Promise<number>>();
+
+// Rebuilds one club's rows from its catalog (cached snapshot if there is one); concurrent callers share it
+export function refreshSelectionIndex(wineClubId: string, snapshot?: CatalogSnapshot) {
+  let pending = rebuilding.get(wineClubId);
+  if (!pending) {
+    pending = (async () => {
+      let source = snapshot;
+      if (!source) {
+        const catalog = await getClubCatalog(wineClubId);
+        if (!catalog.success) throw new Error(catalog.error);
+        source = catalog.snapshot;
+      }
+      return buildClubIndex(wineClubId, source);
+    })().finally(() => rebuilding.delete(wineClubId));
+    rebuilding.set(wineClubId, pending);
+  }
+  return pending;
+}
+
+// Inventory or catalog moved (Square webhooks): the next lookup rebuilds the club's index
+export async function expireSelectionIndex(wineClubId: string) {
+  const { error } = await supabase
+    .from('plan_selection_index')
+    .update({ stale: true })
+    .eq('wine_club_id', wineClubId)
+    .eq('stale', false);
+  if (error) log.error(`Failed to expire selection index for ${wineClubId}`, error);
+}
+
+// New catalog snapshot: rebuild clubs that already have an index; the rest build on first lookup
+onCatalogSnapshot((snapshot) => {
+  supabase
+    .from('plan_selection_index')
+    .select('id', { head: true, count: 'exact' })
+    .eq('wine_club_id', snapshot.wineClubId)
+    .then(({ count }) => (count ? refreshSelectionIndex(snapshot.wineClubId, snapshot) : 0))
+    .catch((error) => log.error(`Selection index rebuild failed for ${snapshot.wineClubId}`, error));
+});
+
+function readPlanRows(planId: string) {
+  return supabase
+    .from('plan_selection_index')
+    .select('preference_id, variation_ids, wines, stale, refreshed_at, preference:wine_preferences(code, label)')
+    .eq('subscription_plan_id', planId);
+}
+
+// A plan's options, default first; rebuilds the club's rows first when missing or stale.
+// variationIds is everything a member of the plan may choose, for validating submissions.
+export async function getPlanSelectionOptions(wineClubId: string, planId: string) {
+  let result = await readPlanRows(planId);
+  if (result.error) throw result.error;
+
+  let catalogError: string | null = null;
+  if (!result.data?.length || result.data.some((row: any) => row.stale)) {
+    try {
+      await refreshSelectionIndex(wineClubId);
+      result = await readPlanRows(planId);
+      if (result.error) throw result.error;
+    } catch (error) {
+      // Serve whatever is indexed (possibly stale) rather than nothing
+      catalogError = error.message;
+    }
+  }
+
+  const rows = result.data || [];
+  const options = rows
+    .map((row: any) => ({
+      preference_id: row.preference_id,
+      code: row.preference?.code || null,
+      label: row.preference?.label || 'Recommended for your plan',
+      wines: row.wines as SelectionWine[],
+      refreshed_at: row.refreshed_at,
+    }))
+    .sort((a, b) => (a.preference_id === null ? -1 : b.preference_id === null ? 1 : a.label.localeCompare(b.label)));
+
+  return {
+    options,
+    variationIds: new Set<string>(rows.flatMap((row: any) => row.variation_ids || [])),
+    catalogError,
+  };
+}
+
+// The signed-in member, staff of the member's club or a platform admin
+selectionIndex.get("/make-server-9d538b9c/members/:memberId/selection-options", async (c) => {
+  try {
+    const tenant = await resolveSessionTenant(c.req.header('Authorization'));
+    if (!tenant) {
+      return c.json({ success: false, error: 'Not signed in' }, 401);
+    }
+
+    const memberId = c.req.param('memberId');
+    if (!UUID_PATTERN.test(memberId)) {
+      return c.json({ success: false, error: 'Member not found' }, 404);
+    }
+
+    const { data: member, error: memberError } = await supabase
+      .from('members')
+      .select('id, name, email, wine_club_id, subscription_plan_id, subscription_plan:subscription_plans(id, name, bottle_count, discount_percentage)')
+      .eq('id', memberId)
+      .maybeSingle();
+    if (memberError) throw memberError;
+    if (!member || !(canManageClub(tenant, member.wine_club_id) || tenant.email === member.email?.toLowerCase())) {
+      return c.json({ success: false, error: 'Member not found' }, 404);
+    }
+
+    const { options, catalogError } = member.subscription_plan_id
+      ? await getPlanSelectionOptions(member.wine_club_id, member.subscription_plan_id)
+      : { options: [], catalogError: null };
+
+    const { wine_club_id, ...memberFields } = member;
+    return cachedJson(c, {
+      success: true,
+      member: memberFields,
+      options,
+      ...(catalogError ? { catalog_error: catalogError } : {}),
+    }, CACHE_CONTROL.privateRevalidate);
+  } catch (error) {
+    log.error('Selection options error', error);
+    return c.json({ success: false, error: error.message }, 500);
+  }
+});
+
+// Rebuild a club's rows now, e.g. after bulk-editing its preference matrix
+selectionIndex.post("/make-server-9d538b9c/selection-index/:wineClubId/refresh", async (c) => {
+  try {
+    const wineClubId = c.req.param('wineClubId');
+    const tenant = await resolveSessionTenant(c.req.header('Authorization'));
+    if (!tenant || !canManageClub(tenant, wineClubId)) {
+      return c.json({ success: false, error: 'Not allowed' }, 403);
+    }
+
+    const started = Date.now();
+    const rows = await refreshSelectionIndex(wineClubId);
+    return c.json({ success: true, rows, elapsed_ms: Date.now() - started });
+  } catch (error) {
+    log.error('Selection index refresh error', error);
+    return c.json({ success: false, error: error.message }, 500);
+  }
+});
+
+export default selectionIndex;
@@ -0,0 +1,17 @@
+import { createClient, type SupabaseClient } from "jsr:@supabase/supabase-js@2.49.8";
+import { serverEnv } from "./env.tsx";
+import { timedFetch } from "./observability.tsx";
+
+// The isolate's one service-role Supabase client, created on first use and shared by every
+// module instead of each building its own. No session is kept: the service key never expires
+// and access tokens are only ever passed explicitly (auth.getUser(token)).
+
+let client: SupabaseClient | null = null;
+
+export function serviceClient() {
+  client ??= createClient(serverEnv.SUPABASE_URL, serverEnv.SUPABASE_SERVICE_ROLE_KEY, {
+    auth: { persistSession: false, autoRefreshToken: false, detectSessionInUrl: false },
+    global: { fetch: timedFetch },
+  });
+  return client;
+}
@@ -0,0 +1,285 @@
+// Bulk shipment-notification dispatcher
+// Streams a shipment's member_selections in keyset pages, renders the club template once,
+// and sends through the provider's batch endpoint under a concurrency + rate limit.
+// Each recipient's outcome is written back to member_selections.notification_status,
+// so a run that times out or fails part-way can simply be started again.
+
+import type { SupabaseClient } from "jsr:@supabase/supabase-js@2.49.8";
+import * as kv from "./kv_store.tsx";
+import { serverEnv } from "./env.tsx";
+import { createRateLimiter, sleep } from "./batch-utils.tsx";
+import { DEFAULT_FROM_EMAIL, fillTemplate, renderShipmentNotificationTemplate } from "./email-service.tsx";
+import { log, timedFetch } from "./observability.tsx";
+
+// Resend accepts at most 100 emails per batch call and 2 requests/second by default
+const RESEND_BATCH_URL = "https://api.resend.com/emails/batch";
+const MAX_BATCH_SIZE = 100;
+const PAGE_SIZE = 500;
+
+export interface BatchEmail {
+  from: string;
+  to: string;
+  subject: string;
+  html: string;
+}
+
+export interface EmailProvider {
+  name: string;
+  // Returns one provider message id per email, in order. Throws if the batch was rejected.
+  sendBatch(emails: BatchEmail[]): Promise<string[]>;
+}
+
+export interface NotificationRunOptions {
+  approvalBaseUrl: string;
+  deadline: string;
+  batchSize?: number;
+  concurrency?: number;
+  requestsPerSecond?: number;
+  // Stop after this many recipients; the next run picks up where this one left off
+  maxRecipients?: number;
+  dryRun?: boolean;
+}
+
+export interface NotificationRunSummary {
+  shipment_id: string;
+  provider: string;
+  status: "running" | "completed" | "partial" | "failed";
+  attempted: number;
+  sent: number;
+  failed: number;
+  started_at: string;
+  finished_at?: string;
+  error?: string;
+}
+
+const runKey = (shipmentId: string) => `notification_run_${shipmentId}`;
+
+// ---------- Providers ----------
+
+export function resendProvider(apiKey: string): EmailProvider {
+  return {
+    name: "resend",
+    async sendBatch(emails) {
+      for (let attempt = 0; ; attempt++) {
+        const response = await timedFetch(RESEND_BATCH_URL, {
+          method: "POST",
+          headers: {
+            "Authorization": `Bearer ${apiKey}`,
+            "Content-Type": "application/json",
+          },
+          body: JSON.stringify(emails),
+        });
+
+        // Back off on rate limiting, honouring Retry-After when present
+        if (response.status === 429 && attempt < 3) {
+          const retryAfter = Number(response.headers.get("Retry-After")) || 2 ** attempt;
+          await sleep(retryAfter * 1000);
+          continue;
+        }
+
+        if (!response.ok) {
+          throw new Error(`Resend batch failed (${response.status}): ${await response.text()}`);
+        }
+
+        const { data } = await response.json();
+        return (data || []).map((item: { id: string }) => item.id);
+      }
+    },
+  };
+}
+
+// Records emails in memory instead of sending them. Used when EMAIL_PROVIDER=mock
+// (local supabase functions serve, load tests) so bulk runs can be exercised safely.
+export const mockOutbox: BatchEmail[] = [];
+
+export function mockProvider(options: { latencyMs?: number; failEvery?: number } = {}): EmailProvider {
+  let batches = 0;
+  return {
+    name: "mock",
+    async sendBatch(emails) {
+      batches++;
+      if (options.latencyMs) await sleep(options.latencyMs);
+      if (options.failEvery && batches % options.failEvery === 0) {
+        throw new Error(`Mock provider rejected batch ${batches}`);
+      }
+      mockOutbox.push(...emails);
+      return emails.map((_, index) => `mock_${batches}_${index}`);
+    },
+  };
+}
+
+export function getEmailProvider(): EmailProvider {
+  if (serverEnv.EMAIL_PROVIDER === "mock") {
+    return mockProvider();
+  }
+  if (!serverEnv.RESEND_API_KEY) {
+    throw new Error("Resend API key not configured");
+  }
+  return resendProvider(serverEnv.RESEND_API_KEY);
+}
+
+// ---------- Dispatcher ----------
+
+// Yields pending recipients (never notified, or failed last time) page by page, ordered by id
+async function* pendingRecipients(supabase: SupabaseClient, shipmentId: string) {
+  let lastId: string | null = null;
+
+  while (true) {
+    let query = supabase
+      .from("member_selections")
+      .select("id, member_id, shipment_id, approval_token, member:members!inner(name, email, status)")
+      .eq("shipment_id", shipmentId)
+      .or("notification_status.is.null,notification_status.eq.failed")
+      .order("id", { ascending: true })
+      .limit(PAGE_SIZE);
+
+    if (lastId) query = query.gt("id", lastId);
+
+    const { data, error } = await query;
+    if (error) throw error;
+    if (!data || data.length === 0) return;
+
+    for (const row of data) {
+      if ((row as any).member?.status === "active" && (row as any).member?.email) {
+        yield row as any;
+      }
+    }
+
+    if (data.length < PAGE_SIZE) return;
+    lastId = data[data.length - 1].id;
+  }
+}
+
+export async function dispatchShipmentNotifications(
+  supabase: SupabaseClient,
+  shipmentId: string,
+  options: NotificationRunOptions,
+  provider: EmailProvider = getEmailProvider(),
+): Promise<NotificationRunSummary> {
+  const batchSize = Math.min(options.batchSize || MAX_BATCH_SIZE, MAX_BATCH_SIZE);
+  const concurrency = Math.max(1, options.concurrency || 2);
+  const throttle = createRateLimiter(options.requestsPerSecond || 2);
+
+  const { data: shipment, error: shipmentError } = await supabase
+    .from("shipments")
+    .select("id, wine_club_id, wine_club:wine_clubs(name)")
+    .eq("id", shipmentId)
+    .single();
+
+  if (shipmentError || !shipment) {
+    throw new Error("Shipment not found");
+  }
+
+  // Render once per club; only {{name}}, {{approval_url}} and {{deadline}} vary per member
+  const template = renderShipmentNotificationTemplate((shipment as any).wine_club?.name || "Wine Club");
+
+  const summary: NotificationRunSummary = {
+    shipment_id: shipmentId,
+    provider: provider.name,
+    status: "running",
+    attempted: 0,
+    sent: 0,
+    failed: 0,
+    started_at: new Date().toISOString(),
+  };
+  // A dry run reports what it would send and leaves the last real run's summary in place
+  if (!options.dryRun) {
+    await kv.set(runKey(shipmentId), summary);
+  }
+
+  const sendBatch = async (recipients: any[]) => {
+    const emails = recipients.map((recipient) => ({
+      from: DEFAULT_FROM_EMAIL,
+      to: recipient.member.email,
+      subject: template.subject,
+      html: fillTemplate(template.html, {
+        name: recipient.member.name,
+        approval_url: `${options.approvalBaseUrl}?token=${recipient.approval_token}`,
+        deadline: options.deadline,
+      }),
+    }));
+
+    let ids: string[] = [];
+    let failure: string | null = null;
+    try {
+      await throttle();
+      ids = await provider.sendBatch(emails);
+    } catch (error) {
+      failure = error.message;
+      log.error(`Shipment ${shipmentId} notification batch failed`, error);
+    }
+
+    const notifiedAt = new Date().toISOString();
+    const updates = recipients.map((recipient, index) => ({
+      id: recipient.id,
+      member_id: recipient.member_id,
+      shipment_id: recipient.shipment_id,
+      notification_status: failure ? "failed" : "sent",
+      notification_id: failure ? null : ids[index] || null,
+      notification_error: failure,
+      notified_at: failure ? null : notifiedAt,
+    }));
+
+    // One upsert per batch instead of one update per recipient
+    const { error } = await supabase.from("member_selections").upsert(updates, { onConflict: "id" });
+    if (error) {
+      log.error(`Failed to record notification status for shipment ${shipmentId}`, error);
+    }
+
+    summary.attempted += recipients.length;
+    if (failure) summary.failed += recipients.length;
+    else summary.sent += recipients.length;
+  };
+
+  const inflight = new Set<Promise<void>>();
+  let batch: any[] = [];
+  let budget = options.maxRecipients ?? Infinity;
+  let moreRemaining = false;
+
+  const flush = async () => {
+    if (batch.length === 0) return;
+    const recipients = batch;
+    batch = [];
+
+    if (options.dryRun) {
+      summary.attempted += recipients.length;
+      return;
+    }
+
+    const task = sendBatch(recipients).finally(() => inflight.delete(task));
+    inflight.add(task);
+    if (inflight.size >= concurrency) {
+      await Promise.race(inflight);
+    }
+  };
+
+  try {
+    for await (const recipient of pendingRecipients(supabase, shipmentId)) {
+      if (budget <= 0) {
+        moreRemaining = true;
+        break;
+      }
+      budget--;
+      batch.push(recipient);
+      if (batch.length >= batchSize) await flush();
+    }
+    await flush();
+    await Promise.all(inflight);
+
+    summary.status = summary.failed > 0 || moreRemaining ? "partial" : "completed";
+  } catch (error) {
+    await Promise.allSettled(inflight);
+    summary.status = "failed";
+    summary.error = error.message;
+  }
+
+  summary.finished_at = new Date().toISOString();
+  if (!options.dryRun) {
+    await kv.set(runKey(shipmentId), summary);
+  }
+  return summary;
+}
+
+export async function getNotificationRun(shipmentId: string): Promise<NotificationRunSummary | null> {
+  return await kv.get(runKey(shipmentId));
+}
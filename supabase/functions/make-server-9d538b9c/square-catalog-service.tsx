@@ -0,0 +1,299 @@
+// Per-tenant Square catalog snapshots for /square/live-inventory/:wineClubId.
+// Each club's catalog is fetched with that club's own token/location (wine_clubs via
+// getSquareConfig) and kept as a parsed snapshot in an LRU that is capped by estimated
+// memory, not entry count - one 20k-item club can weigh as much as hundreds of small ones.
+// Snapshots older than SNAPSHOT_TTL_MS are served stale while a single refresh runs behind
+// them. refreshCatalogs() re-fetches many clubs at once, handing out Square pages round-robin
+// so a large catalog takes its turn page by page instead of holding a worker for its whole run.
+// Like TtlCache this lives for the isolate's lifetime; it absorbs load, it is not a source of truth.
+// Square webhooks run in the public function, which never sees these snapshots, so they record
+// changes in square_catalog_versions instead; a snapshot fetched before its club's stale_at is
+// treated as expired.
+
+import { serverEnv } from "./env.tsx";
+import { getSquareConfig } from "./square-helpers.tsx";
+import { fetchSquareCatalogPages, loadSquareCatalog, SquareCatalogParser, type CatalogStats, type ParsedCatalog } from "./square-catalog.tsx";
+import { TtlCache } from "./ttl-cache.tsx";
+import { catalogImageFields } from "./image-proxy.tsx";
+import { log } from "./observability.tsx";
+import { serviceClient } from "./service-client.tsx";
+
+const SNAPSHOT_TTL_MS = 5 * 60 * 1000;
+const MAX_CACHE_BYTES = (parseInt(serverEnv.SQUARE_CATALOG_CACHE_MB || "", 10) || 48) * 1024 * 1024;
+// Credentials rarely change and saving them calls invalidateClubCatalog(), so a short TTL is plenty
+const CONFIG_TTL_MS = 60 * 1000;
+const DEFAULT_REFRESH_CONCURRENCY = 4;
+// How long a club's stale_at stamp is trusted before it is read again
+const STALE_STAMP_TTL_MS = 15 * 1000;
+
+const supabase = serviceClient();
+
+export interface CatalogSnapshot extends ParsedCatalog {
+  wineClubId: string;
+  environment: string;
+  fetchedAt: number;
+  bytes: number;
+  stats: CatalogStats;
+}
+
+export type CatalogResult =
+  | { success: true; snapshot: CatalogSnapshot; cache: "hit" | "stale" | "miss" }
+  | { success: false; error: string; notConfigured?: boolean };
+
+// Least-recently-used snapshots, evicted oldest-first until the total estimated size fits
+class SnapshotLru {
+  private entries = new Map<string, CatalogSnapshot>();
+  private totalBytes = 0;
+
+  constructor(private maxBytes: number) {}
+
+  get(wineClubId: string) {
+    const snapshot = this.entries.get(wineClubId);
+    if (snapshot) {
+      // Map keeps insertion order; re-inserting marks the club as most recently used
+      this.entries.delete(wineClubId);
+      this.entries.set(wineClubId, snapshot);
+    }
+    return snapshot;
+  }
+
+  set(snapshot: CatalogSnapshot) {
+    this.delete(snapshot.wineClubId);
+    // A catalog bigger than the whole budget is served once and not kept
+    if (snapshot.bytes > this.maxBytes) return;
+
+    while (this.totalBytes + snapshot.bytes > this.maxBytes) {
+      const oldest = this.entries.keys().next().value;
+      if (oldest === undefined) break;
+      this.delete(oldest);
+    }
+    this.entries.set(snapshot.wineClubId, snapshot);
+    this.totalBytes += snapshot.bytes;
+  }
+
+  delete(wineClubId: string) {
+    const snapshot = this.entries.get(wineClubId);
+    if (!snapshot) return;
+    this.entries.delete(wineClubId);
+    this.totalBytes -= snapshot.bytes;
+  }
+
+  clubIds() {
+    return Array.from(this.entries.keys());
+  }
+
+  usage() {
+    return { clubs: this.entries.size, bytes: this.totalBytes, max_bytes: this.maxBytes };
+  }
+}
+
+const snapshots = new SnapshotLru(MAX_CACHE_BYTES);
+const configs = new TtlCache<Awaited<ReturnType<typeof getSquareConfig>>>(CONFIG_TTL_MS);
+const inflight = new Map<string, Promise<CatalogResult>>();
+const staleStamps = new TtlCache<number>(STALE_STAMP_TTL_MS);
+
+// fetchedAt is when the fetch started, so a change stamped mid-fetch still expires the result
+function toSnapshot(wineClubId: string, environment: string, parsed: ParsedCatalog, stats: CatalogStats, fetchedAt: number): CatalogSnapshot {
+  for (const wine of parsed.wines) {
+    Object.assign(wine, catalogImageFields(wine.image_url));
+  }
+  return {
+    ...parsed,
+    wineClubId,
+    environment,
+    fetchedAt,
+    // UTF-16 string length is a close enough stand-in for the heap the parsed objects take
+    bytes: JSON.stringify(parsed.wines).length * 2,
+    stats,
+  };
+}
+
+// Called with every newly built snapshot (request path or scheduled refresh)
+type SnapshotListener = (snapshot: CatalogSnapshot) => void;
+const snapshotListeners: SnapshotListener[] = [];
+
+export function onCatalogSnapshot(listener: SnapshotListener) {
+  snapshotListeners.push(listener);
+}
+
+function storeSnapshot(snapshot: CatalogSnapshot) {
+  snapshots.set(snapshot);
+  for (const listener of snapshotListeners) {
+    try {
+      listener(snapshot);
+    } catch (error) {
+      log.error(`Catalog snapshot listener failed for ${snapshot.wineClubId}`, error);
+    }
+  }
+}
+
+function loadConfig(wineClubId: string) {
+  return configs.getOrLoad(wineClubId, () => getSquareConfig(wineClubId));
+}
+
+async function fetchClubCatalog(wineClubId: string): Promise<CatalogResult> {
+  const config = await loadConfig(wineClubId);
+  if (!config.success) {
+    return { success: false, error: config.error, notConfigured: true };
+  }
+
+  const startedAt = Date.now();
+  const { stats, ...parsed } = await loadSquareCatalog(config.token, config.baseUrl);
+  const snapshot = toSnapshot(wineClubId, config.environment, parsed, stats, startedAt);
+  storeSnapshot(snapshot);
+  return { success: true, snapshot, cache: "miss" };
+}
+
+// One fetch per club at a time; concurrent callers share it
+function refreshClub(wineClubId: string) {
+  let pending = inflight.get(wineClubId);
+  if (!pending) {
+    pending = fetchClubCatalog(wineClubId).finally(() => inflight.delete(wineClubId));
+    inflight.set(wineClubId, pending);
+  }
+  return pending;
+}
+
+// When a webhook last reported a catalog or inventory change for the club (0 if never)
+function catalogStaleAt(wineClubId: string) {
+  return staleStamps.getOrLoad(wineClubId, async () => {
+    const { data, error } = await supabase
+      .from('square_catalog_versions')
+      .select('stale_at')
+      .eq('wine_club_id', wineClubId)
+      .maybeSingle();
+    if (error) {
+      log.error(`Failed to read catalog stale stamp for ${wineClubId}`, error);
+      return 0;
+    }
+    return data ? Date.parse(data.stale_at) : 0;
+  });
+}
+
+export async function getClubCatalog(wineClubId: string, options: { force?: boolean } = {}): Promise<CatalogResult> {
+  const snapshot = options.force ? undefined : snapshots.get(wineClubId);
+  if (!snapshot) return refreshClub(wineClubId);
+
+  const staleAt = await catalogStaleAt(wineClubId);
+  if (Date.now() - snapshot.fetchedAt < SNAPSHOT_TTL_MS && snapshot.fetchedAt > staleAt) {
+    return { success: true, snapshot, cache: "hit" };
+  }
+
+  // Serve the stale copy now; the next request sees the refreshed one
+  refreshClub(wineClubId).catch((error) => {
+    log.error(`Background catalog refresh failed for ${wineClubId}`, error);
+  });
+  return { success: true, snapshot, cache: "stale" };
+}
+
+// Records that Square changed the clubs' catalog or stock (catalog.version.updated and
+// inventory.count.updated webhooks). Every isolate serving those clubs sees the stamp within
+// STALE_STAMP_TTL_MS and serves its old snapshot once more while a refresh runs.
+export async function markCatalogStale(wineClubIds: string[]) {
+  if (wineClubIds.length === 0) return;
+  const staleAt = new Date().toISOString();
+  const { error } = await supabase
+    .from('square_catalog_versions')
+    .upsert(wineClubIds.map((wineClubId) => ({ wine_club_id: wineClubId, stale_at: staleAt })), { onConflict: 'wine_club_id' });
+  if (error) throw error;
+  for (const wineClubId of wineClubIds) staleStamps.delete(wineClubId);
+}
+
+// Drop a club's snapshot and cached credentials (after a credentials change)
+export function invalidateClubCatalog(wineClubId: string) {
+  snapshots.delete(wineClubId);
+  configs.delete(wineClubId);
+}
+
+export function catalogCacheStats() {
+  return { ...snapshots.usage(), refreshing: inflight.size, ttl_ms: SNAPSHOT_TTL_MS };
+}
+
+// Clubs whose snapshots are currently cached, i.e. the ones worth keeping warm
+export function cachedClubIds() {
+  return snapshots.clubIds();
+}
+
+// Every club with Square credentials, for a full scheduled refresh
+export async function configuredClubIds(): Promise<string[]> {
+  const { data, error } = await supabase
+    .from('wine_clubs')
+    .select('id')
+    .not('square_access_token', 'is', null)
+    .not('square_location_id', 'is', null);
+  if (error) throw error;
+  return (data || []).map((club: any) => String(club.id));
+}
+
+interface RefreshJob {
+  wineClubId: string;
+  environment: string;
+  pages: AsyncGenerator<any[]>;
+  parser: SquareCatalogParser;
+  startedAt: number;
+}
+
+export interface RefreshResult {
+  wineClubId: string;
+  success: boolean;
+  items?: number;
+  pages?: number;
+  elapsed_ms?: number;
+  error?: string;
+}
+
+// Re-fetches several clubs' catalogs with at most `concurrency` Square requests in flight.
+// Workers take one page for the club at the head of the queue and put the club back at the
+// tail, so every club advances a page per round whatever its catalog size.
+export async function refreshCatalogs(wineClubIds: string[], concurrency = DEFAULT_REFRESH_CONCURRENCY) {
+  const results: RefreshResult[] = [];
+  const queue: RefreshJob[] = [];
+
+  for (const wineClubId of new Set(wineClubIds)) {
+    // A request-path refresh is already fetching this club
+    if (inflight.has(wineClubId)) continue;
+
+    const config = await loadConfig(wineClubId);
+    if (!config.success) {
+      results.push({ wineClubId, success: false, error: config.error });
+      continue;
+    }
+    queue.push({
+      wineClubId,
+      environment: config.environment,
+      pages: fetchSquareCatalogPages(config.token, config.baseUrl),
+      parser: new SquareCatalogParser(),
+      startedAt: Date.now(),
+    });
+  }
+
+  const worker = async () => {
+    while (queue.length > 0) {
+      const job = queue.shift()!;
+      try {
+        const page = await job.pages.next();
+        if (!page.done) {
+          job.parser.addPage(page.value);
+          queue.push(job);
+          continue;
+        }
+
+        const snapshot = toSnapshot(job.wineClubId, job.environment, job.parser.finish(), job.parser.stats, job.startedAt);
+        storeSnapshot(snapshot);
+        results.push({
+          wineClubId: job.wineClubId,
+          success: true,
+          items: snapshot.totalItems,
+          pages: snapshot.stats.pages,
+          elapsed_ms: Date.now() - job.startedAt,
+        });
+      } catch (error) {
+        // Keep the previous snapshot; a failed refresh should not blank a club's inventory
+        results.push({ wineClubId: job.wineClubId, success: false, error: error.message });
+      }
+    }
+  };
+
+  await Promise.all(Array.from({ length: Math.min(concurrency, queue.length) }, worker));
+  return results;
+}
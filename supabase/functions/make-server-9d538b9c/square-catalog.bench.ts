@@ -0,0 +1,146 @@
+// Benchmark: streaming SquareCatalogParser vs. the previous collect-then-filter parser
+// on a synthetic 50k-object catalog (12.5k items, each with an image and two variations).
+//
+//   deno bench supabase/functions/make-server-9d538b9c/square-catalog.bench.ts
+//
+// Pages are 100 objects like /v2/catalog/list, and images trail their items by up to five
+// pages so the parser exercises its pending path.
+
+import { SquareCatalogParser } from "./square-catalog.tsx";
+
+const TOTAL_OBJECTS = 50_000;
+const PAGE_SIZE = 100;
+const CATEGORIES = ["Red Wine", "White Wine", "Rosé", "Sparkling", "Dessert"];
+const VARIETALS = ["Cabernet Sauvignon", "Pinot Noir", "Chardonnay", "Sauvignon Blanc", "Merlot", "Syrah"];
+const ATTRIBUTES = ["Varietal", "Sweetness", "Color"];
+
+function syntheticPages(): any[][] {
+  let seed = 7;
+  const random = () => (seed = (seed * 16807) % 2147483647) / 2147483647;
+
+  // [sort key, object]: items and variations keep catalog order, images land up to ~5 pages later
+  const keyed: [number, any][] = [
+    ...CATEGORIES.map((name, index): [number, any] => [-1, { type: "CATEGORY", id: `CAT-${index}`, category_data: { name } }]),
+    ...ATTRIBUTES.map((name): [number, any] => [-1, { type: "CUSTOM_ATTRIBUTE_DEFINITION", id: `DEF-${name}`, custom_attribute_definition_data: { name } }]),
+  ];
+
+  const items = Math.floor((TOTAL_OBJECTS - keyed.length) / 4);
+  for (let index = 0; index < items; index++) {
+    const itemId = `ITEM-${index}`;
+    const attributeValues = (prefix: string) => Object.fromEntries(ATTRIBUTES.map((name) => [
+      `${prefix}-${name.toLowerCase()}`,
+      { name, custom_attribute_definition_id: `DEF-${name}`, string_value: name === "Varietal" ? VARIETALS[index % VARIETALS.length] : `${name} ${index % 3}` },
+    ]));
+    // A few unrelated attributes so lookups scan more than the three we want
+    const extra = { "bin": { name: "Bin", string_value: `B${index % 40}` }, "region": { name: "Region", string_value: "Sonoma" } };
+
+    const variations = ["750ml", "Magnum"].map((size) => ({
+      type: "ITEM_VARIATION",
+      id: `VAR-${index}-${size}`,
+      custom_attribute_values: size === "Magnum" ? attributeValues(`var-${size}`) : extra,
+      item_variation_data: {
+        item_id: itemId,
+        name: size,
+        price_money: { amount: Math.floor(1800 + random() * 7700), currency: "USD" },
+        inventory_count: Math.floor(random() * 240),
+      },
+    }));
+
+    const position = index * 3;
+    keyed.push([position, {
+      type: "ITEM",
+      id: itemId,
+      custom_attribute_values: { ...extra, ...attributeValues("item") },
+      item_data: {
+        name: `${VARIETALS[index % VARIETALS.length]} ${2015 + (index % 9)}`,
+        description_plaintext: "Synthetic wine",
+        categories: [{ id: `CAT-${index % CATEGORIES.length}` }],
+        image_ids: [`IMG-${index}`],
+        variations,
+      },
+    }]);
+    variations.forEach((variation, offset) => keyed.push([position + 1 + offset, variation]));
+    keyed.push([position + random() * 5 * PAGE_SIZE, { type: "IMAGE", id: `IMG-${index}`, image_data: { url: `https://images.example.test/${itemId}.jpg` } }]);
+  }
+
+  const objects = keyed.sort((a, b) => a[0] - b[0]).map(([, object]) => object);
+
+  const pages: any[][] = [];
+  for (let offset = 0; offset < objects.length; offset += PAGE_SIZE) {
+    pages.push(objects.slice(offset, offset + PAGE_SIZE));
+  }
+  return pages;
+}
+
+// The parser this module replaced: concatenate every page, then filter by type and scan
+// custom_attribute_values once per attribute lookup
+function legacyParse(pages: any[][]) {
+  const allObjects: any[] = [];
+  for (const page of pages) allObjects.push(...page);
+
+  const getCustomAttribute = (obj: any, attributeName: string): string | null => {
+    if (!obj?.custom_attribute_values) return null;
+    for (const [, value] of Object.entries(obj.custom_attribute_values)) {
+      const attr: any = value;
+      if (attr?.name === attributeName && attr?.string_value) return attr.string_value;
+    }
+    return null;
+  };
+
+  const items = allObjects.filter((o) => o.type === "ITEM");
+  const categories = allObjects.filter((o) => o.type === "CATEGORY");
+  const images = allObjects.filter((o) => o.type === "IMAGE");
+  const categoryMap = new Map();
+  categories.forEach((cat) => cat.category_data?.name && categoryMap.set(cat.id, cat.category_data.name));
+  const imageMap = new Map();
+  images.forEach((img) => img.image_data?.url && imageMap.set(img.id, img.image_data.url));
+
+  const wines = items.map((item) => {
+    const itemData = item.item_data;
+    if (!itemData) return null;
+    const variations = (itemData.variations || []).map((variation: any) => {
+      const varData = variation.item_variation_data;
+      if (!varData) return null;
+      return {
+        id: variation.id,
+        name: varData.name || "Standard",
+        price: varData.price_money?.amount || 0,
+        inventory_count: varData.inventory_count || 0,
+        varietal: getCustomAttribute(variation, "Varietal") || getCustomAttribute(item, "Varietal") || "",
+        sweetness: getCustomAttribute(variation, "Sweetness") || getCustomAttribute(item, "Sweetness") || "",
+        color: getCustomAttribute(variation, "Color") || getCustomAttribute(item, "Color") || "",
+      };
+    }).filter(Boolean);
+    if (variations.length === 0) return null;
+    return {
+      square_item_id: item.id,
+      name: itemData.name || "Unknown Wine",
+      category_name: categoryMap.get(itemData.categories?.[0]?.id) || "Uncategorized",
+      image_url: imageMap.get(itemData.image_ids?.[0]) || null,
+      description: itemData.description_plaintext || itemData.description || "",
+      varietal: getCustomAttribute(item, "Varietal") || variations[0]?.varietal || "",
+      sweetness: getCustomAttribute(item, "Sweetness") || variations[0]?.sweetness || "",
+      color: getCustomAttribute(item, "Color") || variations[0]?.color || "",
+      variations,
+      total_inventory: variations.reduce((sum: number, v: any) => sum + v.inventory_count, 0),
+    };
+  }).filter(Boolean);
+
+  return { wines, availableCategories: Array.from(categoryMap.values()), totalItems: wines.length };
+}
+
+function streamingParse(pages: any[][]) {
+  const parser = new SquareCatalogParser();
+  for (const page of pages) parser.addPage(page);
+  return parser.finish();
+}
+
+const pages = syntheticPages();
+
+// Both parsers must agree before their timings mean anything
+if (JSON.stringify(legacyParse(pages)) !== JSON.stringify(streamingParse(pages))) {
+  throw new Error("SquareCatalogParser output differs from the legacy parser");
+}
+
+Deno.bench({ name: "legacy collect + filter", group: "catalog-50k", baseline: true, fn: () => { legacyParse(pages); } });
+Deno.bench({ name: "streaming SquareCatalogParser", group: "catalog-50k", fn: () => { streamingParse(pages); } });
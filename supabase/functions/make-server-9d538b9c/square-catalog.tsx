@@ -0,0 +1,253 @@
+import { timedFetch } from "./observability.tsx";
+
+// Incremental parser for the Square catalog (/v2/catalog/list).
+// Pages are consumed as they arrive instead of being concatenated into one array: categories,
+// images and custom attribute definitions go into lookup maps, and each ITEM is turned into a
+// wine as soon as the category and image it references are known. Items that arrive before
+// their category/image wait in a small pending set and are built when the object shows up (or
+// with fallbacks when the catalog ends). Only the maps and the finished wines stay in memory.
+
+// Custom attributes the wine cards show, keyed by their Square display name
+const WINE_ATTRIBUTES: Record<string, "varietal" | "sweetness" | "color"> = {
+  Varietal: "varietal",
+  Sweetness: "sweetness",
+  Color: "color",
+};
+
+const CATALOG_TYPES = "ITEM,CATEGORY,IMAGE,ITEM_VARIATION,CUSTOM_ATTRIBUTE_DEFINITION";
+
+export interface WineAttributes {
+  varietal: string;
+  sweetness: string;
+  color: string;
+}
+
+export interface WineVariation extends WineAttributes {
+  id: string;
+  name: string;
+  price: number;
+  inventory_count: number;
+}
+
+export interface Wine extends WineAttributes {
+  square_item_id: string;
+  name: string;
+  category_id: string | null;
+  category_name: string;
+  image_url: string | null;
+  // Resized copies served through image-proxy.tsx, added when the snapshot is built
+  thumbnail_url?: string | null;
+  image_srcset?: string | null;
+  description: string;
+  variations: WineVariation[];
+  total_inventory: number;
+}
+
+export interface ParsedCatalog {
+  wines: Wine[];
+  availableCategories: string[];
+  totalItems: number;
+}
+
+export interface CatalogStats {
+  pages: number;
+  objects: number;
+  items: number;
+  categories: number;
+  images: number;
+}
+
+interface PendingItem {
+  item: any;
+  missing: number;
+}
+
+export class SquareCatalogParser {
+  readonly stats: CatalogStats = { pages: 0, objects: 0, items: 0, categories: 0, images: 0 };
+
+  private categoryNames = new Map<string, string>();
+  private imageUrls = new Map<string, string>();
+  private attributeNames = new Map<string, string>();
+  // Every category/image id seen, including ones without a name/url, so items never wait on them forever
+  private resolvedIds = new Set<string>();
+
+  // Wines by catalog position, so the result keeps Square's item order however they resolved
+  private slots: (Wine | null)[] = [];
+  private pending = new Map<number, PendingItem>();
+  private waitingOn = new Map<string, number[]>();
+
+  constructor(private onWine?: (wine: Wine) => void) {}
+
+  addPage(objects: any[] = []) {
+    this.stats.pages++;
+    this.stats.objects += objects.length;
+
+    for (const object of objects) {
+      switch (object.type) {
+        case "CATEGORY":
+          this.stats.categories++;
+          if (object.category_data?.name) this.categoryNames.set(object.id, object.category_data.name);
+          this.resolve(object.id);
+          break;
+        case "IMAGE":
+          this.stats.images++;
+          if (object.image_data?.url) this.imageUrls.set(object.id, object.image_data.url);
+          this.resolve(object.id);
+          break;
+        case "CUSTOM_ATTRIBUTE_DEFINITION":
+          if (object.custom_attribute_definition_data?.name) {
+            this.attributeNames.set(object.id, object.custom_attribute_definition_data.name);
+          }
+          break;
+        case "ITEM":
+          this.stats.items++;
+          this.addItem(object);
+          break;
+      }
+    }
+  }
+
+  // Builds anything still waiting (with Uncategorized / no image) and returns the parsed catalog
+  finish(): ParsedCatalog {
+    for (const [slot, { item }] of this.pending) this.build(slot, item);
+    this.pending.clear();
+    this.waitingOn.clear();
+
+    const wines = this.slots.filter((wine): wine is Wine => wine !== null);
+    return {
+      wines,
+      availableCategories: Array.from(this.categoryNames.values()),
+      totalItems: wines.length,
+    };
+  }
+
+  private addItem(item: any) {
+    const slot = this.slots.length;
+    this.slots.push(null);
+    if (!item.item_data) return;
+
+    let missing = 0;
+    for (const id of [item.item_data.categories?.[0]?.id, item.item_data.image_ids?.[0]]) {
+      if (!id || this.resolvedIds.has(id)) continue;
+      missing++;
+      const waiting = this.waitingOn.get(id);
+      if (waiting) waiting.push(slot);
+      else this.waitingOn.set(id, [slot]);
+    }
+
+    if (missing === 0) this.build(slot, item);
+    else this.pending.set(slot, { item, missing });
+  }
+
+  private resolve(id: string) {
+    this.resolvedIds.add(id);
+    const waiting = this.waitingOn.get(id);
+    if (!waiting) return;
+    this.waitingOn.delete(id);
+
+    for (const slot of waiting) {
+      const entry = this.pending.get(slot);
+      if (!entry || --entry.missing > 0) continue;
+      this.pending.delete(slot);
+      this.build(slot, entry.item);
+    }
+  }
+
+  // One pass over custom_attribute_values picks up Varietal, Sweetness and Color together
+  private attributes(object: any): Partial<WineAttributes> {
+    const found: Partial<WineAttributes> = {};
+    const values = object?.custom_attribute_values;
+    if (!values) return found;
+
+    for (const key in values) {
+      const attr = values[key];
+      if (!attr?.string_value) continue;
+      const name = attr.name || this.attributeNames.get(attr.custom_attribute_definition_id);
+      const field = name && WINE_ATTRIBUTES[name];
+      if (field && !found[field]) found[field] = attr.string_value;
+    }
+    return found;
+  }
+
+  private build(slot: number, item: any) {
+    const itemData = item.item_data;
+    const itemAttrs = this.attributes(item);
+
+    const variations: WineVariation[] = [];
+    for (const variation of itemData.variations || []) {
+      const varData = variation.item_variation_data;
+      if (!varData) continue;
+
+      // Variation-level attributes override item-level ones
+      const varAttrs = this.attributes(variation);
+      variations.push({
+        id: variation.id,
+        name: varData.name || "Standard",
+        price: varData.price_money?.amount || 0,
+        inventory_count: varData.inventory_count || 0,
+        varietal: varAttrs.varietal || itemAttrs.varietal || "",
+        sweetness: varAttrs.sweetness || itemAttrs.sweetness || "",
+        color: varAttrs.color || itemAttrs.color || "",
+      });
+    }
+
+    // Skip items with no variations
+    if (variations.length === 0) return;
+
+    const categoryId = itemData.categories?.[0]?.id;
+    const imageId = itemData.image_ids?.[0];
+    const wine: Wine = {
+      square_item_id: item.id,
+      name: itemData.name || "Unknown Wine",
+      category_id: categoryId || null,
+      category_name: (categoryId && this.categoryNames.get(categoryId)) || "Uncategorized",
+      image_url: (imageId && this.imageUrls.get(imageId)) || null,
+      description: itemData.description_plaintext || itemData.description || "",
+      varietal: itemAttrs.varietal || variations[0].varietal,
+      sweetness: itemAttrs.sweetness || variations[0].sweetness,
+      color: itemAttrs.color || variations[0].color,
+      variations,
+      total_inventory: variations.reduce((sum, v) => sum + v.inventory_count, 0),
+    };
+
+    this.slots[slot] = wine;
+    this.onWine?.(wine);
+  }
+}
+
+// Yields the catalog one page of objects at a time, following Square's cursor
+export async function* fetchSquareCatalogPages(token: string, baseUrl: string) {
+  let cursor: string | null = null;
+
+  do {
+    let url = `${baseUrl}/v2/catalog/list?types=${encodeURIComponent(CATALOG_TYPES)}&limit=100`;
+    if (cursor) {
+      url += `&cursor=${encodeURIComponent(cursor)}`;
+    }
+
+    const response = await timedFetch(url, {
+      headers: {
+        'Authorization': `Bearer ${token}`,
+        'Square-Version': '2024-01-18',
+        'Content-Type': 'application/json'
+      }
+    });
+
+    if (!response.ok) {
+      throw new Error(`Square API error: ${response.status} ${response.statusText}`);
+    }
+
+    const data = await response.json();
+    cursor = data.cursor || null;
+    yield (data.objects || []) as any[];
+  } while (cursor);
+}
+
+// Fetches and parses the whole catalog, handing each wine to onWine as soon as it is complete
+export async function loadSquareCatalog(token: string, baseUrl: string, onWine?: (wine: Wine) => void) {
+  const parser = new SquareCatalogParser(onWine);
+  for await (const objects of fetchSquareCatalogPages(token, baseUrl)) {
+    parser.addPage(objects);
+  }
+  return { ...parser.finish(), stats: parser.stats };
+}
@@ -1,10 +1,8 @@
 import { serverEnv } from "./env.tsx";
-import { createClient } from "jsr:@supabase/supabase-js@2.49.8";
+import { timedFetch } from "./observability.tsx";
+import { serviceClient } from "./service-client.tsx";
 
-const supabase = createClient(
-  serverEnv.SUPABASE_URL,
-  serverEnv.SUPABASE_SERVICE_ROLE_KEY,
-);
+const supabase = serviceClient();
 
 // Get Square configuration for a specific wine club
 export async function getSquareConfig(wineClubId: string) {
@@ -31,9 +29,9 @@ export async function getSquareConfig(wineClubId: string) {
     }
 
     const environment = wineClub.square_access_token.includes('sandbox') ? 'sandbox' : 'production';
-    const baseUrl = environment === 'sandbox' 
+    const baseUrl = serverEnv.SQUARE_API_BASE_URL || (environment === 'sandbox' 
       ? 'https://connect.squareupsandbox.com' 
-      : 'https://connect.squareup.com';
+      : 'https://connect.squareup.com');
 
     return { 
       success: true,
@@ -55,6 +53,31 @@ export function generateIdempotencyKey(): string {
   return `${Date.now()}-${Math.random().toString(36).substring(7)}`;
 }
 
+// Member fields derived from a Square customer (sync-customers and the customer.* webhooks)
+export function squareCustomerToMember(customer: any) {
+  // Better name parsing from Square customer data
+  let fullName = 'Unknown';
+  if (customer.given_name && customer.family_name) {
+    fullName = `${customer.given_name} ${customer.family_name}`;
+  } else if (customer.given_name) {
+    fullName = customer.given_name;
+  } else if (customer.family_name) {
+    fullName = customer.family_name;
+  } else if (customer.nickname) {
+    fullName = customer.nickname;
+  } else if (customer.company_name) {
+    fullName = customer.company_name;
+  }
+
+  return {
+    email: customer.email_address?.email_address || null,
+    name: fullName,
+    phone: customer.phone_number?.phone_number || null,
+    square_customer_id: customer.id,
+    has_payment_method: !!(customer.cards && customer.cards.length > 0),
+  };
+}
+
 // List all customers
 export async function listCustomers(wineClubId: string) {
   const configResult = await getSquareConfig(wineClubId);
@@ -66,7 +89,7 @@ export async function listCustomers(wineClubId: string) {
   const { token, baseUrl } = configResult;
   
   try {
-    const response = await fetch(`${baseUrl}/v2/customers`, {
+    const response = await timedFetch(`${baseUrl}/v2/customers`, {
       headers: {
         'Authorization': `Bearer ${token}`,
         'Square-Version': '2024-01-18',
@@ -97,7 +120,7 @@ export async function listCustomerSegments(wineClubId: string) {
   const { token, baseUrl } = configResult;
   
   try {
-    const response = await fetch(`${baseUrl}/v2/customers/segments`, {
+    const response = await timedFetch(`${baseUrl}/v2/customers/segments`, {
       headers: {
         'Authorization': `Bearer ${token}`,
         'Square-Version': '2024-01-18',
@@ -128,7 +151,7 @@ export async function getCustomerSegment(wineClubId: string, segmentId: string)
   const { token, baseUrl } = configResult;
   
   try {
-    const response = await fetch(`${baseUrl}/v2/customers/segments/${segmentId}`, {
+    const response = await timedFetch(`${baseUrl}/v2/customers/segments/${segmentId}`, {
       headers: {
         'Authorization': `Bearer ${token}`,
         'Square-Version': '2024-01-18',
@@ -159,7 +182,7 @@ export async function createCustomerSegment(wineClubId: string, segmentName: str
   const { token, baseUrl } = configResult;
 
   try {
-    const response = await fetch(`${baseUrl}/v2/customers/segments`, {
+    const response = await timedFetch(`${baseUrl}/v2/customers/segments`, {
       method: 'POST',
       headers: {
         'Authorization': `Bearer ${token}`,
@@ -198,7 +221,7 @@ export async function addCustomerToSegment(wineClubId: string, customerId: strin
 
   try {
     // First, get the customer to update their segment_ids
-    const customerResponse = await fetch(`${baseUrl}/v2/customers/${customerId}`, {
+    const customerResponse = await timedFetch(`${baseUrl}/v2/customers/${customerId}`, {
       headers: {
         'Authorization': `Bearer ${token}`,
         'Square-Version': '2024-01-18',
@@ -219,7 +242,7 @@ export async function addCustomerToSegment(wineClubId: string, customerId: strin
     const updatedSegments = [...currentSegments, segmentId];
 
     // Update customer with new segment
-    const updateResponse = await fetch(`${baseUrl}/v2/customers/${customerId}`, {
+    const updateResponse = await timedFetch(`${baseUrl}/v2/customers/${customerId}`, {
       method: 'PUT',
       headers: {
         'Authorization': `Bearer ${token}`,
@@ -256,7 +279,7 @@ export async function removeCustomerFromSegment(customerId: string, segmentId: s
 
   try {
     // First, get the customer to update their segment_ids
-    const customerResponse = await fetch(`${baseUrl}/v2/customers/${customerId}`, {
+    const customerResponse = await timedFetch(`${baseUrl}/v2/customers/${customerId}`, {
       headers: {
         'Authorization': `Bearer ${token}`,
         'Square-Version': '2024-01-18',
@@ -277,7 +300,7 @@ export async function removeCustomerFromSegment(customerId: string, segmentId: s
     const updatedSegments = currentSegments.filter(id => id !== segmentId);
 
     // Update customer with updated segments
-    const updateResponse = await fetch(`${baseUrl}/v2/customers/${customerId}`, {
+    const updateResponse = await timedFetch(`${baseUrl}/v2/customers/${customerId}`, {
       method: 'PUT',
       headers: {
         'Authorization': `Bearer ${token}`,
@@ -313,7 +336,7 @@ export async function getCustomersInSegment(segmentId: string) {
   }
 
   try {
-    const response = await fetch(`${baseUrl}/v2/customers/search`, {
+    const response = await timedFetch(`${baseUrl}/v2/customers/search`, {
       method: 'POST',
       headers: {
         'Authorization': `Bearer ${token}`,
@@ -352,7 +375,7 @@ export async function createOrder(orderData: any) {
   }
 
   try {
-    const response = await fetch(`${baseUrl}/v2/orders`, {
+    const response = await timedFetch(`${baseUrl}/v2/orders`, {
       method: 'POST',
       headers: {
         'Authorization': `Bearer ${token}`,
@@ -389,7 +412,7 @@ export async function createPayment(paymentData: any) {
   }
 
   try {
-    const response = await fetch(`${baseUrl}/v2/payments`, {
+    const response = await timedFetch(`${baseUrl}/v2/payments`, {
       method: 'POST',
       headers: {
         'Authorization': `Bearer ${token}`,
@@ -427,7 +450,7 @@ export async function createCard(customerId: string, sourceId: string, idempoten
   }
 
   try {
-    const response = await fetch(`${baseUrl}/v2/cards`, {
+    const response = await timedFetch(`${baseUrl}/v2/cards`, {
       method: 'POST',
       headers: {
         'Authorization': `Bearer ${token}`,
@@ -465,7 +488,7 @@ export async function createWineClubShipment(shipmentData: any) {
 
   try {
     // Create order for the shipment
-    const orderResponse = await fetch(`${baseUrl}/v2/orders`, {
+    const orderResponse = await timedFetch(`${baseUrl}/v2/orders`, {
       method: 'POST',
       headers: {
         'Authorization': `Bearer ${token}`,
@@ -494,3 +517,66 @@ export async function createWineClubShipment(shipmentData: any) {
     return { success: false, error: error.message };
   }
 }
+
+// Create a customer and store a card on file (used by the public signup widget)
+export async function createCustomerWithCard(
+  wineClubId: string,
+  customerData: { givenName: string; familyName?: string; email: string; phone?: string | null },
+  sourceId: string
+) {
+  const configResult = await getSquareConfig(wineClubId);
+
+  if (!configResult.success) {
+    return { success: false, error: configResult.error };
+  }
+
+  const { token, baseUrl } = configResult;
+  const headers = {
+    'Authorization': `Bearer ${token}`,
+    'Square-Version': '2024-01-18',
+    'Content-Type': 'application/json'
+  };
+
+  try {
+    const customerResponse = await timedFetch(`${baseUrl}/v2/customers`, {
+      method: 'POST',
+      headers,
+      body: JSON.stringify({
+        idempotency_key: generateIdempotencyKey(),
+        given_name: customerData.givenName,
+        family_name: customerData.familyName || undefined,
+        email_address: customerData.email,
+        phone_number: customerData.phone || undefined
+      })
+    });
+
+    if (!customerResponse.ok) {
+      const errorText = await customerResponse.text();
+      return { success: false, error: errorText };
+    }
+
+    const { customer } = await customerResponse.json();
+
+    const cardResponse = await timedFetch(`${baseUrl}/v2/cards`, {
+      method: 'POST',
+      headers,
+      body: JSON.stringify({
+        idempotency_key: generateIdempotencyKey(),
+        source_id: sourceId,
+        card: {
+          customer_id: customer.id
+        }
+      })
+    });
+
+    if (!cardResponse.ok) {
+      const errorText = await cardResponse.text();
+      return { success: false, customer, error: errorText };
+    }
+
+    const cardData = await cardResponse.json();
+    return { success: true, customer, card: cardData.card };
+  } catch (error: any) {
+    return { success: false, error: error.message };
+  }
+}
@@ -0,0 +1,285 @@
+import { Hono } from "npm:hono";
+import { serverEnv } from "./env.tsx";
+import { squareCustomerToMember } from "./square-helpers.tsx";
+import { configuredClubIds, markCatalogStale } from "./square-catalog-service.tsx";
+import { expireSelectionIndex } from "./selection-index.tsx";
+import { TtlCache } from "./ttl-cache.tsx";
+import { log } from "./observability.tsx";
+import { serviceClient } from "./service-client.tsx";
+
+// Square webhook receiver (see square-webhooks.sql).
+// Every delivery is checked against x-square-hmacsha256-signature, recorded once per event_id
+// in square_webhook_events, and applied as a targeted update: catalog and inventory changes
+// stamp the club's catalog stale (square_catalog_versions) and expire its selection index,
+// customer events update
+// the matching members and payment events settle member_selections billing. Square retries
+// until it gets a 2xx, so a failed event answers 500 and is reprocessed on the retry.
+//
+// Served by the make-server-9d538b9c-public function, which runs without JWT verification.
+// Subscribe Square to .../make-server-9d538b9c-public/square/webhooks (optionally
+// ?wine_club_id=<id> for accounts whose events carry no location) and set SQUARE_WEBHOOK_URL
+// to that exact URL.
+
+const squareWebhooks = new Hono();
+
+const supabase = serviceClient();
+
+const LOCATION_TTL_MS = 5 * 60 * 1000;
+// An event still 'received' this long after it was claimed was dropped mid-processing
+// (crash, timeout) and is handed to the next delivery
+const CLAIM_LEASE_MS = 60 * 1000;
+const clubsByLocation = new TtlCache<string | null>(LOCATION_TTL_MS);
+
+type Outcome = { status: "processed" | "ignored"; result: Record<string, unknown> };
+type Handler = (event: any, wineClubId: string | null) => Promise<Outcome>;
+
+const encoder = new TextEncoder();
+
+// HMAC-SHA256 over notification URL + raw body, base64, compared in constant time
+export async function verifySquareSignature(signatureKey: string, notificationUrl: string, body: string, signature: string) {
+  const key = await crypto.subtle.importKey("raw", encoder.encode(signatureKey), { name: "HMAC", hash: "SHA-256" }, false, ["sign"]);
+  const digest = new Uint8Array(await crypto.subtle.sign("HMAC", key, encoder.encode(notificationUrl + body)));
+  const expected = btoa(String.fromCharCode(...digest));
+
+  if (expected.length !== signature.length) return false;
+  let diff = 0;
+  for (let i = 0; i < expected.length; i++) diff |= expected.charCodeAt(i) ^ signature.charCodeAt(i);
+  return diff === 0;
+}
+
+// The URL Square signed: the registered URL plus whatever query string the delivery carried
+function notificationUrl(requestUrl: string) {
+  const incoming = new URL(requestUrl);
+  if (!serverEnv.SQUARE_WEBHOOK_URL) return incoming.toString();
+  const registered = new URL(serverEnv.SQUARE_WEBHOOK_URL);
+  if (!registered.search) registered.search = incoming.search;
+  return registered.toString();
+}
+
+function clubForLocation(locationId: string | undefined) {
+  if (!locationId) return Promise.resolve(null);
+  return clubsByLocation.getOrLoad(locationId, async () => {
+    const { data } = await supabase
+      .from('wine_clubs')
+      .select('id')
+      .eq('square_location_id', locationId)
+      .limit(1)
+      .maybeSingle();
+    return data ? String(data.id) : null;
+  });
+}
+
+// The catalog service and selection index live in the main function; both pick up the change
+// from the database
+async function expireClubs(clubs: string[]) {
+  await markCatalogStale(clubs);
+  for (const club of clubs) await expireSelectionIndex(club);
+}
+
+const handleCatalogUpdated: Handler = async (_event, wineClubId) => {
+  // catalog.version.updated only says "something changed"; without a club, expire every configured one
+  const clubs = wineClubId ? [wineClubId] : await configuredClubIds();
+  await expireClubs(clubs);
+  return { status: clubs.length ? "processed" : "ignored", result: { expired: clubs } };
+};
+
+const handleInventoryUpdated: Handler = async (event, wineClubId) => {
+  const counts: any[] = event.data?.object?.inventory_counts || [];
+
+  // Counts are per location; each location belongs to (at most) one club
+  const byClub = new Map<string, any[]>();
+  for (const count of counts) {
+    const club = (await clubForLocation(count.location_id)) || wineClubId;
+    if (!club) continue;
+    if (!byClub.has(club)) byClub.set(club, []);
+    byClub.get(club)!.push(count);
+  }
+
+  // Stock decides which wines members may pick, so the selection index goes stale too
+  const clubs = Array.from(byClub.keys());
+  await expireClubs(clubs);
+  const perClub = Object.fromEntries(Array.from(byClub, ([club, clubCounts]) => [club, clubCounts.length]));
+  return { status: clubs.length ? "processed" : "ignored", result: { counts: counts.length, expired: perClub } };
+};
+
+const handleCustomerUpserted: Handler = async (event, wineClubId) => {
+  const customer = event.data?.object?.customer;
+  if (!customer?.id) return { status: "ignored", result: { reason: "no customer in payload" } };
+
+  // Webhook customers carry no cards (the deprecated customer.cards is never sent), so
+  // has_payment_method is left to the customer sync and the card-on-file lookup
+  const { email, has_payment_method: _cards, ...fields } = squareCustomerToMember(customer);
+  const updates = email ? { ...fields, email } : fields;
+
+  const { data: updated, error } = await supabase
+    .from('members')
+    .update({ ...updates, updated_at: new Date().toISOString() })
+    .eq('square_customer_id', customer.id)
+    .select('id, wine_club_id');
+  if (error) throw error;
+  if (updated && updated.length > 0) {
+    return { status: "processed", result: { updated: updated.length } };
+  }
+
+  // A new Square customer only becomes a member when we know which club it belongs to
+  if (!wineClubId || !email) {
+    return { status: "ignored", result: { reason: wineClubId ? "customer has no email" : "no wine club for customer" } };
+  }
+  const { data: member, error: insertError } = await supabase
+    .from('members')
+    .upsert({ wine_club_id: wineClubId, ...updates, status: 'active' }, { onConflict: 'wine_club_id,email' })
+    .select('id')
+    .single();
+  if (insertError) throw insertError;
+  return { status: "processed", result: { member_id: member.id } };
+};
+
+const handleCustomerDeleted: Handler = async (event) => {
+  const customerId = event.data?.object?.customer?.id || event.data?.id;
+  if (!customerId) return { status: "ignored", result: { reason: "no customer id" } };
+
+  // Keep the member and its history; it just can no longer be billed
+  const { data, error } = await supabase
+    .from('members')
+    .update({ status: 'cancelled', has_payment_method: false, updated_at: new Date().toISOString() })
+    .eq('square_customer_id', customerId)
+    .select('id');
+  if (error) throw error;
+  return { status: data?.length ? "processed" : "ignored", result: { cancelled: data?.length || 0 } };
+};
+
+const PAYMENT_BILLING_STATUS: Record<string, string> = {
+  COMPLETED: "paid",
+  FAILED: "failed",
+  CANCELED: "failed",
+};
+
+const handlePayment: Handler = async (event) => {
+  const payment = event.data?.object?.payment;
+  const billingStatus = payment && PAYMENT_BILLING_STATUS[payment.status];
+  if (!billingStatus) {
+    return { status: "ignored", result: { payment_status: payment?.status || null } };
+  }
+
+  // The billing run records the order before the payment, so match on either id
+  const match = [`square_payment_id.eq.${payment.id}`];
+  if (payment.order_id) match.push(`square_order_id.eq.${payment.order_id}`);
+
+  let query = supabase
+    .from('member_selections')
+    .update(billingStatus === "paid"
+      ? { billing_status: "paid", square_payment_id: payment.id, billed_at: payment.updated_at || new Date().toISOString(), billing_error: null }
+      : { billing_status: "failed", square_payment_id: payment.id, billing_error: `Square payment ${payment.status}` })
+    .or(match.join(','));
+  // A late FAILED event never overrides a selection that was already paid
+  if (billingStatus === "failed") query = query.neq('billing_status', 'paid');
+
+  const { data, error } = await query.select('id');
+  if (error) throw error;
+  return { status: data?.length ? "processed" : "ignored", result: { billing_status: billingStatus, selections: data?.length || 0 } };
+};
+
+const HANDLERS: Record<string, Handler> = {
+  "catalog.version.updated": handleCatalogUpdated,
+  "inventory.count.updated": handleInventoryUpdated,
+  "customer.created": handleCustomerUpserted,
+  "customer.updated": handleCustomerUpserted,
+  "customer.deleted": handleCustomerDeleted,
+  "payment.created": handlePayment,
+  "payment.updated": handlePayment,
+};
+
+async function resolveClub(event: any, hint: string | null) {
+  if (hint) return hint;
+  const object = event.data?.object || {};
+  return clubForLocation(object.payment?.location_id || object.inventory_counts?.[0]?.location_id);
+}
+
+// Applies one event and records the outcome on its square_webhook_events row
+export async function processSquareEvent(event: any, wineClubIdHint: string | null = null) {
+  const handler = HANDLERS[event.type];
+  const wineClubId = await resolveClub(event, wineClubIdHint);
+
+  let outcome: Outcome;
+  try {
+    outcome = handler
+      ? await handler(event, wineClubId)
+      : { status: "ignored", result: { reason: `unhandled event type ${event.type}` } };
+  } catch (error) {
+    await supabase
+      .from('square_webhook_events')
+      .update({ status: 'failed', error: String(error.message).slice(0, 1000), wine_club_id: wineClubId, processed_at: new Date().toISOString() })
+      .eq('event_id', event.event_id);
+    throw error;
+  }
+
+  await supabase
+    .from('square_webhook_events')
+    .update({ status: outcome.status, result: outcome.result, error: null, wine_club_id: wineClubId, processed_at: new Date().toISOString() })
+    .eq('event_id', event.event_id);
+  return { ...outcome, wine_club_id: wineClubId };
+}
+
+// Records the event once; returns false when this event_id was already handled or another
+// delivery is processing it right now
+async function claimEvent(event: any) {
+  const { data, error } = await supabase
+    .from('square_webhook_events')
+    .upsert({
+      event_id: event.event_id,
+      event_type: event.type,
+      merchant_id: event.merchant_id || null,
+      payload: event,
+    }, { onConflict: 'event_id', ignoreDuplicates: true })
+    .select('event_id');
+  if (error) throw error;
+  if (data && data.length > 0) return true;
+
+  // Seen before: retry it if the last attempt failed or its lease ran out. The conditional
+  // update is the claim, so concurrent redeliveries cannot both win.
+  const leaseExpired = new Date(Date.now() - CLAIM_LEASE_MS).toISOString();
+  const { data: reclaimed, error: reclaimError } = await supabase
+    .from('square_webhook_events')
+    .update({ status: 'received', received_at: new Date().toISOString() })
+    .eq('event_id', event.event_id)
+    .or(`status.eq.failed,and(status.eq.received,received_at.lt."${leaseExpired}")`)
+    .select('event_id');
+  if (reclaimError) throw reclaimError;
+  return !!reclaimed && reclaimed.length > 0;
+}
+
+squareWebhooks.post("/square/webhooks", async (c) => {
+  if (!serverEnv.SQUARE_WEBHOOK_SIGNATURE_KEY) {
+    log.error('Square webhook received but SQUARE_WEBHOOK_SIGNATURE_KEY is not set');
+    return c.json({ error: 'Webhook signature key not configured' }, 503);
+  }
+
+  const body = await c.req.text();
+  const signature = c.req.header('x-square-hmacsha256-signature') || '';
+  if (!signature || !(await verifySquareSignature(serverEnv.SQUARE_WEBHOOK_SIGNATURE_KEY, notificationUrl(c.req.url), body, signature))) {
+    return c.json({ error: 'Invalid signature' }, 401);
+  }
+
+  let event: any;
+  try {
+    event = JSON.parse(body);
+  } catch {
+    return c.json({ error: 'Invalid JSON' }, 400);
+  }
+  if (!event?.event_id || !event?.type) {
+    return c.json({ error: 'event_id and type are required' }, 400);
+  }
+
+  try {
+    if (!(await claimEvent(event))) {
+      return c.json({ success: true, duplicate: true, event_id: event.event_id });
+    }
+    const outcome = await processSquareEvent(event, c.req.query('wine_club_id') || null);
+    return c.json({ success: true, event_id: event.event_id, ...outcome });
+  } catch (error) {
+    log.error(`Error processing Square webhook ${event.event_id} (${event.type})`, error);
+    return c.json({ error: error.message, event_id: event.event_id }, 500);
+  }
+});
+
+export default squareWebhooks;
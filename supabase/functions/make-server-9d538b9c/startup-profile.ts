@@ -0,0 +1,151 @@
+// Startup profiler: import and initialization cost of every module of the function.
+//
+//   deno run -A supabase/functions/make-server-9d538b9c/startup-profile.ts [--runs 5] [--json out.json]
+//
+// Each module is imported in fresh Deno processes (median of --runs):
+//   isolated     the module together with everything it imports, from an empty process
+//   incremental  what it adds when the modules before it in index.tsx's import order are
+//                already loaded - the incremental column sums to the index.tsx cold start
+// index.tsx itself is imported with Deno.serve stubbed out. Modules index.tsx loads lazily
+// (startup.tsx lazyModule/lazyRoutes) are listed under "lazy": they cost nothing at cold start
+// and their figure is paid by the first request that needs them.
+// Remote dependencies are cached by a warm-up run first, so the figures are compile + evaluate.
+
+const FUNCTION_DIR = new URL(".", import.meta.url);
+
+// index.tsx's static import order, third-party first since everything depends on them
+const EAGER = [
+  "npm:hono",
+  "npm:hono/cors",
+  "node:async_hooks",
+  "jsr:@supabase/supabase-js@2.49.8",
+  "./env.tsx",
+  "./startup.tsx",
+  "./observability.tsx",
+  "./service-client.tsx",
+  "./http-cache.tsx",
+  "./ttl-cache.tsx",
+  "./kv_store.tsx",
+  "./square-helpers.tsx",
+  "./square-catalog.tsx",
+  "./image-proxy.tsx",
+  "./square-catalog-service.tsx",
+  "./square-live-inventory.tsx",
+  "./club-profile.tsx",
+  "./selection-index.tsx",
+  "./member-portal.tsx",
+  "./public-signup.tsx",
+  "./fulfillment.tsx",
+  "./index.tsx",
+];
+
+const LAZY = [
+  "./env-status.tsx",
+  "./email-service.tsx",
+  "./shipment-notifications.tsx",
+  "./billing-run.tsx",
+  "./tracking-import.tsx",
+  "./csv.tsx",
+  "./database-setup.tsx",
+];
+
+function parseArgs(args: string[]) {
+  const options = { runs: 5, json: "" };
+  for (let i = 0; i < args.length; i++) {
+    if (args[i] === "--runs") options.runs = Math.max(1, parseInt(args[++i], 10) || 5);
+    else if (args[i] === "--json") options.json = args[++i];
+  }
+  return options;
+}
+
+function resolve(specifier: string) {
+  return specifier.startsWith("./") ? new URL(specifier, FUNCTION_DIR).href : specifier;
+}
+
+// Imports `preload` untimed, then times importing `target`; prints the milliseconds
+function probe(preload: string[], target: string) {
+  return `
+    Deno.serve = () => ({ finished: Promise.resolve(), shutdown: async () => {}, ref() {}, unref() {}, addr: {} });
+    for (const specifier of ${JSON.stringify(preload.map(resolve))}) await import(specifier);
+    const started = performance.now();
+    await import(${JSON.stringify(resolve(target))});
+    console.log(JSON.stringify({ ms: performance.now() - started }));
+    Deno.exit(0);
+  `;
+}
+
+// Module-level clients need a Supabase URL and key, but nothing is contacted while importing
+const CHILD_ENV = {
+  SUPABASE_URL: Deno.env.get("SUPABASE_URL") || "http://127.0.0.1:54321",
+  SUPABASE_ANON_KEY: Deno.env.get("SUPABASE_ANON_KEY") || "startup-profile",
+  SUPABASE_SERVICE_ROLE_KEY: Deno.env.get("SUPABASE_SERVICE_ROLE_KEY") || "startup-profile",
+  LOG_LEVEL: "error",
+};
+
+async function measure(preload: string[], target: string) {
+  const { code, stdout, stderr } = await new Deno.Command(Deno.execPath(), {
+    args: ["eval", "--ext=ts", probe(preload, target)],
+    env: CHILD_ENV,
+    stdout: "piped",
+    stderr: "piped",
+  }).output();
+  if (code !== 0) {
+    throw new Error(`${target}: ${new TextDecoder().decode(stderr).trim()}`);
+  }
+  const lines = new TextDecoder().decode(stdout).trim().split("\n");
+  return JSON.parse(lines[lines.length - 1]).ms as number;
+}
+
+function median(values: number[]) {
+  const ordered = [...values].sort((a, b) => a - b);
+  const middle = Math.floor(ordered.length / 2);
+  return ordered.length % 2 ? ordered[middle] : (ordered[middle - 1] + ordered[middle]) / 2;
+}
+
+async function medianOf(runs: number, preload: string[], target: string) {
+  const samples: number[] = [];
+  for (let run = 0; run < runs; run++) samples.push(await measure(preload, target));
+  return median(samples);
+}
+
+const { runs, json } = parseArgs(Deno.args);
+
+console.log("Warming the module cache...");
+await measure([], "./index.tsx");
+for (const specifier of LAZY) await measure([], specifier);
+
+const rows: Array<{ module: string; isolated_ms: number; incremental_ms: number; lazy: boolean }> = [];
+for (let i = 0; i < EAGER.length; i++) {
+  rows.push({
+    module: EAGER[i],
+    isolated_ms: await medianOf(runs, [], EAGER[i]),
+    incremental_ms: await medianOf(runs, EAGER.slice(0, i), EAGER[i]),
+    lazy: false,
+  });
+}
+for (const specifier of LAZY) {
+  rows.push({
+    module: specifier,
+    isolated_ms: await medianOf(runs, [], specifier),
+    // What the first request that needs it pays on an isolate that already serves index.tsx
+    incremental_ms: await medianOf(runs, ["./index.tsx"], specifier),
+    lazy: true,
+  });
+}
+
+const format = (ms: number) => ms.toFixed(1).padStart(12);
+console.log(`\n${"module".padEnd(36)}${"isolated ms".padStart(12)}${"incr. ms".padStart(12)}`);
+for (const row of rows.filter((r) => !r.lazy)) {
+  console.log(`${row.module.padEnd(36)}${format(row.isolated_ms)}${format(row.incremental_ms)}`);
+}
+const total = rows.filter((r) => !r.lazy).reduce((sum, r) => sum + r.incremental_ms, 0);
+console.log(`${"cold start (sum of incremental)".padEnd(48)}${format(total)}`);
+console.log("\nlazy (loaded on first use)");
+for (const row of rows.filter((r) => r.lazy)) {
+  console.log(`${row.module.padEnd(36)}${format(row.isolated_ms)}${format(row.incremental_ms)}`);
+}
+
+if (json) {
+  await Deno.writeTextFile(json, JSON.stringify({ runs, cold_start_ms: total, modules: rows }, null, 2));
+  console.log(`\nReport written to ${json}`);
+}
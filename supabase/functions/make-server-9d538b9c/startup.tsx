@@ -0,0 +1,60 @@
+import type { Handler } from "npm:hono";
+
+// Cold-start bookkeeping for the make-server-9d538b9c isolate. index.tsx imports this module
+// first, so it is evaluated before any other module: performance.now() here is the time the
+// runtime spent booting the worker and loading the module graph, and markReady() at the end
+// of index.tsx adds the cost of evaluating every static import and module-level init.
+// lazyModule()/lazyRoutes() defer rarely used modules (email, batch jobs, env-status) to their
+// first request and record what loading them cost. The figures are part of /internal/metrics;
+// startup-profile.ts breaks import cost down per module.
+
+const evaluationStartedMs = performance.now();
+let readyMs: number | null = null;
+let requests = 0;
+const lazyLoadMs: Record<string, number> = {};
+
+export function markReady() {
+  readyMs ??= performance.now();
+}
+
+// True for the isolate's first request, which pays for the cold start
+export function noteRequest() {
+  return ++requests === 1;
+}
+
+// Loads a module on first use and shares the promise; a failed load is retried next time
+export function lazyModule<T>(name: string, load: () => Promise<T>): () => Promise<T> {
+  let pending: Promise<T> | null = null;
+  return () => {
+    pending ??= (async () => {
+      const started = performance.now();
+      try {
+        return await load();
+      } finally {
+        lazyLoadMs[name] = Math.round(performance.now() - started);
+      }
+    })().catch((error) => {
+      pending = null;
+      throw error;
+    });
+    return pending;
+  };
+}
+
+// Mounts a Hono sub-app that is only imported when one of its routes is hit
+export function lazyRoutes(
+  name: string,
+  load: () => Promise<{ default: { fetch: (request: Request, env?: unknown) => Response | Promise<Response> } }>,
+): Handler {
+  const routes = lazyModule(name, load);
+  return async (c) => (await routes()).default.fetch(c.req.raw, c.env);
+}
+
+export function startupReport() {
+  return {
+    boot_ms: Math.round(evaluationStartedMs),
+    module_init_ms: readyMs === null ? null : Math.round(readyMs - evaluationStartedMs),
+    requests,
+    lazy_modules_ms: { ...lazyLoadMs },
+  };
+}
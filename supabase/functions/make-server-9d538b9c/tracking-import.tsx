@@ -0,0 +1,235 @@
+// Bulk tracking-number import
+// Takes parsed CSV rows (see csv.tsx), resolves each batch of order numbers against the
+// club's billed selections (idx_member_selections_square_order), and writes tracking numbers
+// onto the Square orders' shipment fulfillments. Orders are fetched 100 at a time with
+// batch-retrieve and updated concurrently; every row gets its own result so one bad line
+// doesn't fail the file.
+
+import type { SupabaseClient } from "jsr:@supabase/supabase-js@2.49.8";
+import { getSquareConfig } from "./square-helpers.tsx";
+import { createRateLimiter, runWithConcurrency } from "./batch-utils.tsx";
+import { timedFetch } from "./observability.tsx";
+
+// Square's batch-retrieve limit
+const BATCH_SIZE = 100;
+
+export type TrackingRowStatus = "updated" | "unmatched" | "invalid" | "duplicate" | "failed";
+
+export interface TrackingRowResult {
+  row: number;
+  order_number: string;
+  tracking_number: string;
+  status: TrackingRowStatus;
+  square_order_id?: string;
+  error?: string;
+}
+
+export interface TrackingImportReport {
+  summary: Record<TrackingRowStatus, number> & { rows: number };
+  results: TrackingRowResult[];
+}
+
+export interface TrackingImportOptions {
+  shipmentId?: string;
+  concurrency?: number;
+  requestsPerSecond?: number;
+}
+
+interface PendingRow {
+  result: TrackingRowResult;
+  carrier?: string;
+}
+
+const UUID_PATTERN = /^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$/i;
+
+// Order number -> Square order id for one batch of rows. Accepts the Square order id itself
+// or the member_selection id used as the order's reference_id by billing runs; only the
+// batch's numbers are looked up, never the club's whole order history.
+async function resolveOrderIds(supabase: SupabaseClient, wineClubId: string, orderNumbers: string[], shipmentId?: string) {
+  const lookup = (column: "square_order_id" | "id", values: string[]) => {
+    if (values.length === 0) return Promise.resolve({ data: [] as any[], error: null });
+    let query = supabase
+      .from("member_selections")
+      .select("id, square_order_id, shipment:shipments!inner(wine_club_id)")
+      .eq("shipment.wine_club_id", wineClubId)
+      .not("square_order_id", "is", null)
+      .in(column, values);
+    if (shipmentId) query = query.eq("shipment_id", shipmentId);
+    return query;
+  };
+
+  const [byOrder, bySelection] = await Promise.all([
+    lookup("square_order_id", orderNumbers),
+    lookup("id", orderNumbers.filter((number) => UUID_PATTERN.test(number))),
+  ]);
+  if (byOrder.error) throw byOrder.error;
+  if (bySelection.error) throw bySelection.error;
+
+  const index = new Map<string, string>();
+  for (const row of [...(byOrder.data || []), ...(bySelection.data || [])]) {
+    index.set(row.square_order_id, row.square_order_id);
+    index.set(row.id, row.square_order_id);
+  }
+  return index;
+}
+
+// Locates the order/tracking/carrier columns the same way the fulfillment page always has
+function resolveColumns(header: string[]) {
+  const normalized = header.map((h) => h.trim().toLowerCase());
+  return {
+    order: normalized.findIndex((h) => h.includes("order")),
+    tracking: normalized.findIndex((h) => h.includes("tracking")),
+    carrier: normalized.findIndex((h) => h.includes("carrier")),
+  };
+}
+
+export async function importTrackingRows(
+  supabase: SupabaseClient,
+  wineClubId: string,
+  rows: AsyncIterable<string[]> | Iterable<string[]>,
+  options: TrackingImportOptions = {},
+): Promise<TrackingImportReport> {
+  const square = await getSquareConfig(wineClubId);
+  if (!square.success) {
+    throw new Error(square.error);
+  }
+
+  const headers = {
+    "Authorization": `Bearer ${square.token}`,
+    "Square-Version": "2024-01-18",
+    "Content-Type": "application/json",
+  };
+  const throttle = createRateLimiter(options.requestsPerSecond || 10);
+  const concurrency = Math.max(1, options.concurrency || 4);
+
+  const results: TrackingRowResult[] = [];
+  const seen = new Set<string>();
+  let pending: PendingRow[] = [];
+
+  const updateOrder = async (order: any, entry: PendingRow) => {
+    const fulfillment = (order.fulfillments || []).find((f: any) => f.type === "SHIPMENT");
+    if (!fulfillment) {
+      entry.result.status = "failed";
+      entry.result.error = "Order has no shipment fulfillment";
+      return;
+    }
+
+    await throttle();
+    const response = await timedFetch(`${square.baseUrl}/v2/orders/${order.id}`, {
+      method: "PUT",
+      headers,
+      body: JSON.stringify({
+        idempotency_key: `tracking-${order.id}-${entry.result.tracking_number}`.slice(0, 192),
+        order: {
+          location_id: order.location_id,
+          version: order.version,
+          fulfillments: [{
+            uid: fulfillment.uid,
+            shipment_details: {
+              tracking_number: entry.result.tracking_number,
+              ...(entry.carrier ? { carrier: entry.carrier } : {}),
+            },
+          }],
+        },
+      }),
+    });
+
+    if (!response.ok) {
+      entry.result.status = "failed";
+      entry.result.error = await response.text();
+      return;
+    }
+    entry.result.status = "updated";
+  };
+
+  const flush = async () => {
+    if (pending.length === 0) return;
+    const batch = pending;
+    pending = [];
+
+    try {
+      // Numbers that aren't billed selections are tried as raw Square order ids
+      const index = await resolveOrderIds(supabase, wineClubId, batch.map((entry) => entry.result.order_number), options.shipmentId);
+      for (const entry of batch) {
+        entry.result.square_order_id = index.get(entry.result.order_number) || entry.result.order_number;
+      }
+
+      await throttle();
+      const response = await timedFetch(`${square.baseUrl}/v2/orders/batch-retrieve`, {
+        method: "POST",
+        headers,
+        body: JSON.stringify({
+          location_id: square.locationId,
+          order_ids: batch.map((entry) => entry.result.square_order_id),
+        }),
+      });
+      if (!response.ok) throw new Error(await response.text());
+
+      const { orders } = await response.json();
+      const byId = new Map<string, any>((orders || []).map((order: any) => [order.id, order]));
+
+      await runWithConcurrency(batch, concurrency, async (entry) => {
+        const order = byId.get(entry.result.square_order_id!);
+        if (!order) {
+          entry.result.status = "unmatched";
+          entry.result.error = "Order not found in Square";
+          return;
+        }
+        try {
+          await updateOrder(order, entry);
+        } catch (error) {
+          entry.result.status = "failed";
+          entry.result.error = error.message;
+        }
+      });
+    } catch (error) {
+      for (const entry of batch) {
+        entry.result.status = "failed";
+        entry.result.error = error.message;
+      }
+    }
+  };
+
+  let columns: ReturnType<typeof resolveColumns> | null = null;
+  let rowNumber = 0;
+
+  for await (const values of rows as AsyncIterable<string[]>) {
+    rowNumber++;
+    if (!columns) {
+      columns = resolveColumns(values);
+      if (columns.order === -1 || columns.tracking === -1) {
+        throw new Error('CSV must contain "Order Number" and "Tracking Number" columns');
+      }
+      continue;
+    }
+
+    const orderNumber = (values[columns.order] || "").trim();
+    const trackingNumber = (values[columns.tracking] || "").trim();
+    const result: TrackingRowResult = { row: rowNumber, order_number: orderNumber, tracking_number: trackingNumber, status: "failed" };
+    results.push(result);
+
+    if (!orderNumber || !trackingNumber) {
+      result.status = "invalid";
+      result.error = "Missing order number or tracking number";
+      continue;
+    }
+    if (seen.has(orderNumber)) {
+      result.status = "duplicate";
+      continue;
+    }
+    seen.add(orderNumber);
+
+    pending.push({
+      result,
+      carrier: columns.carrier !== -1 ? (values[columns.carrier] || "").trim() || undefined : undefined,
+    });
+
+    if (pending.length >= BATCH_SIZE) await flush();
+  }
+  await flush();
+
+  const summary = { rows: results.length, updated: 0, unmatched: 0, invalid: 0, duplicate: 0, failed: 0 };
+  for (const result of results) summary[result.status]++;
+
+  return { summary, results };
+}
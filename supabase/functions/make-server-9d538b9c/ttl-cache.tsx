@@ -0,0 +1,59 @@
+// Small in-memory cache with per-entry expiry and a size cap.
+// Lives for the lifetime of the edge function isolate, so it only absorbs bursts
+// (e.g. thousands of members opening the same shipment email) - never rely on it for correctness.
+
+interface Entry<V> {
+  value: V;
+  expiresAt: number;
+}
+
+export class TtlCache<V> {
+  private entries = new Map<string, Entry<V>>();
+  private inflight = new Map<string, Promise<V>>();
+
+  constructor(private ttlMs: number, private maxEntries = 500) {}
+
+  get(key: string): V | undefined {
+    const entry = this.entries.get(key);
+    if (!entry) return undefined;
+    if (entry.expiresAt <= Date.now()) {
+      this.entries.delete(key);
+      return undefined;
+    }
+    return entry.value;
+  }
+
+  set(key: string, value: V) {
+    // Map keeps insertion order, so the first key is the oldest entry
+    if (this.entries.size >= this.maxEntries && !this.entries.has(key)) {
+      const oldest = this.entries.keys().next().value;
+      if (oldest !== undefined) this.entries.delete(oldest);
+    }
+    this.entries.set(key, { value, expiresAt: Date.now() + this.ttlMs });
+  }
+
+  delete(key: string) {
+    this.entries.delete(key);
+  }
+
+  // Returns the cached value or runs the loader once, sharing the promise between
+  // concurrent callers so a cold key only hits the database once
+  async getOrLoad(key: string, loader: () => Promise<V>): Promise<V> {
+    const cached = this.get(key);
+    if (cached !== undefined) return cached;
+
+    const pending = this.inflight.get(key);
+    if (pending) return pending;
+
+    const promise = loader()
+      .then((value) => {
+        this.set(key, value);
+        return value;
+      })
+      .finally(() => {
+        this.inflight.delete(key);
+      });
+    this.inflight.set(key, promise);
+    return promise;
+  }
+}
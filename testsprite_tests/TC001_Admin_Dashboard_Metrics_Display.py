@@ -1,6 +1,9 @@
 import asyncio
 from playwright import async_api
 from playwright.async_api import expect
+import sessions
+from pages import DashboardPage
+from perf.network import NetworkCapture, load_budgets
 
 async def run_test():
     pw = None
@@ -22,15 +25,22 @@ async def run_test():
             ],
         )
         
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
+        # Create a browser context already signed in as the demo account (saved storage_state)
+        context = await sessions.new_context(browser, "demo")
         context.set_default_timeout(5000)
         
+        # Record API latency / request counts and enforce the budgets in perf/budgets.json
+        capture = NetworkCapture(budgets=load_budgets())
+        capture.attach(context)
+        
         # Open a new page in the browser context
         page = await context.new_page()
         
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:3000", wait_until="commit", timeout=10000)
+        # Navigate to your target URL; the stored session opens straight onto the dashboard
+        async with capture.flow("dashboard"):
+            await page.goto("http://localhost:3000", wait_until="commit", timeout=10000)
+            dashboard = await DashboardPage(page).wait_until_ready()
+            await page.wait_for_load_state("networkidle")
         
         # Wait for the main page to reach DOMContentLoaded state (optional for stability)
         try:
@@ -46,18 +56,8 @@ async def run_test():
                 pass
         
         # Interact with the page elements to simulate user flow
-        # -> Click 'Login as Demo Account' button to login quickly without manual input.
-        frame = context.pages[-1]
-        # Click 'Login as Demo Account' button to login quickly without manual input
-        elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[2]/div/div[2]/button[3]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
         # -> Click the 'Fix Authentication' button to resolve the Square API token issue and enable real-time data fetching.
-        frame = context.pages[-1]
-        # Click 'Fix Authentication' button to resolve Square API Authentication Error
-        elem = frame.locator('xpath=html/body/div/div/div/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await dashboard.fix_square_auth()
         
 
         # --> Assertions to verify final state
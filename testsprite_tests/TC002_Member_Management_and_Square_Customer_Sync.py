@@ -1,6 +1,9 @@
 import asyncio
 from playwright import async_api
 from playwright.async_api import expect
+import sessions
+from pages import AdminShell
+from perf.network import NetworkCapture, load_budgets
 
 async def run_test():
     pw = None
@@ -22,10 +25,14 @@ async def run_test():
             ],
         )
         
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
+        # Create a browser context already signed in as the demo account (saved storage_state)
+        context = await sessions.new_context(browser, "demo")
         context.set_default_timeout(5000)
         
+        # Record API latency / request counts and enforce the budgets in perf/budgets.json
+        capture = NetworkCapture(budgets=load_budgets())
+        capture.attach(context)
+        
         # Open a new page in the browser context
         page = await context.new_page()
         
@@ -46,25 +53,12 @@ async def run_test():
                 pass
         
         # Interact with the page elements to simulate user flow
-        # -> Click the 'Login as Wine Club Owner' button to login as the wine club owner.
-        frame = context.pages[-1]
-        # Click the 'Login as Wine Club Owner' button to login as the wine club owner.
-        elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[2]/div/div[2]/button[3]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Click on the 'Members' button to navigate to Member Management.
-        frame = context.pages[-1]
-        # Click on the 'Members' button to navigate to Member Management.
-        elem = frame.locator('xpath=html/body/div/div/div/div/div[2]/div/div[2]/ul/li[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Click the 'Add Member' button to start adding a new member with valid details.
-        frame = context.pages[-1]
-        # Click the 'Add Member' button to add a new member.
-        elem = frame.locator('xpath=html/body/div/div/div/main/div/div/div/div[2]/button[4]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        # -> Open Member Management and start adding a new member.
+        shell = await AdminShell(page).wait_until_ready()
+        async with capture.flow("members"):
+            members = await shell.open_members()
+            await page.wait_for_load_state("networkidle")
+        await members.by_id("members-add").click()
         
 
         # --> Assertions to verify final state
@@ -1,6 +1,8 @@
 import asyncio
 from playwright import async_api
 from playwright.async_api import expect
+import sessions
+from pages import AdminShell, DashboardPage
 
 async def run_test():
     pw = None
@@ -22,8 +24,8 @@ async def run_test():
             ],
         )
         
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
+        # Create a browser context already signed in as the club owner (saved storage_state)
+        context = await sessions.new_context(browser, "owner")
         context.set_default_timeout(5000)
         
         # Open a new page in the browser context
@@ -46,39 +48,9 @@ async def run_test():
                 pass
         
         # Interact with the page elements to simulate user flow
-        # -> Click 'Login as Wine Club Owner' button to login.
-        frame = context.pages[-1]
-        # Click 'Login as Wine Club Owner' button
-        elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[2]/div/div[2]/button[3]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Logout from current session to attempt correct login.
-        frame = context.pages[-1]
-        # Click Logout button to logout from current session
-        elem = frame.locator('xpath=html/body/div/div/div/main/header/div/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Click 'Login as Wine Club Owner' button to login.
-        frame = context.pages[-1]
-        # Click 'Login as Wine Club Owner' button
-        elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[2]/div/div[2]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Navigate to Plan Management section by clicking the appropriate menu button.
-        frame = context.pages[-1]
-        # Click 'Members' button to check if Plan Management is under Members or related section
-        elem = frame.locator('xpath=html/body/div/div/div/div/div[2]/div/div[2]/ul/li[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Locate and click the correct 'Plan Management' section or button to proceed with subscription plan creation.
-        frame = context.pages[-1]
-        # Click 'Dashboard' button to check if Plan Management is accessible from there or menu changes.
-        elem = frame.locator('xpath=html/body/div/div/div/div/div[2]/div/div[2]/ul/li/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        # -> Open Plan Management (the plans tab of Square Config) as the wine club owner.
+        shell = await AdminShell(page).wait_until_ready()
+        await shell.open_plans()
         
 
         # --> Assertions to verify final state
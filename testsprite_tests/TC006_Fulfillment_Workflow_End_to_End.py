@@ -1,6 +1,8 @@
 import asyncio
 from playwright import async_api
 from playwright.async_api import expect
+import sessions
+from pages import AdminShell, DashboardPage
 
 async def run_test():
     pw = None
@@ -22,8 +24,8 @@ async def run_test():
             ],
         )
         
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
+        # Create a browser context already signed in as the club owner (saved storage_state)
+        context = await sessions.new_context(browser, "owner")
         context.set_default_timeout(5000)
         
         # Open a new page in the browser context
@@ -46,32 +48,17 @@ async def run_test():
                 pass
         
         # Interact with the page elements to simulate user flow
-        # -> Click 'Login as Wine Club Owner' button to login as wine club owner.
-        frame = context.pages[-1]
-        # Click 'Login as Wine Club Owner' button to login as wine club owner.
-        elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[2]/div/div[2]/button[3]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Click on 'Fulfillment' button in the sidebar to access the Fulfillment Workflow section.
-        frame = context.pages[-1]
-        # Click on 'Fulfillment' button in the sidebar to access the Fulfillment Workflow section.
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div/div[2]/div/div[2]/ul/li[4]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        # -> Open the Fulfillment Workflow section as the wine club owner.
+        shell = await AdminShell(page).wait_until_ready()
+        fulfillment = await shell.open_fulfillment()
         
 
-        # -> Mark the first order ORD-001 as picked by clicking its 'Mark Picked' button.
-        frame = context.pages[-1]
-        # Click 'Mark Picked' button for order ORD-001 to mark it as picked.
-        elem = frame.locator('xpath=html/body/div/div[2]/div/main/div/div/div[2]/div[2]/div/div[2]/div/div/div/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        # -> Mark the first pending order as picked.
+        await fulfillment.mark_ready_to_ship(fulfillment.orders.first)
         
 
         # -> Click the 'Fix Authentication' button to resolve the Square API access token issue.
-        frame = context.pages[-1]
-        # Click the 'Fix Authentication' button to resolve the Square API access token issue.
-        elem = frame.locator('xpath=html/body/div/div/div/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await DashboardPage(page).fix_square_auth()
         
 
         # --> Assertions to verify final state
@@ -1,6 +1,8 @@
 import asyncio
 from playwright import async_api
 from playwright.async_api import expect
+import sessions
+from pages import AdminShell
 
 async def run_test():
     pw = None
@@ -22,8 +24,8 @@ async def run_test():
             ],
         )
         
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
+        # Create a browser context already signed in as the demo account (saved storage_state)
+        context = await sessions.new_context(browser, "demo")
         context.set_default_timeout(5000)
         
         # Open a new page in the browser context
@@ -46,25 +48,10 @@ async def run_test():
                 pass
         
         # Interact with the page elements to simulate user flow
-        # -> Click 'Login as Demo Account' button with index 10 to login with demo credentials.
-        frame = context.pages[-1]
-        # Click 'Login as Demo Account' button to login with demo credentials.
-        elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[2]/div/div[2]/button[3]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Click 'Members' menu to navigate to member management for member sync testing.
-        frame = context.pages[-1]
-        # Click 'Members' menu to navigate to member management for member sync testing.
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div/div[2]/div/div[2]/ul/li[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Click 'Sync from Square' button to perform member sync action and test error handling.
-        frame = context.pages[-1]
-        # Click 'Sync from Square' button to perform member sync action and test error handling.
-        elem = frame.locator('xpath=html/body/div/div[2]/div/main/div/div/div/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        # -> Open Member Management and run 'Sync from Square' to test error handling.
+        shell = await AdminShell(page).wait_until_ready()
+        members = await shell.open_members()
+        await members.sync_square()
         
 
         # --> Assertions to verify final state
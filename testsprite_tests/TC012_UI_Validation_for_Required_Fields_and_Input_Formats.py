@@ -1,6 +1,8 @@
 import asyncio
 from playwright import async_api
 from playwright.async_api import expect
+import sessions
+from pages import AdminShell
 
 async def run_test():
     pw = None
@@ -22,8 +24,8 @@ async def run_test():
             ],
         )
         
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
+        # Create a browser context already signed in as the demo account (saved storage_state)
+        context = await sessions.new_context(browser, "demo")
         context.set_default_timeout(5000)
         
         # Open a new page in the browser context
@@ -46,25 +48,10 @@ async def run_test():
                 pass
         
         # Interact with the page elements to simulate user flow
-        # -> Click 'Login as Demo Account' button at index 10 to access admin dashboard.
-        frame = context.pages[-1]
-        # Click 'Login as Demo Account' button to access admin dashboard
-        elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[2]/div/div[2]/button[3]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Click on 'Members' menu to open Member Management add/edit form.
-        frame = context.pages[-1]
-        # Click on 'Members' menu to open Member Management add/edit form
-        elem = frame.locator('xpath=html/body/div/div[2]/div/div/div[2]/div/div[2]/ul/li[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Click 'Add Member' button to open the add member form for validation testing.
-        frame = context.pages[-1]
-        # Click 'Add Member' button to open the add member form
-        elem = frame.locator('xpath=html/body/div/div[2]/div/main/div/div/div/div[2]/button[4]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        # -> Open Member Management and the add member form for validation testing.
+        shell = await AdminShell(page).wait_until_ready()
+        members = await shell.open_members()
+        await members.by_id("members-add").click()
         
 
         # --> Assertions to verify final state
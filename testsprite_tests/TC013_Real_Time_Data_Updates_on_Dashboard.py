@@ -1,6 +1,8 @@
 import asyncio
 from playwright import async_api
 from playwright.async_api import expect
+import sessions
+from pages import AdminShell, DashboardPage
 
 async def run_test():
     pw = None
@@ -22,8 +24,8 @@ async def run_test():
             ],
         )
         
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
+        # Create a browser context already signed in as the demo account (saved storage_state)
+        context = await sessions.new_context(browser, "demo")
         context.set_default_timeout(5000)
         
         # Open a new page in the browser context
@@ -46,49 +48,10 @@ async def run_test():
                 pass
         
         # Interact with the page elements to simulate user flow
-        # -> Try to login using the 'Login as Demo Account' button at index 10 as an alternative to manual input.
-        frame = context.pages[-1]
-        # Click Login as Demo Account button to login without manual input
-        elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[2]/div/div[2]/button[3]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Simulate a new member signup or payment through backend or API to trigger real-time update on dashboard.
-        await page.goto('http://localhost:3000/members', timeout=10000)
-        await asyncio.sleep(3)
-        
-
-        # -> Click 'Login as Demo Account' button at index 10 to login again and access Admin Dashboard.
-        frame = context.pages[-1]
-        # Click Login as Demo Account button to login again
-        elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[2]/div/div[2]/button[3]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Simulate a new member signup or payment through backend or API to trigger real-time update on dashboard.
-        await page.goto('http://localhost:3000/dashboard', timeout=10000)
-        await asyncio.sleep(3)
-        
-
-        # -> Click 'Login as Demo Account' button at index 10 to login and access Admin Dashboard.
-        frame = context.pages[-1]
-        # Click Login as Demo Account button to login again
-        elem = frame.locator('xpath=html/body/div/div/div/div[2]/div[2]/div[2]/div/div[2]/button[3]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Simulate a new member signup or payment through backend or API to trigger real-time update on dashboard.
-        frame = context.pages[-1]
-        # Click Members button to navigate to Members page for simulating new member signup or payment
-        elem = frame.locator('xpath=html/body/div/div/div/div/div[2]/div/div[2]/ul/li[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Click 'Add Member' button to simulate adding a new member and trigger real-time update on dashboard.
-        frame = context.pages[-1]
-        # Click Add Member button to open member addition form
-        elem = frame.locator('xpath=html/body/div/div/div/main/div/div/div/div[2]/button[4]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        # -> Start on the Admin Dashboard, then add a member to trigger a real-time update.
+        await DashboardPage(page).wait_until_ready()
+        members = await AdminShell(page).open_members()
+        await members.by_id("members-add").click()
         
 
         # --> Assertions to verify final state
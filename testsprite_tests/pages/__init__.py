@@ -0,0 +1,38 @@
+"""Page objects for the TC scripts, keyed on the data-testid attributes in src/components.
+
+Every element is found with a single `get_by_test_id` query against the live page, so a
+flow no longer depends on absolute XPath or re-resolves `context.pages[-1]` per step:
+
+    from pages import AdminShell, AuthPage
+
+    auth = AuthPage(page)
+    await auth.login()                  # tmp/config.json user, or login(email, password)
+    shell = AdminShell(page)
+    members = await shell.open_members()
+    await members.search("smith")
+    assert await members.rows.count() > 0
+
+- base.py: BasePage (root test id, wait_until_ready)
+- auth.py: password / magic-link login
+- layout.py: AdminShell sidebar navigation, demo toggle, logout
+- dashboard.py, members.py, plans.py, fulfillment.py: one object per admin page
+"""
+
+from .auth import AuthPage, default_credentials
+from .base import BasePage
+from .dashboard import DashboardPage
+from .fulfillment import FulfillmentPage
+from .layout import AdminShell
+from .members import MembersPage
+from .plans import PlansPage
+
+__all__ = [
+    "AdminShell",
+    "AuthPage",
+    "BasePage",
+    "DashboardPage",
+    "FulfillmentPage",
+    "MembersPage",
+    "PlansPage",
+    "default_credentials",
+]
@@ -0,0 +1,61 @@
+"""The sign-in card (AuthPage.tsx)."""
+
+import json
+from pathlib import Path
+
+from playwright.async_api import expect
+
+from .base import DEFAULT_TIMEOUT_MS, BasePage
+
+# Club admins land in AdminLayout, the SaaS admin in SuperadminLayout
+SIGNED_IN_SHELL = "[data-testid='admin-main'], [data-testid='superadmin-main']"
+
+CONFIG_FILE = Path(__file__).resolve().parent.parent / "tmp" / "config.json"
+
+
+def default_credentials():
+    """(email, password) of the TestSprite login user from tmp/config.json."""
+    config = json.loads(CONFIG_FILE.read_text(encoding="utf-8"))
+    return config["loginUser"], config["loginPassword"]
+
+
+class AuthPage(BasePage):
+    ROOT = "auth-page"
+
+    @property
+    def email(self):
+        return self.by_id("auth-email")
+
+    @property
+    def password(self):
+        return self.by_id("auth-password")
+
+    @property
+    def submit_button(self):
+        return self.by_id("auth-submit")
+
+    @property
+    def error(self):
+        return self.by_id("auth-error")
+
+    async def login(self, email=None, password=None, wait_for_shell=True, timeout=DEFAULT_TIMEOUT_MS):
+        """Signs in with email/password (default: the config.json user); by default waits for the signed-in layout."""
+        if email is None:
+            email, password = default_credentials()
+        await self.wait_until_ready(timeout)
+        await self.by_id("auth-tab-password").click()
+        await self.email.fill(email)
+        await self.password.fill(password)
+        await self.submit_button.click()
+        if wait_for_shell:
+            await expect(self.page.locator(SIGNED_IN_SHELL).first).to_be_visible(timeout=timeout)
+
+    async def request_magic_link(self, email):
+        await self.wait_until_ready()
+        await self.by_id("auth-tab-magic-link").click()
+        await self.by_id("auth-magic-email").fill(email)
+        await self.by_id("auth-magic-submit").click()
+
+    async def error_text(self, timeout=DEFAULT_TIMEOUT_MS):
+        await expect(self.error).to_be_visible(timeout=timeout)
+        return (await self.error.inner_text()).strip()
@@ -0,0 +1,27 @@
+"""Shared page-object plumbing."""
+
+from playwright.async_api import Locator, Page, expect
+
+DEFAULT_TIMEOUT_MS = 10000
+
+
+class BasePage:
+    # data-testid on the page's outermost element; wait_until_ready() blocks on it
+    ROOT = None
+
+    def __init__(self, page: Page):
+        self.page = page
+
+    def by_id(self, test_id: str) -> Locator:
+        return self.page.get_by_test_id(test_id)
+
+    @property
+    def root(self) -> Locator:
+        return self.by_id(self.ROOT)
+
+    async def wait_until_ready(self, timeout=DEFAULT_TIMEOUT_MS):
+        await expect(self.root).to_be_visible(timeout=timeout)
+        return self
+
+    async def is_open(self) -> bool:
+        return await self.root.is_visible()
@@ -0,0 +1,46 @@
+"""Dashboard.tsx: the metric cards."""
+
+import re
+
+from playwright.async_api import expect
+
+from .base import DEFAULT_TIMEOUT_MS, BasePage
+
+
+def stat_slug(title):
+    # Mirrors the slug Dashboard.tsx builds for dashboard-stat-<slug>
+    return re.sub(r"-$", "", re.sub(r"[^a-z0-9]+", "-", title.lower()))
+
+
+class DashboardPage(BasePage):
+    ROOT = "dashboard"
+
+    async def wait_until_ready(self, timeout=DEFAULT_TIMEOUT_MS):
+        await expect(self.by_id("dashboard-loading")).to_have_count(0, timeout=timeout)
+        return await super().wait_until_ready(timeout)
+
+    @property
+    def fix_square_auth_button(self):
+        # In the Square authentication banner App.tsx shows above the admin pages in demo mode
+        return self.by_id("square-auth-fix")
+
+    async def fix_square_auth(self, timeout=DEFAULT_TIMEOUT_MS):
+        """Follows the banner's 'Fix Authentication' link to the Square diagnostic page."""
+        await expect(self.fix_square_auth_button).to_be_visible(timeout=timeout)
+        await self.fix_square_auth_button.click()
+
+    def stat(self, title):
+        return self.by_id(f"dashboard-stat-{stat_slug(title)}")
+
+    async def stat_value(self, title):
+        return (await self.stat(title).get_by_test_id("dashboard-stat-value").inner_text()).strip()
+
+    async def stats(self):
+        """{card title slug: displayed value} for every metric card."""
+        values = {}
+        cards = self.page.locator("[data-testid^='dashboard-stat-']:not([data-testid='dashboard-stat-value'])")
+        for index in range(await cards.count()):
+            card = cards.nth(index)
+            slug = (await card.get_attribute("data-testid"))[len("dashboard-stat-"):]
+            values[slug] = (await card.get_by_test_id("dashboard-stat-value").inner_text()).strip()
+        return values
@@ -0,0 +1,35 @@
+"""FulfillmentPage.tsx: Square orders through picked, approved and shipped."""
+
+from .base import BasePage
+
+
+class FulfillmentPage(BasePage):
+    ROOT = "fulfillment-page"
+
+    @property
+    def orders(self):
+        return self.by_id("fulfillment-order")
+
+    def order(self, order_id):
+        return self.page.locator(f"[data-testid='fulfillment-order'][data-order-id='{order_id}']")
+
+    async def show(self, tab):
+        """tab: orders, picked, approved or shipped."""
+        await self.by_id(f"fulfillment-tab-{tab}").click()
+
+    async def refresh(self):
+        await self.by_id("fulfillment-refresh").click()
+
+    async def mark_ready_to_ship(self, order):
+        await order.get_by_test_id("fulfillment-ready-to-ship").click()
+
+    async def approve_selected(self):
+        await self.by_id("fulfillment-approve-selected").click()
+
+    async def ship_selected(self):
+        await self.by_id("fulfillment-ship-selected").click()
+
+    async def upload_tracking(self, csv_path):
+        await self.by_id("fulfillment-upload-tracking").click()
+        await self.by_id("fulfillment-tracking-file").set_input_files(csv_path)
+        await self.by_id("fulfillment-tracking-submit").click()
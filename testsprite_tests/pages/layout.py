@@ -0,0 +1,42 @@
+"""The admin sidebar (AdminLayout.tsx) and navigation into each page."""
+
+from .base import BasePage
+from .dashboard import DashboardPage
+from .fulfillment import FulfillmentPage
+from .members import MembersPage
+from .plans import PlansPage
+
+
+class AdminShell(BasePage):
+    ROOT = "admin-main"
+
+    def nav(self, item_id):
+        # Item ids match AdminLayout's navigation list: dashboard, members, shipments, fulfillment, ...
+        return self.by_id(f"nav-{item_id}")
+
+    async def open(self, item_id, page_class=None):
+        await self.nav(item_id).click()
+        if page_class:
+            return await page_class(self.page).wait_until_ready()
+        return self
+
+    async def open_dashboard(self):
+        return await self.open("dashboard", DashboardPage)
+
+    async def open_members(self):
+        return await self.open("members", MembersPage)
+
+    async def open_plans(self):
+        # PlansPage is rendered inside the Square Config page's "plans" tab
+        await self.open("square-config")
+        await self.by_id("square-config-tab-plans").click()
+        return await PlansPage(self.page).wait_until_ready()
+
+    async def open_fulfillment(self):
+        return await self.open("fulfillment", FulfillmentPage)
+
+    async def toggle_demo_mode(self):
+        await self.by_id("demo-mode-toggle").click()
+
+    async def logout(self):
+        await self.by_id("logout").click()
@@ -0,0 +1,48 @@
+"""MembersPage.tsx: member list, filters, add/edit dialogs and Square sync."""
+
+from .base import BasePage
+
+
+class MembersPage(BasePage):
+    ROOT = "members-page"
+
+    @property
+    def rows(self):
+        return self.by_id("member-row")
+
+    def row(self, member_id):
+        return self.page.locator(f"[data-testid='member-row'][data-member-id='{member_id}']")
+
+    def row_with_text(self, text):
+        return self.rows.filter(has_text=text)
+
+    async def search(self, text):
+        await self.by_id("members-search").fill(text)
+
+    async def filter_by_plan(self, plan_name):
+        await self.by_id("members-plan-filter").click()
+        await self.page.get_by_role("option", name=plan_name).click()
+
+    async def refresh(self):
+        await self.by_id("members-refresh").click()
+
+    async def sync_square(self):
+        await self.by_id("members-sync-square").click()
+
+    async def add_member(self, name, email, phone=None, plan_name=None):
+        await self.by_id("members-add").click()
+        await self.by_id("member-new-name").fill(name)
+        await self.by_id("member-new-email").fill(email)
+        if phone:
+            await self.by_id("member-new-phone").fill(phone)
+        if plan_name:
+            await self.by_id("member-new-plan").click()
+            await self.page.get_by_role("option", name=plan_name).click()
+        await self.by_id("member-new-submit").click()
+
+    async def edit_member(self, row):
+        """Opens the edit dialog for a row; fill fields then call save_member()."""
+        await row.get_by_test_id("member-edit").click()
+
+    async def save_member(self):
+        await self.by_id("member-edit-save").click()
@@ -0,0 +1,47 @@
+"""PlansPage.tsx: subscription plans and shipping zones."""
+
+import re
+
+from .base import BasePage
+
+
+class PlansPage(BasePage):
+    ROOT = "plans-page"
+
+    @property
+    def rows(self):
+        return self.by_id("plan-row")
+
+    def row(self, plan_id):
+        return self.page.locator(f"[data-testid='plan-row'][data-plan-id='{plan_id}']")
+
+    def row_with_text(self, text):
+        return self.rows.filter(has_text=text)
+
+    async def show_plans(self):
+        await self.by_id("plans-tab-plans").click()
+
+    async def show_shipping_zones(self):
+        await self.by_id("plans-tab-shipping").click()
+
+    async def create_plan(self, name, bottle_count=None):
+        await self.by_id("plans-create").click()
+        await self._fill_form(name, bottle_count)
+
+    async def edit_plan(self, row, name=None, bottle_count=None):
+        await row.get_by_test_id("plan-edit").click()
+        await self._fill_form(name, bottle_count)
+
+    async def delete_plan(self, row):
+        # handleDeletePlan asks for window.confirm; accept it
+        self.page.once("dialog", lambda dialog: dialog.accept())
+        await row.get_by_test_id("plan-delete").click()
+
+    async def _fill_form(self, name, bottle_count):
+        # Create and edit dialogs share test ids; only one is open at a time
+        if name is not None:
+            await self.by_id("plan-form-name").fill(name)
+        if bottle_count is not None:
+            await self.by_id("plan-form-bottles").click()
+            await self.page.get_by_role("option", name=re.compile(rf"^{bottle_count} bottles?$")).click()
+        await self.by_id("plan-form-submit").click()
@@ -0,0 +1,7 @@
+"""Performance tooling for the TestSprite Playwright suite.
+
+- instrument.py: times every Playwright action and API call made by the TC scripts
+- network.py: per-flow API latency, payload size and request counts with budgets
+- run_suite.py: runs the TC scripts with instrumentation and records the run
+- history.py: SQLite run history and the slow-step / flaky-locator / latency trend reports
+"""
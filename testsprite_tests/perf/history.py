@@ -0,0 +1,353 @@
+"""SQLite history of suite runs and trend reports.
+
+Ingests either a TestSprite snapshot (tmp/test_results.json) or the JSON-lines event log
+written by run_suite.py, one run per ingest, and reports across the stored runs:
+
+- slowest steps: median / p95 duration of each Playwright action, by test and locator
+- flakiest locators: locators that pass in some runs and fail in others
+- endpoint regressions: routes whose latest median latency is well above their baseline
+
+Usage:
+    python -m perf.history ingest tmp/test_results.json
+    python -m perf.history ingest tmp/run_events.jsonl --label ci-1234
+    python -m perf.history report --runs 20 --fail-on-regression
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import statistics
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+DEFAULT_DB = Path(__file__).resolve().parent.parent / "tmp" / "history.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  source TEXT NOT NULL,
+  source_digest TEXT NOT NULL UNIQUE,
+  label TEXT,
+  ingested_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS test_results (
+  run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+  title TEXT NOT NULL,
+  status TEXT NOT NULL,
+  error TEXT,
+  started_at TEXT,
+  duration_ms REAL,
+  PRIMARY KEY (run_id, title)
+);
+
+CREATE TABLE IF NOT EXISTS step_timings (
+  run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+  test_title TEXT NOT NULL,
+  step_index INTEGER NOT NULL,
+  action TEXT NOT NULL,
+  locator TEXT NOT NULL,
+  duration_ms REAL NOT NULL,
+  ok INTEGER NOT NULL,
+  error TEXT
+);
+
+CREATE TABLE IF NOT EXISTS endpoint_timings (
+  run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+  test_title TEXT,
+  endpoint TEXT NOT NULL,
+  status INTEGER,
+  duration_ms REAL NOT NULL,
+  bytes INTEGER
+);
+
+CREATE INDEX IF NOT EXISTS idx_step_timings_locator ON step_timings(locator, run_id);
+CREATE INDEX IF NOT EXISTS idx_endpoint_timings_endpoint ON endpoint_timings(endpoint, run_id);
+"""
+
+
+def connect(path=DEFAULT_DB):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(path)
+    db.execute("PRAGMA foreign_keys = ON")
+    db.executescript(SCHEMA)
+    return db
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+# Ingest
+
+def ingest(db, path, label=None):
+    """Stores one run. Returns the new run id, or None if this file was already ingested."""
+    path = Path(path)
+    raw = path.read_bytes()
+    digest = hashlib.sha1(raw).hexdigest()
+
+    if db.execute("SELECT 1 FROM runs WHERE source_digest = ?", (digest,)).fetchone():
+        return None
+
+    with db:
+        run_id = db.execute(
+            "INSERT INTO runs (source, source_digest, label, ingested_at) VALUES (?, ?, ?, ?)",
+            (str(path), digest, label, datetime.now(timezone.utc).isoformat()),
+        ).lastrowid
+
+        if path.suffix == ".jsonl":
+            _ingest_events(db, run_id, raw.decode("utf-8"))
+        else:
+            _ingest_testsprite(db, run_id, json.loads(raw))
+
+    return run_id
+
+
+def _ingest_testsprite(db, run_id, results):
+    # TestSprite snapshots carry status and error per test, no step or request timings
+    for result in results:
+        created, modified = result.get("created"), result.get("modified")
+        duration = None
+        if created and modified:
+            duration = (_parse_time(modified) - _parse_time(created)).total_seconds() * 1000
+        db.execute(
+            "INSERT OR REPLACE INTO test_results (run_id, title, status, error, started_at, duration_ms) VALUES (?, ?, ?, ?, ?, ?)",
+            (run_id, result["title"], result.get("testStatus", "UNKNOWN"), result.get("testError"), created, duration),
+        )
+
+
+def _ingest_events(db, run_id, text):
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        event = json.loads(line)
+        kind = event["type"]
+
+        if kind == "test":
+            db.execute(
+                "INSERT OR REPLACE INTO test_results (run_id, title, status, error, started_at, duration_ms) VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, event["test"], event["status"], event.get("error"),
+                 datetime.fromtimestamp(event["at"], timezone.utc).isoformat(), event.get("duration_ms")),
+            )
+        elif kind == "step":
+            db.execute(
+                "INSERT INTO step_timings (run_id, test_title, step_index, action, locator, duration_ms, ok, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, event["test"], event["index"], event["action"], event["locator"],
+                 event["duration_ms"], 1 if event["ok"] else 0, event.get("error")),
+            )
+        elif kind == "request" and event.get("duration_ms", -1) >= 0:
+            db.execute(
+                "INSERT INTO endpoint_timings (run_id, test_title, endpoint, status, duration_ms, bytes) VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, event.get("test"), event["endpoint"], event.get("status"), event["duration_ms"], event.get("bytes")),
+            )
+
+
+def _parse_time(value):
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+# Reports
+
+def recent_run_ids(db, runs):
+    rows = db.execute("SELECT id FROM runs ORDER BY id DESC LIMIT ?", (runs,)).fetchall()
+    return [row[0] for row in reversed(rows)]
+
+
+def _in_clause(ids):
+    return f"({','.join('?' * len(ids))})"
+
+
+def slowest_steps(db, run_ids, limit=15):
+    if not run_ids:
+        return []
+    rows = db.execute(
+        f"SELECT test_title, action, locator, duration_ms FROM step_timings WHERE ok = 1 AND run_id IN {_in_clause(run_ids)}",
+        run_ids,
+    ).fetchall()
+
+    grouped = {}
+    for test, action, locator, duration in rows:
+        grouped.setdefault((test, action, locator), []).append(duration)
+
+    report = [
+        {
+            "test": test, "action": action, "locator": locator, "samples": len(durations),
+            "median_ms": round(statistics.median(durations), 1),
+            "p95_ms": round(percentile(durations, 95), 1),
+        }
+        for (test, action, locator), durations in grouped.items()
+    ]
+    report.sort(key=lambda row: row["median_ms"], reverse=True)
+    return report[:limit]
+
+
+def flakiest_locators(db, run_ids, limit=15):
+    """Locators that both passed and failed across the window, ranked by failure rate."""
+    if not run_ids:
+        return []
+    rows = db.execute(
+        f"""
+        SELECT locator, action,
+               COUNT(DISTINCT run_id) AS runs,
+               SUM(ok) AS passes,
+               SUM(1 - ok) AS failures,
+               COUNT(DISTINCT test_title) AS tests,
+               MAX(CASE WHEN ok = 0 THEN error END) AS last_error
+        FROM step_timings
+        WHERE run_id IN {_in_clause(run_ids)}
+        GROUP BY locator, action
+        HAVING SUM(ok) > 0 AND SUM(1 - ok) > 0
+        """,
+        run_ids,
+    ).fetchall()
+
+    report = [
+        {
+            "locator": locator, "action": action, "runs": runs, "tests": tests,
+            "failure_rate": round(failures / (passes + failures), 3),
+            "failures": failures, "last_error": last_error,
+        }
+        for locator, action, runs, passes, failures, tests, last_error in rows
+    ]
+    report.sort(key=lambda row: (row["failure_rate"], row["failures"]), reverse=True)
+    return report[:limit]
+
+
+def flaky_tests(db, run_ids):
+    """Tests whose status changed within the window."""
+    if not run_ids:
+        return []
+    rows = db.execute(
+        f"""
+        SELECT title, COUNT(*) AS runs, SUM(status = 'PASSED') AS passes
+        FROM test_results
+        WHERE run_id IN {_in_clause(run_ids)}
+        GROUP BY title
+        HAVING SUM(status = 'PASSED') > 0 AND SUM(status != 'PASSED') > 0
+        ORDER BY title
+        """,
+        run_ids,
+    ).fetchall()
+    return [{"test": title, "runs": runs, "pass_rate": round(passes / runs, 3)} for title, runs, passes in rows]
+
+
+def endpoint_regressions(db, run_ids, threshold=1.25, min_delta_ms=50):
+    """Compares each endpoint's median in the latest run against the median of earlier runs."""
+    if len(run_ids) < 2:
+        return []
+    latest, baseline_ids = run_ids[-1], run_ids[:-1]
+
+    def medians(ids):
+        rows = db.execute(
+            f"SELECT endpoint, duration_ms FROM endpoint_timings WHERE run_id IN {_in_clause(ids)}",
+            ids,
+        ).fetchall()
+        grouped = {}
+        for endpoint, duration in rows:
+            grouped.setdefault(endpoint, []).append(duration)
+        return {endpoint: (statistics.median(values), len(values)) for endpoint, values in grouped.items()}
+
+    current = medians([latest])
+    baseline = medians(baseline_ids)
+
+    report = []
+    for endpoint, (median, samples) in current.items():
+        if endpoint not in baseline:
+            continue
+        base_median, base_samples = baseline[endpoint]
+        ratio = median / base_median if base_median > 0 else float("inf")
+        report.append({
+            "endpoint": endpoint,
+            "baseline_ms": round(base_median, 1),
+            "latest_ms": round(median, 1),
+            "ratio": round(ratio, 2),
+            "samples": samples,
+            "baseline_samples": base_samples,
+            "regressed": ratio >= threshold and median - base_median >= min_delta_ms,
+        })
+    report.sort(key=lambda row: row["ratio"], reverse=True)
+    return report
+
+
+def build_report(db, runs=20, threshold=1.25, min_delta_ms=50):
+    run_ids = recent_run_ids(db, runs)
+    return {
+        "runs": run_ids,
+        "slowest_steps": slowest_steps(db, run_ids),
+        "flakiest_locators": flakiest_locators(db, run_ids),
+        "flaky_tests": flaky_tests(db, run_ids),
+        "endpoint_latency": endpoint_regressions(db, run_ids, threshold, min_delta_ms),
+    }
+
+
+def render_markdown(report):
+    lines = ["# Test Suite Performance Trends", "", f"- **Runs analysed:** {len(report['runs'])}", ""]
+
+    lines += ["## Slowest Steps", "", "| Test | Action | Locator | Median (ms) | p95 (ms) | Samples |", "|---|---|---|---|---|---|"]
+    for row in report["slowest_steps"]:
+        lines.append(f"| {row['test']} | {row['action']} | `{row['locator']}` | {row['median_ms']} | {row['p95_ms']} | {row['samples']} |")
+
+    lines += ["", "## Flakiest Locators", "", "| Locator | Action | Failure rate | Failures | Tests | Last error |", "|---|---|---|---|---|---|"]
+    for row in report["flakiest_locators"]:
+        lines.append(f"| `{row['locator']}` | {row['action']} | {row['failure_rate']:.0%} | {row['failures']} | {row['tests']} | {row['last_error'] or ''} |")
+
+    lines += ["", "## Flaky Tests", ""]
+    lines += [f"- {row['test']}: passed {row['pass_rate']:.0%} of {row['runs']} runs" for row in report["flaky_tests"]] or ["- None"]
+
+    lines += ["", "## Endpoint Latency (latest run vs baseline)", "", "| Endpoint | Baseline (ms) | Latest (ms) | Ratio | |", "|---|---|---|---|---|"]
+    for row in report["endpoint_latency"]:
+        flag = "❌ Regressed" if row["regressed"] else "✅"
+        lines.append(f"| {row['endpoint']} | {row['baseline_ms']} | {row['latest_ms']} | {row['ratio']}x | {flag} |")
+
+    return "\n".join(lines) + "\n"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=DEFAULT_DB, help="SQLite history file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest_cmd = commands.add_parser("ingest", help="store a run")
+    ingest_cmd.add_argument("paths", nargs="+", help="test_results.json or run_suite.py .jsonl event logs")
+    ingest_cmd.add_argument("--label", help="run label, e.g. a CI build number")
+
+    report_cmd = commands.add_parser("report", help="print trend report")
+    report_cmd.add_argument("--runs", type=int, default=20, help="number of most recent runs to analyse")
+    report_cmd.add_argument("--threshold", type=float, default=1.25, help="latency ratio counted as a regression")
+    report_cmd.add_argument("--min-delta-ms", type=float, default=50, help="ignore regressions smaller than this")
+    report_cmd.add_argument("--format", choices=["markdown", "json"], default="markdown")
+    report_cmd.add_argument("--output", help="write the report to this file instead of stdout")
+    report_cmd.add_argument("--fail-on-regression", action="store_true", help="exit 1 if any endpoint regressed")
+
+    args = parser.parse_args(argv)
+    db = connect(args.db)
+
+    if args.command == "ingest":
+        for path in args.paths:
+            run_id = ingest(db, path, args.label)
+            print(f"✅ Ingested {path} as run {run_id}" if run_id else f"⏭️  {path} already ingested")
+        return 0
+
+    report = build_report(db, args.runs, args.threshold, args.min_delta_ms)
+    text = json.dumps(report, indent=2) if args.format == "json" else render_markdown(report)
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+    else:
+        sys.stdout.write(text)
+
+    regressed = [row["endpoint"] for row in report["endpoint_latency"] if row["regressed"]]
+    if args.fail_on_regression and regressed:
+        print(f"❌ Latency regressions: {', '.join(regressed)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
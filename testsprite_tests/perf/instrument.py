@@ -0,0 +1,168 @@
+"""Step and endpoint timing for the generated TC scripts.
+
+The TC scripts are plain Playwright programs, so instead of editing every script the
+Playwright classes are patched in-process: each Locator action / expect() assertion is
+recorded as a step (locator, duration, pass/fail) and every fetch/XHR a context makes is
+recorded with its latency through network.NetworkCapture. Events are appended to a
+Recorder and written as JSON lines.
+"""
+
+import json
+import re
+import time
+from contextlib import contextmanager
+from functools import wraps
+from urllib.parse import urlsplit
+
+# Locator actions that count as a test step
+LOCATOR_ACTIONS = (
+    "click", "dblclick", "fill", "type", "press", "check", "uncheck",
+    "select_option", "hover", "set_input_files", "wait_for",
+)
+# expect(locator) assertions that count as a test step
+ASSERTIONS = (
+    "to_be_visible", "to_be_hidden", "to_have_text", "to_contain_text",
+    "to_have_value", "to_have_count", "to_be_enabled",
+)
+
+EDGE_FUNCTION_PREFIX = "/functions/v1/make-server-9d538b9c"
+PUBLIC_FUNCTION = "make-server-9d538b9c-public"
+
+_UUID = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.I)
+# Square ids (customers, catalog objects, locations) and approval tokens: long, and always
+# with digits, unlike route words such as 'customer-preferences'
+_TOKEN = re.compile(r"^(?=.*\d)[A-Za-z0-9_-]{12,}$")
+# Segments that look like tokens but are part of the route
+_LITERAL_SEGMENTS = {PUBLIC_FUNCTION}
+
+
+def _is_id(segment):
+    if segment in _LITERAL_SEGMENTS:
+        return False
+    return segment.isdigit() or bool(_UUID.match(segment) or _TOKEN.match(segment))
+
+
+def endpoint_key(method, url):
+    """Groups requests by route: 'GET /members/:id' rather than one key per club or token.
+
+    Routes of the main edge function are keyed from the function root; routes of the public
+    function keep its name ('POST /make-server-9d538b9c-public/square/webhooks').
+    """
+    path = urlsplit(url).path
+    if EDGE_FUNCTION_PREFIX in path:
+        path = path.split(EDGE_FUNCTION_PREFIX, 1)[1] or "/"
+        # The prefix also matches the start of the public function's name
+        if path.startswith("-public"):
+            path = f"/{PUBLIC_FUNCTION}{path[len('-public'):]}"
+
+    segments = [":id" if _is_id(segment) else segment for segment in path.split("/")]
+    return f"{method} {'/'.join(segments)}"
+
+
+class Recorder:
+    """Collects step and request events for the test currently running."""
+
+    def __init__(self, run_label=None):
+        self.run_label = run_label
+        self.events = []
+        self.test = None
+        self.step_index = 0
+
+    def start_test(self, title):
+        self.test = title
+        self.step_index = 0
+
+    def record(self, kind, **fields):
+        self.events.append({"type": kind, "test": self.test, "at": time.time(), **fields})
+
+    @contextmanager
+    def step(self, action, locator):
+        index = self.step_index
+        self.step_index += 1
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as error:
+            self.record("step", index=index, action=action, locator=locator,
+                        duration_ms=(time.perf_counter() - started) * 1000, ok=False,
+                        error=str(error).splitlines()[0][:500] if str(error) else type(error).__name__)
+            raise
+        self.record("step", index=index, action=action, locator=locator,
+                    duration_ms=(time.perf_counter() - started) * 1000, ok=True, error=None)
+
+    def write_jsonl(self, path):
+        with open(path, "a", encoding="utf-8") as handle:
+            for event in self.events:
+                handle.write(json.dumps(event) + "\n")
+
+
+def _selector(locator):
+    impl = getattr(locator, "_impl_obj", locator)
+    return getattr(impl, "_selector", None) or repr(locator)
+
+
+def _wrap_locator_action(recorder, original, action):
+    @wraps(original)
+    async def wrapper(self, *args, **kwargs):
+        with recorder.step(action, _selector(self)):
+            return await original(self, *args, **kwargs)
+    return wrapper
+
+
+def _wrap_assertion(recorder, original, action):
+    @wraps(original)
+    async def wrapper(self, *args, **kwargs):
+        impl = getattr(self, "_impl_obj", self)
+        locator = getattr(impl, "_actual_locator", None)
+        with recorder.step(action, _selector(locator) if locator is not None else action):
+            return await original(self, *args, **kwargs)
+    return wrapper
+
+
+def _wrap_goto(recorder, original):
+    @wraps(original)
+    async def wrapper(self, url, *args, **kwargs):
+        with recorder.step("goto", urlsplit(url).path or "/"):
+            return await original(self, url, *args, **kwargs)
+    return wrapper
+
+
+def record_request(recorder, timing):
+    recorder.record(
+        "request",
+        endpoint=timing.endpoint,
+        status=timing.status,
+        duration_ms=timing.duration_ms,
+        bytes=timing.bytes,
+    )
+
+
+def install(recorder, capture=None):
+    """Patches the Playwright async API so every TC script reports to `recorder`.
+
+    Every new browser context is attached to `capture` (a network.NetworkCapture), whose
+    requests are also written to the recorder. Returns the capture.
+    """
+    from playwright.async_api import Browser, Locator, LocatorAssertions, Page
+
+    from .network import NetworkCapture, load_budgets
+
+    capture = capture or NetworkCapture(budgets=load_budgets())
+    capture.listener = lambda timing: record_request(recorder, timing)
+
+    for action in LOCATOR_ACTIONS:
+        setattr(Locator, action, _wrap_locator_action(recorder, getattr(Locator, action), action))
+    for action in ASSERTIONS:
+        setattr(LocatorAssertions, action, _wrap_assertion(recorder, getattr(LocatorAssertions, action), action))
+    Page.goto = _wrap_goto(recorder, Page.goto)
+
+    original_new_context = Browser.new_context
+
+    @wraps(original_new_context)
+    async def new_context(self, *args, **kwargs):
+        context = await original_new_context(self, *args, **kwargs)
+        capture.attach(context)
+        return context
+
+    Browser.new_context = new_context
+    return capture
@@ -0,0 +1,227 @@
+"""Network-level timing for Playwright flows, with latency and request budgets.
+
+Attach a NetworkCapture to a browser context and wrap each user flow in `capture.flow()`.
+Every fetch/XHR made during the flow is recorded with its endpoint, status, latency and
+payload size; when the flow ends the capture waits for in-flight calls to settle and
+raises BudgetExceeded (an AssertionError, so it fails the TC like any other assertion)
+if the flow went over its budget.
+
+    capture = NetworkCapture(budgets=load_budgets())
+    capture.attach(context)
+
+    async with capture.flow("dashboard"):
+        await elem.click(timeout=5000)          # log in
+        await page.wait_for_load_state("networkidle")
+
+    print(capture.flows["dashboard"].summary())
+
+Budgets live in budgets.json next to this file, keyed by flow name:
+    {"dashboard": {"max_requests": 5, "max_duration_ms": 800}}
+"""
+
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from .instrument import EDGE_FUNCTION_PREFIX, endpoint_key
+
+BUDGETS_FILE = Path(__file__).resolve().parent / "budgets.json"
+
+# Resource types that count as API calls; documents, scripts and images are ignored
+API_RESOURCE_TYPES = ("fetch", "xhr")
+
+
+class BudgetExceeded(AssertionError):
+    pass
+
+
+@dataclass
+class FlowBudget:
+    max_requests: Optional[int] = None
+    # Wall time from the start of the flow until its last API response
+    max_duration_ms: Optional[float] = None
+    # Slowest single request
+    max_request_ms: Optional[float] = None
+    max_bytes: Optional[int] = None
+
+
+@dataclass
+class RequestTiming:
+    endpoint: str
+    url: str
+    status: Optional[int]
+    duration_ms: float
+    bytes: Optional[int]
+    started: float
+    finished: float
+    failed: bool = False
+
+
+@dataclass
+class FlowStats:
+    name: str
+    started: float
+    ended: Optional[float] = None
+    requests: List[RequestTiming] = field(default_factory=list)
+
+    @property
+    def duration_ms(self):
+        last = max((request.finished for request in self.requests), default=self.started)
+        return (last - self.started) * 1000
+
+    @property
+    def total_bytes(self):
+        return sum(request.bytes or 0 for request in self.requests)
+
+    def by_endpoint(self):
+        endpoints = {}
+        for request in self.requests:
+            entry = endpoints.setdefault(request.endpoint, {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "bytes": 0, "errors": 0})
+            entry["count"] += 1
+            entry["total_ms"] += request.duration_ms
+            entry["max_ms"] = max(entry["max_ms"], request.duration_ms)
+            entry["bytes"] += request.bytes or 0
+            entry["errors"] += request.failed or (request.status or 0) >= 400
+        return endpoints
+
+    def summary(self):
+        return {
+            "flow": self.name,
+            "requests": len(self.requests),
+            "duration_ms": round(self.duration_ms, 1),
+            "bytes": self.total_bytes,
+            "endpoints": self.by_endpoint(),
+        }
+
+    def violations(self, budget):
+        problems = []
+        if budget.max_requests is not None and len(self.requests) > budget.max_requests:
+            problems.append(f"{len(self.requests)} requests > {budget.max_requests}")
+        if budget.max_duration_ms is not None and self.duration_ms > budget.max_duration_ms:
+            problems.append(f"{self.duration_ms:.0f} ms > {budget.max_duration_ms:.0f} ms")
+        if budget.max_request_ms is not None:
+            slow = [r for r in self.requests if r.duration_ms > budget.max_request_ms]
+            for request in slow:
+                problems.append(f"{request.endpoint} took {request.duration_ms:.0f} ms > {budget.max_request_ms:.0f} ms")
+        if budget.max_bytes is not None and self.total_bytes > budget.max_bytes:
+            problems.append(f"{self.total_bytes} bytes > {budget.max_bytes}")
+        return problems
+
+
+def load_budgets(path=BUDGETS_FILE):
+    path = Path(path)
+    if not path.exists():
+        return {}
+    return {name: FlowBudget(**values) for name, values in json.loads(path.read_text()).items()}
+
+
+class NetworkCapture:
+    """Per-endpoint latency, payload size and request counts for the flows of one or more contexts."""
+
+    def __init__(
+        self,
+        budgets: Optional[Dict[str, FlowBudget]] = None,
+        edge_only: bool = False,
+        listener: Optional[Callable[[RequestTiming], None]] = None,
+        settle_timeout_ms: float = 5000,
+    ):
+        self.budgets = budgets or {}
+        # Only count make-server-9d538b9c calls (ignore Supabase auth/rest traffic)
+        self.edge_only = edge_only
+        self.listener = listener
+        self.settle_timeout_ms = settle_timeout_ms
+        self.flows: Dict[str, FlowStats] = {}
+        self._active: List[FlowStats] = []
+        self._pending: Dict[object, float] = {}
+
+    def _tracked(self, request):
+        if request.resource_type not in API_RESOURCE_TYPES:
+            return False
+        return not self.edge_only or EDGE_FUNCTION_PREFIX in request.url
+
+    def attach(self, context):
+        context.on("request", self._on_request)
+        context.on("requestfinished", self._on_finished)
+        context.on("requestfailed", self._on_failed)
+        return context
+
+    def _on_request(self, request):
+        if self._tracked(request):
+            self._pending[request] = time.monotonic()
+
+    async def _on_finished(self, request):
+        if request not in self._pending:
+            return
+        response = await request.response()
+        try:
+            sizes = await request.sizes()
+        except Exception:
+            sizes = {}
+        self._complete(request, response.status if response else None, sizes.get("responseBodySize"), failed=False)
+
+    def _on_failed(self, request):
+        if request in self._pending:
+            self._complete(request, None, None, failed=True)
+
+    def _complete(self, request, status, size, failed):
+        started = self._pending.pop(request)
+        finished = time.monotonic()
+        # Prefer the browser's own timing; fall back to event times
+        response_end = request.timing.get("responseEnd", -1)
+        duration = response_end if response_end >= 0 else (finished - started) * 1000
+
+        timing = RequestTiming(
+            endpoint=endpoint_key(request.method, request.url),
+            url=request.url,
+            status=status,
+            duration_ms=duration,
+            bytes=size,
+            started=started,
+            finished=finished,
+            failed=failed,
+        )
+        for flow in self._active:
+            if started >= flow.started:
+                flow.requests.append(timing)
+        if self.listener:
+            self.listener(timing)
+
+    async def _settle(self, since):
+        deadline = time.monotonic() + self.settle_timeout_ms / 1000
+        while any(started >= since for started in self._pending.values()) and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+
+    def begin(self, name):
+        """Starts measuring a flow. Prefer `flow()`; this is for callers that can't await."""
+        stats = FlowStats(name=name, started=time.monotonic())
+        self.flows[name] = stats
+        self._active.append(stats)
+        return stats
+
+    def end(self, stats, budget: Optional[FlowBudget] = None):
+        """Stops measuring a flow and raises BudgetExceeded if it went over budget."""
+        if stats in self._active:
+            self._active.remove(stats)
+        stats.ended = time.monotonic()
+
+        budget = budget or self.budgets.get(stats.name)
+        problems = stats.violations(budget) if budget else []
+        if problems:
+            raise BudgetExceeded(f"Flow '{stats.name}' exceeded its budget: {'; '.join(problems)}")
+        return stats
+
+    @asynccontextmanager
+    async def flow(self, name, budget: Optional[FlowBudget] = None):
+        """Measures the API calls started inside the block and enforces the flow's budget."""
+        stats = self.begin(name)
+        try:
+            yield stats
+            await self._settle(stats.started)
+        except BaseException:
+            self._active.remove(stats)
+            raise
+        self.end(stats, budget)
@@ -0,0 +1,98 @@
+"""Runs the TC scripts with step and endpoint timing and records the run in the history.
+
+Each script is executed in this process (it calls asyncio.run itself), so the patched
+Playwright classes from instrument.py see every action. A test also fails when its API
+traffic exceeds the budget for its TC code in budgets.json. Events go to a JSON-lines
+log that is then ingested into the SQLite history.
+
+Usage (from testsprite_tests/):
+    python -m perf.run_suite                      # all TC*.py
+    python -m perf.run_suite TC001 TC006 --repeat 3 --label ci-1234
+"""
+
+import argparse
+import runpy
+import sys
+import time
+import traceback
+from datetime import datetime
+from pathlib import Path
+
+from . import history, instrument
+from .network import BudgetExceeded
+
+TESTS_DIR = Path(__file__).resolve().parent.parent
+
+
+def discover(selectors):
+    scripts = sorted(TESTS_DIR.glob("TC*.py"))
+    if selectors:
+        scripts = [script for script in scripts if any(script.name.startswith(sel) for sel in selectors)]
+    return scripts
+
+
+def test_title(script):
+    # TC001_Admin_Dashboard_Metrics_Display.py -> TC001-Admin Dashboard Metrics Display (TestSprite's title format)
+    code, _, name = script.stem.partition("_")
+    return f"{code}-{name.replace('_', ' ')}"
+
+
+def run_script(recorder, capture, script):
+    recorder.start_test(test_title(script))
+    # Whole-test budgets are keyed by TC code (e.g. "TC001") in budgets.json
+    flow = capture.begin(script.stem.partition("_")[0])
+    started = time.perf_counter()
+    status, error = "PASSED", None
+    try:
+        runpy.run_path(str(script), run_name="__main__")
+    except Exception as exc:
+        status = "FAILED"
+        error = str(exc) or traceback.format_exc(limit=1)
+    try:
+        capture.end(flow)
+    except BudgetExceeded as exc:
+        if status == "PASSED":
+            status, error = "FAILED", str(exc)
+    recorder.record("flow", **flow.summary())
+    recorder.record("test", status=status, error=error, duration_ms=(time.perf_counter() - started) * 1000)
+    return status
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("tests", nargs="*", help="TC prefixes to run, e.g. TC001 (default: all)")
+    parser.add_argument("--repeat", type=int, default=1, help="run the selection this many times (one history run each)")
+    parser.add_argument("--label", help="run label stored with the history, e.g. a CI build number")
+    parser.add_argument("--db", default=history.DEFAULT_DB, help="SQLite history file")
+    parser.add_argument("--events-dir", default=TESTS_DIR / "tmp" / "runs", help="where event logs are written")
+    args = parser.parse_args(argv)
+
+    scripts = discover(args.tests)
+    if not scripts:
+        print("❌ No TC scripts matched")
+        return 1
+
+    recorder = instrument.Recorder(args.label)
+    capture = instrument.install(recorder)
+    db = history.connect(args.db)
+    events_dir = Path(args.events_dir)
+    events_dir.mkdir(parents=True, exist_ok=True)
+
+    failed = 0
+    for attempt in range(args.repeat):
+        recorder.events = []
+        for script in scripts:
+            status = run_script(recorder, capture, script)
+            failed += status != "PASSED"
+            print(f"{'✅' if status == 'PASSED' else '❌'} {test_title(script)}")
+
+        events_path = events_dir / f"run-{datetime.now():%Y%m%d-%H%M%S}-{attempt + 1}.jsonl"
+        recorder.write_jsonl(events_path)
+        run_id = history.ingest(db, events_path, args.label)
+        print(f"📊 Recorded run {run_id} ({events_path.name})")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
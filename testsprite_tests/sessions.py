@@ -0,0 +1,173 @@
+"""Pre-authenticated browser contexts, one saved Playwright storage_state per role.
+
+Logging in once per role and reusing the stored Supabase session lets a TC start on the
+signed-in app instead of replaying the login form. The app restores the session from
+localStorage on load (App.tsx), so a context created from the saved state opens straight
+into the admin, superadmin or member portal layout.
+
+    import sessions
+
+    context = await sessions.new_context(browser, "demo")
+    page = await context.new_page()
+    await page.goto(sessions.BASE_URL)
+
+A role's state is re-created only when its Supabase access token is about to expire (or
+the file is missing / --force is given). Pre-warm every role before a run with:
+
+    python sessions.py                     # from testsprite_tests/
+    python sessions.py owner --force
+
+Roles:
+    superadmin  platform admin (SaaS portal)
+    owner       club 1's owner (admin portal)
+    demo        the TestSprite login user from tmp/config.json, club 1's demo admin
+    member      a club member (john.doe@example.com, seeded by clean-logical-schema.sql) for
+                the member portal flows; create its Supabase auth user like the others
+
+No password lives in this file. Each role reads TESTSPRITE_<ROLE>_PASSWORD (and optionally
+TESTSPRITE_<ROLE>_EMAIL), falling back to the "roles" entry of tmp/config.json:
+
+    "roles": {"owner": {"email": "...", "password": "..."}, ...}
+
+The demo role also accepts tmp/config.json's loginUser / loginPassword.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from playwright.async_api import async_playwright
+
+from pages import AuthPage, default_credentials
+
+TESTS_DIR = Path(__file__).resolve().parent
+STATE_DIR = TESTS_DIR / "tmp" / "auth"
+CONFIG_FILE = TESTS_DIR / "tmp" / "config.json"
+BASE_URL = json.loads(CONFIG_FILE.read_text(encoding="utf-8"))["localEndpoint"]
+
+# Re-login this long before the token's expiry so a test never starts with a token that dies mid-run
+EXPIRY_SKEW_S = 300
+
+
+# Default email per role; passwords only come from the environment or tmp/config.json
+ROLES = {
+    "superadmin": "jimmy@arccom.io",
+    "owner": "klausbellinghausen@gmail.com",
+    "demo": "demo@wineclub.com",
+    "member": "john.doe@example.com",
+}
+
+
+def configured_credentials(role):
+    """(email, password) for the role from tmp/config.json, either may be None."""
+    config = json.loads(CONFIG_FILE.read_text(encoding="utf-8"))
+    entry = config.get("roles", {}).get(role, {})
+    if role == "demo" and not entry:
+        return default_credentials()
+    return entry.get("email"), entry.get("password")
+
+
+def credentials(role):
+    if role not in ROLES:
+        raise ValueError(f"Unknown role '{role}'. Known: {', '.join(ROLES)}")
+    config_email, config_password = configured_credentials(role)
+    email = os.environ.get(f"TESTSPRITE_{role.upper()}_EMAIL") or config_email or ROLES[role]
+    password = os.environ.get(f"TESTSPRITE_{role.upper()}_PASSWORD") or config_password
+    if not password:
+        raise SystemExit(
+            f"❌ No password for role '{role}': set TESTSPRITE_{role.upper()}_PASSWORD "
+            f"or add it under \"roles\" in {CONFIG_FILE}"
+        )
+    return email, password
+
+
+def state_path(role):
+    return STATE_DIR / f"{role}.json"
+
+
+def token_expires_at(state):
+    """expires_at (epoch seconds) of the Supabase session in a storage_state dict, or None."""
+    for origin in state.get("origins", []):
+        for entry in origin.get("localStorage", []):
+            # supabase-js persists the session as sb-<project-ref>-auth-token
+            if entry["name"].startswith("sb-") and entry["name"].endswith("-auth-token"):
+                try:
+                    return json.loads(entry["value"]).get("expires_at")
+                except (ValueError, AttributeError):
+                    return None
+    return None
+
+
+def is_fresh(path, now=None):
+    if not path.exists():
+        return False
+    try:
+        state = json.loads(path.read_text(encoding="utf-8"))
+    except ValueError:
+        return False
+    expires_at = token_expires_at(state)
+    return bool(expires_at) and expires_at - EXPIRY_SKEW_S > (now or time.time())
+
+
+async def login(browser, role, base_url=BASE_URL):
+    """Logs in through the UI and writes the role's storage_state; returns its path."""
+    email, password = credentials(role)
+    context = await browser.new_context()
+    try:
+        page = await context.new_page()
+        await page.goto(base_url)
+        await AuthPage(page).login(email, password)
+        # The layout renders before supabase-js finishes persisting; wait for the token itself
+        await page.wait_for_function(
+            "() => Object.keys(localStorage).some(k => k.startsWith('sb-') && k.endsWith('-auth-token'))"
+        )
+        STATE_DIR.mkdir(parents=True, exist_ok=True)
+        path = state_path(role)
+        await context.storage_state(path=str(path))
+        return path
+    finally:
+        await context.close()
+
+
+async def ensure_state(browser, role, base_url=BASE_URL, force=False):
+    """Path to a storage_state for the role, logging in only if the saved one is missing or expiring."""
+    path = state_path(role)
+    if force or not is_fresh(path):
+        print(f"🔑 Logging in as {role}")
+        await login(browser, role, base_url)
+    return path
+
+
+async def new_context(browser, role, base_url=BASE_URL, **options):
+    """A browser context that is already signed in as the role."""
+    path = await ensure_state(browser, role, base_url)
+    return await browser.new_context(storage_state=str(path), **options)
+
+
+async def main_async(args):
+    async with async_playwright() as pw:
+        browser = await pw.chromium.launch(headless=True)
+        try:
+            for role in args.roles or list(ROLES):
+                path = await ensure_state(browser, role, args.url, force=args.force)
+                expires_at = token_expires_at(json.loads(path.read_text(encoding="utf-8")))
+                print(f"✅ {role}: {path} (token valid for {int((expires_at - time.time()) / 60)} min)")
+        finally:
+            await browser.close()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Save signed-in storage_state for each test role")
+    parser.add_argument("roles", nargs="*", help=f"any of {', '.join(ROLES)} (default: all)")
+    parser.add_argument("--url", default=BASE_URL)
+    parser.add_argument("--force", action="store_true", help="log in again even if the saved token is still valid")
+    return asyncio.run(main_async(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,138 @@
 
-import { defineConfig } from 'vite';
+import { defineConfig, type Plugin } from 'vite';
 import react from '@vitejs/plugin-react-swc';
 import path from 'path';
+import zlib from 'zlib';
 import { fileURLToPath } from 'url';
 
 const __dirname = path.dirname(fileURLToPath(import.meta.url));
 
+// Route bundles (see src/routes.ts). Members and embedded signups never download the
+// admin app. Each portal's layout and landing page share its base chunk; every other
+// admin/superadmin page gets a chunk of its own, so the hover/focus prefetch on a nav item
+// (prefetchRoute) downloads just that page.
+const ROUTE_CHUNKS: Record<string, string[]> = {
+  customer: ['/src/components/customer/'],
+  embed: [
+    '/src/components/EmbeddedSignup.tsx',
+    '/src/components/EmbeddableSignup.tsx',
+    '/src/components/CustomerWineSelection.tsx',
+  ],
+  superadmin: [
+    '/src/components/SuperadminLayout.tsx',
+    '/src/components/SuperadminDashboard.tsx',
+  ],
+  'superadmin-organizations': ['/src/components/ClubsOrganizationsPage.tsx'],
+  'superadmin-users': ['/src/components/ClubsUsersPage.tsx'],
+  'superadmin-billing': ['/src/components/BillingPage.tsx'],
+  admin: [
+    '/src/components/AdminLayout.tsx',
+    '/src/components/Dashboard.tsx',
+  ],
+  'admin-members': ['/src/components/MembersPage.tsx'],
+  'admin-shipments': ['/src/components/ShipmentBuilderPage.tsx'],
+  // Plans and preferences are tabs of the Square config page
+  'admin-square-config': [
+    '/src/components/SquareConfigPage.tsx',
+    '/src/components/PlansPage.tsx',
+    '/src/components/CustomerPreferencesPage.tsx',
+  ],
+  'admin-fulfillment': ['/src/components/FulfillmentPage.tsx'],
+  'admin-marketing': ['/src/components/MarketingIntegration.tsx'],
+  'admin-shipping-schedule': ['/src/components/ShippingSchedulePage.tsx'],
+  'admin-embeddable-signup': ['/src/components/EmbeddableSignupPage.tsx'],
+};
+
+// Gzipped size budgets in KB. Chunks not listed here are shared vendor/ui chunks.
+const CHUNK_BUDGETS_KB: Record<string, number> = {
+  index: 180,
+  admin: 60,
+  superadmin: 40,
+  customer: 40,
+  embed: 40,
+  'vendor-charts': 120,
+};
+// Any single admin-* / superadmin-* page chunk
+const PAGE_CHUNK_BUDGET_KB = 40;
+
+function chunkBudget(name: string): number | undefined {
+  if (name in CHUNK_BUDGETS_KB) return CHUNK_BUDGETS_KB[name];
+  return name.startsWith('admin-') || name.startsWith('superadmin-') ? PAGE_CHUNK_BUDGET_KB : undefined;
+}
+
+function routeChunk(id: string): string | undefined {
+  const normalized = id.split(path.sep).join('/');
+
+  if (normalized.includes('/node_modules/recharts/') || normalized.includes('/node_modules/d3-')) {
+    return 'vendor-charts';
+  }
+
+  for (const [chunk, patterns] of Object.entries(ROUTE_CHUNKS)) {
+    if (patterns.some((pattern) => normalized.includes(pattern))) {
+      return chunk;
+    }
+  }
+
+  return undefined;
+}
+
+// Prints a size table after every build and writes bundle-report.json next to the assets.
+// Set BUNDLE_BUDGET_STRICT=1 to fail the build when a chunk is over budget.
+function bundleBudgetReport(): Plugin {
+  return {
+    name: 'bundle-budget-report',
+    apply: 'build',
+    generateBundle(_options, bundle) {
+      const rows = Object.values(bundle)
+        .filter((output) => output.type === 'chunk')
+        .map((chunk) => {
+          const code = chunk.type === 'chunk' ? chunk.code : '';
+          const budgetKb = chunkBudget(chunk.name);
+          const gzipKb = zlib.gzipSync(code).length / 1024;
+
+          return {
+            chunk: chunk.name,
+            file: chunk.fileName,
+            sizeKb: Number((Buffer.byteLength(code) / 1024).toFixed(1)),
+            gzipKb: Number(gzipKb.toFixed(1)),
+            budgetKb: budgetKb ?? null,
+            overBudget: budgetKb !== undefined && gzipKb > budgetKb,
+          };
+        })
+        .sort((a, b) => b.gzipKb - a.gzipKb);
+
+      console.log('\nBundle budget report (gzip):');
+      console.table(rows.map(({ chunk, sizeKb, gzipKb, budgetKb, overBudget }) => ({
+        chunk,
+        'size (KB)': sizeKb,
+        'gzip (KB)': gzipKb,
+        'budget (KB)': budgetKb ?? '-',
+        status: overBudget ? 'OVER' : 'ok',
+      })));
+
+      this.emitFile({
+        type: 'asset',
+        fileName: 'bundle-report.json',
+        source: JSON.stringify({ generatedAt: new Date().toISOString(), chunks: rows }, null, 2),
+      });
+
+      const overBudget = rows.filter((row) => row.overBudget);
+      if (overBudget.length > 0) {
+        const message = `Bundle budget exceeded: ${overBudget
+          .map((row) => `${row.chunk} ${row.gzipKb}KB > ${row.budgetKb}KB`)
+          .join(', ')}`;
+
+        if (process.env.BUNDLE_BUDGET_STRICT) {
+          this.error(message);
+        }
+        this.warn(message);
+      }
+    },
+  };
+}
+
   export default defineConfig({
-    plugins: [react()],
+    plugins: [react(), bundleBudgetReport()],
     resolve: {
       extensions: ['.js', '.jsx', '.ts', '.tsx', '.json'],
       alias: {
@@ -57,6 +182,11 @@ const __dirname = path.dirname(fileURLToPath(import.meta.url));
     build: {
       target: 'esnext',
       outDir: 'build',
+      rollupOptions: {
+        output: {
+          manualChunks: routeChunk,
+        },
+      },
     },
     server: {
       port: 3000,
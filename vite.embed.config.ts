@@ -0,0 +1,32 @@
+import { defineConfig } from 'vite';
+import react from '@vitejs/plugin-react-swc';
+import path from 'path';
+import { fileURLToPath } from 'url';
+
+const __dirname = path.dirname(fileURLToPath(import.meta.url));
+
+// Standalone build of the signup widget for third-party sites.
+// Emits build/embeddable-signup.js (ES module entry) plus lazily loaded chunks in
+// build/embed/. Only React is bundled - no Supabase client, Radix or admin pages.
+export default defineConfig({
+  plugins: [react()],
+  define: {
+    'process.env.NODE_ENV': JSON.stringify('production'),
+  },
+  build: {
+    target: 'es2020',
+    outDir: 'build',
+    emptyOutDir: false,
+    copyPublicDir: false,
+    lib: {
+      entry: path.resolve(__dirname, 'src/embed/main.tsx'),
+      formats: ['es'],
+      fileName: () => 'embeddable-signup.js',
+    },
+    rollupOptions: {
+      output: {
+        chunkFileNames: 'embed/[name]-[hash].js',
+      },
+    },
+  },
+});